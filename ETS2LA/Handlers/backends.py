@@ -0,0 +1,196 @@
+"""
+CPU inference backends for the models of ETS2LA/Handlers/pytorch.py.
+
+The torch.jit model is exported to ONNX once and the export is cached next to
+the .pt file, then it's run with OpenVINO or ONNX Runtime when they are
+installed. Both are optional, without them the models run through torch.
+
+Quantization converts the weights of the ONNX model to int8 with ONNX Runtime's
+dynamic quantization. Every exported model is compared to torch on a fixed set
+of test frames before it's used, one that doesn't match falls back to the
+unquantized model, and that one to torch. The int8 model is also timed against
+the unquantized one on the test frames, and only used if it's faster, on many
+CPUs it isn't.
+
+Settings (global):
+    inference_backend:       "Automatic", "Torch", "ONNX Runtime" or "OpenVINO"
+    inference_quantization:  whether to use the int8 model
+"""
+# The backends are imported when a model is loaded, the settings page only needs the names.
+from importlib.util import find_spec
+import numpy as np
+import traceback
+import logging
+import time
+import os
+
+onnxruntime_available = find_spec("onnxruntime") is not None
+openvino_available = find_spec("openvino") is not None
+
+BACKENDS = ["Automatic", "Torch", "ONNX Runtime", "OpenVINO"]
+
+TEST_FRAMES = 8
+
+TOLERANCE = 0.05
+"""The largest allowed difference to torch, relative to the range of torch's outputs on the test frames."""
+
+TIMING_RUNS = 5
+"""How many times the int8 and unquantized models are run over the test frames to compare their speed."""
+
+
+def available_backends():
+    """
+    The backends that are installed, in the order Automatic picks them.
+    """
+    backends = []
+    if openvino_available:
+        backends.append("OpenVINO")
+    if onnxruntime_available:
+        backends.append("ONNX Runtime")
+    return backends + ["Torch"]
+
+
+def test_frames(channels, height, width):
+    """
+    The frames the exported models are checked on: black, white, a gradient and seeded noise. (NCHW, 0-1)
+    """
+    frames = np.random.default_rng(0).random((TEST_FRAMES, channels, height, width), dtype=np.float32)
+    frames[0] = 0
+    frames[1] = 1
+    frames[2] = np.linspace(0, 1, width, dtype=np.float32)[None, None, :]
+    return frames
+
+
+def relative_error(reference, outputs):
+    return float(np.abs(outputs - reference).max() / max(float(np.ptp(reference)), 1e-6))
+
+
+def frame_time(loaded, frames):
+    """
+    The fastest of TIMING_RUNS runs over the test frames, per frame in milliseconds.
+    """
+    times = []
+    for _ in range(TIMING_RUNS):
+        start = time.perf_counter()
+        for i in range(len(frames)):
+            loaded.run(frames[i:i + 1])
+        times.append((time.perf_counter() - start) / len(frames))
+    return min(times) * 1000
+
+
+class ONNXRuntimeBackend:
+    name = "ONNX Runtime"
+
+    def __init__(self, path):
+        import onnxruntime
+        self.session = onnxruntime.InferenceSession(path, providers=["CPUExecutionProvider"])
+        self.input = self.session.get_inputs()[0].name
+
+    def run(self, inputs):
+        return self.session.run(None, {self.input: inputs})[0]
+
+
+class OpenVINOBackend:
+    name = "OpenVINO"
+
+    def __init__(self, path):
+        import openvino
+        self.model = openvino.Core().compile_model(path, "CPU")
+
+    def run(self, inputs):
+        return self.model(inputs)[0]
+
+
+def export(model_path, onnx_path, channels, height, width):
+    """
+    Export the torch.jit model to ONNX in float32, with a dynamic batch size.
+    """
+    import torch
+    model = torch.jit.load(model_path, map_location="cpu").float().eval()
+    temporary = onnx_path + f".{os.getpid()}.tmp" # several plugins can export at the same time
+    torch.onnx.export(model, (torch.zeros((1, channels, height, width)),), temporary,
+                      input_names=["input"], output_names=["output"],
+                      dynamic_axes={"input": {0: "batch"}, "output": {0: "batch"}},
+                      opset_version=17, dynamo=False)
+    os.replace(temporary, onnx_path)
+
+
+def quantize(onnx_path, int8_path):
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+    temporary = int8_path + f".{os.getpid()}.tmp"
+    quantize_dynamic(onnx_path, temporary, weight_type=QuantType.QUInt8)
+    os.replace(temporary, int8_path)
+
+
+def load(model_path, channels, height, width, backend="Automatic", quantization=False, identifier=""):
+    """
+    Load the model with the selected backend, exporting it first if there's no cached export.
+
+    Parameters
+    ----------
+    model_path : str
+        The path of the .pt file.
+    backend : str
+        One of BACKENDS.
+    quantization : bool
+        Use the int8 model if it's accurate enough and faster.
+
+    Returns
+    -------
+    ONNXRuntimeBackend or OpenVINOBackend or None
+        None when the model should run through torch.
+    """
+    if backend == "Automatic" or backend not in available_backends():
+        backend = available_backends()[0]
+    if backend == "Torch":
+        return None
+
+    try:
+        base = os.path.splitext(model_path)[0]
+        onnx_path = base + ".onnx"
+        if not os.path.exists(onnx_path):
+            export(model_path, onnx_path, channels, height, width)
+
+        import torch
+        # One frame at a time, some models only work with a batch size of 1.
+        frames = test_frames(channels, height, width)
+        model = torch.jit.load(model_path, map_location="cpu").float().eval()
+        with torch.no_grad():
+            reference = np.concatenate([model(torch.from_numpy(frames[i:i + 1])).numpy() for i in range(len(frames))])
+
+        candidates = [onnx_path]
+        if quantization and onnxruntime_available:
+            int8_path = base + ".int8.onnx"
+            if not os.path.exists(int8_path):
+                quantize(onnx_path, int8_path)
+            candidates.insert(0, int8_path)
+
+        accurate = []
+        for path in candidates:
+            loaded = OpenVINOBackend(path) if backend == "OpenVINO" else ONNXRuntimeBackend(path)
+            outputs = np.concatenate([loaded.run(frames[i:i + 1]) for i in range(len(frames))])
+            error = relative_error(reference, outputs)
+            if path != onnx_path:
+                loaded.name += " int8"
+            if error <= TOLERANCE:
+                accurate.append((path, loaded, error))
+            else:
+                logging.warning(f"[{identifier}] {os.path.basename(path)} on {backend} differs from torch by {error:.4f}, not using it.")
+
+        if len(accurate) == 2:
+            # Both are close enough, int8 only replaces the unquantized model if it's faster.
+            int8_ms, float_ms = frame_time(accurate[0][1], frames), frame_time(accurate[1][1], frames)
+            if int8_ms < float_ms:
+                accurate.pop(1)
+            else:
+                logging.info(f"[{identifier}] The int8 model takes {int8_ms:.2f} ms per frame on {backend} and the unquantized one {float_ms:.2f} ms, not using int8.")
+                accurate.pop(0)
+
+        if accurate:
+            path, loaded, error = accurate[0]
+            logging.info(f"[{identifier}] Running on {backend} ({os.path.basename(path)}), error {error:.4f} compared to torch.")
+            return loaded
+    except Exception:
+        logging.warning(f"[{identifier}] Failed to load the model with {backend}, using torch.\n{traceback.format_exc()}")
+
+    return None
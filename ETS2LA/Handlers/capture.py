@@ -0,0 +1,111 @@
+"""
+The capture service grabs the screen once per frame for all vision plugins. It
+runs in its own process so that copying the frames doesn't hold up the backend.
+See Modules/BetterScreenCapture/shared.py for the ring it writes to.
+
+The service is only started once a plugin asks for it, ScreenCapture.Initialize()
+sends ("start",) to the backend and gets ("started",) back. Users that don't
+run any vision plugins never have the process running.
+"""
+from Modules.BetterScreenCapture.shared import FrameRing, ScreenSource, SyntheticSource, idleAfter, serviceAddress, serviceKey, sharedName
+from multiprocessing.connection import Listener
+from multiprocessing import shared_memory
+
+import multiprocessing
+import threading
+import logging
+import atexit
+import time
+import os
+
+FRAME_INTERVAL = 1 / 60
+"""The shortest time between two grabs. (s)"""
+
+IDLE_INTERVAL = 0.1
+"""How often to check for readers when nobody is reading. (s)"""
+
+process: multiprocessing.Process | None = None
+lock = threading.Lock()
+
+def service(source: str) -> None:
+    try:
+        grabber = SyntheticSource() if source == "synthetic" else ScreenSource()
+        ring = FrameRing(create=True, capacity=grabber.capacity())
+    except Exception:
+        logging.exception("Failed to start the capture service, plugins will capture the screen themselves.")
+        return
+
+    while True:
+        start = time.perf_counter()
+        last_read, display = ring.request()
+        if time.time() - last_read > idleAfter:
+            ring.heartbeat()
+            time.sleep(IDLE_INTERVAL)
+            continue
+
+        try:
+            image = grabber.grab(display)
+        except Exception:
+            logging.exception("Failed to grab the screen.")
+            image = None
+
+        if image is not None and image.nbytes <= ring.capacity:
+            ring.publish(image, display)
+        else:
+            ring.heartbeat()
+
+        time.sleep(max(0, FRAME_INTERVAL - (time.perf_counter() - start)))
+
+def start(source: str = "screen") -> None:
+    """Start the capture service if it isn't running yet.
+
+    :param str source: "screen" to grab the screen, "synthetic" to generate test frames.
+    """
+    global process
+    with lock:
+        if process is not None and process.is_alive():
+            return
+        process = multiprocessing.Process(target=service, args=(source,), daemon=True, name="Capture Service")
+        process.start()
+
+def stop() -> None:
+    """Stop the capture service and remove its ring, called when the backend exits."""
+    global process
+    with lock:
+        if process is not None:
+            process.terminate()
+            process.join()
+            process = None
+    try:
+        ring = shared_memory.SharedMemory(name=sharedName)
+        ring.close()
+        ring.unlink()
+    except FileNotFoundError:
+        pass
+
+def listen(listener: Listener, source: str) -> None:
+    while True:
+        try:
+            with listener.accept() as connection:
+                if connection.recv() == ("start",):
+                    start(source)
+                    connection.send(("started",))
+        except Exception:
+            continue # failed handshake or the plugin went away
+
+def run(source: str = "screen") -> None:
+    """Start the capture service once the first vision plugin asks for it.
+
+    :param str source: "screen" to grab the screen, "synthetic" to generate test frames.
+    """
+    # Listening before returning, so that the readers can ask right away.
+    try:
+        if os.name != "nt" and os.path.exists(serviceAddress):
+            os.unlink(serviceAddress) # left behind by a backend that crashed
+        listener = Listener(serviceAddress, authkey=serviceKey)
+    except Exception:
+        logging.exception("Failed to listen for capture requests, plugins will capture the screen themselves.")
+        return
+
+    threading.Thread(target=listen, args=(listener, source), daemon=True, name="Capture Requests").start()
+    atexit.register(stop)
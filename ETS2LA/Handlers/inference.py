@@ -0,0 +1,319 @@
+"""
+The inference server runs the torch.jit models of the vision plugins in one
+process, so every model is only loaded once and requests for the same model
+from several plugins are run as one batch.
+
+Each model has two threads. The preprocessing thread collects the requests that
+arrive within BATCH_DEADLINE of the first one, and copies them into one of two
+preallocated (and on CUDA pinned) input tensors. Meanwhile the compute thread
+runs the model on the other one. The outputs are sent back as NumPy arrays.
+
+The plugins connect through ETS2LA/Handlers/pytorch.Model.detect, which resizes
+the image to the model's input size before sending it so that only small images
+go through the pipe. When the server isn't running detect() runs the model in
+the plugin's process like before.
+
+Without a GPU the server doesn't take any models by default. Batching doesn't make
+convolutions faster on the CPU and the round trip through the pipe adds latency,
+the gain is sharing one CUDA context and one copy of each model in GPU memory.
+
+Messages (pickled over a multiprocessing connection):
+    ("load", key, path, dtype, width, height, channels) -> ("loaded", key, error or None)
+    ("detect", key, image)                               -> ("output", key, output or None)
+"""
+from multiprocessing.connection import Listener, Client, Connection, wait
+import multiprocessing
+import numpy as np
+import threading
+import tempfile
+import logging
+import queue
+import time
+import os
+
+ADDRESS = r"\\.\pipe\ETS2LA_Inference" if os.name == "nt" else os.path.join(tempfile.gettempdir(), "ETS2LA_Inference.sock")
+AUTHKEY = b"ETS2LA"
+
+MAX_BATCH = 8
+"""The most requests that are run as one batch."""
+
+BATCH_DEADLINE = 0.002
+"""How long to wait for more requests after the first one of a batch. (s)"""
+
+ACTIVE_TIMEOUT = 1
+"""How long after its last request a client is still waited for when collecting a batch. (s)"""
+
+RESPONSE_TIMEOUT = 5
+"""How long a client waits for an answer before it falls back to running the model itself. (s)"""
+
+RETRY_INTERVAL = 5
+"""How often a client tries to connect when the server isn't running. (s)"""
+
+process: multiprocessing.Process | None = None
+
+# MARK: Server
+class Request:
+    def __init__(self, client: "Connected", image: np.ndarray):
+        self.client = client
+        self.image = image
+        self.time = time.perf_counter()
+
+class Connected:
+    """A connected plugin process, the compute threads of all models answer it."""
+    def __init__(self, connection: Connection):
+        self.connection = connection
+        self.lock = threading.Lock()
+
+    def send(self, message: tuple) -> None:
+        try:
+            with self.lock:
+                self.connection.send(message)
+        except (OSError, EOFError):
+            pass # disconnected, the server loop removes it
+
+class Batcher:
+    """Batches the requests of one model.
+
+    :param str path: The path of the torch.jit model file.
+    :param str dtype: The name of the torch dtype to run the model in, for example "float32".
+    """
+    def __init__(self, key: str, path: str, dtype: str, width: int, height: int, channels: int):
+        self.key = key
+        self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+        self.dtype = getattr(torch, dtype)
+        self.model = torch.jit.load(path, map_location=self.device)
+        self.model.eval()
+        self.model.to(self.dtype)
+
+        # Two input buffers, one is filled while the model runs on the other.
+        pinned = self.device.type == "cuda"
+        self.inputs = [torch.empty((MAX_BATCH, channels, height, width), dtype=self.dtype, pin_memory=pinned) for _ in range(2)]
+        self.free = queue.Queue()
+        for buffer in range(len(self.inputs)):
+            self.free.put(buffer)
+
+        self.active = {}
+        self.requests = queue.Queue()
+        self.batches = queue.Queue()
+        threading.Thread(target=self.preprocess, daemon=True, name=f"Preprocess {key}").start()
+        threading.Thread(target=self.compute, daemon=True, name=f"Compute {key}").start()
+
+    def collect(self) -> list[Request]:
+        batch = [self.requests.get()]
+        now = time.perf_counter()
+        self.active[batch[0].client] = now
+        for client, last in list(self.active.items()):
+            if now - last > ACTIVE_TIMEOUT:
+                del self.active[client]
+
+        # Waiting is pointless when every client that uses the model is already in the batch.
+        deadline = batch[0].time + BATCH_DEADLINE
+        while len(batch) < MAX_BATCH and len(batch) < len(self.active):
+            remaining = deadline - time.perf_counter()
+            try:
+                request = self.requests.get(timeout=remaining) if remaining > 0 else self.requests.get_nowait()
+            except queue.Empty:
+                break
+            self.active[request.client] = time.perf_counter()
+            batch.append(request)
+        return batch
+
+    def preprocess(self) -> None:
+        while True:
+            batch = self.collect()
+            buffer = self.free.get()
+            inputs = self.inputs[buffer]
+            prepared = []
+            for request in batch:
+                index = len(prepared)
+                try:
+                    image = torch.from_numpy(request.image)
+                    if image.ndim == 2:
+                        image = image.unsqueeze(2)
+                    # Same as ToTensor: HWC to CHW, and uint8 scaled to 0-1.
+                    inputs[index].copy_(image.permute(2, 0, 1))
+                    if request.image.dtype == np.uint8:
+                        inputs[index].mul_(1 / 255)
+                    prepared.append(request)
+                except Exception:
+                    # Left out of the batch, the plugin runs the model on it itself.
+                    logging.exception(f"Failed to preprocess an image for {self.key}.")
+                    request.client.send(("output", self.key, None))
+
+            if prepared:
+                self.batches.put((buffer, prepared))
+            else:
+                self.free.put(buffer)
+
+    def compute(self) -> None:
+        while True:
+            buffer, batch = self.batches.get()
+            try:
+                with torch.inference_mode():
+                    inputs = self.inputs[buffer][:len(batch)].to(self.device, non_blocking=True)
+                    outputs = self.model(inputs).float().cpu().numpy()
+            except Exception:
+                logging.exception(f"Failed to run {self.key}.")
+                outputs = [None] * len(batch)
+            self.free.put(buffer)
+
+            for request, output in zip(batch, outputs):
+                # Shaped like the output of a batch of one, which is what the plugins index.
+                request.client.send(("output", self.key, output[None] if output is not None else None))
+
+def accept(listener: Listener, connections: queue.Queue) -> None:
+    while True:
+        try:
+            connections.put(listener.accept())
+        except Exception:
+            continue # failed handshake
+
+def server(cpu: bool = False) -> None:
+    # Imported here so that the backend and an unused server don't load torch.
+    global torch
+    try:
+        if os.name != "nt" and os.path.exists(ADDRESS):
+            os.unlink(ADDRESS) # left behind by a server that crashed
+        listener = Listener(ADDRESS, authkey=AUTHKEY)
+    except Exception:
+        logging.exception("Failed to start the inference server, plugins will run their models themselves.")
+        return
+
+    accepted = queue.Queue()
+    threading.Thread(target=accept, args=(listener, accepted), daemon=True, name="Inference Accept").start()
+
+    clients: dict[Connection, Connected] = {}
+    batchers: dict[str, Batcher] = {}
+    while True:
+        while not accepted.empty():
+            connection = accepted.get()
+            clients[connection] = Connected(connection)
+
+        for connection in wait(list(clients), timeout=0.1):
+            client = clients[connection]
+            try:
+                message = connection.recv()
+            except (OSError, EOFError):
+                del clients[connection]
+                continue
+
+            if message[0] == "detect":
+                _, key, image = message
+                batcher = batchers.get(key)
+                if batcher is None:
+                    client.send(("output", key, None))
+                else:
+                    batcher.requests.put(Request(client, image))
+
+            elif message[0] == "load":
+                key, *config = message[1:]
+                error = None
+                if key not in batchers:
+                    try:
+                        import torch
+                        if torch.cuda.is_available() or cpu:
+                            batchers[key] = Batcher(key, *config)
+                        else:
+                            error = "No GPU, models run in the plugins"
+                    except Exception as e:
+                        logging.exception(f"Failed to load {key} for inference.")
+                        error = str(e)
+                client.send(("loaded", key, error))
+
+# MARK: Client
+class InferenceClient:
+    """The connection of one plugin process to the server, shared by all of its models.
+
+    Every method raises ConnectionError when the server isn't running or doesn't
+    answer, the caller should then run the model itself.
+    """
+    connection: Connection | None = None
+    lastConnect: float = 0
+    loaded: set[str]
+    refused: dict[str, str]
+    """Models the server can't run and why, they're not requested again until the next connection."""
+
+    def __init__(self):
+        self.loaded = set()
+        self.refused = {}
+        self.lock = threading.Lock()
+
+    def connect(self) -> Connection:
+        if self.connection is not None:
+            return self.connection
+
+        # Don't try to connect on every frame when the server isn't running.
+        if time.time() - self.lastConnect < RETRY_INTERVAL:
+            raise ConnectionError("Inference server isn't running")
+        self.lastConnect = time.time()
+        try:
+            self.connection = Client(ADDRESS, authkey=AUTHKEY)
+        except Exception:
+            raise ConnectionError("Inference server isn't running")
+        self.loaded = set()
+        self.refused = {}
+        return self.connection
+
+    def request(self, message: tuple) -> tuple:
+        connection = self.connect()
+        try:
+            connection.send(message)
+            if not connection.poll(RESPONSE_TIMEOUT):
+                raise TimeoutError
+            return connection.recv()
+        except (OSError, EOFError, TimeoutError):
+            # An answer that arrives later would be taken for the answer to the next request.
+            self.close()
+            raise ConnectionError("Inference server stopped answering")
+
+    def load(self, key: str, config: tuple) -> None:
+        """Make the server load the model, so the plugin knows if it has to load its own copy.
+
+        :param str key: Identifies the model, see detect.
+        :param tuple config: (path, dtype, width, height, channels)
+        """
+        with self.lock:
+            self._load(key, config)
+
+    def _load(self, key: str, config: tuple) -> None:
+        if key in self.refused:
+            raise ConnectionError(f"Inference server can't run {key}: {self.refused[key]}")
+        if key not in self.loaded:
+            _, _, error = self.request(("load", key, *config))
+            if error is not None:
+                self.refused[key] = error
+                raise ConnectionError(f"Inference server can't run {key}: {error}")
+            self.loaded.add(key)
+
+    def detect(self, key: str, config: tuple, image: np.ndarray) -> np.ndarray:
+        """Run the model on an image that's already resized to the model's input size.
+
+        :param str key: Identifies the model, requests with the same key are batched together.
+        :param tuple config: (path, dtype, width, height, channels), used to load the model the first time.
+        :return: The output of the model, with a batch dimension of 1.
+        """
+        with self.lock:
+            self._load(key, config)
+            _, _, output = self.request(("detect", key, image))
+            if output is None:
+                raise ConnectionError(f"Inference server failed to run {key}")
+            return output
+
+    def close(self) -> None:
+        if self.connection is not None:
+            try: self.connection.close()
+            except OSError: pass
+            self.connection = None
+            self.lastConnect = time.time()
+
+client = InferenceClient()
+"""The connection of this process, models connect when they first run."""
+
+def run(cpu: bool = False) -> None:
+    """Start the inference server.
+
+    :param bool cpu: Also run models when there's no GPU, used by benchmarks/inference_server.py.
+    """
+    global process
+    process = multiprocessing.Process(target=server, args=(cpu,), daemon=True, name="Inference Server")
+    process.start()
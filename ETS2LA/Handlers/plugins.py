@@ -1,6 +1,8 @@
 from ETS2LA.Plugin.process import PluginProcess, PluginDescription, PluginMessage, Author
 from ETS2LA.Networking.Servers import notifications
 from ETS2LA.Plugin.message import Channel, State
+from ETS2LA.Plugin.classes.profiler import Histogram, HistogramWindow
+from ETS2LA.Plugin.bus import TagBus
 from ETS2LA.Utils.translator import _
 from ETS2LA.Controls import ControlEvent
 from ETS2LA.Handlers import controls
@@ -9,6 +11,7 @@ from ETS2LA import variables
 
 import multiprocessing
 import threading
+import atexit
 
 import logging
 import time
@@ -22,6 +25,9 @@ search_folders: list[str] = [
 loading: bool = False
 """Indicator for other files that the plugin handler is still loading plugins."""
 
+bus: TagBus = None # type: ignore
+"""The shared memory tags of all plugins, see ETS2LA/Plugin/bus.py. Created in run()."""
+
 # Discover all plugins in the search folders.
 plugin_folders: list[str] = []
 def discover_plugins() -> None:
@@ -68,9 +74,6 @@ class Plugin:
     running: bool
     """Whether the plugin is running or not."""
     
-    tags: dict = {}
-    """All plugins share this same tags dictionary. This way they can easily share tag data."""
-    
     state: dict
     """The current plugin state used by the frontend."""
     
@@ -81,6 +84,9 @@ class Plugin:
     
     frametimes: list[float]
     
+    phases: dict[str, HistogramWindow]
+    """The durations of the plugin's profiled phases over the last minute."""
+    
     def start_plugin(self) -> None:
         # First initialize / reset the variables
         self.stack = {}
@@ -89,6 +95,7 @@ class Plugin:
             "progress": -1
         }
         self.frametimes = []
+        self.phases = {}
         self.last_controls_state = {}
         self.stop = False
         self.running = False
@@ -106,7 +113,7 @@ class Plugin:
         self.edit_time = os.path.getmtime(self.folder + "/main.py")
         self.process = multiprocessing.Process(
             target=PluginProcess,
-            args=(self.folder, self.queue, self.return_queue),
+            args=(self.folder, self.queue, self.return_queue, bus.handle),
             daemon=True,
             name=f"Plugin {self.folder.split('/')[-1]} Process",
         )
@@ -142,16 +149,6 @@ class Plugin:
         
         self.get_controls()
         
-        threading.Thread(
-            target=self.tag_handler,
-            daemon=True
-        ).start()
-        
-        threading.Thread(
-            target=self.state_handler,
-            daemon=True
-        ).start()
-        
         threading.Thread(
             target=self.page_handler,
             daemon=True
@@ -205,6 +202,12 @@ class Plugin:
                 ).start()
                 continue
             
+            if message.channel == Channel.STATE_UPDATE:
+                if "progress" in message.data and "status" in message.data:
+                    self.state["progress"] = message.data["progress"]
+                    self.state["status"] = message.data["status"]
+                continue
+            
             if message.channel not in self.stack:
                 self.stack[message.channel] = {}
             self.stack[message.channel][message.id] = message
@@ -225,58 +228,6 @@ class Plugin:
             
             time.sleep(0.025)
     
-    def tag_handler(self):
-        while True:   
-            if self.stop:
-                return
-                     
-            if Channel.GET_TAGS in self.stack:
-                while self.stack[Channel.GET_TAGS]:
-                    message = self.stack[Channel.GET_TAGS].popitem()[1]
-                    
-                    tags = message.data["tags"]
-                    response = {}
-                    for tag in tags:
-                        response[tag] = self.tags.get(tag, None)
-                    
-                    message.state = State.DONE
-                    message.data = response
-                    self.queue.put(message, block=True)
-            
-            if Channel.UPDATE_TAGS in self.stack:
-                while self.stack[Channel.UPDATE_TAGS]:
-                    message = self.stack[Channel.UPDATE_TAGS].popitem()[1]
-                    data = message.data
-                    
-                    for tag, value in data.items():
-                        if tag not in self.tags:
-                            self.tags[tag] = {}
-                            
-                        if self.description.id not in self.tags[tag]:
-                            self.tags[tag][self.description.id] = {}
-                            
-                        self.tags[tag][self.description.id] = value
-                    
-                    message.state = State.DONE
-                    message.data = "success" # clear data for faster transmit
-                    self.queue.put(message, block=True)
-            
-            time.sleep(0.01)
-    
-    def state_handler(self):
-        while True:
-            if self.stop:
-                return
-            
-            if Channel.STATE_UPDATE in self.stack:
-                while self.stack[Channel.STATE_UPDATE]:
-                    message = self.stack[Channel.STATE_UPDATE].popitem()[1]
-                    if "progress" in message.data and "status" in message.data:
-                        self.state["progress"] = message.data["progress"]
-                        self.state["status"] = message.data["status"]
-            
-            time.sleep(0.1)
-            
     def page_handler(self):
         while True:
             if self.stop:
@@ -333,6 +284,11 @@ class Plugin:
                         self.frametimes.append(frametime)
                         if len(self.frametimes) > 60:
                             self.frametimes.pop(0)
+                            
+                    for phase, histogram in message.data.get("phases", {}).items():
+                        if phase not in self.phases:
+                            self.phases[phase] = HistogramWindow()
+                        self.phases[phase].add(Histogram.from_dict(histogram))
             
             time.sleep(0.5)
 
@@ -490,7 +446,20 @@ def create_processes() -> None:
     loading = False
     logging.info(_("Loaded {0} plugins.").format(len(plugins)))
   
+def tag_retainer() -> None:
+    # Not counted as a waiter, growing a segment always notifies the bus.
+    while True:
+        with bus.condition:
+            bus.condition.wait(timeout=1)
+        bus.retain()
+
 def run() -> None:
+    global bus
+    bus = TagBus()
+    atexit.register(bus.close)
+    if os.name == "nt":
+        threading.Thread(target=tag_retainer, daemon=True, name="Tag Retainer").start()
+        
     discover_plugins()
     threading.Thread(target=create_processes, daemon=True).start()
     
@@ -713,14 +682,23 @@ def page_close_event(url: str):
 # MARK: General Utils
 def get_tag_data(tag: str) -> dict:
     """Get the tag data from all plugins."""
-    
-    # We only need the tags dict from the first plugin as they 
-    # all share the same pointer.
-    if not plugins:
+    if bus is None:
         return {}
     
-    plugin = plugins[0]
-    return plugin.tags.get(tag, {})
+    return bus.read(tag) or {}
+
+def get_performance() -> dict:
+    """Get the frametimes and phase percentiles of all running plugins."""
+    performance = {}
+    for plugin in plugins:
+        if not plugin.running:
+            continue
+        
+        performance[plugin.description.id] = {
+            "frametimes": plugin.frametimes,
+            "phases": {name: window.summary() for name, window in plugin.phases.items()}
+        }
+    return performance
 
 def get_states() -> dict:
     """Get the state data from all plugins."""
@@ -10,10 +10,14 @@
 
 import ETS2LA.Utils.settings as settings
 import ETS2LA.Utils.Console.visibility as console
+import ETS2LA.Handlers.inference as inference
+import ETS2LA.Handlers.backends as backends
+from ETS2LA.Plugin.classes.profiler import profiler
 import ETS2LA.variables as variables
 from bs4 import BeautifulSoup
 import threading
 import traceback
+import zipfile
 import requests
 import numpy
 import time
@@ -83,7 +87,9 @@ class Model:
         self.loaded:bool = False
 
         self.metadata:dict
-        self.model:torch.jit.ScriptModule
+        self._model:torch.jit.ScriptModule|None = None
+        self.local:bool = False
+        self.local_lock = threading.Lock()
 
         self.image_width:int
         self.image_height:int
@@ -93,6 +99,12 @@ class Model:
         self.training_time:str
         self.training_date:str
 
+        self.inference_key:str
+        self.inference_config:tuple
+
+        self.backend:backends.ONNXRuntimeBackend|backends.OpenVINOBackend|None = None
+        self.backend_name:str = "Torch"
+
         def popup_reset():
             stop_time = time.time() + 5
             first_popup_values = self.popup_values
@@ -124,6 +136,7 @@ class Model:
         """
         Run the model on an image.
         Automatically converts and resizes the image.
+        Runs on the inference server when it's running, so requests from several plugins are batched.
 
         Parameters
         ----------
@@ -132,8 +145,8 @@ class Model:
 
         Returns
         -------
-        list
-            The output of the model.
+        numpy.ndarray
+            The output of the model, with a batch dimension of 1.
         """
         try:
             if len(image.shape) == 3:
@@ -149,12 +162,31 @@ class Model:
                 if self.color_channels == 3:
                     image = cv2.cvtColor(image, cv2.COLOR_GRAY2RGB)
             image = cv2.resize(image, (self.image_width, self.image_height))
+
+            start = time.perf_counter_ns()
+            try:
+                output = inference.client.detect(self.inference_key, self.inference_config, image)
+                profiler.record(f"{self.identifier} (Inference Server)", time.perf_counter_ns() - start)
+                return output
+            except ConnectionError:
+                # The server can't run the model (anymore), this process needs its own copy.
+                if not self.local:
+                    self.load_local()
+                start = time.perf_counter_ns()
+
             if image.dtype == numpy.uint8:
                 image = numpy.array(image, dtype=numpy.float32) / 255.0
-            image = torch.as_tensor(transforms.ToTensor()(image).unsqueeze(0), dtype=self.torch_dtype, device=self.device)
-            with torch.no_grad():
-                output = self.model(image)
-                output = output.tolist()
+            if self.backend is not None:
+                if len(image.shape) == 2:
+                    image = image[:, :, None]
+                image = numpy.ascontiguousarray(image.transpose(2, 0, 1)[None], dtype=numpy.float32)
+                output = self.backend.run(image)
+            else:
+                image = torch.as_tensor(transforms.ToTensor()(image).unsqueeze(0), dtype=self.torch_dtype, device=self.device)
+                with torch.no_grad():
+                    output = self.model(image)
+                    output = output.float().cpu().numpy()
+            profiler.record(f"{self.identifier} ({self.backend_name})", time.perf_counter_ns() - start)
             return output
         except:
             send_crash_report("PyTorch - Error in function detect", str(traceback.format_exc()))
@@ -182,18 +214,18 @@ class Model:
                     if self.get_name() == None:
                         return
 
+                    with self.local_lock: # the file might have been replaced by an update
+                        self._model = None
+                        self.backend = None
+                        self.local = False
+
                     self.popup("Loading the model...", 0)
                     print(GRAY + f"[{self.identifier}] " + GREEN + "Loading the model..." + NORMAL)
 
                     model_file_broken = False
 
                     try:
-                        self.metadata = {"data": [], "Data": [], "metadata": [], "Metadata": []}
-                        self.model = torch.jit.load(os.path.join(self.path, self.get_name()), _extra_files=self.metadata, map_location=self.device)
-                        self.model.eval()
-                        self.model.to(self.torch_dtype)
-                        key = max(self.metadata, key=lambda key: len(self.metadata[key]))
-                        self.metadata = eval(self.metadata[key])
+                        self.metadata = self.read_metadata()
                         for item in self.metadata:
                             try:
                                 item = str(item)
@@ -227,6 +259,18 @@ class Model:
                     except:
                         model_file_broken = True
 
+                    if model_file_broken == False:
+                        self.inference_key = f"{self.identifier}/{self.get_name()}/{self.torch_dtype}"
+                        self.inference_config = (os.path.join(self.path, self.get_name()), str(self.torch_dtype).split(".")[-1], self.image_width, self.image_height, getattr(self, "color_channels", 3))
+                        try:
+                            # The server loads its own copy, this process only needs one if the server can't run it.
+                            inference.client.load(self.inference_key, self.inference_config)
+                        except ConnectionError:
+                            try:
+                                self.load_local()
+                            except:
+                                model_file_broken = True
+
                     if model_file_broken == False:
                         self.popup("Successfully loaded the model!", 100)
                         print(GRAY + f"[{self.identifier}] " + GREEN + "Successfully loaded the model!" + NORMAL)
@@ -255,6 +299,89 @@ class Model:
             print(GRAY + f"[{self.identifier}] " + RED + "Failed to load the model." + NORMAL)
 
 
+    def read_metadata(self):
+        """
+        Read the metadata from the model file without loading the model.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        list
+            The metadata items, "name#value" strings.
+        """
+        # TorchScript files are zip archives, the extra files are in <archive>/extra/.
+        extra_files = {"data": "", "Data": "", "metadata": "", "Metadata": ""}
+        with zipfile.ZipFile(os.path.join(self.path, self.get_name())) as archive:
+            for name in archive.namelist():
+                folder, separator, file = name.rpartition("/")
+                if folder.endswith("extra") and file in extra_files:
+                    extra_files[file] = archive.read(name).decode()
+        key = max(extra_files, key=lambda key: len(extra_files[key]))
+        return eval(extra_files[key])
+
+
+    def load_torch(self):
+        """
+        Load the TorchScript model into this process.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        torch.jit.ScriptModule
+            The model, raises if the model file is broken.
+        """
+        model = torch.jit.load(os.path.join(self.path, self.get_name()), map_location=self.device)
+        model.eval()
+        model.to(self.torch_dtype)
+        return model
+
+
+    def load_local(self):
+        """
+        Load the model into this process, only done when the inference server isn't running or can't run the model.
+        Uses the ONNX Runtime or OpenVINO backend on the CPU when it's available, the Torch model otherwise.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        None
+        """
+        with self.local_lock:
+            if self.local:
+                return
+            if self.device.type == "cpu":
+                self.backend = backends.load(os.path.join(self.path, self.get_name()), getattr(self, "color_channels", 3), self.image_height, self.image_width,
+                                             backend=settings.Get("global", "inference_backend", "Automatic"),
+                                             quantization=settings.Get("global", "inference_quantization", False),
+                                             identifier=self.identifier)
+                self.backend_name = self.backend.name if self.backend is not None else "Torch"
+            if self.backend is None and self._model is None:
+                self._model = self.load_torch()
+            self.local = True
+
+
+    @property
+    def model(self):
+        """
+        The Torch model in this process, loaded the first time it's used.
+        Models run through detect() don't need it when the inference server runs them.
+        """
+        if self._model is None:
+            with self.local_lock:
+                if self._model is None:
+                    self._model = self.load_torch()
+        return self._model
+
+
     def check_for_updates(self):
         """
         Checks for model updates.
@@ -459,7 +586,7 @@ class Model:
                 return
             self.folder_exists()
             for file in os.listdir(self.path):
-                if file.endswith(".pt"):
+                if file.endswith((".pt", ".onnx")):
                     os.remove(os.path.join(self.path, file))
         except PermissionError:
             global torch_available
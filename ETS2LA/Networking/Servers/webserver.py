@@ -25,7 +25,7 @@ import ETS2LA.variables as variables
 import ETS2LA.Utils.version as git
 
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, Response
 from fastapi import FastAPI, Body
 from typing import Any
 import multiprocessing
@@ -225,7 +225,7 @@ def disable_plugin(plugin: str):
 
 @app.get("/backend/plugins/performance")
 def get_performance():
-    return {} # TODO: Reimplement this
+    return plugins.get_performance()
 
 @app.get("/backend/plugins/states")
 def get_states():
@@ -296,6 +296,9 @@ def get_tags_data():
 @app.post("/api/tags/data")
 def get_tag_data(data: TagFetchData):
     try:
+        if data.tag == "map":
+            return get_map_data(data.zlib)
+
         backend_data = plugins.get_tag_data(data.tag)
         count = 0
         for plugin in backend_data:
@@ -349,6 +352,100 @@ def get_tag(tag: str):
 def get_tags_list():
     return plugins.get_tag_list()
 
+# endregion
+# region Map
+
+MAP_CATEGORIES = ("prefabs", "roads", "models", "elevations")
+
+MAP_READ_RETRIES = 3
+"""How many times the map stream is read again when one of its slots was reused while reading it."""
+
+def get_map_stream() -> dict | None:
+    """The latest map_stream tag from the Map plugin, see Plugins/Map/utils/map_stream.py."""
+    return next(iter(plugins.get_tag_data("map_stream").values()), None)
+
+def get_map_sectors(stream: dict, keys: list[str]) -> dict[str, dict] | None:
+    """Read the slot tags of the given sectors of the stream.
+
+    :return: None if a slot already holds a newer sector or revision, read the stream again.
+    """
+    sectors = {}
+    for key in keys:
+        slot, revision = stream["sectors"][key]
+        sector = next(iter(plugins.get_tag_data(f"map_sector_{slot}").values()), None)
+        if sector is None or sector["sector"] != key or sector["revision"] != revision:
+            return None
+        sectors[key] = sector
+    return sectors
+
+def join_map_sectors(sectors: list[dict[str, bytes]]) -> bytes:
+    """Merge serialized sectors into one {"prefabs": [...], "roads": [...], ...} object without parsing them."""
+    if not sectors:
+        return b"{}"
+    categories = []
+    for category in MAP_CATEGORIES:
+        items = b",".join(sector[category] for sector in sectors if sector[category])
+        categories.append(b'"' + category.encode() + b'":[' + items + b"]")
+    return b"{" + b",".join(categories) + b"}"
+
+def map_response(content: bytes, compress: bool) -> Response:
+    headers = {}
+    if compress:
+        content = zlib.compress(content, wbits=28)
+        headers["Content-Encoding"] = "gzip"
+    return Response(content=content, media_type="application/json", headers=headers)
+
+def get_map_data(compress: bool = False) -> Response:
+    """All loaded sectors as one object, the format of the old "map" tag."""
+    for attempt in range(MAP_READ_RETRIES):
+        stream = get_map_stream()
+        if stream is None:
+            return map_response(b"{}", compress)
+        sectors = get_map_sectors(stream, list(stream["sectors"]))
+        if sectors is not None:
+            return map_response(join_map_sectors(list(sectors.values())), compress)
+    return Response(status_code=503)
+
+@app.get("/api/map/stream")
+def get_map_stream_delta(version: int = -1, zlib: bool = False):
+    """
+    The sectors that were added, serialized again or removed since the version the
+    client has applied. The client acknowledges the returned version by sending it
+    with its next request, -1 (or a version that's too old) gets all sectors with
+    "full" set.
+    """
+    for attempt in range(MAP_READ_RETRIES):
+        stream = get_map_stream()
+        if stream is None:
+            return map_response(b'{"version":-1,"full":true,"sectors":{},"removed":[]}', zlib)
+
+        loaded = stream["sectors"]
+        if version in stream["history"]:
+            known = stream["history"][version]
+            added = [key for key, (slot, revision) in loaded.items() if known.get(key) != revision]
+            removed = [key for key in known if key not in loaded]
+            full = False
+        else:
+            added = list(loaded)
+            removed = []
+            full = True
+
+        sectors = get_map_sectors(stream, added)
+        if sectors is not None:
+            break
+    else:
+        # The plugin is publishing faster than the sectors can be read, the client can try again.
+        return Response(status_code=503)
+
+    content = b",".join(b'"' + key.encode() + b'":' + join_map_sectors([sectors[key]]) for key in added)
+    return map_response(
+        b'{"version":' + str(stream["version"]).encode() +
+        b',"full":' + (b"true" if full else b"false") +
+        b',"sectors":{' + content +
+        b'},"removed":' + json.dumps(removed).encode() + b"}",
+        zlib
+    )
+
 # endregion
 # region Pages
 
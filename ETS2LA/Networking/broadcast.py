@@ -0,0 +1,226 @@
+"""
+Send the same messages to many websocket clients, encoding each message only once.
+
+The plugin thread publishes one message per channel every frame. The message is
+encoded once for each encoding the channel's subscribers use, and it's not sent
+at all if it's the same as the last one published on that channel.
+
+Every subscriber has its own sender task and a mailbox that holds only the newest
+frame of each channel. While a slow client's socket is still busy the newer frames
+replace the ones waiting in the mailbox, so the client gets the current state once
+it catches up instead of an ever growing queue of old frames.
+
+Encodings (chosen by the client when it subscribes to a channel):
+    json:     text frames, the default
+    msgpack:  binary frames, only available if msgpack is installed, otherwise json is used
+"""
+
+from typing import Any, Hashable
+import websockets
+import logging
+import asyncio
+import orjson
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+ENCODINGS = ["json", "msgpack"] if msgpack is not None else ["json"]
+
+def default(value: Any) -> Any:
+    """Numpy arrays and scalars, everything else is sent as a string."""
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    return str(value)
+
+def encode(message: Any, encoding: str) -> str | bytes:
+    if encoding == "msgpack":
+        return msgpack.packb(message, default=default)
+    # Websockets sends str as text frames, which is what the existing clients expect.
+    return orjson.dumps(message, default=default, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS).decode()
+
+class Subscriber:
+    """One connected client, created by `Broadcaster.connect`."""
+    websocket: Any
+
+    channels: dict[Hashable, str]
+    """The subscribed channels and the encoding of each."""
+
+    pending: dict[Hashable, str | bytes]
+    """The newest frame of each channel that hasn't been sent yet."""
+
+    dropped: int
+    """How many frames were replaced by a newer one while waiting for the socket. Frames
+    replaced while the client hasn't acknowledged the last batch yet aren't counted,
+    the client wasn't going to receive those anyway."""
+
+    needs_acknowledge: bool
+    """The client has to acknowledge each batch of frames before it gets the next one."""
+    acknowledged: bool
+
+    def __init__(self, websocket: Any, needs_acknowledge: bool = False):
+        self.websocket = websocket
+        self.channels = {}
+        self.pending = {}
+        self.dropped = 0
+        self.needs_acknowledge = needs_acknowledge
+        self.acknowledged = not needs_acknowledge
+        self.ready = asyncio.Event()
+        self.task = asyncio.create_task(self.send_frames())
+
+    def put(self, channel: Hashable, frame: str | bytes) -> None:
+        if channel in self.pending and self.acknowledged:
+            self.dropped += 1
+        self.pending[channel] = frame
+        if self.acknowledged:
+            self.ready.set()
+
+    def acknowledge(self) -> None:
+        self.acknowledged = True
+        if self.pending:
+            self.ready.set()
+
+    async def send_frames(self) -> None:
+        try:
+            while True:
+                await self.ready.wait()
+                self.ready.clear()
+                frames, self.pending = self.pending, {}
+                if self.needs_acknowledge:
+                    self.acknowledged = False
+
+                # send() waits until the socket can take more data, meanwhile put() replaces the pending frames.
+                for frame in frames.values():
+                    await self.websocket.send(frame)
+        except websockets.ConnectionClosed:
+            pass
+        except Exception as e:
+            logging.warning(f"Stopped sending to {self.websocket.remote_address}: {e}")
+
+class Broadcaster:
+    """The subscribers of one websocket server.
+
+    :param bool needs_acknowledge: Whether clients have to acknowledge each batch of frames.
+    """
+    loop: asyncio.AbstractEventLoop | None
+
+    subscribers: dict[Any, Subscriber]
+    """Subscribers by websocket, only changed on the event loop."""
+
+    hashes: dict[tuple[Hashable, str], int]
+    """The hash of the last frame of each channel and encoding."""
+
+    frames: dict[tuple[Hashable, str], str | bytes]
+    """The last frame of each channel and encoding, new subscribers get it right away."""
+
+    messages: dict[Hashable, Any]
+    """The last message of each channel, also the ones published before anyone subscribed.
+    New subscribers get it encoded when there's no frame in their encoding yet."""
+
+    def __init__(self, needs_acknowledge: bool = False):
+        self.needs_acknowledge = needs_acknowledge
+        self.loop = None
+        self.subscribers = {}
+        self.hashes = {}
+        self.frames = {}
+        self.messages = {}
+
+    # MARK: Event loop
+    def connect(self, websocket: Any) -> Subscriber:
+        self.loop = asyncio.get_running_loop()
+        subscriber = Subscriber(websocket, self.needs_acknowledge)
+        self.subscribers[websocket] = subscriber
+        return subscriber
+
+    def disconnect(self, websocket: Any) -> None:
+        subscriber = self.subscribers.pop(websocket, None)
+        if subscriber is not None:
+            subscriber.task.cancel()
+
+    def subscribe(self, websocket: Any, channel: Hashable, encoding: str = "json") -> str:
+        """Subscribe the client to a channel.
+
+        :return: The encoding that will be used, json if the requested one isn't available.
+        """
+        if encoding not in ENCODINGS:
+            encoding = "json"
+
+        subscriber = self.subscribers[websocket]
+        subscriber.channels[channel] = encoding
+        key = (channel, encoding)
+        frame = self.frames.get(key)
+        if frame is None and channel in self.messages:
+            # Published while nobody was subscribed in this encoding.
+            frame = encode(self.messages[channel], encoding)
+            self.hashes[key] = hash(frame)
+            self.frames[key] = frame
+        if frame is not None:
+            subscriber.put(channel, frame)
+        return encoding
+
+    def unsubscribe(self, websocket: Any, channel: Hashable) -> None:
+        subscriber = self.subscribers[websocket]
+        subscriber.channels.pop(channel, None)
+        subscriber.pending.pop(channel, None)
+
+    def deliver(self, frames: dict[Hashable, dict[str, str | bytes]]) -> None:
+        for subscriber in self.subscribers.values():
+            for channel, encodings in frames.items():
+                encoding = subscriber.channels.get(channel)
+                if encoding in encodings:
+                    subscriber.put(channel, encodings[encoding])
+
+    # MARK: Plugin thread
+    def channels(self) -> set[Hashable]:
+        """All channels that at least one client is subscribed to."""
+        channels = set()
+        for subscriber in list(self.subscribers.values()):
+            channels.update(list(subscriber.channels))
+        return channels
+
+    def publish(self, channel: Hashable, message: Any) -> bool:
+        """Encode the message and send it to the channel's subscribers, can be called from any thread.
+
+        :return: False if nobody is subscribed or the message didn't change.
+        """
+        return self.publish_all({channel: message})
+
+    def publish_all(self, messages: dict[Hashable, Any]) -> bool:
+        """Publish the messages of multiple channels as one batch, clients that
+        acknowledge batches get all of them before they have to acknowledge again.
+        """
+        self.messages.update(messages)
+        if self.loop is None:
+            return False
+
+        subscribers = list(self.subscribers.values())
+        frames = {}
+        for channel, message in messages.items():
+            encodings = set()
+            for subscriber in subscribers:
+                encoding = subscriber.channels.get(channel)
+                if encoding is not None:
+                    encodings.add(encoding)
+
+            # Nobody gets this message in the other encodings, their last frames are outdated now.
+            for encoding in ENCODINGS:
+                if encoding not in encodings:
+                    self.frames.pop((channel, encoding), None)
+                    self.hashes.pop((channel, encoding), None)
+
+            for encoding in encodings:
+                frame = encode(message, encoding)
+                key = (channel, encoding)
+                digest = hash(frame)
+                if self.hashes.get(key) == digest:
+                    continue
+                self.hashes[key] = digest
+                self.frames[key] = frame
+                frames.setdefault(channel, {})[encoding] = frame
+
+        if not frames:
+            return False
+
+        self.loop.call_soon_threadsafe(self.deliver, frames)
+        return True
@@ -0,0 +1,334 @@
+"""
+Tags shared between the backend and the plugin processes through shared memory.
+
+Every (tag, plugin) pair gets an entry in the index and its own data segment that
+holds the pickled value. Only the plugin that set the tag writes to its entry, so
+writing doesn't need a lock. Readers find the entries of a tag in the index and
+copy the values straight out of the data segments, there's no round trip through
+the backend and the value is never older than the last write.
+
+Each entry has a sequence number that is odd while the value is being written.
+Readers check it before and after copying the value and try again if it changed,
+they also remember the sequence number of the value they last unpickled so tags
+that haven't changed are not copied again.
+
+Index layout:
+    header:  count (I), waiters (I)
+    entries: sequence (Q), size (I), capacity (I), generation (I), tag (64s), plugin (64s)
+
+The data segment of an entry is called "<index name>_<entry>_<generation>". When a
+value doesn't fit anymore the writer creates the next generation with twice the
+capacity and the readers reattach when they see the new generation.
+
+`wait` blocks on the bus' condition until a tag changes. Waiting processes are
+counted in the index header, writes only take the (cross process) condition to
+notify it when someone is waiting. Growing a segment always notifies, the backend
+waits for that on Windows to keep the new segment alive.
+
+The plugin processes share the backend's resource tracker, so segments left behind
+by a plugin that crashed are still removed when ETS2LA exits.
+"""
+
+from multiprocessing import shared_memory
+from multiprocessing.synchronize import Condition
+from typing import Any
+import multiprocessing
+import threading
+import logging
+import pickle
+import struct
+import time
+import os
+
+HEADER = struct.Struct("=I")
+WAITERS = struct.Struct("=I")
+SEQUENCE = struct.Struct("=Q")
+FIELDS = struct.Struct("=III") # size, capacity, generation
+NAMES = struct.Struct("=64s64s") # tag, plugin
+
+HEADER_SIZE = 16
+ENTRY_SIZE = 160
+MAX_ENTRIES = 1024
+INDEX_SIZE = HEADER_SIZE + ENTRY_SIZE * MAX_ENTRIES
+
+MIN_CAPACITY = 4096
+"""Smallest data segment, most tags are small and this way they never have to grow. (bytes)"""
+
+READ_RETRIES = 100
+"""How many times a read is retried while the value is being written before the last value is returned."""
+
+MISSING = object()
+"""Returned for entries that have been registered but never written."""
+
+def entry_offset(entry: int) -> int:
+    return HEADER_SIZE + entry * ENTRY_SIZE
+
+class TagBus:
+    """Connection to the tag bus from one process.
+
+    :param str name: The name of the index to attach to. Leave empty in the backend to create a new bus.
+    :param Condition condition: The condition of the bus, notified on writes while someone is waiting.
+    """
+    name: str
+    owner: bool
+    """Whether this process created the bus and is responsible for removing it."""
+
+    index: shared_memory.SharedMemory
+    condition: Condition
+
+    entries: dict[str, dict[str, int]]
+    """The index entries of each tag by plugin. Entries are never removed, only appended."""
+
+    scanned: int
+    """How many index entries have already been read into `entries`."""
+
+    segments: dict[int, tuple[int, shared_memory.SharedMemory]]
+    """The open data segment and its generation for each entry."""
+
+    values: dict[int, tuple[int, Any]]
+    """The last unpickled value and its sequence number for each entry."""
+
+    def __init__(self, name: str = "", condition: Condition | None = None):
+        self.owner = name == ""
+        self.condition = condition if condition is not None else multiprocessing.Condition()
+        if self.owner:
+            self.name = f"ETS2LA_Tags_{os.getpid()}"
+            self.index = shared_memory.SharedMemory(name=self.name, create=True, size=INDEX_SIZE)
+        else:
+            self.name = name
+            self.index = shared_memory.SharedMemory(name=name)
+
+        self.entries = {}
+        self.scanned = 0
+        self.segments = {}
+        self.values = {}
+        self.lock = threading.Lock()
+
+    @property
+    def handle(self) -> tuple[str, Condition]:
+        """What a plugin process needs to connect to this bus."""
+        return self.name, self.condition
+
+    # MARK: Index
+    def scan(self) -> None:
+        """Read the entries that have been added since the last scan."""
+        count = HEADER.unpack_from(self.index.buf, 0)[0]
+        for entry in range(self.scanned, count):
+            tag, plugin = NAMES.unpack_from(self.index.buf, entry_offset(entry) + SEQUENCE.size + FIELDS.size)
+            tag = tag.rstrip(b"\0").decode()
+            plugin = plugin.rstrip(b"\0").decode()
+            self.entries.setdefault(tag, {})[plugin] = entry
+        self.scanned = count
+
+    def register(self, tag: str, plugin: str) -> int:
+        """Find the entry of a tag for the plugin, adding it to the index if needed."""
+        with self.lock:
+            self.scan()
+            if plugin in self.entries.get(tag, {}):
+                return self.entries[tag][plugin]
+
+        # The condition is always taken before the lock, wait() does the same.
+        with self.condition, self.lock:
+            self.scan() # another process might have added entries in the meantime
+            if plugin in self.entries.get(tag, {}):
+                return self.entries[tag][plugin]
+
+            entry = self.scanned
+            if entry >= MAX_ENTRIES:
+                raise MemoryError(f"The tag bus is full, can't add {tag} for {plugin}")
+
+            # The names have to be written before the count, readers only look at counted entries.
+            NAMES.pack_into(self.index.buf, entry_offset(entry) + SEQUENCE.size + FIELDS.size, tag.encode()[:64], plugin.encode()[:64])
+            HEADER.pack_into(self.index.buf, 0, entry + 1)
+            self.scan()
+
+        return entry
+
+    # MARK: Segments
+    def segment_name(self, entry: int, generation: int) -> str:
+        return f"{self.name}_{entry}_{generation}"
+
+    def segment(self, entry: int, generation: int) -> shared_memory.SharedMemory:
+        """The data segment of the entry, reattaches if the generation changed.
+
+        :raises FileNotFoundError: The segment has already been replaced.
+        """
+        current = self.segments.get(entry)
+        if current is not None and current[0] == generation:
+            return current[1]
+
+        memory = shared_memory.SharedMemory(name=self.segment_name(entry, generation))
+        if current is not None:
+            current[1].close()
+        self.segments[entry] = (generation, memory)
+        return memory
+
+    def grow(self, entry: int, generation: int, size: int) -> tuple[shared_memory.SharedMemory, int]:
+        """Create the next generation of the entry's data segment that fits size bytes."""
+        capacity = MIN_CAPACITY
+        while capacity < size:
+            capacity *= 2
+
+        name = self.segment_name(entry, generation)
+        try:
+            memory = shared_memory.SharedMemory(name=name, create=True, size=capacity)
+        except FileExistsError:
+            # Left behind by a plugin that crashed before it updated the index.
+            stale = shared_memory.SharedMemory(name=name)
+            stale.close()
+            stale.unlink()
+            memory = shared_memory.SharedMemory(name=name, create=True, size=capacity)
+
+        current = self.segments.get(entry)
+        if current is not None:
+            # Readers that still have it open can finish copying, it's freed once they close it.
+            current[1].close()
+            if os.name != "nt":
+                try: current[1].unlink()
+                except FileNotFoundError: pass
+        self.segments[entry] = (generation, memory)
+        return memory, capacity
+
+    # MARK: Reading and writing
+    def write(self, tag: str, plugin: str, value: Any) -> None:
+        """Set the plugin's value of the tag and wake up everyone waiting on the bus."""
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        entry = self.entries.get(tag, {}).get(plugin)
+        if entry is None:
+            entry = self.register(tag, plugin)
+        grown = False
+        with self.lock:
+            offset = entry_offset(entry)
+            buffer = self.index.buf
+
+            sequence = SEQUENCE.unpack_from(buffer, offset)[0]
+            sequence += sequence % 2 # the last write was interrupted by a crash
+            SEQUENCE.pack_into(buffer, offset, sequence + 1)
+
+            _, capacity, generation = FIELDS.unpack_from(buffer, offset + SEQUENCE.size)
+            if len(data) > capacity:
+                if entry not in self.segments and capacity > 0:
+                    # Set before this process started, open it so that grow() removes it.
+                    try: self.segment(entry, generation)
+                    except FileNotFoundError: pass
+                generation += 1
+                memory, capacity = self.grow(entry, generation, len(data))
+                grown = True
+            else:
+                memory = self.segment(entry, generation)
+
+            memory.buf[:len(data)] = data
+            FIELDS.pack_into(buffer, offset + SEQUENCE.size, len(data), capacity, generation)
+            SEQUENCE.pack_into(buffer, offset, sequence + 2)
+
+        # Waiters check the sequences after they are counted, one that's counted
+        # after this read sees the new sequence and doesn't have to be woken up.
+        if grown or self.waiters() > 0:
+            with self.condition:
+                self.condition.notify_all()
+
+    def read_entry(self, entry: int) -> Any:
+        offset = entry_offset(entry)
+        buffer = self.index.buf
+        cached = self.values.get(entry)
+
+        for _ in range(READ_RETRIES):
+            sequence = SEQUENCE.unpack_from(buffer, offset)[0]
+            if sequence == 0:
+                return MISSING
+            if cached is not None and cached[0] == sequence:
+                return cached[1]
+            if sequence % 2:
+                time.sleep(0)
+                continue
+
+            size, _, generation = FIELDS.unpack_from(buffer, offset + SEQUENCE.size)
+            try:
+                memory = self.segment(entry, generation)
+            except FileNotFoundError:
+                continue # the writer grew the segment after we read the generation
+
+            data = bytes(memory.buf[:size])
+            if SEQUENCE.unpack_from(buffer, offset)[0] != sequence:
+                continue
+
+            value = pickle.loads(data)
+            self.values[entry] = (sequence, value)
+            return value
+
+        logging.debug(f"Gave up reading tag entry {entry}, it's being written too often.")
+        return cached[1] if cached is not None else MISSING
+
+    def read(self, tag: str) -> dict | None:
+        """The values of the tag from every plugin that has set it.
+
+        :return: {plugin: value}, or None if no plugin has set the tag yet.
+        """
+        with self.lock:
+            self.scan()
+            data = {}
+            for plugin, entry in self.entries.get(tag, {}).items():
+                value = self.read_entry(entry)
+                if value is not MISSING:
+                    data[plugin] = value
+
+        return data if data else None
+
+    def sequences(self, tag: str) -> list[int]:
+        with self.lock:
+            self.scan()
+            return [SEQUENCE.unpack_from(self.index.buf, entry_offset(entry))[0]
+                    for entry in self.entries.get(tag, {}).values()]
+
+    def waiters(self) -> int:
+        """How many threads are waiting for a tag in all processes."""
+        return WAITERS.unpack_from(self.index.buf, HEADER.size)[0]
+
+    def wait(self, tag: str, timeout: float | None = None) -> bool:
+        """Block until any plugin sets the tag.
+
+        :return: False if the timeout ran out before that.
+        """
+        last = self.sequences(tag)
+        with self.condition:
+            # Only changed while holding the condition, so the count can't race between processes.
+            WAITERS.pack_into(self.index.buf, HEADER.size, self.waiters() + 1)
+            try:
+                return self.condition.wait_for(lambda: self.sequences(tag) != last, timeout)
+            finally:
+                WAITERS.pack_into(self.index.buf, HEADER.size, self.waiters() - 1)
+
+    # MARK: Lifetime
+    def retain(self) -> None:
+        """Keep the newest segment of every entry open.
+
+        Windows frees a segment as soon as the last handle is closed, the backend
+        calls this whenever a segment grows so tags outlive the plugin that set them.
+        """
+        with self.lock:
+            self.scan()
+            for entry in range(self.scanned):
+                _, capacity, generation = FIELDS.unpack_from(self.index.buf, entry_offset(entry) + SEQUENCE.size)
+                if capacity == 0:
+                    continue
+                try: self.segment(entry, generation)
+                except FileNotFoundError: pass
+
+    def close(self) -> None:
+        with self.lock:
+            for entry in range(HEADER.unpack_from(self.index.buf, 0)[0] if self.owner else 0):
+                _, _, generation = FIELDS.unpack_from(self.index.buf, entry_offset(entry) + SEQUENCE.size)
+                try:
+                    memory = shared_memory.SharedMemory(name=self.segment_name(entry, generation))
+                    memory.close()
+                    memory.unlink()
+                except FileNotFoundError:
+                    pass
+
+            for _, memory in self.segments.values():
+                memory.close()
+            self.segments = {}
+
+            self.index.close()
+            if self.owner:
+                self.index.unlink()
@@ -10,23 +10,37 @@ import time
 
     
 class Tags:
-    def __init__(self, get_tag: Callable, set_tag: Callable) -> None:
+    def __init__(self, get_tag: Callable, set_tag: Callable, wait_for_tag: Callable | None = None) -> None:
         self.get_tag = get_tag
         self.set_tag = set_tag
+        self.wait_for_tag = wait_for_tag
 
     def __getattr__(self, name):
-        if name in ["get_tag", "set_tag"]:
+        if name in ["get_tag", "set_tag", "wait_for_tag"]:
             return super().__getattr__(name) # type: ignore
         
         return self.get_tag(name) # type: ignore
     
     def __setattr__(self, name, value):
-        if name in ["get_tag", "set_tag"]:
+        if name in ["get_tag", "set_tag", "wait_for_tag"]:
             return super().__setattr__(name, value)
         
         self.set_tag(name, value) # type: ignore
         return None
     
+    def wait(self, name: str, timeout: float | None = None) -> bool:
+        """Block until any plugin sets the tag, instead of polling it.
+        
+        :param str name: The name of the tag.
+        :param float timeout: How long to wait at most. (s)
+        :return: False if the timeout ran out first.
+        """
+        if self.wait_for_tag is None:
+            time.sleep(timeout if timeout is not None else 0.01)
+            return False
+        
+        return self.wait_for_tag(name, timeout)
+    
     def merge(self, tag_dict: dict):
         if tag_dict is None:
             return None
@@ -163,12 +177,15 @@ class Global:
     
     # Set Data
     self.globals.tags.tag_name = 5
+    
+    # Wait until another plugin sets it
+    self.globals.tags.wait("tag_name", timeout=1)
     ```
     """
     
-    def __init__(self, get_tag: Callable, set_tag: Callable) -> None:
+    def __init__(self, get_tag: Callable, set_tag: Callable, wait_for_tag: Callable | None = None) -> None:
         self.settings = GlobalSettings()
-        self.tags = Tags(get_tag, set_tag) 
+        self.tags = Tags(get_tag, set_tag, wait_for_tag)
         
 class PluginDescription:
     """ETS2LA Plugin Description
@@ -1,6 +1,7 @@
 from ETS2LA.Plugin.classes.attributes import Global, PluginDescription, State
 from ETS2LA.Plugin.classes.settings import Settings
 from ETS2LA.Plugin.classes.author import Author
+from ETS2LA.Plugin.classes.profiler import profiler, Phase
 
 from ETS2LA.Plugin.message import Channel, PluginMessage
 from ETS2LA.Controls import ControlEvent
@@ -107,14 +108,14 @@ class ETS2LAPlugin(object):
         if type(self).__name__ != "Plugin":
             raise TypeError("Please make sure the class is named 'Plugin'")
     
-    def __new__(cls, path: str, queue: Queue, return_queue: Queue, get_tag: Callable, set_tag: Callable) -> object:
+    def __new__(cls, path: str, queue: Queue, return_queue: Queue, get_tag: Callable, set_tag: Callable, wait_for_tag: Callable | None = None) -> object:
         instance = super().__new__(cls)
         instance.path = path
         
         instance.queue = queue
         instance.return_queue = return_queue
                 
-        instance.globals = Global(get_tag, set_tag)
+        instance.globals = Global(get_tag, set_tag, wait_for_tag)
         instance.state = State(return_queue)
         
         instance.ensure_settings_file()
@@ -168,6 +169,13 @@ class ETS2LAPlugin(object):
             if type(ex) != AttributeError: 
                 logging.exception("Error in 'Initialize' function")
     
+    def stop(self) -> None:
+        """Called by the plugin process before the plugin is removed, runs the plugin's 'shutdown' function."""
+        try: self.shutdown() # type: ignore # Might or might not exist.
+        except Exception as ex:
+            if type(ex) != AttributeError:
+                logging.exception("Error in 'shutdown' function")
+    
     # def event_listener(self):
     #     while True:
     #         data = self.event_queue.get()
@@ -205,6 +213,19 @@ class ETS2LAPlugin(object):
             }
         ), block=False)
         
+    def profile(self, name: str) -> Phase:
+        """
+        Measure how long a part of the plugin takes. The p50, p95, p99
+        and max of each phase are shown on the performance page.
+        
+        Example:
+        ```python
+        with self.profile("planning"):
+            UpdateRoutePlan()
+        ```
+        """
+        return profiler.profile(name)
+    
     def navigate(self, url: str, reason: str = ""):
         self.return_queue.put(PluginMessage(
             Channel.NAVIGATE, {
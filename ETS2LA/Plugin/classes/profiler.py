@@ -0,0 +1,183 @@
+from collections import deque
+import threading
+import time
+
+SUB_BUCKET_BITS = 4
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+"""Every power of two is split into this many buckets, so values are accurate to ~6%."""
+
+MAX_SHIFT = 33
+"""The largest power of two that gets its own buckets, everything above ~4 minutes shares the last bucket."""
+
+BUCKETS = (MAX_SHIFT + 2) * SUB_BUCKETS
+
+def bucket_index(value: int) -> int:
+    if value < 2 * SUB_BUCKETS:
+        return max(value, 0)
+
+    shift = value.bit_length() - SUB_BUCKET_BITS - 1
+    if shift > MAX_SHIFT:
+        return BUCKETS - 1
+    return shift * SUB_BUCKETS + (value >> shift)
+
+def bucket_limit(index: int) -> int:
+    """The largest value that goes into the bucket."""
+    if index < 2 * SUB_BUCKETS:
+        return index
+
+    shift = index // SUB_BUCKETS - 1
+    top = index - shift * SUB_BUCKETS
+    return ((top + 1) << shift) - 1
+
+class Histogram:
+    """
+    Durations in nanoseconds in a fixed number of log-linear
+    buckets, similar to HdrHistogram. Recording is just an index
+    calculation and an increment, no matter how many values there are.
+    """
+    counts: list[int]
+    count: int
+    total: int
+    max: int
+
+    def __init__(self):
+        self.counts = [0] * BUCKETS
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def record(self, value: int) -> None:
+        self.counts[bucket_index(value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other: "Histogram", sign: int = 1) -> None:
+        """Add the other histogram to this one, or remove it with sign=-1."""
+        for index, count in enumerate(other.counts):
+            if count:
+                self.counts[index] += count * sign
+        self.count += other.count * sign
+        self.total += other.total * sign
+        if sign > 0:
+            self.max = max(self.max, other.max)
+
+    def percentile(self, percentile: float) -> int:
+        """The value below which the given percentage (0-100) of the recorded values are. (ns)"""
+        if self.count == 0:
+            return 0
+
+        target = max(1, round(self.count * percentile / 100))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                return min(bucket_limit(index), self.max)
+        return self.max
+
+    def to_dict(self) -> dict:
+        """Only the used buckets, this is what is sent to the backend."""
+        return {
+            "counts": {index: count for index, count in enumerate(self.counts) if count},
+            "count": self.count,
+            "total": self.total,
+            "max": self.max
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Histogram":
+        histogram = cls()
+        for index, count in data["counts"].items():
+            histogram.counts[index] = count
+        histogram.count = data["count"]
+        histogram.total = data["total"]
+        histogram.max = data["max"]
+        return histogram
+
+class HistogramWindow:
+    """
+    The sum of the last `length` histograms. The plugins send one
+    histogram per phase every second, so by default this covers the last minute.
+    """
+    histograms: deque[Histogram]
+    total: Histogram
+
+    def __init__(self, length: int = 60):
+        self.histograms = deque(maxlen=length)
+        self.total = Histogram()
+
+    def add(self, histogram: Histogram) -> None:
+        if len(self.histograms) == self.histograms.maxlen:
+            self.total.merge(self.histograms[0], sign=-1)
+        self.histograms.append(histogram)
+        self.total.merge(histogram)
+
+    @property
+    def max(self) -> int:
+        return max((histogram.max for histogram in self.histograms), default=0)
+
+    def summary(self) -> dict[str, float]:
+        """The count, mean, p50, p95, p99 and max of the window. (ms)"""
+        self.total.max = self.max
+        return {
+            "count": self.total.count,
+            "mean": self.total.total / self.total.count / 1e6 if self.total.count else 0,
+            "p50": self.total.percentile(50) / 1e6,
+            "p95": self.total.percentile(95) / 1e6,
+            "p99": self.total.percentile(99) / 1e6,
+            "max": self.total.max / 1e6
+        }
+
+class Phase:
+    """
+    Context manager that records how long its block took, returned by `Profiler.profile`.
+    The same phase can be entered from several threads and nested within itself,
+    every thread has its own stack of start times.
+    """
+    def __init__(self, profiler: "Profiler", name: str):
+        self.profiler = profiler
+        self.name = name
+        self.local = threading.local()
+
+    def __enter__(self) -> "Phase":
+        starts = getattr(self.local, "starts", None)
+        if starts is None:
+            starts = self.local.starts = []
+        starts.append(time.perf_counter_ns())
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.profiler.record(self.name, time.perf_counter_ns() - self.local.starts.pop())
+
+class Profiler:
+    """
+    Collects the phase histograms of the plugin in this process,
+    the plugin process sends and resets them every second.
+    """
+    histograms: dict[str, Histogram]
+    phases: dict[str, Phase]
+
+    def __init__(self):
+        self.histograms = {}
+        self.phases = {}
+
+    def profile(self, name: str) -> Phase:
+        if name not in self.phases:
+            self.phases[name] = Phase(self, name)
+        return self.phases[name]
+
+    def record(self, name: str, duration: int) -> None:
+        """Record a duration of the phase. (ns)"""
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = Histogram()
+        histogram.record(duration)
+
+    def collect(self) -> dict[str, dict]:
+        """Take the histograms recorded since the last call."""
+        histograms, self.histograms = self.histograms, {}
+        return {name: histogram.to_dict() for name, histogram in histograms.items()}
+
+profiler = Profiler()
+"""There's one plugin per process, this is the profiler of that plugin."""
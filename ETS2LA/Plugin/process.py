@@ -4,6 +4,8 @@ from types import ModuleType
 from ETS2LA.Utils.Console.logging import setup_process_logging
 from ETS2LA.Controls import ControlEvent
 from ETS2LA.Utils.settings import Get
+from ETS2LA.Plugin.classes.profiler import profiler
+from ETS2LA.Plugin.bus import TagBus
 from ETS2LA.UI import ETS2LAPage
 from ETS2LA.Plugin import *
 
@@ -96,43 +98,34 @@ class PluginProcess:
     track the performance of the plugin.
     """
     
-    output_needs_update: bool = False
-    pending_output_update: bool = False
-    last_output_time: int = 0
-    output_tags: dict = {}
+    bus: TagBus
     """
-    Output tags are tags that this plugin wants to send to others.
+    The shared memory tag bus, tags are read and written
+    directly without going through the backend.
     """
     
-    input_tags_that_need_update: list[str] = []
-    pending_input_update: bool = False
-    input_tags: dict = {}
-    """
-    Input tags are tags that this plugin wants to get from others.
-    """
-    
-    def get_tag(self, name: str) -> dict:
+    def get_tag(self, name: str) -> dict | None:
         """
-        Get the tags from the plugin. This is used to get the
-        tags from the plugin and send them to the backend.
+        Get a tag from the bus. The result is a dictionary
+        of {plugin_id: value}, or None if no plugin has set it.
         """
-        if name not in self.input_tags_that_need_update:
-            self.input_tags_that_need_update.append(name)
-            
-        if name not in self.input_tags:
-            self.input_tags[name] = None
-            
-        return self.input_tags[name]
+        return self.bus.read(name)
     
     def set_tag(self, name: str, value) -> None:
         """
-        Set a tag in the plugin. This is used to set a tag
-        in the plugin and send it to the backend.
+        Set this plugin's value of a tag. Other plugins
+        see it the next time they read the tag.
         """
-        self.output_tags[name] = value
-        self.output_needs_update = True
+        self.bus.write(name, self.description.id, value) # type: ignore
         return None
     
+    def wait_for_tag(self, name: str, timeout: float | None = None) -> bool:
+        """
+        Block until any plugin sets the tag.
+        Returns False if the timeout ran out first.
+        """
+        return self.bus.wait(name, timeout)
+    
     def update_plugin(self) -> None:
         logging.info(f"Importing plugin file from {self.path}")
         import_path = self.path.replace("\\", ".").replace("/", ".") + ".main"
@@ -190,8 +183,6 @@ class PluginProcess:
                     Description(self)(message)
                 case Channel.ENABLE_PLUGIN | Channel.STOP_PLUGIN | Channel.RESTART_PLUGIN:
                     self.main_thread_stack.append(message)
-                case Channel.GET_TAGS | Channel.UPDATE_TAGS:
-                    Tags(self)(message)
                 case Channel.CALL_FUNCTION:
                     Function(self)(message)
                 case Channel.GET_CONTROLS | Channel.CONTROL_STATE_UPDATE:
@@ -209,33 +200,6 @@ class PluginProcess:
         message = self.stack.pop(id)
         return message
     
-    def tag_updater(self) -> None:
-        while True:
-            if self.input_tags_that_need_update and not self.pending_input_update:
-                self.pending_input_update = True
-                message = PluginMessage(
-                    Channel.GET_TAGS, {
-                        "tags": self.input_tags_that_need_update
-                    }
-                )
-                
-                self.input_tags_that_need_update = []
-                self.return_queue.put(message, block=False)
-                
-            if self.output_needs_update and (not self.pending_output_update or time.time() > self.last_output_time + 1):
-                self.pending_output_update = True
-                message = PluginMessage(
-                    Channel.UPDATE_TAGS, self.output_tags
-                )
-
-                self.return_queue.put(message, block=False)
-
-                self.last_output_time = time.time()
-                self.output_needs_update = False
-                self.output_tags = {}
-
-            time.sleep(0.01)
-    
     def process(self) -> None:
         """Keep the process alive."""
         while True:
@@ -254,8 +218,10 @@ class PluginProcess:
             try: self.plugin.before()
             except: pass
             
+            run_start = time.perf_counter_ns()
             try: self.plugin.run() # type: ignore
             except: logging.exception("Error in plugin process.")
+            profiler.record("run", time.perf_counter_ns() - run_start)
             
             try: self.plugin.after()
             except: pass
@@ -280,6 +246,7 @@ class PluginProcess:
             message = PluginMessage(
                 Channel.FRAMETIME_UPDATE, {
                     "frametime": average,
+                    "phases": profiler.collect()
                 }
             )
             self.return_queue.put(message, block=False)
@@ -318,11 +285,12 @@ class PluginProcess:
         except Exception as e:
             logging.exception(f"Error setting high priority: {e}")
         
-    def __init__(self, path: str, queue: Queue, return_queue: Queue) -> None:
+    def __init__(self, path: str, queue: Queue, return_queue: Queue, bus: tuple) -> None:
         start_time = time.time()
         
         self.queue = queue
         self.return_queue = return_queue
+        self.bus = TagBus(*bus)
         
         name = os.path.basename(path)
         setup_process_logging(
@@ -360,11 +328,6 @@ class PluginProcess:
             daemon=True
         ).start()
         
-        threading.Thread(
-            target=self.tag_updater,
-            daemon=True
-        ).start()
-        
         threading.Thread(
             target=self.page_updater,
             daemon=True
@@ -454,7 +417,8 @@ class PluginManagement(ChannelHandler):
                         self.plugin.queue,
                         self.plugin.return_queue,  
                         self.plugin.get_tag,
-                        self.plugin.set_tag  
+                        self.plugin.set_tag,
+                        self.plugin.wait_for_tag
                     )
                     
                     for page in self.plugin.pages:
@@ -469,6 +433,8 @@ class PluginManagement(ChannelHandler):
                     
             elif message.channel == Channel.STOP_PLUGIN:
                 try:
+                    if self.plugin.plugin is not None:
+                        self.plugin.plugin.stop()
                     del self.plugin.plugin
                     self.plugin.plugin = None
                     message.state = State.DONE
@@ -484,6 +450,8 @@ class PluginManagement(ChannelHandler):
                     
             elif message.channel == Channel.RESTART_PLUGIN:
                 try:
+                    if self.plugin.plugin is not None:
+                        self.plugin.plugin.stop()
                     del self.plugin.plugin
                     self.plugin.plugin = None
                     self.plugin.update_plugin()
@@ -492,7 +460,8 @@ class PluginManagement(ChannelHandler):
                         self.plugin.queue,
                         self.plugin.return_queue,  
                         self.plugin.get_tag,
-                        self.plugin.set_tag      
+                        self.plugin.set_tag,
+                        self.plugin.wait_for_tag
                     )
                     
                     for page in self.plugin.pages:
@@ -516,25 +485,6 @@ class PluginManagement(ChannelHandler):
             logging.exception("Error handling plugin state")
             self.plugin.return_queue.put(message)
             
-class Tags(ChannelHandler):
-    def __call__(self, message: PluginMessage):
-        try:
-            if message.state == State.ERROR:
-                logging.error("Error getting tags, " + message.data)
-                return None
-            
-            if message.channel == Channel.GET_TAGS:
-                for tag, value in message.data.items():
-                    self.plugin.input_tags[tag] = value
-                    
-                self.plugin.pending_input_update = False
-                    
-            if message.channel == Channel.UPDATE_TAGS:
-                self.plugin.pending_output_update = False
-            
-        except Exception as e:
-            logging.exception("Error handling tags")
-            
 class Function(ChannelHandler):
     def __call__(self, message: PluginMessage):
         try:
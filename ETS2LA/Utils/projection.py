@@ -0,0 +1,91 @@
+"""
+Project game coordinates to the screen, for many points at once.
+
+A Projection is built once per frame from the camera (head position, rotation,
+FOV and the size of the game window), the rotation is then a single 3x3 matrix
+and every batch of points is projected with one matrix multiplication instead
+of doing the trigonometry for each point.
+
+The math is the same as the ConvertToScreenCoordinate functions the plugins
+used to have: the points are rotated by -yaw around Y, -pitch around X and
+-roll around Z, the camera looks down -Z and the horizontal FOV is the one of a
+4:3 window of the same height.
+
+Usage:
+>>> projection = Projection(HeadX, HeadY, HeadZ, yaw, pitch, roll, FOV, width, height)
+>>> screen, distance, visible = projection.project(points) # points: (N, 3)
+"""
+import numpy as np
+import math
+
+NEAR = 0.1
+"""Points closer to the camera plane than this are clipped. (m)"""
+
+def rotation_matrix(yaw: float, pitch: float, roll: float) -> np.ndarray:
+    """The rotation from world to camera space, the angles are the camera's rotation in degrees."""
+    yaw, pitch, roll = math.radians(-yaw), math.radians(-pitch), math.radians(-roll)
+    cy, sy = math.cos(yaw), math.sin(yaw)
+    cp, sp = math.cos(pitch), math.sin(pitch)
+    cr, sr = math.cos(roll), math.sin(roll)
+
+    Yaw = np.array([[cy, 0, sy], [0, 1, 0], [-sy, 0, cy]])
+    Pitch = np.array([[1, 0, 0], [0, cp, -sp], [0, sp, cp]])
+    Roll = np.array([[cr, -sr, 0], [sr, cr, 0], [0, 0, 1]])
+    return Roll @ Pitch @ Yaw
+
+class Projection:
+    """The camera of one frame.
+
+    :param float x, y, z: The position of the camera in the game world.
+    :param float yaw, pitch, roll: The rotation of the camera in degrees. (HeadRotationDegreesX, Y and Z)
+    :param float fov: The FOV set in the game.
+    :param float width, height: The size of the game window in pixels.
+    :param float near: See NEAR.
+    """
+    def __init__(self, x: float, y: float, z: float, yaw: float, pitch: float, roll: float, fov: float, width: float, height: float, near: float = NEAR):
+        self.position = np.array([x, y, z], dtype=np.float64)
+        self.rotation = rotation_matrix(yaw, pitch, roll)
+        self.width = width
+        self.height = height
+        self.near = near
+        self.focal = (height * (4 / 3) / 2) / math.tan(math.radians(fov) / 2)
+        """The distance of the screen from the camera in pixels."""
+
+    def project(self, points: np.ndarray, relative: bool = False, frustum: bool = False, margin: float = 0) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Project points to the screen.
+
+        :param np.ndarray points: (N, 3) game coordinates.
+        :param bool relative: The points are already relative to the camera position.
+        :param bool frustum: Also clip the points that are outside of the window.
+        :param float margin: How far outside of the window points are still kept when clipping to the frustum. (px)
+        :return: The screen coordinates (N, 2), the distances to the camera (N,) and which points are visible (N,).
+                 The screen coordinates of points that aren't visible are undefined.
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        if not relative:
+            points = points - self.position
+        camera = points @ self.rotation.T
+        depth = camera[:, 2]
+
+        visible = depth < -self.near
+        scale = self.focal / np.where(visible, depth, -1)
+        screen = np.empty((len(points), 2))
+        screen[:, 0] = self.width / 2 - camera[:, 0] * scale
+        screen[:, 1] = self.height / 2 + camera[:, 1] * scale
+
+        if frustum:
+            visible &= (screen[:, 0] >= -margin) & (screen[:, 0] <= self.width + margin)
+            visible &= (screen[:, 1] >= -margin) & (screen[:, 1] <= self.height + margin)
+
+        distance = np.sqrt(np.einsum("ij,ij->i", points, points))
+        return screen, distance, visible
+
+    def project_point(self, x: float, y: float, z: float) -> tuple[float, float, float] | None:
+        """Project a single point.
+
+        :return: The screen X, Y and the distance, or None if it's behind the camera.
+        """
+        screen, distance, visible = self.project(np.array([x, y, z]))
+        if not visible[0]:
+            return None
+        return float(screen[0, 0]), float(screen[0, 1]), float(distance[0])
@@ -0,0 +1,270 @@
+"""
+Record the game's shared memory buffers and play them back without the game.
+
+Start ETS2LA with `--record <file>` to record while driving, and with
+`--replay <file>` to have TruckSimAPI, Traffic, Route and Semaphores read
+the recording instead of the game. Add `--replay-fast` to play it back as
+fast as the plugins can read it instead of in real time.
+
+File format (gzip compressed):
+    magic:   b"ETS2LAREC1"
+    records: time (d), source (H), length (I), payload
+
+The payload is the buffer XORed with the previous buffer of the same
+source, most of the telemetry doesn't change between frames so this
+compresses very well.
+"""
+
+from Modules.TruckSimAPI.api import scsTelemetry, telemetrySize
+from ETS2LA import variables
+
+import numpy as np
+import threading
+import logging
+import struct
+import mmap
+import gzip
+import time
+import os
+
+MAGIC = b"ETS2LAREC1"
+RECORD = struct.Struct("=dHI")
+
+SOURCES = [
+    ("SCSTelemetry", telemetrySize),
+    ("ETS2LATraffic", 5280),
+    ("ETS2LARoute", 96_000),
+    ("ETS2LASemaphore", 2080),
+]
+"""All recorded buffers and how much of them is recorded, the index is the source id."""
+
+SOURCE_IDS = {name: id for id, (name, _) in enumerate(SOURCES)}
+
+POLL_INTERVAL = 0.005
+"""How often the recorder checks the buffers for changes. (s)"""
+
+FLUSH_INTERVAL = 1
+"""How often the recording is flushed to disk, so that it's readable if ETS2LA crashes. (s)"""
+
+# MARK: Recording
+
+class Recorder:
+    path: str
+    """Where the recording is saved."""
+
+    file: gzip.GzipFile
+
+    start: float
+    """perf_counter() at the start of the recording."""
+
+    last: dict[int, np.ndarray]
+    """The last recorded state of each source."""
+
+    buffers: dict[int, mmap.mmap]
+
+    def __init__(self, path: str):
+        self.path = path
+        self.file = gzip.open(path, "wb", compresslevel=6)
+        self.file.write(MAGIC)
+        self.start = time.perf_counter()
+        self.last = {}
+        self.buffers = {}
+        self.api = scsTelemetry()
+
+    def open(self, id: int) -> mmap.mmap | None:
+        name, size = SOURCES[id]
+        if os.name != "nt":
+            return None # the ETS2LA SDK buffers only exist on Windows
+        try:
+            return mmap.mmap(0, size, "Local\\" + name)
+        except Exception:
+            return None
+
+    def read(self, id: int) -> bytes | None:
+        if id == SOURCE_IDS["SCSTelemetry"]:
+            try: return self.api.read(telemetrySize)
+            except Exception:
+                self.api.close()
+                return None
+
+        if id not in self.buffers:
+            buffer = self.open(id)
+            if buffer is None:
+                return None
+            self.buffers[id] = buffer
+
+        return self.buffers[id][:SOURCES[id][1]]
+
+    def write(self, id: int, data: bytes) -> None:
+        current = np.frombuffer(data, dtype=np.uint8)
+        last = self.last.get(id)
+        if last is not None and np.array_equal(current, last):
+            return
+
+        payload = current if last is None else current ^ last
+        self.file.write(RECORD.pack(time.perf_counter() - self.start, id, len(data)))
+        self.file.write(payload.tobytes())
+        self.last[id] = current
+
+    def poll(self) -> None:
+        for id in range(len(SOURCES)):
+            data = self.read(id)
+            if data is not None:
+                self.write(id, data)
+
+    def close(self) -> None:
+        self.file.close()
+
+recorder: Recorder | None = None
+
+def recording_thread() -> None:
+    last_flush = time.perf_counter()
+    while recorder is not None:
+        try:
+            recorder.poll()
+            if time.perf_counter() - last_flush > FLUSH_INTERVAL:
+                recorder.file.flush()
+                last_flush = time.perf_counter()
+        except Exception:
+            logging.exception("Error while recording")
+            time.sleep(1)
+
+        time.sleep(POLL_INTERVAL)
+
+def record(path: str) -> None:
+    """Start recording to the given file in a background thread."""
+    global recorder
+    recorder = Recorder(path)
+    threading.Thread(target=recording_thread, daemon=True, name="Recorder").start()
+    logging.info(f"Recording the game's buffers to [dim]{path}[/dim]")
+
+# MARK: Playback
+
+class Player:
+    realtime: bool
+    """Follow the recording's timestamps, otherwise each telemetry read advances one frame."""
+
+    records: list[tuple[float, int, bytes]]
+
+    frames: int
+    """How many telemetry frames are in the recording."""
+
+    index: int
+    """The next record to apply."""
+
+    state: dict[int, np.ndarray]
+    """The current state of each source."""
+
+    cache: dict[int, bytes]
+    """The current state of each source as bytes, cleared when the state changes."""
+
+    start: float
+    """perf_counter() at the start of the playback in realtime mode."""
+
+    def __init__(self, path: str, realtime: bool = True):
+        self.realtime = realtime
+        self.records = []
+
+        with gzip.open(path, "rb") as file:
+            if file.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not an ETS2LA recording")
+            try:
+                while True:
+                    header = file.read(RECORD.size)
+                    if len(header) < RECORD.size:
+                        break
+                    timestamp, id, length = RECORD.unpack(header)
+                    payload = file.read(length)
+                    if len(payload) < length:
+                        break
+                    self.records.append((timestamp, id, payload))
+            except EOFError:
+                pass # ETS2LA was closed while recording, the flushed part is still usable
+
+        if not self.records:
+            raise ValueError(f"{path} doesn't contain any frames")
+
+        self.frames = sum(1 for _, id, _ in self.records if id == SOURCE_IDS["SCSTelemetry"])
+        self.restart()
+
+    @property
+    def duration(self) -> float:
+        return self.records[-1][0]
+
+    def restart(self) -> None:
+        self.index = 0
+        self.state = {}
+        self.cache = {}
+        self.start = time.perf_counter()
+
+    def apply(self) -> int:
+        """Apply the next record, returns the source it changed."""
+        _, id, payload = self.records[self.index]
+        change = np.frombuffer(payload, dtype=np.uint8)
+        self.state[id] = change.copy() if id not in self.state else self.state[id] ^ change
+        self.cache.pop(id, None)
+        self.index += 1
+        return id
+
+    def seek(self, timestamp: float) -> None:
+        """Apply all records up to the given recording time."""
+        while self.index < len(self.records) and self.records[self.index][0] <= timestamp:
+            self.apply()
+
+    def advance(self) -> None:
+        """Apply records until the next telemetry frame, loops back to the start at the end."""
+        if self.frames == 0:
+            self.seek(self.duration) # nothing to step through
+            return
+
+        while True:
+            if self.index >= len(self.records):
+                self.restart()
+            if self.apply() == SOURCE_IDS["SCSTelemetry"]:
+                return
+
+    def update(self, source: str) -> None:
+        if not self.realtime:
+            if source == "SCSTelemetry":
+                self.advance()
+            return
+
+        elapsed = time.perf_counter() - self.start
+        if elapsed > self.duration:
+            self.restart()
+            elapsed = 0
+        self.seek(elapsed)
+
+    def read(self, source: str) -> bytes:
+        """The current state of the source, zeroed if it hasn't been recorded (yet)."""
+        self.update(source)
+        id = SOURCE_IDS[source]
+        if id not in self.cache:
+            state = self.state.get(id)
+            self.cache[id] = state.tobytes() if state is not None else bytes(SOURCES[id][1])
+        return self.cache[id]
+
+player: Player | None = None
+
+def play(path: str, realtime: bool = True) -> Player:
+    """Replace the game's buffers with a recording in this process."""
+    global player
+    player = Player(path, realtime)
+    return player
+
+def get_player() -> Player | None:
+    """The player of this process, started from the command line arguments if needed."""
+    if player is None and variables.REPLAY_PATH != "":
+        play(variables.REPLAY_PATH, realtime=not variables.REPLAY_FAST)
+    return player
+
+class ReplayBuffer:
+    """Drop in replacement for the mmap of one of the sources, only supports reading."""
+    def __init__(self, source: str):
+        self.source = source
+
+    def __getitem__(self, key):
+        return get_player().read(self.source)[key]
+
+    def __len__(self) -> int:
+        return SOURCES[SOURCE_IDS[self.source]][1]
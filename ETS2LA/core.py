@@ -29,7 +29,10 @@ import ETS2LA.Window.window as window
 #import ETS2LA.Events.base_events as base_events
 import ETS2LA.Handlers.controls as controls
 import ETS2LA.Handlers.plugins as plugins
+import ETS2LA.Handlers.capture as capture
+import ETS2LA.Handlers.inference as inference
 import ETS2LA.Utils.listener as listener
+import ETS2LA.Utils.replay as replay
 
 # Utils
 from ETS2LA.Utils.Console.visibility import RestoreConsole
@@ -48,6 +51,10 @@ if not check_python_version():
 
 discovery.run()     # Rebind local IP to http://ets2la.local
 controls.run()      # Control handlers
+capture.run()       # Share one screen capture with the vision plugins (started by the first one)
+inference.run()     # Run the vision plugins' models in one process
+if variables.RECORD_PATH:
+    replay.record(variables.RECORD_PATH) # Record the game's buffers (--record)
 plugins.run()       # Run the plugin handler
 
 notifications.run() # Websockets server for notifications
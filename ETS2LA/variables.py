@@ -65,6 +65,15 @@ NO_UI = "--no-ui" in sys.argv
 NO_CONSOLE = "--no-console" in sys.argv and not NO_UI
 """Whether the app should close the console as soon as the UI has started."""
 
+RECORD_PATH = sys.argv[sys.argv.index("--record") + 1] if "--record" in sys.argv else ""
+"""Record the game's shared memory buffers to this file from the --record argument."""
+
+REPLAY_PATH = sys.argv[sys.argv.index("--replay") + 1] if "--replay" in sys.argv else ""
+"""Read the game's shared memory buffers from this recording instead of the game, from the --replay argument."""
+
+REPLAY_FAST = "--replay-fast" in sys.argv
+"""Whether the recording should be played back as fast as possible instead of in real time."""
+
 METADATA = json.loads(open(PATH + "metadata.json", "r").read())
 """Current version metadata."""
 
@@ -1,6 +1,7 @@
 # TODO: Add docstrings, fix some typing errors.
 import ETS2LA.Handlers.pytorch as pytorch
 import ETS2LA.variables as variables
+from Modules.BetterScreenCapture.shared import SharedCapture
 from typing import Tuple
 import numpy as np
 import time
@@ -17,6 +18,7 @@ def SendCrashReport(Title, Description):
     print("NOT IMPLEMENTED: SendCrashReport")
 
 Model = None
+SharedFrames = SharedCapture()
 sct = mss.mss()
 if len(sct.monitors) < 2:
     SendCrashReport("ScreenCapture - Only one item in the monitor list, normally there should be at least two.", str(sct.monitors))
@@ -34,7 +36,7 @@ LastTrackWindowRouteAdvisorUpdates = {}
 
 
 # MARK: Initialize()
-def Initialize(Screen=None, Area=(None, None, None, None)):
+def Initialize(Screen=None, Area=(None, None, None, None), Shared=True):
     """
     Initialize the ScreenCapture module. Needs to be called before the use of Capture().
 
@@ -44,6 +46,8 @@ def Initialize(Screen=None, Area=(None, None, None, None)):
         The index of the screen to capture. Defaults to primary screen. Format: 0 = primary screen
     Area : tuple
         The area of the screen to capture in X1, Y1, X2, Y2. Defaults to entire screen.
+    Shared : bool
+        Read the frames of the capture service instead of capturing the screen in this process, the service is started if it isn't running yet. Defaults to True.
 
     Returns
     -------
@@ -73,6 +77,26 @@ def Initialize(Screen=None, Area=(None, None, None, None)):
     RouteAdvisorZoomCorrect = True
     RouteAdvisorTabCorrect = True
 
+    SharedFrames.display = Display
+    if Shared and SharedFrames.start():
+        CaptureLibrary = "Shared"
+        return
+
+    InitializeLibrary()
+
+
+# MARK: InitializeLibrary()
+def InitializeLibrary():
+    """
+    Start capturing the screen in this process with the fastest available capture library.
+
+    Returns
+    -------
+    None
+    """
+    global Cam
+    global CaptureLibrary
+
     try:
 
         if variables.OS == "nt":
@@ -147,6 +171,40 @@ def Initialize(Screen=None, Area=(None, None, None, None)):
         CaptureLibrary = "MSS"
 
 
+# MARK: Grab()
+def Grab():
+    """
+    Get the latest frame of the entire screen as the capture library returns it, without converting or copying it.
+
+    Returns
+    -------
+    numpy.ndarray
+        The frame in BGRA or BGR, or None if there is no frame.
+    """
+    try:
+        if CaptureLibrary == "WindowsCapture":
+            return WindowsCaptureFrame
+        elif CaptureLibrary == "BetterCam":
+            if Cam is None:
+                InitializeLibrary()
+            return Cam.get_latest_frame() # type: ignore
+        elif CaptureLibrary == "MSS" or CaptureLibrary == "Shared":
+            # With the capture service this is only used until it has a frame of the display.
+            return np.asarray(sct.grab(sct.monitors[(Display + 1)]))
+    except:
+        pass
+    return None
+
+
+def ConvertFrame(Frame):
+    """
+    Copy the frame to a BGR image, only the given part of the frame is converted.
+    """
+    if Frame.ndim == 3 and Frame.shape[2] == 4:
+        return cv2.cvtColor(Frame, cv2.COLOR_BGRA2BGR)
+    return np.array(Frame)
+
+
 # MARK: Capture()
 def Capture(ImageType:str = "both"):
     """
@@ -162,77 +220,43 @@ def Capture(ImageType:str = "both"):
     numpy.ndarray or numpy.ndarray, numpy.ndarray
         The return is based on the ImageType.
     """
-
+    ImageType = ImageType.lower()
     if CaptureLibrary is None:
-        return None if ImageType.lower() == "cropped" or ImageType.lower() == "full" else (None, None)
-    
-    if CaptureLibrary.lower() == "windowscapture":
+        return None if ImageType == "cropped" or ImageType == "full" else (None, None)
 
+    if CaptureLibrary == "Shared":
         try:
-
-            img = cv2.cvtColor(np.array(WindowsCaptureFrame), cv2.COLOR_BGRA2BGR)
-            if ImageType.lower() == "both":
-                croppedImg = img[MonitorY1:MonitorY2, MonitorX1:MonitorX2]
-                return croppedImg, img
-            elif ImageType.lower() == "cropped":
-                croppedImg = img[MonitorY1:MonitorY2, MonitorX1:MonitorX2]
-                return croppedImg
-            elif ImageType.lower() == "full":
-                return img
+            if ImageType == "cropped":
+                img = SharedFrames.read(MonitorX1, MonitorY1, MonitorX2, MonitorY2)
+                if img is not None:
+                    return img
             else:
-                croppedImg = img[MonitorY1:MonitorY2, MonitorX1:MonitorX2]
-                return croppedImg, img
-
-        except:
-
-            return None if ImageType.lower() == "cropped" or ImageType.lower() == "full" else (None, None)
-
-    elif CaptureLibrary.lower() == "bettercam":
-
-        try:
+                img = SharedFrames.read()
+                if img is not None:
+                    if ImageType == "full":
+                        return img
+                    return img[MonitorY1:MonitorY2, MonitorX1:MonitorX2], img
+            # The service is waking up or switching displays, grab this frame here.
+        except ConnectionError:
+            # The capture service stopped, capture the screen in this process from now on.
+            InitializeLibrary()
 
-            if Cam is None:
-                Initialize()
-                
-            img = np.array(Cam.get_latest_frame()) # type: ignore
-            if ImageType.lower() == "both":
-                croppedImg = img[MonitorY1:MonitorY2, MonitorX1:MonitorX2]
-                return croppedImg, img
-            elif ImageType.lower() == "cropped":
-                croppedImg = img[MonitorY1:MonitorY2, MonitorX1:MonitorX2]
-                return croppedImg
-            elif ImageType.lower() == "full":
-                return img
-            else:
-                croppedImg = img[MonitorY1:MonitorY2, MonitorX1:MonitorX2]
-                return croppedImg, img
-
-        except:
-
-            return None if ImageType.lower() == "cropped" or ImageType.lower() == "full" else (None, None)
-
-    elif CaptureLibrary.lower() == "mss":
+    try:
 
-        try:
+        img = Grab()
+        if img is None:
+            return None if ImageType == "cropped" or ImageType == "full" else (None, None)
+        if ImageType == "cropped":
+            return ConvertFrame(img[MonitorY1:MonitorY2, MonitorX1:MonitorX2])
+        img = ConvertFrame(img)
+        if ImageType == "full":
+            return img
+        croppedImg = img[MonitorY1:MonitorY2, MonitorX1:MonitorX2]
+        return croppedImg, img
 
-            fullMonitor = sct.monitors[(Display + 1)]
-            img = np.array(sct.grab(fullMonitor))
-            img = cv2.cvtColor(img, cv2.COLOR_BGRA2BGR)
-            if ImageType.lower() == "both":
-                croppedImg = img[MonitorY1:MonitorY2, MonitorX1:MonitorX2]
-                return croppedImg, img
-            elif ImageType.lower() == "cropped":
-                croppedImg = img[MonitorY1:MonitorY2, MonitorX1:MonitorX2]
-                return croppedImg
-            elif ImageType.lower() == "full":
-                return img
-            else:
-                croppedImg = img[MonitorY1:MonitorY2, MonitorX1:MonitorX2]
-                return croppedImg, img
-
-        except:
+    except:
 
-            return None if ImageType.lower() == "cropped" or ImageType.lower() == "full" else (None, None)
+        return None if ImageType == "cropped" or ImageType == "full" else (None, None)
 
 
 # MARK: GetScreenDimensions()
@@ -0,0 +1,326 @@
+"""One screen capture shared between all vision plugins.
+
+The capture service (ETS2LA/Handlers/capture.py) is the only process that grabs
+the screen. Every frame is copied into one of two slots in shared memory and the
+frame counter is bumped, so the plugins read the newest slot while the service
+is writing the other one. A plugin only converts the colors of the area it
+actually uses, instead of every plugin grabbing and converting the full screen.
+
+The service is started by the backend when the first reader asks for it. The
+readers tell the service which display they want and when they last read a
+frame. The service stops grabbing when nobody has read a frame for a while.
+
+Neither the service nor the readers leave the ring to the resource tracker, a
+reader with a tracker of its own would remove it when the reader exits. The
+backend removes it when it exits instead, see capture.stop().
+
+Ring layout:
+    header:  frame (Q), heartbeat (d), capacity (Q)
+    request: last read (d), display (i)
+    slots:   frame (Q), time (d), height (I), width (I), channels (I), display (i) + image (capacity bytes) * 2
+"""
+from multiprocessing.connection import Client
+from multiprocessing import shared_memory, resource_tracker
+import numpy as np
+import tempfile
+import struct
+import time
+import cv2
+import os
+
+sharedName = "ETS2LA_Capture"
+serviceAddress = r"\\.\pipe\ETS2LA_Capture" if os.name == "nt" else os.path.join(tempfile.gettempdir(), "ETS2LA_Capture.sock")
+"""Where the backend listens for requests to start the service."""
+serviceKey = b"ETS2LA"
+startTimeout = 5
+"""How long a reader waits for the service to start. (s)"""
+slotCount = 2
+timeout = 2
+"""How long the service can go without a heartbeat before the readers stop trusting it. (s)"""
+staleAfter = 0.5
+"""Frames older than this are not returned, the service is idle and will grab a new one. (s)"""
+idleAfter = 5
+"""How long the service keeps grabbing after the last read. (s)"""
+
+HEADER = struct.Struct("=QdQ")
+REQUEST = struct.Struct("=di")
+SLOT = struct.Struct("=QdIIIi")
+headerSize = 64
+requestOffset = 32
+slotHeaderSize = 32
+
+def untrack(shm: shared_memory.SharedMemory) -> None:
+    """Stop the resource tracker of this process from removing the segment when it exits."""
+    if os.name != "nt":
+        resource_tracker.unregister(shm._name, "shared_memory")
+
+class FrameRing:
+    """The shared memory ring, created by the capture service and attached to by the readers.
+
+    :param int capacity: The size of the largest frame in bytes, only needed when creating the ring.
+    """
+    shm: shared_memory.SharedMemory
+    capacity: int
+    frame: int = 0
+
+    def __init__(self, create: bool = False, capacity: int = 0):
+        if not create:
+            # Attaching registers the ring with the resource tracker like creating it does.
+            self.shm = shared_memory.SharedMemory(name=sharedName)
+            untrack(self.shm)
+            self.capacity = HEADER.unpack_from(self.shm.buf, 0)[2]
+            return
+
+        size = headerSize + (slotHeaderSize + capacity) * slotCount
+        try:
+            self.shm = shared_memory.SharedMemory(name=sharedName, create=True, size=size)
+        except FileExistsError:
+            # Left behind by a previous backend that didn't exit cleanly.
+            self.shm = shared_memory.SharedMemory(name=sharedName)
+            self.shm.close()
+            self.shm.unlink()
+            self.shm = shared_memory.SharedMemory(name=sharedName, create=True, size=size)
+        untrack(self.shm)
+
+        self.capacity = capacity
+        HEADER.pack_into(self.shm.buf, 0, 0, time.time(), capacity)
+        REQUEST.pack_into(self.shm.buf, requestOffset, 0, 0)
+
+    def slotOffset(self, frame: int) -> int:
+        return headerSize + (frame % slotCount) * (slotHeaderSize + self.capacity)
+
+    # MARK: Service
+    def publish(self, image: np.ndarray, display: int) -> None:
+        """Copy a new frame into the slot the readers aren't using, they can only see it once the header is updated."""
+        frame = self.frame + 1
+        offset = self.slotOffset(frame)
+        height, width = image.shape[:2]
+        channels = image.shape[2] if image.ndim == 3 else 1
+
+        SLOT.pack_into(self.shm.buf, offset, 0, 0, 0, 0, 0, 0) # mark the slot as being written
+        target = np.ndarray(image.shape, dtype=np.uint8, buffer=self.shm.buf, offset=offset + slotHeaderSize)
+        np.copyto(target, image)
+        del target # a view into the buffer would keep close() from working
+        SLOT.pack_into(self.shm.buf, offset, frame, time.time(), height, width, channels, display)
+        HEADER.pack_into(self.shm.buf, 0, frame, time.time(), self.capacity)
+        self.frame = frame
+
+    def heartbeat(self) -> None:
+        HEADER.pack_into(self.shm.buf, 0, self.frame, time.time(), self.capacity)
+
+    def request(self) -> tuple[float, int]:
+        """When a reader last read a frame and the display it wants."""
+        return REQUEST.unpack_from(self.shm.buf, requestOffset)
+
+    # MARK: Readers
+    def header(self) -> tuple[int, float, int]:
+        return HEADER.unpack_from(self.shm.buf, 0)
+
+    def want(self, display: int) -> None:
+        REQUEST.pack_into(self.shm.buf, requestOffset, time.time(), display)
+
+    def stamp(self, frame: int) -> int:
+        return SLOT.unpack_from(self.shm.buf, self.slotOffset(frame))[0]
+
+    def view(self, frame: int) -> tuple[np.ndarray, float, int] | None:
+        """A view of the slot of the given frame, no data is copied.
+
+        The view stays valid until the service starts writing the frame after
+        the next one, check `stamp(frame)` after using it.
+
+        :return: The image, when it was grabbed and its display, or None if the slot has already been overwritten.
+        """
+        offset = self.slotOffset(frame)
+        stamp, grabbed, height, width, channels, display = SLOT.unpack_from(self.shm.buf, offset)
+        if stamp != frame:
+            return None
+        image = np.ndarray((height, width, channels), dtype=np.uint8, buffer=self.shm.buf, offset=offset + slotHeaderSize)
+        return image, grabbed, display
+
+    def close(self) -> None:
+        self.shm.close()
+
+class Region:
+    """An area of the screen a plugin reads, returned by `SharedCapture.register`.
+
+    The coordinates are relative to the display, like the ones of ScreenCapture.Initialize().
+    """
+    def __init__(self, capture: "SharedCapture", X1: int, Y1: int, X2: int, Y2: int):
+        self.capture = capture
+        self.move(X1, Y1, X2, Y2)
+
+    def move(self, X1: int, Y1: int, X2: int, Y2: int) -> None:
+        self.X1, self.Y1, self.X2, self.Y2 = X1, Y1, X2, Y2
+
+    def view(self) -> tuple[int, np.ndarray] | None:
+        """The area in the newest frame as it's in shared memory (usually BGRA), without copying it.
+
+        :return: The frame number and the view, see `SharedCapture.valid` for how long the view can be used.
+        """
+        return self.capture.view(self.X1, self.Y1, self.X2, self.Y2)
+
+    def read(self) -> np.ndarray | None:
+        """A BGR copy of the area in the newest frame."""
+        return self.capture.read(self.X1, self.Y1, self.X2, self.Y2)
+
+class SharedCapture:
+    """Reads the screen from the capture service instead of grabbing it.
+
+    Every method raises ConnectionError when the service isn't running, the
+    caller should then fall back to capturing the screen itself.
+
+    :param int display: The index of the display to read. Format: 0 = primary screen
+    """
+    ring: FrameRing | None = None
+    lastAttach: float = 0
+
+    def __init__(self, display: int = 0):
+        self.display = display
+
+    def attach(self) -> FrameRing:
+        if self.ring is not None:
+            return self.ring
+
+        # Don't try to open the shared memory every frame when the service isn't running.
+        if time.time() - self.lastAttach < 1:
+            raise ConnectionError("Capture service isn't running")
+        self.lastAttach = time.time()
+        try:
+            self.ring = FrameRing()
+        except FileNotFoundError:
+            raise ConnectionError("Capture service isn't running")
+        return self.ring
+
+    def start(self) -> bool:
+        """Ask the backend to start the service and wait until it's running.
+
+        :return: False if the backend isn't running or the service didn't start in time.
+        """
+        if self.available():
+            return True
+        try:
+            with Client(serviceAddress, authkey=serviceKey) as connection:
+                connection.send(("start",))
+                if not connection.poll(startTimeout) or connection.recv() != ("started",):
+                    return False
+        except (OSError, EOFError):
+            return False
+
+        end = time.time() + startTimeout
+        while time.time() < end:
+            self.lastAttach = 0
+            if self.available():
+                return True
+            time.sleep(0.1)
+        return False
+
+    def available(self) -> bool:
+        try:
+            return time.time() - self.attach().header()[1] < timeout
+        except ConnectionError:
+            return False
+
+    def register(self, X1: int, Y1: int, X2: int, Y2: int) -> Region:
+        return Region(self, X1, Y1, X2, Y2)
+
+    def newest(self) -> int | None:
+        """The number of the newest frame of the wanted display, None if there's no recent one yet."""
+        ring = self.attach()
+        frame, heartbeat, _ = ring.header()
+        if time.time() - heartbeat > timeout:
+            raise ConnectionError("Capture service stopped")
+
+        last, display = ring.request()
+        if display != self.display or time.time() - last > 0.1:
+            ring.want(self.display) # also keeps the service grabbing
+        return frame if frame > 0 else None
+
+    def valid(self, frame: int) -> bool:
+        """Whether views of the frame can still be used, the service overwrites them two frames later."""
+        return self.attach().stamp(frame) == frame
+
+    def view(self, X1: int | None = None, Y1: int | None = None, X2: int | None = None, Y2: int | None = None) -> tuple[int, np.ndarray] | None:
+        """The area in the newest frame without copying it, the whole display if no area is given.
+
+        :return: The frame number and the view, or None if there's no recent frame of the display.
+        """
+        for _ in range(slotCount):
+            frame = self.newest()
+            if frame is None:
+                return None
+            view = self.ring.view(frame)
+            if view is None:
+                continue # the service overwrote it after we read the header
+            image, grabbed, display = view
+            if display != self.display or time.time() - grabbed > staleAfter:
+                return None # the service hasn't switched to the display or woken up yet
+            return frame, image[Y1:Y2, X1:X2]
+        return None
+
+    def read(self, X1: int | None = None, Y1: int | None = None, X2: int | None = None, Y2: int | None = None) -> np.ndarray | None:
+        """A BGR copy of the area in the newest frame, only the area is converted."""
+        for _ in range(slotCount):
+            view = self.view(X1, Y1, X2, Y2)
+            if view is None:
+                return None
+            frame, image = view
+            if image.shape[2] == 4:
+                image = cv2.cvtColor(image, cv2.COLOR_BGRA2BGR)
+            else:
+                image = image.copy()
+            if self.valid(frame):
+                return image
+        return None
+
+    def close(self) -> None:
+        if self.ring is not None:
+            self.ring.close()
+            self.ring = None
+
+# MARK: Sources
+class SyntheticSource:
+    """Generates frames instead of grabbing the screen, for testing without a display.
+
+    Each pixel is (x, y, frame, 255) modulo 256 in BGRA, so readers can check
+    that the area they got is the right one from the right frame.
+    """
+    def __init__(self, width: int = 1920, height: int = 1080):
+        self.width = width
+        self.height = height
+        self.frame = 0
+        y, x = np.mgrid[0:height, 0:width]
+        self.base = np.zeros((height, width, 4), dtype=np.uint8)
+        self.base[:, :, 0] = x % 256
+        self.base[:, :, 1] = y % 256
+        self.base[:, :, 3] = 255
+
+    def capacity(self) -> int:
+        return self.width * self.height * 4
+
+    def grab(self, display: int) -> np.ndarray | None:
+        self.frame += 1
+        self.base[:, :, 2] = self.frame % 256
+        return self.base
+
+class ScreenSource:
+    """Grabs the display with BetterScreenCapture's capture library (WindowsCapture, BetterCam or MSS)."""
+    def __init__(self):
+        # Imported here so that the synthetic source works without a display.
+        import Modules.BetterScreenCapture.main as ScreenCapture
+        self.ScreenCapture = ScreenCapture
+        self.display = None
+
+    def capacity(self) -> int:
+        return max(monitor["width"] * monitor["height"] for monitor in self.ScreenCapture.sct.monitors[1:]) * 4
+
+    def grab(self, display: int) -> np.ndarray | None:
+        if display != self.display:
+            if display + 1 >= len(self.ScreenCapture.sct.monitors):
+                return None
+            if self.ScreenCapture.CaptureLibrary == "WindowsCapture":
+                self.ScreenCapture.StopWindowsCapture = True
+                while self.ScreenCapture.StopWindowsCapture == True:
+                    time.sleep(0.01)
+            self.ScreenCapture.Initialize(Screen=display, Shared=False)
+            self.display = display
+        return self.ScreenCapture.Grab()
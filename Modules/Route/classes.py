@@ -1,4 +1,13 @@
+import numpy as np
+
+ROUTE_DTYPE = np.dtype([("uid", "<i8"), ("distance", "<f4"), ("time", "<f4")])
+"""Layout of one item in the ETS2LARoute buffer, the route ends at the first zero UID."""
+
 class RouteItem():
+    """
+    The module returns a record array with these same fields,
+    this class can be used to keep an item around on its own.
+    """
     uid: int
     distance: float
     time: float
@@ -9,4 +18,4 @@ class RouteItem():
         self.time = time
         
     def __str__(self):
-        return f"RouteItem({self.uid}, {self.distance / 1000:.1f} km, {self.time / 60:.1f} min)"
\ No newline at end of file
+        return f"RouteItem({self.uid}, {self.distance / 1000:.1f} km, {self.time / 60:.1f} min)"
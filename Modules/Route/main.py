@@ -1,51 +1,54 @@
-from Modules.Route.classes import RouteItem
+from Modules.Route.classes import ROUTE_DTYPE
+from ETS2LA.Utils import replay
 from ETS2LA.Module import *
+import numpy as np
 import logging
-import struct
 import mmap
 import time
 
 class Module(ETS2LAModule):
     def imports(self):
         self.wait_for_buffer()
-        self.last_update = 0
+        self.last_buffer = None
         self.last_data = []
         
     def wait_for_buffer(self):
+        if replay.get_player() is not None:
+            self.buf = replay.ReplayBuffer("ETS2LARoute")
+            return
+        
         self.buf = None
         while self.buf is None:
             size = 96_000
             self.buf = mmap.mmap(0, size, r"Local\ETS2LARoute")
             time.sleep(0.1)
     
-    def get_route_information(self, force=False):
+    def get_route_information(self, force=False) -> np.recarray | list:
+        """Get the route from the game.
+        
+        :param force: Parse the buffer even if it hasn't changed.
+        :return: A record array with the uid, distance and time of each route item.
+                 The same array is returned until the route in the game changes.
+        """
         if self.buf is None:
             return []
         
-        if not force and time.time() - self.last_update < 60:
-            return self.last_data
-        
-        self.last_update = time.perf_counter()
-        
         try:
-            format = "qff"
-            total_format = "=" + format * 6000
-            data = struct.unpack(total_format, self.buf[:96_000])
+            buffer = self.buf[:96_000]
+            if not force and buffer == self.last_buffer:
+                return self.last_data
             
-            items = []
-            for i in range(0,6000):
-                if data[0] == 0:
-                    break
-                
-                item = RouteItem(data[0], data[1], data[2])
-                items.append(item)
-                data = data[3:]
+            route = np.frombuffer(buffer, dtype=ROUTE_DTYPE)
+            end = np.flatnonzero(route["uid"] == 0)
+            if len(end) > 0:
+                route = route[:end[0]]
             
-            self.last_data = items
-            return items
+            self.last_buffer = buffer
+            self.last_data = route.view(np.recarray)
+            return self.last_data
         except:
             logging.exception("Failed to read route information")
             return []
     
     def run(self, force=False):
-        return self.get_route_information(force=force)
\ No newline at end of file
+        return self.get_route_information(force=force)
@@ -1,4 +1,5 @@
 from Modules.Semaphores.classes import Gate, TrafficLight, Position, Quaternion
+from ETS2LA.Utils import replay
 from ETS2LA.Module import *
 import logging
 import struct
@@ -15,6 +16,10 @@ class Module(ETS2LAModule):
         self.wait_for_buffer()
 
     def wait_for_buffer(self):
+        if replay.get_player() is not None:
+            self.buf = replay.ReplayBuffer("ETS2LASemaphore")
+            return
+        
         self.buf = None
         while self.buf is None:
             size = 2080
@@ -1,3 +1,4 @@
+import numpy as np
 import math
 import time
 
@@ -52,6 +53,74 @@ def rotate_around_point(point, center, pitch, yaw, roll):
         z + center[2]
     ]
 
+TRAILER_DTYPE = np.dtype([
+    ("position", "<f4", 3),
+    ("rotation", "<f4", 4),
+    ("size", "<f4", 3),
+])
+
+VEHICLE_DTYPE = np.dtype([
+    ("position", "<f4", 3),
+    ("rotation", "<f4", 4), # w, x, y, z as sent by the game, Quaternion swaps x and y
+    ("size", "<f4", 3),
+    ("speed", "<f4"),
+    ("acceleration", "<f4"),
+    ("trailer_count", "<i2"),
+    ("id", "<i2"),
+    ("trailers", TRAILER_DTYPE, 2),
+])
+"""Layout of one vehicle in the ETS2LATraffic buffer."""
+
+def euler_batch(rotations: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Same as Quaternion.euler() for an array of rotations in the buffer's order.
+    
+    :param rotations: (..., 4) array of w, x, y, z.
+    :return: pitch, yaw and roll arrays in degrees.
+    """
+    rotations = rotations.astype(np.float64)
+    w = rotations[..., 0]
+    x = rotations[..., 2]
+    y = rotations[..., 1]
+    z = rotations[..., 3]
+    
+    yaw = np.arctan2(2.0*(y*z + w*x), w*w - x*x - y*y + z*z)
+    pitch = np.arcsin(np.clip(-2.0*(x*z - w*y), -1, 1))
+    roll = np.arctan2(2.0*(x*y + w*z), w*w + x*x - y*y - z*z)
+    
+    return np.degrees(pitch), np.degrees(yaw), np.degrees(roll)
+
+def corners_batch(positions: np.ndarray, sizes: np.ndarray, pitch: np.ndarray, yaw: np.ndarray) -> np.ndarray:
+    """
+    Same as Vehicle.get_corners() for arrays of boxes.
+    
+    :param positions: (..., 3) ground middle of each box.
+    :param sizes: (..., 3) width, height and length of each box.
+    :param pitch: (...) pitch in degrees.
+    :param yaw: (...) yaw in degrees.
+    :return: (..., 4, 3) front left, front right, back right and back left corners.
+    """
+    positions = positions.astype(np.float64)
+    half_width = sizes[..., 0, None].astype(np.float64) / 2
+    half_length = sizes[..., 2, None].astype(np.float64) / 2
+    
+    # Corner offsets from the middle, in the same order as get_corners()
+    x = np.array([-1, 1, 1, -1]) * half_width
+    z = np.array([-1, -1, 1, 1]) * half_length
+    
+    # Pitch rotation (around X-axis), y starts at 0
+    pitch_rad = np.radians(pitch)[..., None]
+    y = -z * np.sin(pitch_rad)
+    z = z * np.cos(pitch_rad)
+    
+    # Yaw rotation (around Y-axis), get_corners() rotates by -yaw
+    yaw_rad = np.radians(-yaw)[..., None]
+    cos = np.cos(yaw_rad)
+    sin = np.sin(yaw_rad)
+    x, z = x * cos - z * sin, x * sin + z * cos
+    
+    return np.stack([x, y, z], axis=-1) + positions[..., None, :]
+
 class Position():
     x: float
     y: float
@@ -132,6 +201,10 @@ class Trailer:
     position: Position
     rotation: Quaternion
     size: Size
+    frame: "TrafficFrame | None" = None
+    """The frame this trailer was decoded from, the corners are computed there."""
+    index: int = -1
+    trailer: int = -1
     
     def __init__(self, position: Position, rotation: Quaternion, size: Size):
         self.position = position
@@ -144,6 +217,19 @@ class Trailer:
     def __str__(self):
         return f"Trailer({self.position}, {self.rotation}, {self.size})"
     
+    def get_corners(self):
+        """Same as Vehicle.get_corners() for the trailer."""
+        if self.frame is not None:
+            return self.frame.get_corners(self.index, self.trailer)
+        
+        pitch, yaw, roll = self.rotation.euler()
+        corners = corners_batch(
+            np.array([self.position.x, self.position.y, self.position.z]),
+            np.array([self.size.width, self.size.height, self.size.length]),
+            np.array(pitch), np.array(yaw)
+        )
+        return tuple(corners.tolist())
+    
     def __dict__(self): # type: ignore
         return {
             "position": self.position.__dict__,
@@ -165,6 +251,9 @@ class Vehicle:
     is_trailer: bool
     time: float = 0.0
     speed_position: Position = Position(0, 0, 0)
+    frame: "TrafficFrame | None" = None
+    """The frame this vehicle was decoded from, the corners are computed there."""
+    index: int = -1
     
     def __init__(self, position: Position, rotation: Quaternion, size: Size, speed: float, acceleration: float, trailer_count: int, id: int, trailers: list[Trailer]):
         self.position = position
@@ -229,6 +318,9 @@ class Vehicle:
         3. Back right
         4. Back left
         """
+        if self.frame is not None:
+            return self.frame.get_corners(self.index)
+        
         ground_middle = [
             self.position.x,
             self.position.y,
@@ -284,4 +376,104 @@ class Vehicle:
             "trailers": [trailer.__dict__() for trailer in self.trailers],
             "is_tmp": self.is_tmp,
             "is_trailer": self.is_trailer,
-        }
\ No newline at end of file
+        }
+class TrafficFrame:
+    """
+    All valid vehicles in the traffic buffer as arrays. The corners of every
+    vehicle and trailer are computed at once the first time any of them are
+    needed, Vehicle objects are only built when vehicles() or find() is called.
+    """
+    data: np.ndarray
+    """Structured VEHICLE_DTYPE array of the valid vehicles."""
+    speeds: np.ndarray
+    """The speed of each vehicle, calculated from the position for TruckersMP vehicles."""
+    times: np.ndarray
+    """When each vehicle's speed was last updated."""
+    
+    _corners: np.ndarray | None = None
+    _trailer_corners: np.ndarray | None = None
+    
+    def __init__(self, data: np.ndarray, speeds: np.ndarray, times: np.ndarray):
+        self.data = data
+        self.speeds = speeds
+        self.times = times
+        
+    def __len__(self) -> int:
+        return len(self.data)
+    
+    def compute_corners(self) -> None:
+        # Vehicles and their trailers in one batch
+        trailers = self.data["trailers"]
+        positions = np.concatenate((self.data["position"], trailers["position"].reshape(-1, 3)))
+        rotations = np.concatenate((self.data["rotation"], trailers["rotation"].reshape(-1, 4)))
+        sizes = np.concatenate((self.data["size"], trailers["size"].reshape(-1, 3)))
+        
+        pitch, yaw, _ = euler_batch(rotations)
+        corners = corners_batch(positions, sizes, pitch, yaw)
+        
+        count = len(self.data)
+        self._corners = corners[:count]
+        self._trailer_corners = corners[count:].reshape(count, 2, 4, 3)
+    
+    @property
+    def corners(self) -> np.ndarray:
+        """(N, 4, 3) corners of each vehicle, see Vehicle.get_corners()."""
+        if self._corners is None:
+            self.compute_corners()
+        return self._corners
+    
+    @property
+    def trailer_corners(self) -> np.ndarray:
+        """(N, 2, 4, 3) corners of each vehicle's trailers."""
+        if self._trailer_corners is None:
+            self.compute_corners()
+        return self._trailer_corners
+    
+    def get_corners(self, index: int, trailer: int = -1) -> tuple:
+        """The corners of a single vehicle (or its trailer) as python lists."""
+        if trailer == -1:
+            return tuple(self.corners[index].tolist())
+        return tuple(self.trailer_corners[index, trailer].tolist())
+    
+    def find(self, ids: list[int]) -> Vehicle | None:
+        """The first vehicle with one of the given IDs."""
+        for index, id in enumerate(self.data["id"].tolist()):
+            if id in ids:
+                return self.vehicles([index])[0]
+        return None
+        
+    def vehicles(self, indices: list[int] | None = None) -> list[Vehicle]:
+        """Build the Vehicle objects, for all vehicles or only the given indices."""
+        data = self.data if indices is None else self.data[indices]
+        indices = list(range(len(self.data))) if indices is None else indices
+        
+        # tolist() per field, a structured array would give numpy types instead of python ones.
+        positions = data["position"].tolist()
+        rotations = data["rotation"].tolist()
+        sizes = data["size"].tolist()
+        accelerations = data["acceleration"].tolist()
+        trailer_counts = data["trailer_count"].tolist()
+        ids = data["id"].tolist()
+        trailer_positions = data["trailers"]["position"].tolist()
+        trailer_rotations = data["trailers"]["rotation"].tolist()
+        trailer_sizes = data["trailers"]["size"].tolist()
+        speeds = self.speeds[indices].tolist()
+        times = self.times[indices].tolist()
+        
+        vehicles = []
+        for i, index in enumerate(indices):
+            trailers = []
+            for j in range(min(trailer_counts[i], 2)):
+                trailer = Trailer(Position(*trailer_positions[i][j]), Quaternion(*trailer_rotations[i][j]), Size(*trailer_sizes[i][j]))
+                trailer.frame = self
+                trailer.index = index
+                trailer.trailer = j
+                trailers.append(trailer)
+                
+            vehicle = Vehicle(Position(*positions[i]), Quaternion(*rotations[i]), Size(*sizes[i]), speeds[i], accelerations[i], trailer_counts[i], ids[i], trailers)
+            vehicle.time = times[i]
+            vehicle.frame = self
+            vehicle.index = index
+            vehicles.append(vehicle)
+            
+        return vehicles
@@ -1,26 +1,36 @@
-from Modules.Traffic.classes import Position, Quaternion, Size, Trailer, Vehicle
+from Modules.Traffic.classes import Position, Quaternion, Size, Trailer, Vehicle, TrafficFrame, VEHICLE_DTYPE, tmp_speed_update_frequency
+from ETS2LA.Utils import replay
 from ETS2LA.Module import *
+import numpy as np
 import logging
-import struct
 import mmap
 import time
 
 class Module(ETS2LAModule):
-    vehicle_format = "ffffffffffffhh"
-    trailer_format = "ffffffffff"
-    vehicle_object_format = vehicle_format + trailer_format + trailer_format
-    total_format = "=" + vehicle_object_format * 40
-    
-    last_vehicles: dict[int, Vehicle] = {}
+    # Per vehicle ID (offset by 32768) state for the TruckersMP speed calculation.
+    seen: np.ndarray
+    last_ids: np.ndarray
+    speeds: np.ndarray
+    speed_times: np.ndarray
+    speed_positions: np.ndarray
     
     start_time = 0
     message_shown = False
     
     def imports(self):
         self.start_time = time.time()
+        self.seen = np.zeros(65536, dtype=bool)
+        self.last_ids = np.zeros(0, dtype=np.int64)
+        self.speeds = np.zeros(65536)
+        self.speed_times = np.zeros(65536)
+        self.speed_positions = np.zeros((65536, 3))
         self.wait_for_buffer()
         
     def wait_for_buffer(self):
+        if replay.get_player() is not None:
+            self.buf = replay.ReplayBuffer("ETS2LATraffic")
+            return
+        
         self.buf = None
         while self.buf is None:
             try:
@@ -52,47 +62,56 @@ class Module(ETS2LAModule):
         
         return Vehicle(position, rotation, size, speed, acceleration, trailer_count, id, trailers)
     
-    def get_traffic(self):
+    def get_traffic_arrays(self) -> TrafficFrame | None:
+        """Decode the traffic buffer without building any Vehicle objects."""
         if self.buf is None:
             return None
         
         try:
-            data = struct.unpack(self.total_format, self.buf[:5280])
-            vehicles: list[Vehicle] = []
-            for i in range(0, 40):
-                position = Position(data[0], data[1], data[2])
-                rotation = Quaternion(data[3], data[4], data[5], data[6])
-                size = Size(data[7], data[8], data[9])
-                speed = data[10]
-                acceleration = data[11]
-                trailer_count = data[12]
-                id = data[13]
-                
-                trailers = []
-                for j in range(0, trailer_count):
-                    offset = 14 + (j * 10)
-                    trailer_position = Position(data[offset], data[offset + 1], data[offset + 2])
-                    trailer_rotation = Quaternion(data[offset + 3], data[offset + 4], data[offset + 5], data[offset + 6])
-                    trailer_size = Size(data[offset + 7], data[offset + 8], data[offset + 9])
-                    
-                    trailers.append(Trailer(trailer_position, trailer_rotation, trailer_size))
+            data = np.frombuffer(self.buf[:5280], dtype=VEHICLE_DTYPE)
+            valid = np.any(data["position"] != 0, axis=1) & np.any(data["rotation"] != 0, axis=1)
+            data = data[valid]
+            
+            now = time.time()
+            ids = data["id"].astype(np.int64) + 32768
+            speeds = data["speed"].astype(np.float64)
+            times = np.full(len(data), now)
+            
+            # TruckersMP vehicles don't send their speed, calculate it from the
+            # distance driven every tmp_speed_update_frequency seconds instead.
+            is_tmp = (data["acceleration"] == -1) | (data["acceleration"] == -2)
+            if is_tmp.any():
+                positions = data["position"].astype(np.float64)
+                known = is_tmp & self.seen[ids]
+                time_diff = now - self.speed_times[ids]
+                keep = known & (time_diff < tmp_speed_update_frequency)
+                update = known & ~keep
                 
-                if not position.is_zero() and not rotation.is_zero():
-                    vehicles.append(Vehicle(position, rotation, size, speed, acceleration, trailer_count, id, trailers))
+                distance = np.linalg.norm(positions[update] - self.speed_positions[ids[update]], axis=1)
+                speeds[keep] = self.speeds[ids[keep]]
+                times[keep] = self.speed_times[ids[keep]]
+                speeds[update] = np.where(distance > 0.1, distance / time_diff[update], 0)
                 
-                data = data[14 + (2 * 10):]
+                # Vehicles that kept their last speed also keep the position it was calculated from.
+                moved = ids[~keep]
+                self.speed_positions[moved] = positions[~keep]
+                self.speeds[ids] = speeds
+                self.speed_times[ids] = times
             
-            if len(vehicles) > 0:
-                if vehicles[0].is_tmp:
-                    for vehicle in vehicles:
-                        if vehicle.id in self.last_vehicles:
-                            vehicle.update_from_last(self.last_vehicles[vehicle.id])
-
-            self.last_vehicles = {vehicle.id: vehicle for vehicle in vehicles}
-            return vehicles
+            self.seen[self.last_ids] = False
+            self.seen[ids] = True
+            self.last_ids = ids
+            
+            return TrafficFrame(data, speeds, times)
         except:
-            logging.exception("Failed to read camera properties")
+            logging.exception("Failed to read traffic")
+            return None
+    
+    def get_traffic(self):
+        frame = self.get_traffic_arrays()
+        if frame is None:
             return None
+        return frame.vehicles()
     
     def run(self):
         return self.get_traffic()
\ No newline at end of file
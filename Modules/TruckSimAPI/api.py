@@ -18,7 +18,557 @@ wheelSize = 14
 substanceSize = 25
 
 
-import time
+# MARK: LAYOUT
+# Every entry is either (key, format) or (key, [(key, format), ...]) for the sub structures.
+# The formats are struct codes with an optional count, a count means the value is a list
+# ("16f" is a list of 16 floats). "Ns" is a string of N bytes, "C*Ns" a list of C strings,
+# "Nx" is padding and "game" is the game id converted to its name.
+
+LAYOUT = [
+    # MARK: ZONE 1 - 0
+    ("sdkActive", "?"),
+    ("placeHolder", "3s"),
+    ("pause", "?"),
+    ("placeHolder2", "3s"),
+    ("time", "Q"),
+    ("simulatedTime", "Q"),
+    ("renderTime", "Q"),
+    ("multiplayerTimeOffset", "Q"),
+
+    # MARK: ZONE 2 - 40
+    ("scsValues", [
+        ("telemetryPluginRevision", "i"),
+        ("versionMajor", "i"),
+        ("versionMinor", "i"),
+        ("game", "game"),
+        ("telemetryVersionGameMajor", "i"),
+        ("telemetryVersionGameMinor", "i"),
+    ]),
+    ("commonUI", [
+        ("timeAbs", "i"),
+    ]),
+    ("configUI", [
+        ("gears", "i"),
+        ("gearsReverse", "i"),
+        ("retarderStepCount", "i"),
+        ("truckWheelCount", "i"),
+        ("selectorCount", "i"),
+        ("timeAbsDelivery", "i"),
+        ("maxTrailerCount", "i"),
+        ("unitCount", "i"),
+        ("plannedDistanceKm", "i"),
+    ]),
+    ("truckUI", [
+        ("shifterSlot", "i"),
+        ("retarderBrake", "i"),
+        ("lightsAuxFront", "i"),
+        ("lightsAuxRoof", "i"),
+        ("truckWheelSubstance", "16i"),
+        ("hshifterPosition", "32i"),
+        ("hshifterBitmask", "32i"),
+    ]),
+    ("gameplayUI", [
+        ("jobDeliveredDeliveryTime", "i"),
+        ("jobStartingTime", "i"),
+        ("jobFinishedTime", "i"),
+    ]),
+    ("bufferUI", "48s"),
+
+    # MARK: ZONE 3 - 500
+    ("commonInt", [
+        ("restStop", "i"),
+    ]),
+    ("truckInt", [
+        ("gear", "i"),
+        ("gearDashboard", "i"),
+        ("hshifterResulting", "32i"),
+    ]),
+    ("bufferInt", "56s"),
+    (None, "4x"),
+
+    # MARK: ZONE 4 - 700
+    ("commonFloat", [
+        ("scale", "f"),
+    ]),
+    ("configFloat", [
+        ("fuelCapacity", "f"),
+        ("fuelWarningFactor", "f"),
+        ("adblueCapacity", "f"),
+        ("adblueWarningFactor", "f"),
+        ("airPressureWarning", "f"),
+        ("airPressureEmergency", "f"),
+        ("oilPressureWarning", "f"),
+        ("waterTemperatureWarning", "f"),
+        ("batteryVoltageWarning", "f"),
+        ("engineRpmMax", "f"),
+        ("gearDifferential", "f"),
+        ("cargoMass", "f"),
+        ("truckWheelRadius", "16f"),
+        ("gearRatiosForward", "24f"),
+        ("gearRatiosReverse", "8f"),
+        ("unitMass", "f"),
+    ]),
+    ("truckFloat", [
+        ("speed", "f"),
+        ("engineRpm", "f"),
+        ("userSteer", "f"),
+        ("userThrottle", "f"),
+        ("userBrake", "f"),
+        ("userClutch", "f"),
+        ("gameSteer", "f"),
+        ("gameThrottle", "f"),
+        ("gameBrake", "f"),
+        ("gameClutch", "f"),
+        ("cruiseControlSpeed", "f"),
+        ("airPressure", "f"),
+        ("brakeTemperature", "f"),
+        ("fuel", "f"),
+        ("fuelAvgConsumption", "f"),
+        ("fuelRange", "f"),
+        ("adblue", "f"),
+        ("oilPressure", "f"),
+        ("oilTemperature", "f"),
+        ("waterTemperature", "f"),
+        ("batteryVoltage", "f"),
+        ("lightsDashboard", "f"),
+        ("wearEngine", "f"),
+        ("wearTransmission", "f"),
+        ("wearCabin", "f"),
+        ("wearChassis", "f"),
+        ("wearWheels", "f"),
+        ("truckOdometer", "f"),
+        ("routeDistance", "f"),
+        ("routeTime", "f"),
+        ("speedLimit", "f"),
+        ("truck_wheelSuspDeflection", "16f"),
+        ("truck_wheelVelocity", "16f"),
+        ("truck_wheelSteering", "16f"),
+        ("truck_wheelRotation", "16f"),
+        ("truck_wheelLift", "16f"),
+        ("truck_wheelLiftOffset", "16f"),
+    ]),
+    ("gameplayFloat", [
+        ("jobDeliveredCargoDamage", "f"),
+        ("jobDeliveredDistanceKm", "f"),
+        ("refuelAmount", "f"),
+    ]),
+    ("jobFloat", [
+        ("cargoDamage", "f"),
+    ]),
+    ("bufferFloat", "28s"),
+
+    # MARK: ZONE 5 - 1500
+    ("configBool", [
+        ("truckWheelSteerable", "16?"),
+        ("truckWheelSimulated", "16?"),
+        ("truckWheelPowered", "16?"),
+        ("truckWheelLiftable", "16?"),
+        ("isCargoLoaded", "?"),
+        ("specialJob", "?"),
+    ]),
+    ("truckBool", [
+        ("parkBrake", "?"),
+        ("motorBrake", "?"),
+        ("airPressureWarning", "?"),
+        ("airPressureEmergency", "?"),
+        ("fuelWarning", "?"),
+        ("adblueWarning", "?"),
+        ("oilPressureWarning", "?"),
+        ("waterTemperatureWarning", "?"),
+        ("batteryVoltageWarning", "?"),
+        ("electricEnabled", "?"),
+        ("engineEnabled", "?"),
+        ("wipers", "?"),
+        ("blinkerLeftActive", "?"),
+        ("blinkerRightActive", "?"),
+        ("blinkerLeftOn", "?"),
+        ("blinkerRightOn", "?"),
+        ("lightsParking", "?"),
+        ("lightsBeamLow", "?"),
+        ("lightsBeamHigh", "?"),
+        ("lightsBeacon", "?"),
+        ("lightsBrake", "?"),
+        ("lightsReverse", "?"),
+        ("lightsHazard", "?"),
+        ("cruiseControl", "?"),
+        ("truck_wheelOnGround", "16?"),
+        ("shifterToggle", "2?"),
+        ("differentialLock", "?"),
+        ("liftAxle", "?"),
+        ("liftAxleIndicator", "?"),
+        ("trailerLiftAxle", "?"),
+        ("trailerLiftAxleIndicator", "?"),
+    ]),
+    ("gameplayBool", [
+        ("jobDeliveredAutoparkUsed", "?"),
+        ("jobDeliveredAutoloadUsed", "?"),
+    ]),
+    ("bufferBool", "25s"),
+
+    # MARK: ZONE 6 - 1640
+    ("configVector", [
+        ("cabinPositionX", "f"),
+        ("cabinPositionY", "f"),
+        ("cabinPositionZ", "f"),
+        ("headPositionX", "f"),
+        ("headPositionY", "f"),
+        ("headPositionZ", "f"),
+        ("truckHookPositionX", "f"),
+        ("truckHookPositionY", "f"),
+        ("truckHookPositionZ", "f"),
+        ("truckWheelPositionX", "16f"),
+        ("truckWheelPositionY", "16f"),
+        ("truckWheelPositionZ", "16f"),
+    ]),
+    ("truckVector", [
+        ("lv_accelerationX", "f"),
+        ("lv_accelerationY", "f"),
+        ("lv_accelerationZ", "f"),
+        ("av_accelerationX", "f"),
+        ("av_accelerationY", "f"),
+        ("av_accelerationZ", "f"),
+        ("accelerationX", "f"),
+        ("accelerationY", "f"),
+        ("accelerationZ", "f"),
+        ("aa_accelerationX", "f"),
+        ("aa_accelerationY", "f"),
+        ("aa_accelerationZ", "f"),
+        ("cabinAVX", "f"),
+        ("cabinAVY", "f"),
+        ("cabinAVZ", "f"),
+        ("cabinAAX", "f"),
+        ("cabinAAY", "f"),
+        ("cabinAAZ", "f"),
+    ]),
+    ("bufferVector", "60s"),
+
+    # MARK: ZONE 7 - 2000
+    ("headPlacement", [
+        ("cabinOffsetX", "f"),
+        ("cabinOffsetY", "f"),
+        ("cabinOffsetZ", "f"),
+        ("cabinOffsetrotationX", "f"),
+        ("cabinOffsetrotationY", "f"),
+        ("cabinOffsetrotationZ", "f"),
+        ("headOffsetX", "f"),
+        ("headOffsetY", "f"),
+        ("headOffsetZ", "f"),
+        ("headOffsetrotationX", "f"),
+        ("headOffsetrotationY", "f"),
+        ("headOffsetrotationZ", "f"),
+    ]),
+    ("bufferHeadPlacement", "152s"),
+
+    # MARK: ZONE 8 - 2200
+    ("truckPlacement", [
+        ("coordinateX", "d"),
+        ("coordinateY", "d"),
+        ("coordinateZ", "d"),
+        ("rotationX", "d"),
+        ("rotationY", "d"),
+        ("rotationZ", "d"),
+    ]),
+    ("bufferTruckPlacement", "52s"),
+
+    # MARK: ZONE 9 - 2300
+    ("configString", [
+        ("truckBrandId", "64s"),
+        ("truckBrand", "64s"),
+        ("truckId", "64s"),
+        ("truckName", "64s"),
+        ("cargoId", "64s"),
+        ("cargo", "64s"),
+        ("cityDstId", "64s"),
+        ("cityDst", "64s"),
+        ("compDstId", "64s"),
+        ("compDst", "64s"),
+        ("citySrcId", "64s"),
+        ("citySrc", "64s"),
+        ("compSrcId", "64s"),
+        ("compSrc", "64s"),
+        ("shifterType", "16s"),
+        ("truckLicensePlate", "64s"),
+        ("truckLicensePlateCountryId", "64s"),
+        ("truckLicensePlateCountry", "64s"),
+        ("jobMarket", "32s"),
+    ]),
+    ("gameplayString", [
+        ("fineOffence", "32s"),
+        ("ferrySourceName", "64s"),
+        ("ferryTargetName", "64s"),
+        ("ferrySourceId", "64s"),
+        ("ferryTargetId", "64s"),
+        ("trainSourceName", "64s"),
+        ("trainTargetName", "64s"),
+        ("trainSourceId", "64s"),
+        ("trainTargetId", "64s"),
+    ]),
+    ("bufferString", "20s"),
+
+    # MARK: ZONE 10 - 4000
+    ("configLongLong", [
+        ("jobIncome", "Q"),
+    ]),
+    ("bufferLongLong", "192s"),
+
+    # MARK: ZONE 11 - 4200
+    ("gameplayLongLong", [
+        ("jobCancelledPenalty", "Q"),
+        ("jobDeliveredRevenue", "Q"),
+        ("fineAmount", "Q"),
+        ("tollgatePayAmount", "Q"),
+        ("ferryPayAmount", "Q"),
+        ("trainPayAmount", "Q"),
+    ]),
+    ("bufferLongLong", "52s"),
+
+    # MARK: ZONE 12 - 4300
+    ("specialBool", [
+        ("onJob", "?"),
+        ("jobFinished", "?"),
+        ("jobCancelled", "?"),
+        ("jobDelivered", "?"),
+        ("fined", "?"),
+        ("tollgate", "?"),
+        ("ferry", "?"),
+        ("train", "?"),
+        ("refuel", "?"),
+        ("refuelPayed", "?"),
+    ]),
+    ("bufferSpecial", "90s"),
+
+    # MARK: ZONE 13 - 4400
+    ("substances", "25*64s"),
+]
+"""The shared memory layout, see scs-telemetry-common.hpp."""
+
+TRAILER_LAYOUT = [
+    ("conBool", [
+        ("wheelSteerable", "16?"),
+        ("wheelSimulated", "16?"),
+        ("wheelPowered", "16?"),
+        ("wheelLiftable", "16?"),
+    ]),
+    ("comBool", [
+        ("wheelOnGround", "16?"),
+        ("attached", "?"),
+    ]),
+    ("bufferBool", "3s"),
+    ("comUI", [
+        ("wheelSubstance", "16i"),
+    ]),
+    ("conUI", [
+        ("wheelCount", "i"),
+    ]),
+    ("comFloat", [
+        ("cargoDamage", "f"),
+        ("wearChassis", "f"),
+        ("wearWheels", "f"),
+        ("wearBody", "f"),
+        ("wheelSuspDeflection", "16f"),
+        ("wheelVelocity", "16f"),
+        ("wheelSteering", "16f"),
+        ("wheelRotation", "16f"),
+        ("wheelLift", "16f"),
+        ("wheelLiftOffset", "16f"),
+    ]),
+    ("conFloat", [
+        ("wheelRadius", "16f"),
+    ]),
+    ("comVector", [
+        ("linearVelocityX", "f"),
+        ("linearVelocityY", "f"),
+        ("linearVelocityZ", "f"),
+        ("angularVelocityX", "f"),
+        ("angularVelocityY", "f"),
+        ("angularVelocityZ", "f"),
+        ("linearAccelerationX", "f"),
+        ("linearAccelerationY", "f"),
+        ("linearAccelerationZ", "f"),
+        ("angularAccelerationX", "f"),
+        ("angularAccelerationY", "f"),
+        ("angularAccelerationZ", "f"),
+    ]),
+    ("conVector", [
+        ("hookPositionX", "f"),
+        ("hookPositionY", "f"),
+        ("hookPositionZ", "f"),
+        ("wheelPositionX", "16f"),
+        ("wheelPositionY", "16f"),
+        ("wheelPositionZ", "16f"),
+    ]),
+    ("bufferVector", "4s"),
+    ("comDouble", [
+        ("worldX", "d"),
+        ("worldY", "d"),
+        ("worldZ", "d"),
+        ("rotationX", "d"),
+        ("rotationY", "d"),
+        ("rotationZ", "d"),
+    ]),
+    ("conString", [
+        ("id", "64s"),
+        ("cargoAccessoryId", "64s"),
+        ("bodyType", "64s"),
+        ("brandId", "64s"),
+        ("brand", "64s"),
+        ("name", "64s"),
+        ("chainType", "64s"),
+        ("licensePlate", "64s"),
+        ("licensePlateCountry", "64s"),
+        ("licensePlateCountryId", "64s"),
+    ]),
+]
+"""The layout of one trailer, the trailers start at offset 6000."""
+
+trailerCount = 10
+games = {1: "ETS2", 2: "ATS"}
+
+def decodeString(value: bytes) -> str:
+    return value.split(b"\0", 1)[0].decode("utf-8", errors="ignore")
+
+def compileFormat(format: str) -> tuple[str, int, callable]:
+    """Compile a single field.
+
+    :return: The struct format, how many values it unpacks and a function (values, index) -> value.
+    """
+    if format == "game":
+        return "i", 1, lambda values, index: games.get(values[index], "unknown")
+    if format.endswith("x"):
+        return format, 0, None
+    if "*" in format:
+        count, format = format.split("*")
+        count = int(count)
+        return format * count, count, lambda values, index: [decodeString(value) for value in values[index:index + count]]
+    if format.endswith("s"):
+        return format, 1, lambda values, index: decodeString(values[index])
+    if len(format) > 1:
+        count = int(format[:-1])
+        return format, count, lambda values, index: list(values[index:index + count])
+    return format, 1, lambda values, index: values[index]
+
+def compileLayout(layout: list) -> tuple[str, int, callable]:
+    """Compile a sub structure into one struct format, the result is the same as compileFormat."""
+    formats = ""
+    fields = []
+    count = 0
+    for key, format in layout:
+        if isinstance(format, list):
+            format, values, convert = compileLayout(format)
+        else:
+            format, values, convert = compileFormat(format)
+        formats += format
+        if convert is not None:
+            fields.append((key, count, convert))
+        count += values
+
+    return formats, count, lambda values, index: {key: convert(values, index + start) for key, start, convert in fields}
+
+def compileEntries(layout: list, offset: int = 0) -> tuple[dict[str, tuple[int, struct.Struct, callable]], int]:
+    """Compile the top level entries so that each of them can be decoded on its own.
+
+    :return: key -> (offset, struct, convert) and the offset after the last entry.
+    """
+    entries = {}
+    for key, format in layout:
+        if isinstance(format, list):
+            format, _, convert = compileLayout(format)
+        else:
+            format, _, convert = compileFormat(format)
+        compiled = struct.Struct("=" + format)
+        if key is not None:
+            entries[key] = (offset, compiled, convert)
+        offset += compiled.size
+    return entries, offset
+
+ENTRIES, trailerOffset = compileEntries(LAYOUT)
+_trailerFormat, _trailerValues, _trailerConvert = compileLayout(TRAILER_LAYOUT)
+TRAILER_ENTRIES = {
+    **ENTRIES,
+    "trailers": (
+        trailerOffset,
+        struct.Struct("=" + _trailerFormat * trailerCount),
+        lambda values, index: [_trailerConvert(values, index + i * _trailerValues) for i in range(trailerCount)]
+    )
+}
+telemetrySize = TRAILER_ENTRIES["trailers"][0] + TRAILER_ENTRIES["trailers"][1].size
+
+
+class TelemetrySnapshot(dict):
+    """The telemetry at the time of the update, decoded lazily.
+
+    This is a normal dict to the consumers. It holds a copy of the shared memory and
+    each top level entry (ie. "truckPlacement") is only decoded the first time it's
+    accessed. Iterating, serializing or copying the snapshot decodes everything.
+    """
+    __slots__ = ['buffer', 'entries', 'postprocess']
+
+    def __init__(self, buffer: bytes, entries: dict, postprocess: dict[str, callable] = {}):
+        super().__init__()
+        self.buffer = buffer
+        self.entries = entries
+        self.postprocess = postprocess
+
+    def __missing__(self, key):
+        if key not in self.entries:
+            raise KeyError(key)
+
+        offset, layout, convert = self.entries[key]
+        value = convert(layout.unpack_from(self.buffer, offset), 0)
+        if key in self.postprocess:
+            self.postprocess[key](value)
+
+        dict.__setitem__(self, key, value)
+        return value
+
+    def decodeAll(self) -> None:
+        for key in self.entries:
+            if not dict.__contains__(self, key):
+                self.__missing__(key)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key) -> bool:
+        return key in self.entries or dict.__contains__(self, key)
+
+    def keys(self):
+        self.decodeAll()
+        return dict.keys(self)
+
+    def values(self):
+        self.decodeAll()
+        return dict.values(self)
+
+    def items(self):
+        self.decodeAll()
+        return dict.items(self)
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self) -> int:
+        self.decodeAll()
+        return dict.__len__(self)
+
+    def __eq__(self, other) -> bool:
+        self.decodeAll()
+        return dict.__eq__(self, other)
+
+    def __repr__(self) -> str:
+        self.decodeAll()
+        return dict.__repr__(self)
+
+    def copy(self) -> dict:
+        return dict(self.items())
+
+    def __reduce__(self):
+        # Sent to other processes as a plain dict.
+        return (dict, (self.copy(),))
+
 
 class scsTelemetry:
     
@@ -64,636 +614,68 @@ class scsTelemetry:
             str(minutes).zfill(2)
         )
     
-    # MARK: VARIABLE READING
-    
-    def readGame(self, offset):
-        int = struct.unpack('i', self.mm[offset:offset+4])[0]
-        if int == 1:
-            return "ETS2", offset+4
-        elif int == 2:
-            return "ATS", offset+4
-        else:
-            return "unknown", offset+4
+    # MARK: MAPPING
     
-    # MARK: SPECIAL READING
+    mm: mmap.mmap | None = None
+    inode: int | None = None
     
-    def readTrailer(self, offset, count=1):
-        trailers = []
-        for i in range(count):
-            data = {}
-            
-            # START OF FIRST ZONE AT OFFSET 0 
-            
-            data["conBool"] = {}
-            data["conBool"]["wheelSteerable"], offset = self.readBool(offset, count=16)
-            data["conBool"]["wheelSimulated"], offset = self.readBool(offset, count=16)
-            data["conBool"]["wheelPowered"], offset = self.readBool(offset, count=16)
-            data["conBool"]["wheelLiftable"], offset = self.readBool(offset, count=16)
-
-            data["comBool"] = {}
-            data["comBool"]["wheelOnGround"], offset = self.readBool(offset, count=16)
-            data["comBool"]["attached"], offset = self.readBool(offset)
-            
-            data["bufferBool"], offset = self.readChar(offset, count=3)
-            
-            # END OF FIRST ZONE -> Offset 84
-            
-            # START OF SECOND ZONE -> Offset 84
-            
-            data["comUI"] = {}
-            data["comUI"]["wheelSubstance"], offset = self.readInt(offset, count=16)
-            
-            data["conUI"] = {}
-            data["conUI"]["wheelCount"], offset = self.readInt(offset)
-            
-            # END OF SECOND ZONE -> Offset 152
-            
-            # START OF THIRD ZONE -> Offset 152
-            
-            data["comFloat"] = {}
-            data["comFloat"]["cargoDamage"], offset = self.readFloat(offset)
-            data["comFloat"]["wearChassis"], offset = self.readFloat(offset)
-            data["comFloat"]["wearWheels"], offset = self.readFloat(offset)
-            data["comFloat"]["wearBody"], offset = self.readFloat(offset)
-
-            data["comFloat"]["wheelSuspDeflection"], offset = self.readFloat(offset, count=16)
-            data["comFloat"]["wheelVelocity"], offset = self.readFloat(offset, count=16)
-            data["comFloat"]["wheelSteering"], offset = self.readFloat(offset, count=16)
-            data["comFloat"]["wheelRotation"], offset = self.readFloat(offset, count=16)
-            data["comFloat"]["wheelLift"], offset = self.readFloat(offset, count=16)
-            data["comFloat"]["wheelLiftOffset"], offset = self.readFloat(offset, count=16)
-
-            data["conFloat"] = {}
-            data["conFloat"]["wheelRadius"], offset = self.readFloat(offset, count=16)
-            
-            # END OF THIRD ZONE -> Offset 616
-            
-            # START OF FOURTH ZONE -> Offset 616
-            
-            data["comVector"] = {}
-            data["comVector"]["linearVelocityX"], offset = self.readFloat(offset)
-            data["comVector"]["linearVelocityY"], offset = self.readFloat(offset)
-            data["comVector"]["linearVelocityZ"], offset = self.readFloat(offset)
-            data["comVector"]["angularVelocityX"], offset = self.readFloat(offset)
-            data["comVector"]["angularVelocityY"], offset = self.readFloat(offset)
-            data["comVector"]["angularVelocityZ"], offset = self.readFloat(offset)
-            data["comVector"]["linearAccelerationX"], offset = self.readFloat(offset)
-            data["comVector"]["linearAccelerationY"], offset = self.readFloat(offset)
-            data["comVector"]["linearAccelerationZ"], offset = self.readFloat(offset)
-            data["comVector"]["angularAccelerationX"], offset = self.readFloat(offset)
-            data["comVector"]["angularAccelerationY"], offset = self.readFloat(offset)
-            data["comVector"]["angularAccelerationZ"], offset = self.readFloat(offset)
-
-            data["conVector"] = {}
-            data["conVector"]["hookPositionX"], offset = self.readFloat(offset)
-            data["conVector"]["hookPositionY"], offset = self.readFloat(offset)
-            data["conVector"]["hookPositionZ"], offset = self.readFloat(offset)
-            data["conVector"]["wheelPositionX"], offset = self.readFloat(offset, count=16)
-            data["conVector"]["wheelPositionY"], offset = self.readFloat(offset, count=16)
-            data["conVector"]["wheelPositionZ"], offset = self.readFloat(offset, count=16)
-
-            data["bufferVector"], offset = self.readChar(offset, count=4)
-            
-            # END OF FOURTH ZONE -> Offset 872
-            
-            # START OF FIFTH ZONE -> Offset 872
-            
-            data["comDouble"] = {}
-            data["comDouble"]["worldX"], offset = self.readDouble(offset)
-            data["comDouble"]["worldY"], offset = self.readDouble(offset)
-            data["comDouble"]["worldZ"], offset = self.readDouble(offset)
-            data["comDouble"]["rotationX"], offset = self.readDouble(offset)
-            data["comDouble"]["rotationY"], offset = self.readDouble(offset)
-            data["comDouble"]["rotationZ"], offset = self.readDouble(offset)
-            
-            # END OF FIFTH ZONE -> Offset 920
-            
-            # START OF SIXTH ZONE -> Offset 920
-            
-            data["conString"] = {}
-            data["conString"]["id"], offset = self.readChar(offset, count=stringSize)
-            data["conString"]["cargoAccessoryId"], offset = self.readChar(offset, count=stringSize)
-            data["conString"]["bodyType"], offset = self.readChar(offset, count=stringSize)
-            data["conString"]["brandId"], offset = self.readChar(offset, count=stringSize)
-            data["conString"]["brand"], offset = self.readChar(offset, count=stringSize)
-            data["conString"]["name"], offset = self.readChar(offset, count=stringSize)
-            data["conString"]["chainType"], offset = self.readChar(offset, count=stringSize)
-            data["conString"]["licensePlate"], offset = self.readChar(offset, count=stringSize)
-            data["conString"]["licensePlateCountry"], offset = self.readChar(offset, count=stringSize)
-            data["conString"]["licensePlateCountryId"], offset = self.readChar(offset, count=stringSize)
-            
-            # END OF SIXTH ZONE -> Offset 1560
-            
-            trailers.append(data)
-            
-        return trailers, offset
+    def open(self):
+        """Map the shared memory, the mapping is kept open between updates."""
+        self.close()
+        if os.name != "nt":
+            fd = os.open(mmapName, os.O_RDONLY)
+            try:
+                self.mm = mmap.mmap(fd, length=0, flags=mmap.MAP_SHARED, prot=mmap.PROT_READ)
+                self.inode = os.fstat(fd).st_ino
+            finally:
+                os.close(fd) # the mapping stays valid without the descriptor
+        else:
+            self.mm = mmap.mmap(0, mmapSize, mmapName)
             
+    def close(self):
+        if self.mm is not None:
+            self.mm.close()
+        self.mm = None
+        self.inode = None
+        
+    def isStale(self) -> bool:
+        """The game creates a new file when it restarts, the old mapping would never update again."""
+        if os.name == "nt":
+            return False
+        try:
+            return os.stat(mmapName).st_ino != self.inode
+        except FileNotFoundError:
+            return True
     
     # MARK: VALUE SETTING
     
     def setBool(self, offset, value):
-        self.mm = mmap.mmap(0, mmapSize, mmapName)
-        self.mm[offset:offset+1] = struct.pack('?', value)
-        self.mm.close()
+        mm = mmap.mmap(0, mmapSize, mmapName)
+        mm[offset:offset+1] = struct.pack('?', value)
+        mm.close()
         return offset+1
     
-    # MARK: VALUE READING
-    
-    def readBool(self, offset, count=1):
-        if count == 1:
-            bool = struct.unpack('?', self.mm[offset:offset+1])[0]
-            return bool, offset+1
-        else:
-            bools = []
-            for i in range(count):
-                bools.append(struct.unpack('?', self.mm[offset+i:offset+i+1])[0])
-            return bools, offset+count
-    
-    def readInt(self, offset, count=1):
-        if count == 1:
-            int = struct.unpack('i', self.mm[offset:offset+4])[0]
-            return int, offset+4
-        else:
-            ints = []
-            for i in range(count):
-                ints.append(struct.unpack('i', self.mm[offset+i*4:offset+i*4+4])[0])
-            return ints, offset+count*4
-    
-    def readFloat(self, offset, count=1):
-        if count == 1:
-            float = struct.unpack('f', self.mm[offset:offset+4])[0]
-            return float, offset+4
-        else:
-            floats = []
-            for i in range(count):
-                floats.append(struct.unpack('f', self.mm[offset+i*4:offset+i*4+4])[0])
-            return floats, offset+count*4
-    
-    def readLong(self, offset, count=1):
-        if count == 1:
-            long = struct.unpack('q', self.mm[offset:offset+8])[0]
-        else:
-            longs = []
-            for i in range(count):
-                longs.append(struct.unpack('q', self.mm[offset+i*8:offset+i*8+8])[0])
-            return longs, offset+count*8
-        return long, offset+8
+    # MARK: UPDATE
     
-    def readLongLong(self, offset, count=1):
-        if count == 1:
-            longlong = struct.unpack('Q', self.mm[offset:offset+8])[0]
-        else:
-            longlongs = []
-            for i in range(count):
-                longlongs.append(struct.unpack('Q', self.mm[offset+i*8:offset+i*8+8])[0])
-            return longlongs, offset+count*8
-        
-        return longlong, offset+8
+    def addReadableTime(self, commonUI: dict):
+        try:
+            commonUI["timeRdbl"] = self.readable(commonUI["timeAbs"])
+        except:
+            commonUI["timeRdbl"] = "Monday 12:00"
     
-    def readChar(self, offset, count):
-        char = ""
-        newChar = ""
-        for i in range(count):
-            try:
-                newChar = struct.unpack('s', self.mm[offset+i:offset+i+1])[0].decode("utf-8")
-            except:
-                continue
-                
-            if newChar == "\u0000":
-                char += ""
-            else:
-                char += newChar 
-            
+    def read(self, size: int = telemetrySize) -> bytes:
+        """Copy the first `size` bytes of the shared memory."""
+        if self.mm is None or self.isStale():
+            self.open()
         
-        char.replace(r"\u0000", "")
+        if len(self.mm) < size:
+            raise ValueError(f"Telemetry shared memory is too small ({len(self.mm)} < {size} bytes)")
         
-        return char, offset+count
+        return self.mm[:size]
     
-    def readDouble(self, offset, count=1):
-        if count == 1:
-            double = struct.unpack('d', self.mm[offset:offset+8])[0]
-            return double, offset+8
-        else:
-            doubles = []
-            for i in range(count):
-                doubles.append(struct.unpack('d', self.mm[offset+i*8:offset+i*8+8])[0])
-            return doubles, offset+count*8
-    
-    def readStringArray(self, offset, count, stringSize):
-        strings = []
-        for i in range(count):
-            strings.append(self.readChar(offset+i*stringSize, stringSize)[0])
-        return strings, offset+count*stringSize
-    
-    # MARK: UPDATE
-    
-    def update(self, trailerData=False):
-        if os.name != "nt":
-            self.fd = open(mmapName)
-            self.mm = mmap.mmap(self.fd.fileno(), length=0, flags=mmap.MAP_SHARED, prot=mmap.PROT_READ)
-        else:
-            self.mm = mmap.mmap(0, mmapSize, mmapName)
-        
-        data = {}
-        offset = 0
-        
+    def snapshot(self, buffer: bytes, trailerData=False) -> TelemetrySnapshot:
         # ALL COMMENTS EXTRACTED FROM https://github.com/RenCloud/scs-sdk-plugin/blob/dev/scs-telemetry/inc/scs-telemetry-common.hpp
-        try:
-            # MARK: ZONE 1 - 0
-            # ZONE 1 -> Start at offset 0
-            
-            data["sdkActive"], offset = self.readBool(offset)
-            data["placeHolder"], offset = self.readChar(offset, 3)
-            data["pause"], offset = self.readBool(offset)
-            data["placeHolder2"], offset = self.readChar(offset, 3)
-            
-            data["time"], offset = self.readLongLong(offset)
-            data["simulatedTime"], offset = self.readLongLong(offset)
-            data["renderTime"], offset = self.readLongLong(offset)
-            data["multiplayerTimeOffset"], offset = self.readLongLong(offset)
-            
-            # END OF ZONE 1 -> Offset 40
-            
-            # MARK: ZONE 2 - 40
-            # START OF ZONE 2 -> Offset 40
-            # The Second zone contains unsigned integers and it sorted in sub structures
-            
-            data["scsValues"] = {}
-            data["scsValues"]["telemetryPluginRevision"], offset = self.readInt(offset)
-            data["scsValues"]["versionMajor"], offset = self.readInt(offset)
-            data["scsValues"]["versionMinor"], offset = self.readInt(offset)
-            data["scsValues"]["game"], offset = self.readGame(offset)
-            data["scsValues"]["telemetryVersionGameMajor"], offset = self.readInt(offset)
-            data["scsValues"]["telemetryVersionGameMinor"], offset = self.readInt(offset)
-            
-            data["commonUI"] = {}
-            data["commonUI"]["timeAbs"], offset = self.readInt(offset)
-            try:
-                data["commonUI"]["timeRdbl"] = self.readable(data["commonUI"]["timeAbs"])
-            except:
-                data["commonUI"]["timeRdbl"] = "Monday 12:00"
-
-            data["configUI"] = {}
-            data["configUI"]["gears"], offset = self.readInt(offset)
-            data["configUI"]["gearsReverse"], offset = self.readInt(offset)
-            data["configUI"]["retarderStepCount"], offset = self.readInt(offset)
-            data["configUI"]["truckWheelCount"], offset = self.readInt(offset)
-            data["configUI"]["selectorCount"], offset = self.readInt(offset)
-            data["configUI"]["timeAbsDelivery"], offset = self.readInt(offset)
-            data["configUI"]["maxTrailerCount"], offset = self.readInt(offset)
-            data["configUI"]["unitCount"], offset = self.readInt(offset)
-            data["configUI"]["plannedDistanceKm"], offset = self.readInt(offset)
-            
-            data["truckUI"] = {}
-            data["truckUI"]["shifterSlot"], offset = self.readInt(offset)
-            data["truckUI"]["retarderBrake"], offset = self.readInt(offset)
-            data["truckUI"]["lightsAuxFront"], offset = self.readInt(offset)
-            data["truckUI"]["lightsAuxRoof"], offset = self.readInt(offset)
-            data["truckUI"]["truckWheelSubstance"], offset = self.readInt(offset, count=16)
-            data["truckUI"]["hshifterPosition"], offset = self.readInt(offset, count=32)
-            data["truckUI"]["hshifterBitmask"], offset = self.readInt(offset, count=32)
-            
-            data["gameplayUI"] = {}
-            data["gameplayUI"]["jobDeliveredDeliveryTime"], offset = self.readInt(offset)
-            data["gameplayUI"]["jobStartingTime"], offset = self.readInt(offset)
-            data["gameplayUI"]["jobFinishedTime"], offset = self.readInt(offset)
-            
-            data["bufferUI"], offset = self.readChar(offset, 48)
-            
-            # END OF ZONE 2 -> Offset 500
-            
-            # MARK: ZONE 3 - 500
-            # START OF ZONE 3 -> Offset 500
-            # The third zone contains integers and is sorted in sub structures
-            
-            data["commonInt"] = {}
-            data["commonInt"]["restStop"], offset = self.readInt(offset)
-            
-            data["truckInt"] = {}
-            data["truckInt"]["gear"], offset = self.readInt(offset)
-            data["truckInt"]["gearDashboard"], offset = self.readInt(offset)
-            data["truckInt"]["hshifterResulting"], offset = self.readInt(offset, count=32)
-            
-            data["bufferInt"], offset = self.readChar(offset, 56)
-            
-            # END OF ZONE 3 -> Offset 696
-            
-            offset += 4
-            
-            # MARK: ZONE 4 - 700
-            # START IF ZONE 4 -> Offset 700
-            # The fourth zone contains floats and is sorted in sub structures
-            
-            data["commonFloat"] = {}
-            data["commonFloat"]["scale"], offset = self.readFloat(offset)
-            
-            data["configFloat"] = {}
-            data["configFloat"]["fuelCapacity"], offset = self.readFloat(offset)
-            data["configFloat"]["fuelWarningFactor"], offset = self.readFloat(offset)
-            data["configFloat"]["adblueCapacity"], offset = self.readFloat(offset)
-            data["configFloat"]["adblueWarningFactor"], offset = self.readFloat(offset)
-            data["configFloat"]["airPressureWarning"], offset = self.readFloat(offset)
-            data["configFloat"]["airPressureEmergency"], offset = self.readFloat(offset)
-            data["configFloat"]["oilPressureWarning"], offset = self.readFloat(offset)
-            data["configFloat"]["waterTemperatureWarning"], offset = self.readFloat(offset)
-            data["configFloat"]["batteryVoltageWarning"], offset = self.readFloat(offset)
-            data["configFloat"]["engineRpmMax"], offset = self.readFloat(offset)
-            data["configFloat"]["gearDifferential"], offset = self.readFloat(offset)
-            data["configFloat"]["cargoMass"], offset = self.readFloat(offset)
-            data["configFloat"]["truckWheelRadius"], offset = self.readFloat(offset, count=16)
-            data["configFloat"]["gearRatiosForward"], offset = self.readFloat(offset, count=24)
-            data["configFloat"]["gearRatiosReverse"], offset = self.readFloat(offset, count=8)
-            data["configFloat"]["unitMass"], offset = self.readFloat(offset)
-            
-            data["truckFloat"] = {}
-            data["truckFloat"]["speed"], offset = self.readFloat(offset)
-            data["truckFloat"]["engineRpm"], offset = self.readFloat(offset)
-            data["truckFloat"]["userSteer"], offset = self.readFloat(offset)
-            data["truckFloat"]["userThrottle"], offset = self.readFloat(offset)
-            data["truckFloat"]["userBrake"], offset = self.readFloat(offset)
-            data["truckFloat"]["userClutch"], offset = self.readFloat(offset)
-            data["truckFloat"]["gameSteer"], offset = self.readFloat(offset)
-            data["truckFloat"]["gameThrottle"], offset = self.readFloat(offset)
-            data["truckFloat"]["gameBrake"], offset = self.readFloat(offset)
-            data["truckFloat"]["gameClutch"], offset = self.readFloat(offset)
-            data["truckFloat"]["cruiseControlSpeed"], offset = self.readFloat(offset)
-            data["truckFloat"]["airPressure"], offset = self.readFloat(offset)
-            data["truckFloat"]["brakeTemperature"], offset = self.readFloat(offset)
-            data["truckFloat"]["fuel"], offset = self.readFloat(offset)
-            data["truckFloat"]["fuelAvgConsumption"], offset = self.readFloat(offset)
-            data["truckFloat"]["fuelRange"], offset = self.readFloat(offset)
-            data["truckFloat"]["adblue"], offset = self.readFloat(offset)
-            data["truckFloat"]["oilPressure"], offset = self.readFloat(offset)
-            data["truckFloat"]["oilTemperature"], offset = self.readFloat(offset)
-            data["truckFloat"]["waterTemperature"], offset = self.readFloat(offset)
-            data["truckFloat"]["batteryVoltage"], offset = self.readFloat(offset)
-            data["truckFloat"]["lightsDashboard"], offset = self.readFloat(offset)
-            data["truckFloat"]["wearEngine"], offset = self.readFloat(offset)
-            data["truckFloat"]["wearTransmission"], offset = self.readFloat(offset)
-            data["truckFloat"]["wearCabin"], offset = self.readFloat(offset)
-            data["truckFloat"]["wearChassis"], offset = self.readFloat(offset)
-            data["truckFloat"]["wearWheels"], offset = self.readFloat(offset)
-            data["truckFloat"]["truckOdometer"], offset = self.readFloat(offset)
-            data["truckFloat"]["routeDistance"], offset = self.readFloat(offset)
-            data["truckFloat"]["routeTime"], offset = self.readFloat(offset)
-            data["truckFloat"]["speedLimit"], offset = self.readFloat(offset)
-            data["truckFloat"]["truck_wheelSuspDeflection"], offset = self.readFloat(offset, count=16)
-            data["truckFloat"]["truck_wheelVelocity"], offset = self.readFloat(offset, count=16)
-            data["truckFloat"]["truck_wheelSteering"], offset = self.readFloat(offset, count=16)
-            data["truckFloat"]["truck_wheelRotation"], offset = self.readFloat(offset, count=16)
-            data["truckFloat"]["truck_wheelLift"], offset = self.readFloat(offset, count=16)
-            data["truckFloat"]["truck_wheelLiftOffset"], offset = self.readFloat(offset, count=16)
-            
-            data["gameplayFloat"] = {}
-            data["gameplayFloat"]["jobDeliveredCargoDamage"], offset = self.readFloat(offset)
-            data["gameplayFloat"]["jobDeliveredDistanceKm"], offset = self.readFloat(offset)
-            data["gameplayFloat"]["refuelAmount"], offset = self.readFloat(offset)
-            
-            data["jobFloat"] = {}
-            data["jobFloat"]["cargoDamage"], offset = self.readFloat(offset)
-            
-            data["bufferFloat"], offset = self.readChar(offset, 28)
-            
-            # END OF ZONE 4 -> Offset 1500
-            
-            # MARK: ZONE 5 - 1500
-            # START OF ZONE 5 -> Offset 1500
-            # The fifth zone contains bool and is sorted in sub structures
-            
-            data["configBool"] = {}
-            data["configBool"]["truckWheelSteerable"], offset = self.readBool(offset, count=16)
-            data["configBool"]["truckWheelSimulated"], offset = self.readBool(offset, count=16)
-            data["configBool"]["truckWheelPowered"], offset = self.readBool(offset, count=16)
-            data["configBool"]["truckWheelLiftable"], offset = self.readBool(offset, count=16)
-            data["configBool"]["isCargoLoaded"], offset = self.readBool(offset)
-            data["configBool"]["specialJob"], offset = self.readBool(offset)
-
-            data["truckBool"] = {}
-            data["truckBool"]["parkBrake"], offset = self.readBool(offset)
-            data["truckBool"]["motorBrake"], offset = self.readBool(offset)
-            data["truckBool"]["airPressureWarning"], offset = self.readBool(offset)
-            data["truckBool"]["airPressureEmergency"], offset = self.readBool(offset)
-            data["truckBool"]["fuelWarning"], offset = self.readBool(offset)
-            data["truckBool"]["adblueWarning"], offset = self.readBool(offset)
-            data["truckBool"]["oilPressureWarning"], offset = self.readBool(offset)
-            data["truckBool"]["waterTemperatureWarning"], offset = self.readBool(offset)
-            data["truckBool"]["batteryVoltageWarning"], offset = self.readBool(offset)
-            data["truckBool"]["electricEnabled"], offset = self.readBool(offset)
-            data["truckBool"]["engineEnabled"], offset = self.readBool(offset)
-            data["truckBool"]["wipers"], offset = self.readBool(offset)
-            data["truckBool"]["blinkerLeftActive"], offset = self.readBool(offset)
-            data["truckBool"]["blinkerRightActive"], offset = self.readBool(offset)
-            data["truckBool"]["blinkerLeftOn"], offset = self.readBool(offset)
-            data["truckBool"]["blinkerRightOn"], offset = self.readBool(offset)
-            data["truckBool"]["lightsParking"], offset = self.readBool(offset)
-            data["truckBool"]["lightsBeamLow"], offset = self.readBool(offset)
-            data["truckBool"]["lightsBeamHigh"], offset = self.readBool(offset)
-            data["truckBool"]["lightsBeacon"], offset = self.readBool(offset)
-            data["truckBool"]["lightsBrake"], offset = self.readBool(offset)
-            data["truckBool"]["lightsReverse"], offset = self.readBool(offset)
-            data["truckBool"]["lightsHazard"], offset = self.readBool(offset)
-            data["truckBool"]["cruiseControl"], offset = self.readBool(offset)
-            data["truckBool"]["truck_wheelOnGround"], offset = self.readBool(offset, count=16)
-            data["truckBool"]["shifterToggle"], offset = self.readBool(offset, count=2)
-            data["truckBool"]["differentialLock"], offset = self.readBool(offset)
-            data["truckBool"]["liftAxle"], offset = self.readBool(offset)
-            data["truckBool"]["liftAxleIndicator"], offset = self.readBool(offset)
-            data["truckBool"]["trailerLiftAxle"], offset = self.readBool(offset)
-            data["truckBool"]["trailerLiftAxleIndicator"], offset = self.readBool(offset)
-
-            data["gameplayBool"] = {}
-            data["gameplayBool"]["jobDeliveredAutoparkUsed"], offset = self.readBool(offset)
-            data["gameplayBool"]["jobDeliveredAutoloadUsed"], offset = self.readBool(offset)
-
-            data["bufferBool"], offset = self.readChar(offset, count=25)
-            
-            # END OF ZONE 5 -> Offset 1640
-            
-            # MARK: ZONE 6 - 1640
-            # START OF ZONE 6 -> Offset 1640
-            # The sixth zone contains fvector and is sorted in sub structures
-            
-            data["configVector"] = {}
-            data["configVector"]["cabinPositionX"], offset = self.readFloat(offset)
-            data["configVector"]["cabinPositionY"], offset = self.readFloat(offset)
-            data["configVector"]["cabinPositionZ"], offset = self.readFloat(offset)
-            data["configVector"]["headPositionX"], offset = self.readFloat(offset)
-            data["configVector"]["headPositionY"], offset = self.readFloat(offset)
-            data["configVector"]["headPositionZ"], offset = self.readFloat(offset)
-            data["configVector"]["truckHookPositionX"], offset = self.readFloat(offset)
-            data["configVector"]["truckHookPositionY"], offset = self.readFloat(offset)
-            data["configVector"]["truckHookPositionZ"], offset = self.readFloat(offset)
-            data["configVector"]["truckWheelPositionX"], offset = self.readFloat(offset, count=16)
-            data["configVector"]["truckWheelPositionY"], offset = self.readFloat(offset, count=16)
-            data["configVector"]["truckWheelPositionZ"], offset = self.readFloat(offset, count=16)
-
-            data["truckVector"] = {}
-            data["truckVector"]["lv_accelerationX"], offset = self.readFloat(offset)
-            data["truckVector"]["lv_accelerationY"], offset = self.readFloat(offset)
-            data["truckVector"]["lv_accelerationZ"], offset = self.readFloat(offset)
-            data["truckVector"]["av_accelerationX"], offset = self.readFloat(offset)
-            data["truckVector"]["av_accelerationY"], offset = self.readFloat(offset)
-            data["truckVector"]["av_accelerationZ"], offset = self.readFloat(offset)
-            data["truckVector"]["accelerationX"], offset = self.readFloat(offset)
-            data["truckVector"]["accelerationY"], offset = self.readFloat(offset)
-            data["truckVector"]["accelerationZ"], offset = self.readFloat(offset)
-            data["truckVector"]["aa_accelerationX"], offset = self.readFloat(offset)
-            data["truckVector"]["aa_accelerationY"], offset = self.readFloat(offset)
-            data["truckVector"]["aa_accelerationZ"], offset = self.readFloat(offset)
-            data["truckVector"]["cabinAVX"], offset = self.readFloat(offset)
-            data["truckVector"]["cabinAVY"], offset = self.readFloat(offset)
-            data["truckVector"]["cabinAVZ"], offset = self.readFloat(offset)
-            data["truckVector"]["cabinAAX"], offset = self.readFloat(offset)
-            data["truckVector"]["cabinAAY"], offset = self.readFloat(offset)
-            data["truckVector"]["cabinAAZ"], offset = self.readFloat(offset)
-
-            data["bufferVector"], offset = self.readChar(offset, count=60)
-            
-            # END OF ZONE 6 -> Offset 2000
-            
-            # MARK: ZONE 7 - 2000
-            # START OF ZONE 7 -> Offset 2000
-            # The 7th zone contains fplacement and is sorted in sub structures
-            data["headPlacement"] = {}
-            data["headPlacement"]["cabinOffsetX"], offset = self.readFloat(offset)
-            data["headPlacement"]["cabinOffsetY"], offset = self.readFloat(offset)
-            data["headPlacement"]["cabinOffsetZ"], offset = self.readFloat(offset)
-            data["headPlacement"]["cabinOffsetrotationX"], offset = self.readFloat(offset)
-            data["headPlacement"]["cabinOffsetrotationY"], offset = self.readFloat(offset)
-            data["headPlacement"]["cabinOffsetrotationZ"], offset = self.readFloat(offset)
-            data["headPlacement"]["headOffsetX"], offset = self.readFloat(offset)
-            data["headPlacement"]["headOffsetY"], offset = self.readFloat(offset)
-            data["headPlacement"]["headOffsetZ"], offset = self.readFloat(offset)
-            data["headPlacement"]["headOffsetrotationX"], offset = self.readFloat(offset)
-            data["headPlacement"]["headOffsetrotationY"], offset = self.readFloat(offset)
-            data["headPlacement"]["headOffsetrotationZ"], offset = self.readFloat(offset)
-
-            data["bufferHeadPlacement"], offset = self.readChar(offset, count=152)
-            
-            # END OF ZONE 7 -> Offset 2200
-            
-            # MARK: ZONE 8 - 2200
-            # START OF ZONE 8 -> Offset 2200
-            
-            data["truckPlacement"] = {}
-            data["truckPlacement"]["coordinateX"], offset = self.readDouble(offset)
-            data["truckPlacement"]["coordinateY"], offset = self.readDouble(offset)
-            data["truckPlacement"]["coordinateZ"], offset = self.readDouble(offset)
-            data["truckPlacement"]["rotationX"], offset = self.readDouble(offset)
-            data["truckPlacement"]["rotationY"], offset = self.readDouble(offset)
-            data["truckPlacement"]["rotationZ"], offset = self.readDouble(offset)
-
-            data["bufferTruckPlacement"], offset = self.readChar(offset, count=52)
-            
-            # END OF ZONE 8 -> Offset 2300
-            
-            # MARK: ZONE 9 - 2300
-            # START OF ZONE 9 -> Offset 2300
-            # The 9th zone contains strings and is sorted in sub structures
-            
-            data["configString"] = {}
-            data["configString"]["truckBrandId"], offset = self.readChar(offset, count=stringSize)
-            data["configString"]["truckBrand"], offset = self.readChar(offset, count=stringSize)
-            data["configString"]["truckId"], offset = self.readChar(offset, count=stringSize)
-            data["configString"]["truckName"], offset = self.readChar(offset, count=stringSize)
-            data["configString"]["cargoId"], offset = self.readChar(offset, count=stringSize)
-            data["configString"]["cargo"], offset = self.readChar(offset, count=stringSize)
-            data["configString"]["cityDstId"], offset = self.readChar(offset, count=stringSize)
-            data["configString"]["cityDst"], offset = self.readChar(offset, count=stringSize)
-            data["configString"]["compDstId"], offset = self.readChar(offset, count=stringSize)
-            data["configString"]["compDst"], offset = self.readChar(offset, count=stringSize)
-            data["configString"]["citySrcId"], offset = self.readChar(offset, count=stringSize)
-            data["configString"]["citySrc"], offset = self.readChar(offset, count=stringSize)
-            data["configString"]["compSrcId"], offset = self.readChar(offset, count=stringSize)
-            data["configString"]["compSrc"], offset = self.readChar(offset, count=stringSize)
-            data["configString"]["shifterType"], offset = self.readChar(offset, count=16)
-            data["configString"]["truckLicensePlate"], offset = self.readChar(offset, count=stringSize)
-            data["configString"]["truckLicensePlateCountryId"], offset = self.readChar(offset, count=stringSize)
-            data["configString"]["truckLicensePlateCountry"], offset = self.readChar(offset, count=stringSize)
-            data["configString"]["jobMarket"], offset = self.readChar(offset, count=32)
-
-            data["gameplayString"] = {}
-            data["gameplayString"]["fineOffence"], offset = self.readChar(offset, count=32)
-            data["gameplayString"]["ferrySourceName"], offset = self.readChar(offset, count=stringSize)
-            data["gameplayString"]["ferryTargetName"], offset = self.readChar(offset, count=stringSize)
-            data["gameplayString"]["ferrySourceId"], offset = self.readChar(offset, count=stringSize)
-            data["gameplayString"]["ferryTargetId"], offset = self.readChar(offset, count=stringSize)
-            data["gameplayString"]["trainSourceName"], offset = self.readChar(offset, count=stringSize)
-            data["gameplayString"]["trainTargetName"], offset = self.readChar(offset, count=stringSize)
-            data["gameplayString"]["trainSourceId"], offset = self.readChar(offset, count=stringSize)
-            data["gameplayString"]["trainTargetId"], offset = self.readChar(offset, count=stringSize)
-
-            data["bufferString"], offset = self.readChar(offset, count=20)
-            
-            # END OF ZONE 9 -> Offset 4000
-            
-            # MARK: ZONE 10 - 4000
-            # START OF ZONE 10 -> Offset 4000
-            # The 10th zone contains unsigned long long and is sorted in sub structures
-            
-            data["configLongLong"] = {}
-            data["configLongLong"]["jobIncome"], offset = self.readLongLong(offset)
-            
-            data["bufferLongLong"], offset = self.readChar(offset, count=192)
-            
-            # END OF ZONE 10 -> Offset 4200
-            
-            # MARK: ZONE 11 - 4200
-            # START OF ZONE 11 -> Offset 4200
-            # The 11th zone contains long long and is sorted in sub structures
-            
-            data["gameplayLongLong"] = {}
-            data["gameplayLongLong"]["jobCancelledPenalty"], offset = self.readLongLong(offset)
-            data["gameplayLongLong"]["jobDeliveredRevenue"], offset = self.readLongLong(offset)
-            data["gameplayLongLong"]["fineAmount"], offset = self.readLongLong(offset)
-            data["gameplayLongLong"]["tollgatePayAmount"], offset = self.readLongLong(offset)
-            data["gameplayLongLong"]["ferryPayAmount"], offset = self.readLongLong(offset)
-            data["gameplayLongLong"]["trainPayAmount"], offset = self.readLongLong(offset)
-
-            data["bufferLongLong"], offset = self.readChar(offset, count=52)
-            
-            # END OF ZONE 11 -> Offset 4300
-            
-            # MARK: ZONE 12 - 4300
-            # START OF ZONE 12 -> Offset 4300
-            # The 12th zone contains special events and is sorted in sub structures
-            
-            data["specialBool"] = {}
-            data["specialBool"]["onJob"], offset = self.readBool(offset)
-            data["specialBool"]["jobFinished"], offset = self.readBool(offset)
-            data["specialBool"]["jobCancelled"], offset = self.readBool(offset)
-            data["specialBool"]["jobDelivered"], offset = self.readBool(offset)
-            data["specialBool"]["fined"], offset = self.readBool(offset)
-            data["specialBool"]["tollgate"], offset = self.readBool(offset)
-            data["specialBool"]["ferry"], offset = self.readBool(offset)
-            data["specialBool"]["train"], offset = self.readBool(offset)
-            data["specialBool"]["refuel"], offset = self.readBool(offset)
-            data["specialBool"]["refuelPayed"], offset = self.readBool(offset)
-
-            data["bufferSpecial"], offset = self.readChar(offset, count=90)
-            
-            # END OF ZONE 12 -> Offset 4400
-            
-            # MARK: ZONE 13 - 4400
-            # START OF ZONE 13 -> Offset 4400
-            
-            data["substances"], offset = self.readStringArray(offset, count=substanceSize, stringSize=stringSize)
-            
-            # END OF ZONE 13 -> Offset 6000
-            
-            # MARK: ZONE 14 - 6000
-            # START OF ZONE 14 -> Offset 6000
-            if trailerData:
-                data["trailers"], offset = self.readTrailer(offset, count=10)
-        
-        except Exception as e:
-            print(e)
-            try:
-                print("Current offset : " + offset)
-            except:
-                pass
-        
-        self.mm.close()
-        
-        return data
-           
\ No newline at end of file
+        return TelemetrySnapshot(buffer, TRAILER_ENTRIES if trailerData else ENTRIES, {"commonUI": self.addReadableTime})
+    
+    def update(self, trailerData=False) -> TelemetrySnapshot:
+        return self.snapshot(self.read(telemetrySize if trailerData else trailerOffset), trailerData)
@@ -1,5 +1,7 @@
 from Modules.TruckSimAPI.virtualAPI import scsTelemetry as virtualTelemetry
+from Modules.TruckSimAPI.replay import replayTelemetry
 from Modules.TruckSimAPI.api import scsTelemetry
+from ETS2LA.Utils import replay
 from ETS2LA.Module import *
 
 class Module(ETS2LAModule):
@@ -18,6 +20,8 @@ class Module(ETS2LAModule):
     
     def init(self):
         self.API = scsTelemetry()
+        if replay.get_player() is not None:
+            self.API = replayTelemetry()
         self.VIRTUAL_API = virtualTelemetry()
         self.TRAILER = False
         self.CHECK_EVENTS = False
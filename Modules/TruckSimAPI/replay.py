@@ -0,0 +1,8 @@
+from Modules.TruckSimAPI.api import scsTelemetry, telemetrySize
+from ETS2LA.Utils import replay
+
+class replayTelemetry(scsTelemetry):
+    """Reads the telemetry from a recording instead of the game, see ETS2LA/Utils/replay.py."""
+    def read(self, size: int = telemetrySize) -> bytes:
+        data = replay.get_player().read("SCSTelemetry")
+        return data if size == telemetrySize else data[:size]
@@ -3,6 +3,7 @@ from ETS2LA import variables
 from ETS2LA.UI import *
 
 import ETS2LA.Handlers.sounds as sounds 
+from ETS2LA.Handlers.backends import BACKENDS
 from ETS2LA.Utils.translator import languages, parse_language
 from ETS2LA.Utils.translator import _
 from langcodes import Language
@@ -129,6 +130,17 @@ class Page(ETS2LAPage):
 
         utils_settings.Set("global", "slow_loading", slow_loading)
 
+    def change_inference_backend(self, backend: str):
+        utils_settings.Set("global", "inference_backend", backend)
+
+    def handle_inference_quantization_change(self, *args):
+        if args:
+            inference_quantization = args[0]
+        else:
+            inference_quantization = not utils_settings.Get("global", "inference_quantization", default=False)
+
+        utils_settings.Set("global", "inference_quantization", inference_quantization)
+
     def render(self):
         TitleAndDescription(
             _("Global Settings"),
@@ -266,6 +278,23 @@ class Page(ETS2LAPage):
                     changed=self.handle_slow_loading_change
                 )
                 
+                Separator()
+                with Container(styles.FlexHorizontal() + styles.Gap("24px") + styles.Classname("justify-between")):
+                    ComboboxWithTitleDescription(
+                        title=_("Inference Backend"),
+                        description=_("Which library runs the AI models when there is no GPU. Automatic uses OpenVINO or ONNX Runtime if they are installed. Takes effect when the plugins are restarted."),
+                        default=utils_settings.Get("global", "inference_backend", default="Automatic"), # type: ignore
+                        options=BACKENDS,
+                        changed=self.change_inference_backend,
+                    )
+                    
+                    CheckboxWithTitleDescription(
+                        title=_("Quantized Models"),
+                        description=_("Use int8 versions of the AI models with OpenVINO or ONNX Runtime. They are only used if their output is close to the original and they are faster on this CPU."),
+                        default=utils_settings.Get("global", "inference_quantization", default=False), # type: ignore
+                        changed=self.handle_inference_quantization_change
+                    )
+                
             with Tab(_("Miscellaneous"), styles.FlexVertical() + styles.Gap("24px")):
                 if variables.LOCAL_MODE:
                     port = utils_settings.Get("global", "frontend_port", default=3005) # type: ignore
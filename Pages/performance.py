@@ -87,6 +87,39 @@ class Page(ETS2LAPage):
         
         return graph_data
 
+    def format_phases_to_table_data(self, phases: dict) -> list[dict]:
+        summaries = [(name, window.summary()) for name, window in phases.items()]
+        # Slowest phases first, the spikes are what this table is for.
+        summaries.sort(key=lambda item: item[1]["p99"], reverse=True)
+        
+        table_data = []
+        for name, summary in summaries:
+            table_data.append({
+                "phase": name,
+                "p50": f"{summary['p50']:.2f} ms",
+                "p95": f"{summary['p95']:.2f} ms",
+                "p99": f"{summary['p99']:.2f} ms",
+                "max": f"{summary['max']:.2f} ms",
+                "count": summary["count"]
+            })
+        
+        return table_data
+
+    def render_phases(self, phases: dict):
+        with Container(styles.FlexVertical() + styles.Classname("border rounded-md p-4 gap-2")):
+            Text(_("Phases (last minute)"), styles.Description())
+            Table(
+                data=self.format_phases_to_table_data(phases),
+                columns={
+                    "phase": _("Phase"),
+                    "p50": "p50",
+                    "p95": "p95",
+                    "p99": "p99",
+                    "max": _("Max"),
+                    "count": _("Calls")
+                }
+            )
+
     def render(self):
         start_time = time.perf_counter()
         with Container(styles.FlexVertical() + styles.Classname("p-4")):
@@ -186,10 +219,14 @@ class Page(ETS2LAPage):
                                             type="area",
                                             style=styles.MaxHeight("150px")
                                         )
+                                        
+                                if plugin.phases:
+                                    self.render_phases(plugin.phases)
                             except:
                                 Text(_("Failed to render plugin {plugin_name}.", plugin_name=plugin.description.name), styles.Description() + styles.Classname("text-red-500"))
 
             Space(styles.Height("8px"))
             with Container(styles.FlexVertical() + styles.Classname("border rounded-md p-4 w-full")):
                 Text(_("All displayed data is averaged over a second."), styles.Description())
+                Text(_("Phase percentiles are calculated over the last minute."), styles.Description())
                 Text(_("This page took {time:.2f} ms to render.").format(time=(time.perf_counter() - start_time) * 1000), styles.Description())
\ No newline at end of file
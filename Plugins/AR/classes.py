@@ -1,4 +1,6 @@
+from ETS2LA.Utils.projection import Projection
 import ETS2LA.variables as variables
+import numpy as np
 import logging
 import math
 import sys
@@ -13,11 +15,16 @@ except:
     # print(f"WARNING: Could not import ets2la_AR from the CppUtils! Doing calculations in Python instead.")
     ...
 
+def IsInsideCab(self) -> bool:
+    """Whether the camera is the driver's head, relative coordinates are relative to it."""
+    return abs(self.HeadX - self.InsideHeadX) <= 3 and abs(self.HeadY - self.InsideHeadY) <= 1 and abs(self.HeadZ - self.InsideHeadZ) <= 3
+
 def ConvertCoordinateToScreen(coordinate, self):
     if type(coordinate) != Coordinate:
         return None
 
-    if ets2la_AR_imported:
+    # The C++ version doesn't handle relative coordinates from other cameras.
+    if ets2la_AR_imported and (not coordinate.relative or IsInsideCab(self)):
         screen_x, screen_y, distance = ets2la_AR.game_to_screen_coordinate(
             coordinate.x,
             coordinate.y,
@@ -65,9 +72,6 @@ def ConvertCoordinateToScreen(coordinate, self):
             RelativeY = Y
             RelativeZ = Z
 
-            if abs(self.HeadX - self.InsideHeadX) > 3 or abs(self.HeadY - self.InsideHeadY) > 1 or abs(self.HeadZ - self.InsideHeadZ) > 3:
-                return None # TODO: Implement relative coordinates for other cameras
-
             if coordinate.rotation_relative:
                 # Rotate the points around the head (0, 0, 0)
                 CosPitch = math.cos(math.radians(self.CabinOffsetRotationDegreesY))
@@ -88,6 +92,12 @@ def ConvertCoordinateToScreen(coordinate, self):
                 RelativeX = FinalX
                 RelativeY = FinalY
                 RelativeZ = NewZ
+
+            if not IsInsideCab(self):
+                # Another camera, the coordinate stays relative to the driver's head.
+                RelativeX += self.InsideHeadX - self.HeadX
+                RelativeY += self.InsideHeadY - self.HeadY
+                RelativeZ += self.InsideHeadZ - self.HeadZ
         else:
             RelativeX = X - self.HeadX
             RelativeY = Y - self.HeadY
@@ -125,6 +135,55 @@ def ConvertCoordinateToScreen(coordinate, self):
         return ScreenX, ScreenY, Distance
 
 
+def ProjectCoordinates(coordinates, self):
+    """Project all coordinates of a frame at once, the results are the same as ConvertCoordinateToScreen's.
+    
+    Uses the C++ version for every coordinate it handles when it's imported, the rest are projected in one batch.
+
+    :param list[Coordinate] coordinates: The coordinates to project.
+    :return: The screen X, Y and distance (or None) of each coordinate, by id(coordinate).
+    """
+    projected = {}
+    inside = IsInsideCab(self)
+    if ets2la_AR_imported:
+        for coordinate in coordinates:
+            if not coordinate.relative or inside:
+                projected[id(coordinate)] = ConvertCoordinateToScreen(coordinate, self)
+        coordinates = [coordinate for coordinate in coordinates if id(coordinate) not in projected]
+
+    if not coordinates:
+        return projected
+
+    projection = Projection(self.HeadX, self.HeadY, self.HeadZ,
+                            self.HeadRotationDegreesX, self.HeadRotationDegreesY, self.HeadRotationDegreesZ, self.FOV,
+                            self.WindowPosition[2] - self.WindowPosition[0], self.WindowPosition[3] - self.WindowPosition[1])
+
+    absolute = [coordinate for coordinate in coordinates if not coordinate.relative]
+    relative = [coordinate for coordinate in coordinates if coordinate.relative]
+
+    ordered = absolute + relative
+    points = np.array([coordinate.tuple() for coordinate in ordered], dtype=np.float64)
+    points[:len(absolute)] -= projection.position
+
+    rotated = [len(absolute) + i for i, coordinate in enumerate(relative) if coordinate.rotation_relative]
+    if rotated:
+        # Rotate the points around the head by the cabin's pitch and then yaw.
+        pitch = math.radians(self.CabinOffsetRotationDegreesY)
+        yaw = math.radians(self.CabinOffsetRotationDegreesX)
+        Pitch = np.array([[1, 0, 0], [0, math.cos(pitch), -math.sin(pitch)], [0, math.sin(pitch), math.cos(pitch)]])
+        Yaw = np.array([[math.cos(yaw), 0, math.sin(yaw)], [0, 1, 0], [-math.sin(yaw), 0, math.cos(yaw)]])
+        points[rotated] = points[rotated] @ (Yaw @ Pitch).T
+
+    if relative and not inside:
+        # Another camera, the relative coordinates stay relative to the driver's head.
+        points[len(absolute):] += np.array([self.InsideHeadX, self.InsideHeadY, self.InsideHeadZ]) - projection.position
+
+    screen, distance, visible = projection.project(points, relative=True)
+    for coordinate, position, dist, shown in zip(ordered, screen.tolist(), distance.tolist(), visible.tolist()):
+        projected[id(coordinate)] = (position[0], position[1], dist) if shown else None
+    return projected
+
+
 class Point:
     """Representation of a 2D point.
 
@@ -149,9 +208,9 @@ class Point:
     def tuple(self):
         return (self.x, self.y)
 
-    def screen(self, plugin):
+    def screen(self, plugin, projected=None):
         if type(self.anchor) == Coordinate:
-            anchor = self.anchor.screen(plugin)
+            anchor = self.anchor.screen(plugin, projected)
             if anchor is None:
                 return None
             
@@ -193,7 +252,10 @@ class Coordinate:
     def tuple(self):
         return (self.x, self.y, self.z)
     
-    def screen(self, plugin):
+    def screen(self, plugin, projected=None):
+        """The screen position and distance, taken from `projected` (see ProjectCoordinates) when it's there."""
+        if projected is not None and id(self) in projected:
+            return projected[id(self)]
         return ConvertCoordinateToScreen(self, plugin)
     
     def get_distance_to(self, x, y, z):
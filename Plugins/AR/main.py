@@ -81,74 +81,6 @@ def CalculateAlpha(distances, fade_end=10, fade_start=30, max_fade_start=150, ma
         return 0
 
 
-def ConvertToScreenCoordinate(X: float, Y: float, Z: float, relative: bool = False, head_relative: bool = False):
-    HeadYaw = HeadRotationDegreesX
-    HeadPitch = HeadRotationDegreesY
-    HeadRoll = HeadRotationDegreesZ
-
-    if relative:
-        RelativeX = X - InsideHeadX - HeadX
-        RelativeY = Y - InsideHeadY - HeadY
-        RelativeZ = Z - InsideHeadZ - HeadZ
-        
-        if head_relative:
-            # Rotate the points around the head (0, 0, 0)
-            CosPitch = math.cos(math.radians(CabinOffsetRotationDegreesY))
-            SinPitch = math.sin(math.radians(CabinOffsetRotationDegreesY))
-            NewY = RelativeY * CosPitch - RelativeZ * SinPitch
-            NewZ = RelativeZ * CosPitch + RelativeY * SinPitch
-
-            CosYaw = math.cos(math.radians(CabinOffsetRotationDegreesX))
-            SinYaw = math.sin(math.radians(CabinOffsetRotationDegreesX))
-            NewX = RelativeX * CosYaw + NewZ * SinYaw
-            NewZ = NewZ * CosYaw - RelativeX * SinYaw
-
-            CosRoll = math.cos(math.radians(0))#-CabinOffsetRotationDegreesZ))
-            SinRoll = math.sin(math.radians(0))#-CabinOffsetRotationDegreesZ))
-            FinalX = NewX * CosRoll - NewY * SinRoll
-            FinalY = NewY * CosRoll + NewX * SinRoll
-
-            RelativeX = FinalX
-            RelativeY = FinalY
-            RelativeZ = NewZ
-        
-    else:
-        RelativeX = X - HeadX
-        RelativeY = Y - HeadY
-        RelativeZ = Z - HeadZ
-
-    CosYaw = math.cos(math.radians(-HeadYaw))
-    SinYaw = math.sin(math.radians(-HeadYaw))
-    NewX = RelativeX * CosYaw + RelativeZ * SinYaw
-    NewZ = RelativeZ * CosYaw - RelativeX * SinYaw
-
-    CosPitch = math.cos(math.radians(-HeadPitch))
-    SinPitch = math.sin(math.radians(-HeadPitch))
-    NewY = RelativeY * CosPitch - NewZ * SinPitch
-    FinalZ = NewZ * CosPitch + RelativeY * SinPitch
-
-    CosRoll = math.cos(math.radians(-HeadRoll))
-    SinRoll = math.sin(math.radians(-HeadRoll))
-    FinalX = NewX * CosRoll - NewY * SinRoll
-    FinalY = NewY * CosRoll + NewX * SinRoll
-
-    if FinalZ >= 0:
-        return None
-
-    FovRad = math.radians(FOV)
-    
-    WindowDistance = ((WindowPosition[3] - WindowPosition[1]) * (4 / 3) / 2) / math.tan(FovRad / 2)
-
-    ScreenX = (FinalX / FinalZ) * WindowDistance + (WindowPosition[2] - WindowPosition[0]) / 2
-    ScreenY = (FinalY / FinalZ) * WindowDistance + (WindowPosition[3] - WindowPosition[1]) / 2
-
-    ScreenX = (WindowPosition[2] - WindowPosition[0]) - ScreenX
-
-    Distance = math.sqrt((RelativeX ** 2) + (RelativeY ** 2) + (RelativeZ ** 2))
-
-    return ScreenX, ScreenY, Distance
-
-
 class Settings(ETS2LAPage):
     url = "/settings/AR"
     location = ETS2LAPageLocation.SETTINGS
@@ -301,14 +233,28 @@ class Plugin(ETS2LAPlugin):
             
         sorted_items = [item for _, item in sorted(zip(distances, items), key=lambda pair: pair[0], reverse=True)]
         draw_calls = 0
+
+        # Project the coordinates of all items in one batch instead of one by one while drawing.
+        points = []
+        for item in sorted_items:
+            if type(item) in [Rectangle, Line]:
+                points += [item.start, item.end]
+            elif type(item) == Polygon:
+                points += item.points
+            elif type(item) == Circle:
+                points.append(item.center)
+            elif type(item) == Text:
+                points.append(item.point)
+        coordinates = [point.anchor if type(point) == Point else point for point in points]
+        projected = ProjectCoordinates([coordinate for coordinate in coordinates if type(coordinate) == Coordinate], self)
         
         with dpg.viewport_drawlist(label="draw") as FRAME:
             dpg.bind_font(regular_font)
             for i, item in enumerate(sorted_items):
                 if type(item) == Rectangle:
                     points = [item.start, item.end]
-                    screen_start = points[0].screen(self)
-                    screen_end = points[1].screen(self)
+                    screen_start = points[0].screen(self, projected)
+                    screen_end = points[1].screen(self, projected)
                     
                     if screen_start is None or screen_end is None:
                         continue
@@ -332,8 +278,8 @@ class Plugin(ETS2LAPlugin):
                     
                 elif type(item) == Line:
                     points = [item.start, item.end]
-                    screen_start = points[0].screen(self)
-                    screen_end = points[1].screen(self)
+                    screen_start = points[0].screen(self, projected)
+                    screen_end = points[1].screen(self, projected)
                     
                     if screen_start is None or screen_end is None:
                         continue
@@ -349,7 +295,7 @@ class Plugin(ETS2LAPlugin):
                     
                 elif type(item) == Polygon:
                     points = item.points
-                    screen_points = [point.screen(self) for point in item.points]
+                    screen_points = [point.screen(self, projected) for point in item.points]
                     
                     if None in screen_points:
                         continue
@@ -366,7 +312,7 @@ class Plugin(ETS2LAPlugin):
                     
                 elif type(item) == Circle:
                     center = item.center
-                    screen_center = center.screen(self)
+                    screen_center = center.screen(self, projected)
                     
                     if screen_center is None:
                         continue
@@ -383,7 +329,7 @@ class Plugin(ETS2LAPlugin):
                     
                 elif type(item) == Text:
                     position = item.point
-                    screen_position = position.screen(self)
+                    screen_position = position.screen(self, projected)
                     if screen_position is None:
                         continue
                      
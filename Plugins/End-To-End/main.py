@@ -6,47 +6,6 @@ PURPLE = "\033[95m"
 NORMAL = "\033[0m"
 
 
-def ConvertToScreenCoordinate(X: float, Y: float, Z: float):
-    HeadYaw = HeadRotationDegreesX
-    HeadPitch = HeadRotationDegreesY
-    HeadRoll = HeadRotationDegreesZ
-
-    RelativeX = X - HeadX
-    RelativeY = Y - HeadY
-    RelativeZ = Z - HeadZ
-
-    CosYaw = math.cos(math.radians(-HeadYaw))
-    SinYaw = math.sin(math.radians(-HeadYaw))
-    NewX = RelativeX * CosYaw + RelativeZ * SinYaw
-    NewZ = RelativeZ * CosYaw - RelativeX * SinYaw
-
-    CosPitch = math.cos(math.radians(-HeadPitch))
-    SinPitch = math.sin(math.radians(-HeadPitch))
-    NewY = RelativeY * CosPitch - NewZ * SinPitch
-    FinalZ = NewZ * CosPitch + RelativeY * SinPitch
-
-    CosRoll = math.cos(math.radians(HeadRoll))
-    SinRoll = math.sin(math.radians(HeadRoll))
-    FinalX = NewX * CosRoll - NewY * SinRoll
-    FinalY = NewY * CosRoll + NewX * SinRoll
-
-    if FinalZ >= 0:
-        return None, None, None
-
-    FovRad = math.radians(FOV)
-    
-    WindowDistance = ((ScreenCapture.MonitorY2 - ScreenCapture.MonitorY1) * (4 / 3) / 2) / math.tan(FovRad / 2)
-
-    ScreenX = (FinalX / FinalZ) * WindowDistance + (ScreenCapture.MonitorX2 - ScreenCapture.MonitorX1) / 2
-    ScreenY = (FinalY / FinalZ) * WindowDistance + (ScreenCapture.MonitorY2 - ScreenCapture.MonitorY1) / 2
-
-    ScreenX = (ScreenCapture.MonitorX2 - ScreenCapture.MonitorX1) - ScreenX
-
-    Distance = math.sqrt((RelativeX ** 2) + (RelativeY ** 2) + (RelativeZ ** 2))
-
-    return ScreenX, ScreenY, Distance
-
-
 class Plugin(ETS2LAPlugin):
     description = PluginDescription(
         name="End-To-End",
@@ -65,12 +24,13 @@ class Plugin(ETS2LAPlugin):
 
 
     def imports(self):
-        global SCSTelemetry, SCSController, ScreenCapture, ShowImage, variables, settings, pytorch, np, keyboard, math, time, cv2
+        global SCSTelemetry, SCSController, ScreenCapture, ShowImage, Projection, variables, settings, pytorch, np, keyboard, math, time, cv2
 
         from Modules.TruckSimAPI.main import scsTelemetry as SCSTelemetry
         import Modules.BetterScreenCapture.main as ScreenCapture
         from Modules.SDKController.main import SCSController
         import Modules.BetterShowImage.main as ShowImage
+        from ETS2LA.Utils.projection import Projection
         import ETS2LA.Handlers.pytorch as pytorch
         import ETS2LA.Utils.settings as settings
         import ETS2LA.variables as variables
@@ -182,87 +142,22 @@ class Plugin(ETS2LAPlugin):
         HeadZ = PointX * math.sin(TruckRotationRadiansX) + PointZ * math.cos(TruckRotationRadiansX) + TruckZ
 
 
-        TruckWheelPointsX = [Point for Point in APIDATA["configVector"]["truckWheelPositionX"] if Point != 0]
-        TruckWheelPointsY = [Point for Point in APIDATA["configVector"]["truckWheelPositionY"] if Point != 0]
-        TruckWheelPointsZ = [Point for Point in APIDATA["configVector"]["truckWheelPositionZ"] if Point != 0]
-
-        WheelAngles = [Angle for Angle in APIDATA["truckFloat"]["truck_wheelSteering"] if Angle != 0]
-        while int(APIDATA["configUI"]["truckWheelCount"]) > len(WheelAngles):
-            WheelAngles.append(0)
-
-        for i in range(len(TruckWheelPointsX)):
-            PointX = TruckX + TruckWheelPointsX[i] * math.cos(TruckRotationRadiansX) - TruckWheelPointsZ[i] * math.sin(TruckRotationRadiansX)
-            PointY = TruckY + TruckWheelPointsY[i]
-            PointZ = TruckZ + TruckWheelPointsZ[i] * math.cos(TruckRotationRadiansX) + TruckWheelPointsX[i] * math.sin(TruckRotationRadiansX)
-            X, Y, D = ConvertToScreenCoordinate(X=PointX, Y=PointY, Z=PointZ)
-
-
-        AllCoordinatesValid = True
-        Points = []
-
+        # This plugin has always rolled the points the other way than AR does.
+        CameraProjection = Projection(HeadX, HeadY, HeadZ, HeadRotationDegreesX, HeadRotationDegreesY, -HeadRotationDegreesZ, FOV,
+                                      ScreenCapture.MonitorX2 - ScreenCapture.MonitorX1, ScreenCapture.MonitorY2 - ScreenCapture.MonitorY1)
 
-        OffsetX = 2
-        OffsetY = 0.1
-        OffsetZ = 1.5
+        # The corners of the area in front of the truck, top left, top right, bottom left and bottom right.
+        Offsets = np.array([[2, 0.1, 1.5], [2, 0.1, -1.5], [2, -0.5, 1.5], [2, -0.5, -1.5]])
+        OffsetX, OffsetY, OffsetZ = Offsets[:, 0], Offsets[:, 1], Offsets[:, 2]
+        Points = np.stack([
+            HeadX + OffsetX * math.sin(TruckRotationRadiansX) - OffsetZ * math.cos(TruckRotationRadiansX),
+            HeadY + OffsetY + math.tan(math.radians(TruckRotationY * 360)) * np.sqrt(OffsetX**2 + OffsetZ**2),
+            HeadZ - OffsetX * math.cos(TruckRotationRadiansX) - OffsetZ * math.sin(TruckRotationRadiansX)
+        ], axis=1)
 
-        PointX = HeadX + OffsetX * math.sin(TruckRotationRadiansX) - OffsetZ * math.cos(TruckRotationRadiansX)
-        PointY = HeadY + OffsetY + math.tan(math.radians(TruckRotationY * 360)) * math.sqrt(OffsetX**2 + OffsetZ**2)
-        PointZ = HeadZ - OffsetX * math.cos(TruckRotationRadiansX) - OffsetZ * math.sin(TruckRotationRadiansX)
-
-        X, Y, D = ConvertToScreenCoordinate(PointX, PointY, PointZ)
-        if X == None or Y == None:
-            AllCoordinatesValid = False
-        else:
-            TopLeft = X, Y
-            Points.append((PointX, PointY, PointZ))
-
-
-        OffsetX = 2
-        OffsetY = 0.1
-        OffsetZ = -1.5
-
-        PointX = HeadX + OffsetX * math.sin(TruckRotationRadiansX) - OffsetZ * math.cos(TruckRotationRadiansX)
-        PointY = HeadY + OffsetY + math.tan(math.radians(TruckRotationY * 360)) * math.sqrt(OffsetX**2 + OffsetZ**2)
-        PointZ = HeadZ - OffsetX * math.cos(TruckRotationRadiansX) - OffsetZ * math.sin(TruckRotationRadiansX)
-
-        X, Y, D = ConvertToScreenCoordinate(PointX, PointY, PointZ)
-        if X == None or Y == None:
-            AllCoordinatesValid = False
-        else:
-            TopRight = X, Y
-            Points.append((PointX, PointY, PointZ))
-
-
-        OffsetX = 2
-        OffsetY = -0.5
-        OffsetZ = 1.5
-
-        PointX = HeadX + OffsetX * math.sin(TruckRotationRadiansX) - OffsetZ * math.cos(TruckRotationRadiansX)
-        PointY = HeadY + OffsetY + math.tan(math.radians(TruckRotationY * 360)) * math.sqrt(OffsetX**2 + OffsetZ**2)
-        PointZ = HeadZ - OffsetX * math.cos(TruckRotationRadiansX) - OffsetZ * math.sin(TruckRotationRadiansX)
-
-        X, Y, D = ConvertToScreenCoordinate(PointX, PointY, PointZ)
-        if X == None or Y == None:
-            AllCoordinatesValid = False
-        else:
-            BottomLeft = X, Y
-            Points.append((PointX, PointY, PointZ))
-
-
-        OffsetX = 2
-        OffsetY = -0.5
-        OffsetZ = -1.5
-
-        PointX = HeadX + OffsetX * math.sin(TruckRotationRadiansX) - OffsetZ * math.cos(TruckRotationRadiansX)
-        PointY = HeadY + OffsetY + math.tan(math.radians(TruckRotationY * 360)) * math.sqrt(OffsetX**2 + OffsetZ**2)
-        PointZ = HeadZ - OffsetX * math.cos(TruckRotationRadiansX) - OffsetZ * math.sin(TruckRotationRadiansX)
-
-        X, Y, D = ConvertToScreenCoordinate(PointX, PointY, PointZ)
-        if X == None or Y == None:
-            AllCoordinatesValid = False
-        else:
-            BottomRight = X, Y
-            Points.append((PointX, PointY, PointZ))
+        Screen, _, Visible = CameraProjection.project(Points)
+        AllCoordinatesValid = bool(Visible.all())
+        TopLeft, TopRight, BottomLeft, BottomRight = [tuple(Corner) for Corner in Screen]
 
 
         if AllCoordinatesValid:
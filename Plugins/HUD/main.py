@@ -784,17 +784,12 @@ class Plugin(ETS2LAPlugin):
             if targets is None:
                 targets = []
             
-            vehicles = self.modules.Traffic.run()
-            
-            if vehicles is None:
-                vehicles = []
+            # Only the highlighted vehicle is needed, don't build all of them.
+            traffic = self.modules.Traffic.get_traffic_arrays()
             
             highlighted_vehicle = None
-            if len(targets) > 0:
-                for vehicle in vehicles:
-                    if vehicle.id in targets:
-                        highlighted_vehicle = vehicle
-                        break
+            if traffic is not None and len(targets) > 0:
+                highlighted_vehicle = traffic.find(targets)
                 
             if not highlighted_vehicle:
                 self.acc_data = []
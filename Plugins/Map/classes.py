@@ -1,7 +1,12 @@
 """Map plugin classes."""
-from typing import Union, Literal, Optional, Any
+from typing import Union, Literal, Any, Callable
+from collections import OrderedDict
 from enum import Enum, StrEnum, IntEnum
+from operator import attrgetter
+import threading
 import logging
+import array
+import sys
 import math
 import time
 import json
@@ -13,7 +18,10 @@ from Plugins.Map.utils import prefab_helpers
 from Plugins.Map.utils import math_helpers
 from Plugins.Map.utils import road_helpers
 from Plugins.Map.utils import node_helpers
+from Plugins.Map.utils import memory_helpers
 
+import numpy as np
+from scipy.spatial import cKDTree
 import psutil
 
 # MARK: Constants
@@ -132,34 +140,110 @@ class SpawnPointType(IntEnum):
     LongTrailerPos = 25,
 
 
+# MARK: Struct of arrays
+
+ARRAY_DTYPES = {"d": np.float64, "Q": np.uint64, "q": np.int64, "i": np.int32, "b": np.int8}
+"""array.array typecode -> NumPy dtype."""
+
+
+def to_array(typecode: str, values) -> array.array:
+    return array.array(typecode, np.ascontiguousarray(values, dtype=ARRAY_DTYPES[typecode]).tobytes())
+
+
+class Columns:
+    """Struct of arrays storage for the items that exist in the millions.
+    
+    Every column is an `array.array`, indexing it returns plain Python numbers
+    and `column()` gives a NumPy view of it without copying. The items themselves
+    are lightweight views that only hold the columns and their row index.
+    """
+    __slots__ = ['length']
+    
+    types: dict[str, str] = {}
+    """Column name -> array.array typecode, columns missing from __init__ are filled with zeros."""
+    widths: dict[str, int] = {}
+    """Columns with more than one value per row."""
+    length: int
+    
+    def __init__(self, length: int, **columns: np.ndarray):
+        self.length = length
+        for name, typecode in self.types.items():
+            values = columns.get(name, None)
+            if values is None:
+                values = np.zeros(length * self.widths.get(name, 1))
+            setattr(self, name, to_array(typecode, values))
+    
+    def column(self, name: str) -> np.ndarray:
+        return np.frombuffer(getattr(self, name), dtype=ARRAY_DTYPES[self.types[name]])
+    
+    def positions(self, x: str, y: str) -> np.ndarray:
+        """(N, 2) array of the given position columns."""
+        return np.column_stack((self.column(x), self.column(y)))
+    
+    def nbytes(self) -> int:
+        return sum(getattr(self, name).buffer_info()[1] * getattr(self, name).itemsize for name in self.types)
+    
+    def __len__(self) -> int:
+        return self.length
+
+
 # MARK: Base Classes
 
 class NavigationNode:
-    __slots__ = ['node_id', 'distance', 'direction', 'is_one_lane_road', 'dlc_guard', 'item_uid', 'item_type', 'lane_indices']
+    """View of one row in NavigationColumns."""
+    __slots__ = ['_columns', '_index']
     
-    node_id: str
-    distance: float
-    direction: Literal["forward", "backward"]
-    is_one_lane_road: bool
-    dlc_guard: int
-    item_uid: str
-    item_type: Any
-    lane_indices: list[int]
-    """This is a list of the lane indices that go through this navigation node."""
+    _columns: "NavigationColumns"
+    _index: int
     
-    def parse_strings(self):
-        self.node_id = parse_string_to_int(self.node_id)
-        
-    def __init__(self, node_id: int | str, distance: float, direction: Literal["forward", "backward"], is_one_lane_road: bool, dlc_guard: int):
-        self.node_id = node_id
-        self.distance = distance
-        self.direction = direction
-        self.is_one_lane_road = is_one_lane_road
-        self.dlc_guard = dlc_guard
-        self.parse_strings()
-        self.item_type = None
-        self.item_uid = None
-        self.lane_indices = []
+    def __init__(self, columns: "NavigationColumns", index: int):
+        self._columns = columns
+        self._index = index
+    
+    @property
+    def node_id(self) -> int:
+        return self._columns.node_id[self._index]
+    
+    @property
+    def distance(self) -> float:
+        return self._columns.distance[self._index]
+    
+    @property
+    def dlc_guard(self) -> int:
+        return self._columns.dlc_guard[self._index]
+    
+    @property
+    def item_uid(self) -> int | None:
+        return self._columns.item_uid[self._index] or None
+    
+    @item_uid.setter
+    def item_uid(self, value: int | None) -> None:
+        self._columns.item_uid[self._index] = value or 0
+    
+    @property
+    def direction(self) -> Literal["forward", "backward"]:
+        return DIRECTIONS[self._columns.direction[self._index]]
+    
+    @property
+    def is_one_lane_road(self) -> bool:
+        return bool(self._columns.is_one_lane_road[self._index])
+    
+    @property
+    def item_type(self) -> Any:
+        return NAVIGATION_ITEM_TYPES[self._columns.item_type[self._index]]
+    
+    @item_type.setter
+    def item_type(self, value: Any) -> None:
+        self._columns.item_type[self._index] = NAVIGATION_ITEM_TYPES.index(value) if value in NAVIGATION_ITEM_TYPES else 0
+    
+    @property
+    def lane_indices(self) -> list[int]:
+        """This is a list of the lane indices that go through this navigation node."""
+        return self._columns.lane_indices[self._index] or []
+    
+    @lane_indices.setter
+    def lane_indices(self, value: list[int]) -> None:
+        self._columns.lane_indices[self._index] = value or None
         
     def json(self) -> dict:
         return {
@@ -171,20 +255,31 @@ class NavigationNode:
         }
 
 class NavigationEntry:
-    __slots__ = ['uid', "forward", "backward"]
-    
-    uid: int | str
-    forward: list[NavigationNode]
-    backward: list[NavigationNode]
+    """The navigation nodes of an entry are the rows start:end in NavigationColumns,
+    the forward ones first. They are created on access.
+    """
+    __slots__ = ['uid', '_columns', '_start', '_middle', '_end']
     
-    def parse_strings(self):
-        self.uid = parse_string_to_int(self.uid)
+    uid: int
+    _columns: "NavigationColumns"
+    _start: int
+    _middle: int
+    _end: int
         
-    def __init__(self, uid: int | str, forward: list[NavigationNode], backward: list[NavigationNode]):
+    def __init__(self, uid: int, columns: "NavigationColumns", start: int, middle: int, end: int):
         self.uid = uid
-        self.forward = forward
-        self.backward = backward
-        self.parse_strings()
+        self._columns = columns
+        self._start = start
+        self._middle = middle
+        self._end = end
+    
+    @property
+    def forward(self) -> list[NavigationNode]:
+        return [NavigationNode(self._columns, index) for index in range(self._start, self._middle)]
+    
+    @property
+    def backward(self) -> list[NavigationNode]:
+        return [NavigationNode(self._columns, index) for index in range(self._middle, self._end)]
         
     def json(self) -> dict:
         return {
@@ -246,56 +341,68 @@ class NavigationEntry:
             
 
 class Node:
-    __slots__ = ['uid', 'x', 'y', 'z', 'rotation', 'rotationQuat', '_euler', 'forward_item_uid', 'backward_item_uid', 'sector_x', 'sector_y', 'forward_country_id', 'backward_country_id', '_navigation']
+    """View of one row in NodeColumns."""
+    __slots__ = ['_columns', '_index', '_euler', '_navigation']
     
-    uid: str
-    x: float
-    y: float
-    z: float
-    rotation: float
-    """NOTE: This variable is not to be used. It is only here for compatibility, please use `.euler` instead."""
-    rotationQuat: list[float]
+    _columns: "NodeColumns"
+    _index: int
     _euler: list[float]
-    forward_item_uid: str
-    backward_item_uid: str
-    sector_x: int
-    sector_y: int
-    forward_country_id: str
-    backward_country_id: str
     _navigation: NavigationEntry
-
-    def parse_strings(self):
-        self.uid = parse_string_to_int(self.uid)
-        self.forward_item_uid = parse_string_to_int(self.forward_item_uid)
-        self.backward_item_uid = parse_string_to_int(self.backward_item_uid)
-        self.forward_country_id = parse_string_to_int(self.forward_country_id)
-        self.backward_country_id = parse_string_to_int(self.backward_country_id)
-
-    def __init__(self, uid: int | str, x: float, y: float, z: float, rotation: float, rotationQuat: list[float], 
-                 forward_item_uid: int | str, backward_item_uid: int | str, sector_x: int, sector_y: int, 
-                 forward_country_id: int | str, backward_country_id: int | str):
-        self.uid = uid
-        
-        self.x = x
-        self.y = y
-        self.z = z
-        
-        self.rotation = rotation
-        self.rotationQuat = rotationQuat
+    
+    def __init__(self, columns: "NodeColumns", index: int):
+        self._columns = columns
+        self._index = index
         self._euler = None
-        
-        self.forward_item_uid = forward_item_uid
-        self.backward_item_uid = backward_item_uid
-        
-        self.sector_x = sector_x
-        self.sector_y = sector_y
-        
-        self.forward_country_id = forward_country_id
-        self.backward_country_id = backward_country_id
-        
         self._navigation = None
-        
-        self.parse_strings()
+    
+    @property
+    def uid(self) -> int:
+        return self._columns.uid[self._index]
+    
+    @property
+    def x(self) -> float:
+        return self._columns.x[self._index]
+    
+    @property
+    def y(self) -> float:
+        return self._columns.y[self._index]
+    
+    @property
+    def z(self) -> float:
+        return self._columns.z[self._index]
+    
+    @property
+    def rotation(self) -> float:
+        """NOTE: This variable is not to be used. It is only here for compatibility, please use `.euler` instead."""
+        return self._columns.rotation[self._index]
+    
+    @property
+    def forward_item_uid(self) -> int | None:
+        return self._columns.forward_item_uid[self._index] or None
+    
+    @property
+    def backward_item_uid(self) -> int | None:
+        return self._columns.backward_item_uid[self._index] or None
+    
+    @property
+    def sector_x(self) -> int:
+        return self._columns.sector_x[self._index]
+    
+    @property
+    def sector_y(self) -> int:
+        return self._columns.sector_y[self._index]
+    
+    @property
+    def forward_country_id(self) -> int:
+        return self._columns.forward_country_id[self._index]
+    
+    @property
+    def backward_country_id(self) -> int:
+        return self._columns.backward_country_id[self._index]
+    
+    @property
+    def rotationQuat(self) -> list[float]:
+        return self._columns.rotation_quat[self._index * 4:self._index * 4 + 4].tolist()
         
     @property
     def euler(self) -> list[float]:
@@ -306,7 +413,7 @@ class Node:
     @property
     def navigation(self) -> NavigationEntry:
         if self._navigation is None:
-            self._navigation = data.map.get_navigation_entry(self.uid)
+            self._navigation = data.map.get_node_navigation(self.uid)
         return self._navigation
 
     def json(self) -> dict:
@@ -326,6 +433,65 @@ class Node:
         }
 
 
+class NodeColumns(Columns):
+    types = {
+        "uid": "Q", "x": "d", "y": "d", "z": "d", "rotation": "d", "rotation_quat": "d",
+        "forward_item_uid": "Q", "backward_item_uid": "Q", "forward_country_id": "q", "backward_country_id": "q",
+        "sector_x": "i", "sector_y": "i",
+    }
+    widths = {"rotation_quat": 4}
+    __slots__ = [*types, 'nodes']
+    
+    nodes: list[Node]
+    """One view per row. Nodes are looked up by UID so these are kept around."""
+    
+    def __init__(self, length: int, **columns: np.ndarray):
+        super().__init__(length, **columns)
+        self.nodes = [Node(self, index) for index in range(length)]
+
+
+class NavigationColumns(Columns):
+    types = {
+        "node_id": "Q", "distance": "d", "direction": "b", "is_one_lane_road": "b", "dlc_guard": "i",
+        "item_uid": "Q", "item_type": "b",
+    }
+    __slots__ = [*types, 'lane_indices', 'entries']
+    
+    lane_indices: list[list[int] | None]
+    """Set by compute_navigation_data(), None when there are no lanes."""
+    entries: list[NavigationEntry]
+    
+    def __init__(self, length: int, uids: list[int], starts: list[int], middles: list[int], ends: list[int], **columns: np.ndarray):
+        """
+        :param list[int] uids: The node UID of each entry.
+        :param list[int] starts: The first row of each entry.
+        :param list[int] middles: The first backward row of each entry.
+        :param list[int] ends: The row after the last one of each entry.
+        """
+        super().__init__(length, **columns)
+        self.lane_indices = columns.get("lane_indices", None) or [None] * length
+        self.entries = [
+            NavigationEntry(uid, self, start, middle, end) 
+            for uid, start, middle, end in zip(uids, starts, middles, ends)
+        ]
+
+
+class ElevationColumns(Columns):
+    """Elevations are only accessed by sector, so the views are created on access."""
+    types = {"x": "d", "y": "d", "z": "d", "sector_x": "i", "sector_y": "i"}
+    __slots__ = [*types]
+    
+    def __getitem__(self, index: int) -> "Elevation":
+        if index < 0:
+            index += self.length
+        if not 0 <= index < self.length:
+            raise IndexError("elevation index out of range")
+        return Elevation(self, index)
+    
+    def __iter__(self):
+        return (Elevation(self, index) for index in range(self.length))
+
+
 class Transform:
     __slots__ = ['x', 'y', 'z', 'rotation', 'euler']
     
@@ -537,7 +703,7 @@ class CityArea(BaseItem):
 
 
 class City:
-    __slots = ['token', 'name', 'name_localized', 'country_token', 'population', 'x', 'y', 'areas']
+    __slots__ = ['token', 'name', 'name_localized', 'country_token', 'population', 'x', 'y', 'areas']
     
     token: str
     name: str
@@ -1019,7 +1185,7 @@ class Railing:
 
 class Road(BaseItem):
     __slots__ = ['dlc_guard', 'hidden', 'road_look_token', 'start_node_uid', 'end_node_uid', 'length', 'maybe_divided',
-                 'type', 'road_look', '_bounding_box', '_lanes', '_points', 'start_node', 'end_node', 'railings']
+                 'type', 'road_look', '_bounding_box', '_lanes', '_points', 'start_node', 'end_node', 'railings', '_lane_points']
     
     dlc_guard: int
     hidden: bool
@@ -1035,6 +1201,7 @@ class Road(BaseItem):
     _bounding_box: BoundingBox
     _lanes: list[Lane]
     _points: list[Position]
+    _lane_points: tuple[list[Lane], np.ndarray, np.ndarray] | None
 
     def parse_strings(self):
         # Only parse UIDs if they don't contain 'prefab_' prefix
@@ -1066,6 +1233,7 @@ class Road(BaseItem):
         self._lanes = []
         self._bounding_box = None
         self._points = None
+        self._lane_points = None
         self.start_node = None
         self.end_node = None
 
@@ -1100,8 +1268,6 @@ class Road(BaseItem):
                 logging.error(f"Failed to get nodes for road {self.uid}")
                 return []
     
-            new_points = []
-    
             start_pos = (start_node.x, start_node.z, start_node.y)
             end_pos = (end_node.x, end_node.z, end_node.y)
 
@@ -1111,10 +1277,9 @@ class Road(BaseItem):
             length = math.sqrt(sum((e - s) ** 2 for s, e in zip(start_pos, end_pos)))
             needed_points = max(int(length * road_quality), min_quality)
     
-            for i in range(needed_points):
-                s = i / (needed_points - 1)
-                x, y, z = math_helpers.Hermite3D(s, start_pos, end_pos, start_quaternion, end_quaternion, self.length)
-                new_points.append(Position(x, y, z))
+            s = np.arange(needed_points) / (needed_points - 1)
+            points = math_helpers.Hermite3DBatch(s, start_pos, end_pos, start_quaternion, end_quaternion, self.length)
+            new_points = [Position(x, y, z) for x, y, z in points.tolist()]
     
             return new_points
         except Exception as e:
@@ -1138,7 +1303,8 @@ class Road(BaseItem):
         if self._lanes == []:
             self._lanes, self._bounding_box = road_helpers.GetRoadLanes(self, data)
             data.heavy_calculations_this_frame += 1
-            data.data_needs_update = True
+            if self._lanes:
+                data.map_stream.invalidate((self.sector_x, self.sector_y))
 
         return self._lanes
 
@@ -1146,6 +1312,14 @@ class Road(BaseItem):
     def lanes(self, value: list[Lane]):
         self._lanes = value
 
+    @property
+    def lane_points(self) -> tuple[np.ndarray, np.ndarray]:
+        """The [x, z] of every lane point and the index of the lane each point belongs to."""
+        lanes = self.lanes
+        if self._lane_points is None or self._lane_points[0] is not lanes:
+            self._lane_points = (lanes, *get_lane_points(lanes))
+        return self._lane_points[1], self._lane_points[2]
+
     @property
     def bounding_box(self) -> BoundingBox:
         if self._bounding_box is None:
@@ -1153,7 +1327,8 @@ class Road(BaseItem):
                 return BoundingBox(0, 0, 0, 0)
             self._lanes, self._bounding_box = road_helpers.GetRoadLanes(self, data)
             data.heavy_calculations_this_frame += 1
-            data.data_needs_update = True
+            if self._lanes:
+                data.map_stream.invalidate((self.sector_x, self.sector_y))
 
         return self._bounding_box
 
@@ -1166,13 +1341,12 @@ class Road(BaseItem):
         if self.bounding_box.is_in(position):
             return 0.0
 
-        min_distance = float('inf')
-        for point in self.points:
-            distance = math.sqrt((point.x - position.x) ** 2 + (point.y - position.y) ** 2 + (point.z - position.z) ** 2)
-            if distance < min_distance:
-                min_distance = distance
+        points = self.points
+        if len(points) == 0:
+            return float('inf')
 
-        return min_distance
+        points = np.array([point.tuple() for point in points], dtype=np.float64)
+        return float(np.min(np.linalg.norm(points - position.tuple(), axis=1)))
 
     def json(self) -> dict:
         return {
@@ -2076,7 +2250,7 @@ class PrefabDescription:
 
 
 class Prefab(BaseItem):
-    __slots__ = ['dlc_guard', 'hidden', 'token', 'node_uids', 'origin_node_index', 'type', 'prefab_description', 'z', '_nav_routes', '_bounding_box']
+    __slots__ = ['dlc_guard', 'hidden', 'token', 'node_uids', 'origin_node_index', 'type', '_descriptions', 'z', '_nav_routes', '_bounding_box', '_lane_points']
     
     dlc_guard: int
     hidden: bool
@@ -2084,10 +2258,11 @@ class Prefab(BaseItem):
     node_uids: list[int | str]
     origin_node_index: int
     type: ItemType
-    prefab_description: PrefabDescription
+    _descriptions: "PrefabDescriptionStore"
     z: float
     _nav_routes: list[PrefabNavRoute]
     _bounding_box: BoundingBox
+    _lane_points: tuple[list[PrefabNavRoute], np.ndarray, np.ndarray] | None
 
     def parse_strings(self):
         super().parse_strings()
@@ -2097,9 +2272,10 @@ class Prefab(BaseItem):
                  hidden: bool | None, token: str, node_uids: list[int | str], origin_node_index: int):
         super().__init__(uid, ItemType.Prefab, x, y, sector_x, sector_y)
         self.type = ItemType.Prefab
-        self.prefab_description = None
+        self._descriptions = None
         self._nav_routes = []
         self._bounding_box = None
+        self._lane_points = None
         self.z = z
         self.dlc_guard = dlc_guard
         self.hidden = hidden
@@ -2109,27 +2285,48 @@ class Prefab(BaseItem):
         self.parse_strings()
 
     def build_nav_routes(self):
-        self._nav_routes = []
+        # Built into a local list first, the lane precompute thread can
+        # build them while the steering thread reads them.
+        nav_routes = []
         for route in self.prefab_description.nav_routes:
-            self._nav_routes.append(PrefabNavRoute(
+            nav_routes.append(PrefabNavRoute(
                 route.generate_relative_curves(data.map.get_node_by_uid(self.node_uids[0]),
                                                self.prefab_description.nodes[self.origin_node_index])
             ))
 
-        for route in self._nav_routes:
+        for route in nav_routes:
             route.generate_points(self)
+            
+        self._nav_routes = nav_routes
+
+    @property
+    def prefab_description(self) -> PrefabDescription | None:
+        if self._descriptions is None:
+            return None
+        return self._descriptions.get(self.token)
 
     @property
     def nav_routes(self) -> list[PrefabNavRoute]:
         """The prefab description also has nav routes, but this nav route list has the correct world space positions."""
         if self._nav_routes == []:
             self.build_nav_routes()
+        if self._descriptions is not None:
+            self._descriptions.touch(self)
 
         return self._nav_routes
 
     @nav_routes.setter
     def nav_routes(self, value: list[PrefabNavRoute]):
         self._nav_routes = value
+        self._lane_points = None
+
+    @property
+    def lane_points(self) -> tuple[np.ndarray, np.ndarray]:
+        """The [x, z] of every nav route point and the index of the route each point belongs to."""
+        nav_routes = self.nav_routes
+        if self._lane_points is None or self._lane_points[0] is not nav_routes:
+            self._lane_points = (nav_routes, *get_lane_points(nav_routes))
+        return self._lane_points[1], self._lane_points[2]
 
     @property
     def bounding_box(self) -> BoundingBox:
@@ -2180,25 +2377,153 @@ class Prefab(BaseItem):
         }
 
 
+class PrefabDescriptionStore:
+    """Prefab descriptions by token. They are kept as their raw JSON record and only built
+    the first time a prefab needs them. Once limit() has been called (after loading) the
+    least recently used descriptions and prefab nav routes are dropped, they are rebuilt
+    if they are needed again.
+    """
+    __slots__ = ['records', 'builder', 'descriptions', 'prefabs', 'pinned', 'max_descriptions', 'max_prefabs', 'lock']
+    
+    records: dict[str, bytes]
+    builder: Callable[[bytes], PrefabDescription]
+    descriptions: OrderedDict[str, PrefabDescription]
+    """Built descriptions, the most recently used last."""
+    prefabs: OrderedDict[int, Prefab]
+    """Prefabs that have built their nav routes, the most recently used last."""
+    pinned: set[int]
+    """Prefabs in the loaded sectors, they keep their nav routes even if they are the least recently used."""
+    max_descriptions: int | None
+    max_prefabs: int | None
+    lock: threading.Lock
+    """The store is used by both the steering thread and the lane precompute thread."""
+    
+    def __init__(self, records: dict[str, bytes], builder: Callable[[bytes], PrefabDescription]):
+        """
+        :param dict[str, bytes] records: Token -> raw JSON record.
+        :param Callable builder: Builds a description from a raw record.
+        """
+        self.records = records
+        self.builder = builder
+        self.descriptions = OrderedDict()
+        self.prefabs = OrderedDict()
+        self.pinned = set()
+        self.max_descriptions = None
+        self.max_prefabs = None
+        self.lock = threading.Lock()
+        
+    def get(self, token: str) -> PrefabDescription | None:
+        with self.lock:
+            return self._get(token)
+    
+    def _get(self, token: str) -> PrefabDescription | None:
+        description = self.descriptions.get(token, None)
+        if description is not None:
+            self.descriptions.move_to_end(token)
+            return description
+        
+        record = self.records.get(token, None)
+        if record is None:
+            return None
+        
+        description = self.builder(record)
+        self.descriptions[token] = description
+        if self.max_descriptions is not None:
+            while len(self.descriptions) > self.max_descriptions:
+                self.descriptions.popitem(last=False)
+        return description
+    
+    def touch(self, prefab: Prefab) -> None:
+        """Mark the nav routes of a prefab as used."""
+        with self.lock:
+            self._touch(prefab)
+    
+    def _touch(self, prefab: Prefab) -> None:
+        if prefab.uid in self.prefabs:
+            self.prefabs.move_to_end(prefab.uid)
+            return
+        
+        self.prefabs[prefab.uid] = prefab
+        self._evict()
+    
+    def _evict(self) -> None:
+        if self.max_prefabs is None:
+            return
+        
+        # Pinned prefabs are moved to the end, every prefab is checked at most once so this ends
+        # even if the pinned ones are over the limit. The most recently used one is never evicted.
+        remaining = len(self.prefabs) - 1
+        while len(self.prefabs) > self.max_prefabs and remaining > 0:
+            uid, evicted = self.prefabs.popitem(last=False)
+            remaining -= 1
+            if uid in self.pinned:
+                self.prefabs[uid] = evicted
+                continue
+            evicted.nav_routes = [] # bounding box is kept, it's small and expensive to rebuild
+    
+    def pin(self, prefabs: list[Prefab]) -> None:
+        """Keep the nav routes of these prefabs (the ones in the loaded sectors), replaces the previously pinned prefabs.
+        
+        The lane precompute thread builds the routes of the prefabs ahead of the truck, without
+        pinning those could evict the routes of the prefabs the truck is driving through.
+        """
+        with self.lock:
+            self.pinned = {prefab.uid for prefab in prefabs}
+    
+    def limit(self, max_descriptions: int = 512, max_prefabs: int = 4096) -> None:
+        """Bound the number of built descriptions and prefab nav routes.
+        
+        :param int max_descriptions: How many built descriptions to keep.
+        :param int max_prefabs: How many prefabs can keep their nav routes.
+        """
+        self.max_descriptions = max_descriptions
+        self.max_prefabs = max_prefabs
+        with self.lock:
+            while len(self.descriptions) > max_descriptions:
+                self.descriptions.popitem(last=False)
+            self._evict()
+    
+    def __len__(self) -> int:
+        return len(self.records)
+    
+    def __contains__(self, token: str) -> bool:
+        return token in self.records
+
+
 Item = Union[
     City, Country, Company, Ferry, POI, Road, Prefab, MapArea, MapOverlay, Building, Curve, FerryItem, CompanyItem, Cutscene, Trigger, Model, Terrain]
 """NOTE: You shouldn't use this type directly, use the children types instead as they provide intellisense!"""
 
 class Elevation:
-    __slots__ = ['x', 'y', 'z', 'sector_x', 'sector_y']
+    """View of one row in ElevationColumns."""
+    __slots__ = ['_columns', '_index']
 
-    x: float
-    y: float
-    z: float
-    sector_x: int
-    sector_y: int
+    _columns: ElevationColumns
+    _index: int
 
-    def __init__(self, x: float, y: float, z: float):
-        self.x = x
-        self.y = y
-        self.z = z
-        self.sector_x = 0
-        self.sector_y = 0
+    def __init__(self, columns: ElevationColumns, index: int):
+        self._columns = columns
+        self._index = index
+
+    @property
+    def x(self) -> float:
+        return self._columns.x[self._index]
+
+    @property
+    def y(self) -> float:
+        return self._columns.y[self._index]
+
+    @property
+    def z(self) -> float:
+        return self._columns.z[self._index]
+
+    @property
+    def sector_x(self) -> int:
+        return self._columns.sector_x[self._index]
+
+    @property
+    def sector_y(self) -> int:
+        return self._columns.sector_y[self._index]
 
     def json(self) -> dict:
         return {
@@ -2207,11 +2532,216 @@ class Elevation:
             "z": self.z
         }
 
+DIRECTIONS = ("forward", "backward")
+"""NavigationColumns.direction values."""
+NAVIGATION_ITEM_TYPES = (None, Road, Prefab, Model)
+"""NavigationColumns.item_type values."""
+
+# MARK: Sectors
+def get_uid_array(uids: list[int | None]) -> np.ndarray:
+    """UIDs as an uint64 array, missing UIDs are stored as 0."""
+    return np.fromiter((uid if uid else 0 for uid in uids), dtype=np.uint64, count=len(uids))
+
+
+def get_position_array(items: list, x: str, y: str) -> np.ndarray:
+    """(N, 2) array of the given position attributes of the items."""
+    positions = np.empty((len(items), 2), dtype=np.float64)
+    positions[:, 0] = np.fromiter(map(attrgetter(x), items), dtype=np.float64, count=len(items))
+    positions[:, 1] = np.fromiter(map(attrgetter(y), items), dtype=np.float64, count=len(items))
+    return positions
+
+
+def get_sector_key(sector_x: int, sector_y: int) -> int:
+    """Pack a sector into a single integer, matches the keys in SectorIndex."""
+    return (sector_x << 32) | (sector_y & 0xFFFFFFFF)
+
+
+class SectorIndex:
+    """Items grouped by sector into one contiguous array (CSR style).
+    
+    The items of the sector `keys[i]` are `items[offsets[i]:offsets[i + 1]]`.
+    Use `get` to access them, it returns a view instead of a copy.
+    """
+    __slots__ = ['items', 'keys', 'offsets']
+    
+    items: np.ndarray
+    keys: np.ndarray
+    offsets: np.ndarray
+
+    def __init__(self, items: list | np.ndarray, sector_x: np.ndarray, sector_y: np.ndarray):
+        keys = (sector_x.astype(np.int64) << 32) | (sector_y.astype(np.int64) & 0xFFFFFFFF)
+        order = np.argsort(keys, kind="stable")
+        keys = keys[order]
+        
+        if not isinstance(items, np.ndarray):
+            items = np.fromiter(items, dtype=object, count=len(items))
+        self.items = items[order]
+        
+        starts = np.flatnonzero(np.diff(keys, prepend=keys[:1] - 1)) if len(keys) > 0 else np.zeros(0, dtype=np.int64)
+        self.keys = keys[starts]
+        self.offsets = np.append(starts, len(items))
+
+    def get(self, sector: tuple[int, int]) -> np.ndarray:
+        key = get_sector_key(sector[0], sector[1])
+        index = np.searchsorted(self.keys, key)
+        if index >= len(self.keys) or self.keys[index] != key:
+            return self.items[0:0]
+        return self.items[self.offsets[index]:self.offsets[index + 1]]
+    
+    def __len__(self) -> int:
+        return len(self.keys)
+
+
+# MARK: Spatial index
+def get_lane_points(lanes: list[Lane] | list[PrefabNavRoute]) -> tuple[np.ndarray, np.ndarray]:
+    """The [x, z] of every point of the lanes as an (N, 2) array, and the lane index of each point."""
+    positions = [(point.x, point.z) for lane in lanes for point in lane.points]
+    points = np.array(positions, dtype=np.float64).reshape(-1, 2)
+    lane_ids = np.repeat(np.arange(len(lanes), dtype=np.int32), [len(lane.points) for lane in lanes])
+    return points, lane_ids
+
+
+class LaneIndex:
+    """KD-trees over the lane points of the roads and the nav route points of the
+    prefabs in the loaded sectors, used for the closest item and closest lane queries.
+    
+    Only items whose lanes are already built are indexed, building them is left to
+    the lane precompute thread and the lazy properties so that a sector change doesn't
+    build every lane on the steering thread. Sectors with items that weren't built yet
+    are read again every REFRESH_INTERVAL, the kept sectors are reused otherwise.
+    """
+    __slots__ = ['map', 'sectors', 'trees', 'last_refresh']
+    
+    map: "MapData"
+    """The map the sectors were read from."""
+    sectors: dict[tuple[int, int], tuple[dict[type, tuple[list, np.ndarray, np.ndarray, np.ndarray]], int, bool]]
+    """Sector -> (item type -> (items, points, item index per point, lane index per point), built items, complete)."""
+    trees: dict[type, tuple[cKDTree, list, np.ndarray, np.ndarray]]
+    """Item type -> (tree, items, item index per point, lane index per point)."""
+    last_refresh: float
+    
+    TYPES = (Road, Prefab)
+    REFRESH_INTERVAL = 0.5
+    """How often sectors with items that didn't have their lanes yet are read again. (s)"""
+    
+    def __init__(self):
+        self.map = None
+        self.sectors = {}
+        self.trees = {}
+        self.last_refresh = 0
+        
+    @staticmethod
+    def is_built(item: Road | Prefab) -> bool:
+        return (item._lanes if type(item) == Road else item._nav_routes) != []
+        
+    def sector_items(self, sector: tuple[int, int]) -> list[tuple[type, list]]:
+        roads = self.map.get_sector_roads_by_sector(sector)
+        prefabs = self.map.get_sector_prefabs_by_sector(sector)
+        return [(Road, list(roads) if roads is not None else []),
+                (Prefab, list(prefabs) if prefabs is not None else [])]
+        
+    def built_count(self, sector: tuple[int, int]) -> int:
+        return sum(self.is_built(item) for _, items in self.sector_items(sector) for item in items)
+        
+    def read_sector(self, sector: tuple[int, int]) -> tuple[dict[type, tuple[list, np.ndarray, np.ndarray, np.ndarray]], int, bool]:
+        result = {}
+        built_count = 0
+        complete = True
+        for item_type, items in self.sector_items(sector):
+            built = [item for item in items if self.is_built(item)]
+            built_count += len(built)
+            complete = complete and len(built) == len(items)
+            
+            lane_points = [item.lane_points for item in built]
+            points = np.concatenate([points for points, _ in lane_points]) if built else np.zeros((0, 2))
+            item_ids = np.repeat(np.arange(len(built), dtype=np.int32), [len(points) for points, _ in lane_points])
+            lane_ids = np.concatenate([lane_ids for _, lane_ids in lane_points]) if built else np.zeros(0, dtype=np.int32)
+            result[item_type] = (built, points, item_ids, lane_ids)
+        return result, built_count, complete
+        
+    def clear(self) -> None:
+        """Forget the read sectors, they're read again on the next update. (road data was cleared)"""
+        self.sectors = {}
+        self.trees = {}
+        
+    def update(self, map: "MapData", sectors: list[tuple[int, int]]) -> None:
+        """Index the given sectors, this is cheap to call every frame. Sectors that were
+        already read are reused, incomplete ones are checked again every REFRESH_INTERVAL.
+        
+        :param MapData map: The map to read the items from.
+        :param list[tuple[int, int]] sectors: The loaded sectors.
+        """
+        if map is not self.map:
+            self.map = map
+            self.clear()
+            
+        changed = False
+        refresh = time.perf_counter() - self.last_refresh > self.REFRESH_INTERVAL
+        if refresh:
+            self.last_refresh = time.perf_counter()
+            
+        kept = {}
+        for sector in sectors:
+            cached = self.sectors.get(sector)
+            if cached is not None and not cached[2] and refresh and self.built_count(sector) != cached[1]:
+                cached = None # more items have their lanes now
+            if cached is None:
+                cached = self.read_sector(sector)
+                changed = True
+            kept[sector] = cached
+            
+        if not changed and len(kept) == len(self.sectors):
+            return
+        self.sectors = kept
+        
+        self.trees = {}
+        for item_type in self.TYPES:
+            items = []
+            points = []
+            item_ids = []
+            lane_ids = []
+            for sector_data, _, _ in self.sectors.values():
+                sector_items, sector_points, sector_item_ids, sector_lane_ids = sector_data[item_type]
+                points.append(sector_points)
+                item_ids.append(sector_item_ids + len(items))
+                lane_ids.append(sector_lane_ids)
+                items += sector_items
+                
+            points = np.concatenate(points) if points else np.zeros((0, 2))
+            if len(points) > 0:
+                self.trees[item_type] = (cKDTree(points), items, np.concatenate(item_ids), np.concatenate(lane_ids))
+                
+    def covers(self, map: "MapData", sectors: list[tuple[int, int]]) -> bool:
+        """Whether every item of the sectors is indexed."""
+        return map is self.map and len(sectors) == len(self.sectors) and \
+               all(sector in self.sectors and self.sectors[sector][2] for sector in sectors)
+        
+    def query(self, x: float, z: float, item_type: type | None = None) -> tuple[Road | Prefab | None, int, float, tuple[float, float] | None]:
+        """Find the closest lane point to the given position.
+        
+        :param float x: X coordinate.
+        :param float z: Z coordinate.
+        :param type item_type: Only search this item type (Road or Prefab). Defaults to both.
+        :return: (item, lane index, distance, point) or (None, -1, inf, None) if nothing is indexed.
+        """
+        result = (None, -1, math.inf, None)
+        for tree_type, (tree, items, item_ids, lane_ids) in self.trees.items():
+            if item_type is not None and tree_type is not item_type:
+                continue
+            distance, index = tree.query((x, z))
+            if distance < result[2]:
+                point = tree.data[index]
+                result = (items[item_ids[index]], int(lane_ids[index]), float(distance), (float(point[0]), float(point[1])))
+        return result
+
+
 # MARK: MapData
 class MapData:
     nodes: list[Node]
     """List of all nodes in the currently loaded map data."""
-    elevations: list[Elevation]
+    node_columns: NodeColumns
+    """The storage behind the nodes."""
+    elevations: ElevationColumns
     roads: list[Road]
     ferries: list[Ferry]
     prefabs: list[Prefab]
@@ -2224,15 +2754,17 @@ class MapData:
     cities: list[City]
     company_defs: list[Company]
     road_looks: list[RoadLook]
-    prefab_descriptions: list[PrefabDescription]
+    prefab_descriptions: "PrefabDescriptionStore"
     model_descriptions: list[ModelDescription]
     navigation: list[NavigationEntry]
+    navigation_columns: NavigationColumns
+    """The storage behind the navigation nodes."""
 
-    _elevations_by_sector: dict[dict[Elevation]]
-    _nodes_by_sector: dict[dict[Node]]
-    _roads_by_sector: dict[dict[Road]]
-    _prefabs_by_sector: dict[dict[Prefab]]
-    _models_by_sector: dict[dict[Model]]
+    _elevations_by_sector: SectorIndex
+    _nodes_by_sector: SectorIndex
+    _roads_by_sector: SectorIndex
+    _prefabs_by_sector: SectorIndex
+    _models_by_sector: SectorIndex
 
     _min_sector_x: int = math.inf
     _max_sector_x: int = -math.inf
@@ -2241,71 +2773,125 @@ class MapData:
     _sector_width: int = 200
     _sector_height: int = 200
 
-    _by_uid = {}
-    _model_descriptions_by_token = {}
-    _prefab_descriptions_by_token = {}
-    _companies_by_token = {}
-    _navigation_by_node_uid = {}
+    _by_uid: dict[int, Node | Road | Prefab | Model] = {}
     """
-    Nested nodes dictionary for quick access to nodes by their UID. UID is split into 4 character strings to index into the nested dictionaries.
-    Please use the get_node_by_uid method to access nodes by UID.
+    Nodes and items by their integer UID. Please use the get_node_by_uid and
+    get_item_by_uid methods instead of accessing this directly.
     """
+    _model_descriptions_by_token = {}
+    _companies_by_token_and_city: dict[tuple[str, str], CompanyItem] = {}
+    _cities_by_token: dict[str, City] = {}
+    _road_looks_by_token: dict[str, RoadLook] = {}
+    _navigation_by_node_uid: dict[int, NavigationEntry] = {}
+    """Navigation entries by their integer node UID. Please use the get_node_navigation method."""
     
     def clear_road_data(self) -> None:
         logging.warning("Clearing road data...")
         road_helpers.get_rules()
         for road in self.roads:
             road.clear_data()
+        data.lane_index.clear()
         logging.warning("Road data cleared.")
     
-    def calculate_sectors(self) -> None:
-        for node in self.nodes:
-            node.sector_x, node.sector_y = self.get_sector_from_coordinates(node.x, node.y)
-            
-        for elevation in self.elevations:
-            elevation.sector_x, elevation.sector_y = self.get_sector_from_coordinates(elevation.x, elevation.z)
-            
-        for road in self.roads:
-            road.sector_x, road.sector_y = self.get_road_sector(road)
-            
-        for prefab in self.prefabs:
-            prefab.sector_x, prefab.sector_y = self.get_sector_from_center_of_nodes(prefab.node_uids, (prefab.x, prefab.y))
-            
-        for company in self.companies:
-            company.sector_x, company.sector_y = self.get_node_sector(company.node_uid, (company.x, company.y))
-            
-        for model in self.models:
-            model.sector_x, model.sector_y = self.get_node_sector(model.node_uid, (model.x, model.y))
+    def calculate_sectors(self, precomputed: bool = False) -> None:
+        """Assign sectors to all items. All positions are gathered into arrays
+        and the node lookups and sector math are done with NumPy.
+
+        :param bool precomputed: The nodes, roads and prefabs already have their sectors (loaded from the cache).
+        """
+        node_uids = self.node_columns.column("uid")
+        node_positions = self.node_columns.positions("x", "y")
+        order = np.argsort(node_uids)
+        self._sorted_node_uids = node_uids[order]
+        self._sorted_node_positions = node_positions[order]
+        
+        if not precomputed:
+            self.assign_sectors(self.node_columns, node_positions)
             
-        for area in self.map_areas:
-            area.sector_x, area.sector_y = self.get_sector_from_center_of_nodes(area.node_uids, (area.x, area.y))
+            start_positions, start_found = self.get_node_positions([road.start_node_uid for road in self.roads])
+            end_positions, end_found = self.get_node_positions([road.end_node_uid for road in self.roads])
+            road_positions = np.where(
+                (start_found & end_found)[:, None],
+                (start_positions + end_positions) / 2,
+                get_position_array(self.roads, "x", "y")
+            )
+            self.assign_sectors(self.roads, road_positions)
+            self.assign_sectors(self.prefabs, self.get_centers_of_nodes(self.prefabs, "node_uids"))
             
-        for poi in self.POIs:
-            poi.sector_x, poi.sector_y = self.get_sector_from_coordinates(poi.x, poi.y)
+        self.assign_sectors(self.elevations, self.elevations.positions("x", "z"))
+        self.assign_sectors(self.companies, self.get_node_positions_or_default(self.companies))
+        self.assign_sectors(self.models, self.get_node_positions_or_default(self.models))
+        self.assign_sectors(self.map_areas, self.get_centers_of_nodes(self.map_areas, "node_uids"))
+        self.assign_sectors(self.POIs, get_position_array(self.POIs, "x", "y"))
+        
+        del self._sorted_node_uids, self._sorted_node_positions
 
-    def get_node_sector(self, node_uid: int | str,  default: tuple[float, float]):
+    def get_node_positions(self, uids: list[int | None]) -> tuple[np.ndarray, np.ndarray]:
+        """Vectorized node lookup, only valid inside calculate_sectors().
+        
+        :return: (N, 2) array of node x, y positions and a mask of the nodes that were found.
+        """
+        uids = get_uid_array(uids)
+        if len(self._sorted_node_uids) == 0:
+            return np.zeros((len(uids), 2)), np.zeros(len(uids), dtype=np.bool_)
+        
+        index = np.searchsorted(self._sorted_node_uids, uids)
+        index = np.minimum(index, len(self._sorted_node_uids) - 1)
+        found = (self._sorted_node_uids[index] == uids) & (uids != 0)
+        return self._sorted_node_positions[index], found
+
+    def get_node_positions_or_default(self, items: list) -> np.ndarray:
+        positions, found = self.get_node_positions([item.node_uid for item in items])
+        return np.where(found[:, None], positions, get_position_array(items, "x", "y"))
+
+    def get_centers_of_nodes(self, items: list, attribute: str) -> np.ndarray:
+        """Vectorized get_center_of_nodes for all items, falls back to the item position."""
+        lengths = np.fromiter(map(len, map(attrgetter(attribute), items)), dtype=np.int64, count=len(items))
+        positions, found = self.get_node_positions([uid for item in items for uid in getattr(item, attribute)])
+        
+        rows = np.repeat(np.arange(len(items)), lengths)
+        counts = np.bincount(rows, weights=found, minlength=len(items))
+        sum_x = np.bincount(rows, weights=np.where(found, positions[:, 0], 0), minlength=len(items))
+        sum_y = np.bincount(rows, weights=np.where(found, positions[:, 1], 0), minlength=len(items))
+        
+        with np.errstate(invalid="ignore", divide="ignore"):
+            centers = np.column_stack((sum_x / counts, sum_y / counts))
+        return np.where((counts > 0)[:, None], centers, get_position_array(items, "x", "y"))
+
+    def get_sectors_from_coordinates(self, coordinates: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Vectorized version of get_sector_from_coordinates for an (N, 2) array of x, z coordinates."""
+        coordinates = np.asarray(coordinates, dtype=np.float64).reshape(-1, 2)
+        sector_x = np.floor_divide(coordinates[:, 0], self._sector_width).astype(np.int64)
+        sector_y = np.floor_divide(coordinates[:, 1], self._sector_height).astype(np.int64)
+        return sector_x, sector_y
+
+    def assign_sectors(self, items: list | Columns, coordinates: np.ndarray) -> None:
+        sector_x, sector_y = self.get_sectors_from_coordinates(coordinates)
+        if isinstance(items, Columns):
+            items.column("sector_x")[:] = sector_x
+            items.column("sector_y")[:] = sector_y
+            return
+        for item, x, y in zip(items, sector_x.tolist(), sector_y.tolist()):
+            item.sector_x = x
+            item.sector_y = y
+
+    def get_node_position(self, node_uid: int | str, default: tuple[float, float]) -> tuple[float, float]:
         if not node_uid:
             return default
 
         node = self.get_node_by_uid(node_uid)
         if node:
-            return self.get_sector_from_coordinates(node.x, node.y)
-        else:
-            return self.get_sector_from_coordinates(default[0], default[1])
+            return (node.x, node.y)
+        return default
 
-    def get_road_sector(self, road: Road):
+    def get_road_center(self, road: Road) -> tuple[float, float]:
         start_node = self.get_node_by_uid(road.start_node_uid)
         end_node = self.get_node_by_uid(road.end_node_uid)
         if start_node and end_node:
-            center_coordinate_X = (start_node.x + end_node.x) / 2
-            center_coordinate_Y = (start_node.y + end_node.y) / 2
-        else:
-            center_coordinate_X = road.x
-            center_coordinate_Y = road.y
+            return ((start_node.x + end_node.x) / 2, (start_node.y + end_node.y) / 2)
+        return (road.x, road.y)
 
-        return self.get_sector_from_coordinates(center_coordinate_X, center_coordinate_Y)
-
-    def get_sector_from_center_of_nodes(self, node_uids: list[int | str], default: tuple[float, float]):
+    def get_center_of_nodes(self, node_uids: list[int | str], default: tuple[float, float]) -> tuple[float, float]:
         center_coordinate_X = 0
         center_coordinate_Y = 0
         node_num = 0
@@ -2317,231 +2903,164 @@ class MapData:
                 center_coordinate_Y += node.y
 
         if node_num > 0:
-            return self.get_sector_from_coordinates(center_coordinate_X / node_num, center_coordinate_Y / node_num)
-        else:
-            return self.get_sector_from_coordinates(default[0], default[1])
+            return (center_coordinate_X / node_num, center_coordinate_Y / node_num)
+        return default
 
-    def sort_to_sectors(self) -> None:
-        self._elevations_by_sector = {}
-        self._nodes_by_sector = {}
-        self._roads_by_sector = {}
-        self._prefabs_by_sector = {}
-        self._models_by_sector = {}
-
-        for node in self.nodes:
-            sector = (node.sector_x, node.sector_y)
-
-            if sector[0] < self._min_sector_x:
-                self._min_sector_x = sector[0]
-            if sector[0] > self._max_sector_x:
-                self._max_sector_x = sector[0]
-            if sector[1] < self._min_sector_y:
-                self._min_sector_y = sector[1]
-            if sector[1] > self._max_sector_y:
-                self._max_sector_y = sector[1]
-
-            if sector[0] not in self._nodes_by_sector:
-                self._nodes_by_sector[sector[0]] = {}
-            if sector[1] not in self._nodes_by_sector[sector[0]]:
-                self._nodes_by_sector[sector[0]][sector[1]] = []
-
-            self._nodes_by_sector[sector[0]][sector[1]].append(node)
+    def get_node_sector(self, node_uid: int | str, default: tuple[float, float]) -> tuple[int, int]:
+        return self.get_sector_from_coordinates(*self.get_node_position(node_uid, default))
 
-        for road in self.roads:
-            sector = (road.sector_x, road.sector_y)
-            if sector[0] not in self._roads_by_sector:
-                self._roads_by_sector[sector[0]] = {}
-            if sector[1] not in self._roads_by_sector[sector[0]]:
-                self._roads_by_sector[sector[0]][sector[1]] = []
-            self._roads_by_sector[sector[0]][sector[1]].append(road)
+    def get_road_sector(self, road: Road) -> tuple[int, int]:
+        return self.get_sector_from_coordinates(*self.get_road_center(road))
 
-        for prefab in self.prefabs:
-            sector = (prefab.sector_x, prefab.sector_y)
-            if sector[0] not in self._prefabs_by_sector:
-                self._prefabs_by_sector[sector[0]] = {}
-            if sector[1] not in self._prefabs_by_sector[sector[0]]:
-                self._prefabs_by_sector[sector[0]][sector[1]] = []
-            self._prefabs_by_sector[sector[0]][sector[1]].append(prefab)
-
-        for model in self.models:
-            sector = (model.sector_x, model.sector_y)
-            if sector[0] not in self._models_by_sector:
-                self._models_by_sector[sector[0]] = {}
-            if sector[1] not in self._models_by_sector[sector[0]]:
-                self._models_by_sector[sector[0]][sector[1]] = []
-            self._models_by_sector[sector[0]][sector[1]].append(model)
-            
-        for elevation in self.elevations:
-            sector = (elevation.sector_x, elevation.sector_y)
-            if sector[0] not in self._elevations_by_sector:
-                self._elevations_by_sector[sector[0]] = {}
-            if sector[1] not in self._elevations_by_sector[sector[0]]:
-                self._elevations_by_sector[sector[0]][sector[1]] = []
-            self._elevations_by_sector[sector[0]][sector[1]].append(elevation)
-
-    def get_node_by_uid(self, uid: str) -> Optional[Node]:
-        """Get a node by its UID."""
-        # Convert int to hex string if needed
-        if isinstance(uid, int):
-            uid = hex(uid)[2:]  # Remove '0x' prefix
-
-        # Search through nodes
-        for node in self.nodes:
-            if node.uid == uid:
-                return node
-        return None
-
-    def calculate_sector_dimensions(self) -> None:
-        min_sector_x = self._min_sector_x
-        min_sector_x_y = min([key for key in self._nodes_by_sector[min_sector_x].keys()])
-        min_sector_y = self._min_sector_y
-        min_sector_y_x = min([key if min_sector_y in self._nodes_by_sector[key].keys() else math.inf for key in
-                              self._nodes_by_sector.keys()])
-        min_x = min([node.x for node in self._nodes_by_sector[min_sector_x][min_sector_x_y]])
-        min_y = min([node.y for node in self._nodes_by_sector[min_sector_y_x][min_sector_y]])
-
-        max_sector_x = self._max_sector_x
-        max_sector_x_y = max([key for key in self._nodes_by_sector[max_sector_x].keys()])
-        max_sector_y = self._max_sector_y
-        max_sector_y_x = max([key if max_sector_y in self._nodes_by_sector[key].keys() else -math.inf for key in
-                              self._nodes_by_sector.keys()])
-        max_x = max([node.x for node in self._nodes_by_sector[max_sector_x][max_sector_x_y]])
-        max_y = max([node.y for node in self._nodes_by_sector[max_sector_y_x][max_sector_y]])
-
-        self._sector_width = (max_x - min_x) / (max_sector_x - min_sector_x)
-        self._sector_height = (max_y - min_y) / (max_sector_y - min_sector_y)
+    def get_sector_from_center_of_nodes(self, node_uids: list[int | str], default: tuple[float, float]) -> tuple[int, int]:
+        return self.get_sector_from_coordinates(*self.get_center_of_nodes(node_uids, default))
+
+    def get_item_sectors(self, items: list | Columns) -> tuple[np.ndarray, np.ndarray]:
+        if isinstance(items, Columns):
+            return items.column("sector_x").astype(np.int64), items.column("sector_y").astype(np.int64)
+        sector_x = np.fromiter(map(attrgetter("sector_x"), items), dtype=np.int64, count=len(items))
+        sector_y = np.fromiter(map(attrgetter("sector_y"), items), dtype=np.int64, count=len(items))
+        return sector_x, sector_y
+
+    def sort_to_sectors(self) -> None:
+        node_sector_x, node_sector_y = self.get_item_sectors(self.node_columns)
+        if len(self.nodes) > 0:
+            self._min_sector_x = int(node_sector_x.min())
+            self._max_sector_x = int(node_sector_x.max())
+            self._min_sector_y = int(node_sector_y.min())
+            self._max_sector_y = int(node_sector_y.max())
+
+        self._nodes_by_sector = SectorIndex(self.nodes, node_sector_x, node_sector_y)
+        self._roads_by_sector = SectorIndex(self.roads, *self.get_item_sectors(self.roads))
+        self._prefabs_by_sector = SectorIndex(self.prefabs, *self.get_item_sectors(self.prefabs))
+        self._models_by_sector = SectorIndex(self.models, *self.get_item_sectors(self.models))
+        # Elevations are indexed by row, the views are created in get_sector_elevations_by_sector.
+        self._elevations_by_sector = SectorIndex(np.arange(len(self.elevations)), *self.get_item_sectors(self.elevations))
 
     def build_dictionary(self) -> None:
         self._by_uid = {}
-        items = self.nodes + self.roads + self.prefabs + self.models
-        for item in items:
-            uid_str = str(item.uid)
-            self._by_uid[uid_str] = item
+        for items in (self.nodes, self.roads, self.prefabs, self.models):
+            for item in items:
+                self._by_uid[item.uid] = item
 
         self._model_descriptions_by_token = {}
         for model_description in self.model_descriptions:
             self._model_descriptions_by_token[model_description.token] = model_description
 
-        self._prefab_descriptions_by_token = {}
-        for prefab_description in self.prefab_descriptions:
-            self._prefab_descriptions_by_token[prefab_description.token] = prefab_description
-
-        self._companies_by_token = {}
+        # setdefault so that the first match wins, same as the old linear searches
+        self._companies_by_token_and_city = {}
         for company in self.companies:
-            self._companies_by_token[company.token] = company
+            self._companies_by_token_and_city.setdefault((company.token, company.city_token), company)
+
+        self._cities_by_token = {}
+        for city in self.cities:
+            self._cities_by_token.setdefault(city.token, city)
+
+        self._road_looks_by_token = {}
+        for road_look in self.road_looks:
+            self._road_looks_by_token.setdefault(road_look.token, road_look)
             
         self._navigation_by_node_uid = {}
         for nav in self.navigation:
             self._navigation_by_node_uid[nav.uid] = nav
 
-    def get_node_navigation(self, uid: str) -> NavigationEntry:
-        return self._navigation_by_node_uid.get(uid, None)
+    def get_uid_key(self, uid: int | str | None) -> int | None:
+        """Convert a UID to the integer key used by the UID indices."""
+        if type(uid) == int:
+            return uid
+        if uid is None or uid == "":
+            return None
+        try:
+            return parse_string_to_int(uid)
+        except (ValueError, TypeError):
+            return None
+
+    def get_node_navigation(self, uid: int | str) -> NavigationEntry | None:
+        return self._navigation_by_node_uid.get(self.get_uid_key(uid), None)
 
     def get_sector_from_coordinates(self, x: float, z: float) -> tuple[int, int]:
         return (int(x // self._sector_width), int(z // self._sector_height))
 
-    def get_sector_nodes_by_coordinates(self, x: float, z: float) -> list[Node]:
+    def get_sector_nodes_by_coordinates(self, x: float, z: float) -> np.ndarray:
         sector = self.get_sector_from_coordinates(x, z)
         return self.get_sector_nodes_by_sector(sector)
 
-    def get_sector_nodes_by_sector(self, sector: tuple[int, int]) -> list[Node]:
-        return self._nodes_by_sector.get(sector[0], {}).get(sector[1], [])
+    def get_sector_nodes_by_sector(self, sector: tuple[int, int]) -> np.ndarray:
+        return self._nodes_by_sector.get(sector)
 
-    def get_sector_roads_by_coordinates(self, x: float, z: float) -> list[Road]:
+    def get_sector_roads_by_coordinates(self, x: float, z: float) -> np.ndarray:
         print(x, z)
         sector = self.get_sector_from_coordinates(x, z)
         print(sector)
         return self.get_sector_roads_by_sector(sector)
 
-    def get_sector_roads_by_sector(self, sector: tuple[int, int]) -> list[Road]:
-        return self._roads_by_sector.get(sector[0], {}).get(sector[1], [])
+    def get_sector_roads_by_sector(self, sector: tuple[int, int]) -> np.ndarray:
+        return self._roads_by_sector.get(sector)
 
-    def get_sector_prefabs_by_coordinates(self, x: float, z: float) -> list[Prefab]:
+    def get_sector_prefabs_by_coordinates(self, x: float, z: float) -> np.ndarray:
         sector = self.get_sector_from_coordinates(x, z)
         return self.get_sector_prefabs_by_sector(sector)
 
-    def get_sector_prefabs_by_sector(self, sector: tuple[int, int]) -> list[Prefab]:
-        return self._prefabs_by_sector.get(sector[0], {}).get(sector[1], [])
+    def get_sector_prefabs_by_sector(self, sector: tuple[int, int]) -> np.ndarray:
+        return self._prefabs_by_sector.get(sector)
 
     def get_sector_items_by_sector(self, sector: tuple[int, int]) -> list[Item]:
         items = []
-        items += self._prefabs_by_sector.get(sector[0], {}).get(sector[1], [])
-        items += self._roads_by_sector.get(sector[0], {}).get(sector[1], [])
+        items.extend(self._prefabs_by_sector.get(sector))
+        items.extend(self._roads_by_sector.get(sector))
         return items
 
     def get_sector_items_by_coordinates(self, x: float, z: float) -> list[Item]:
         sector = self.get_sector_from_coordinates(x, z)
         return self.get_sector_items_by_sector(sector)
 
-    def get_sector_models_by_coordinates(self, x: float, z: float) -> list[Model]:
+    def get_sector_models_by_coordinates(self, x: float, z: float) -> np.ndarray:
         sector = self.get_sector_from_coordinates(x, z)
         return self.get_sector_models_by_sector(sector)
 
-    def get_sector_models_by_sector(self, sector: tuple[int, int]) -> list[Model]:
-        return self._models_by_sector.get(sector[0], {}).get(sector[1], [])
+    def get_sector_models_by_sector(self, sector: tuple[int, int]) -> np.ndarray:
+        return self._models_by_sector.get(sector)
 
     def get_sector_elevations_by_coordinates(self, x: float, z: float) -> list[Elevation]:
         sector = self.get_sector_from_coordinates(x, z)
         return self.get_sector_elevations_by_sector(sector)
     
     def get_sector_elevations_by_sector(self, sector: tuple[int, int]) -> list[Elevation]:
-        return self._elevations_by_sector.get(sector[0], {}).get(sector[1], [])
+        return [Elevation(self.elevations, index) for index in self._elevations_by_sector.get(sector).tolist()]
 
     def get_node_by_uid(self, uid: int | str) -> Node | None:
-        try:
-            if type(uid) == str:
-                uid = parse_string_to_int(uid)
-
-            uid_str = str(uid)
-            return self._by_uid.get(uid_str, None)
-        except:
-            return None
+        return self._by_uid.get(self.get_uid_key(uid), None)
 
     def get_item_by_uid(self, uid: int | str, warn_errors:bool = True) -> Prefab | Road:
-        try:
-            if type(uid) == str:
-                uid = parse_string_to_int(uid)
-            if uid == 0:
-                return None
-            if uid is None:
-                return None
-
-            uid_str = str(uid)
-            return self._by_uid.get(uid_str, None)
-        except:
-            if warn_errors:
+        key = self.get_uid_key(uid)
+        if key is None:
+            if warn_errors and uid is not None:
                 logging.warning(f"Error getting item by UID: {uid}")
-            #logging.exception(f"Error getting item by UID: {uid}")
             return None
+        if key == 0:
+            return None
+
+        return self._by_uid.get(key, None)
 
     def get_company_item_by_token_and_city(self, token: str, city_token: str) -> CompanyItem:
-        # TODO: Optimize this, use the dictionary and add the companies as a list based on the token
-        return_item = None
-        for company in self.companies:
-            if company.token == token and company.city_token == city_token:
-                return_item = company
-                break
-        return return_item
+        return self._companies_by_token_and_city.get((token, city_token), None)
 
     def get_model_description_by_token(self, token: str) -> ModelDescription:
         return self._model_descriptions_by_token.get(token, None)
 
     def get_city_by_token(self, token: str) -> City:
-        for city in self.cities:
-            if city.token == token:
-                return city
-        return None
+        return self._cities_by_token.get(token, None)
+
+    def get_road_look_by_token(self, token: str) -> RoadLook:
+        return self._road_looks_by_token.get(token, None)
 
     def match_roads_to_looks(self) -> None:
         for road in self.roads:
-            for look in self.road_looks:
-                if road.road_look_token == look.token:
-                    road.road_look = look
-                    break
+            road.road_look = self._road_looks_by_token.get(road.road_look_token, None)
 
     def match_prefabs_to_descriptions(self) -> None:
         for prefab in self.prefabs:
-            prefab.prefab_description = self._prefab_descriptions_by_token.get(prefab.token, None)
+            prefab._descriptions = self.prefab_descriptions
             
     def get_world_center_for_sector(self, sector: tuple[int, int]) -> tuple[float, float]:
         return (sector[0] * self._sector_width + self._sector_width / 2, sector[1] * self._sector_height + self._sector_height / 2)
@@ -2560,10 +3079,12 @@ class MapData:
         return sectors
     
     def get_closest_item(self, x: float, z: float) -> Item:
-        # TODO: Use actual points instead of just the item position
+        sectors = self.get_sectors_for_coordinate_and_distance(x, z, data.load_distance)
+        if sectors == data.current_sectors and data.lane_index.covers(self, sectors):
+            return data.lane_index.query(x, z)[0]
+        
         in_bounding_box = []
         items: list[Prefab | Road] = []
-        sectors = self.get_sectors_for_coordinate_and_distance(x, z, data.load_distance)
         if sectors == data.current_sectors:
             items += data.current_sector_prefabs
             items += data.current_sector_roads
@@ -2583,30 +3104,11 @@ class MapData:
         closest_item = None
         closest_point_distance = math.inf
         for item in in_bounding_box:
-            if type(item) == Prefab:
-                for lane_id, lane in enumerate(item.nav_routes):
-                    for point in lane.points:
-                        point_tuple = point.tuple()
-                        point_tuple = (point_tuple[0], point_tuple[2])
-                        distance = math_helpers.DistanceBetweenPoints((x, z), point_tuple)
-                        if distance < closest_point_distance:
-                            closest_point_distance = distance
-                            closest_item = item
-
-            elif type(item) == Road:
-                # Initialize lanes if not already done
-                if not hasattr(item, '_lanes'):
-                    item._lanes = []
-                if not item.lanes:  # If lanes list is empty, generate points
-                    item.generate_points()
-                for lane_id, lane in enumerate(item.lanes):
-                    for point in lane.points:
-                        point_tuple = point.tuple()
-                        point_tuple = (point_tuple[0], point_tuple[2])
-                        distance = math_helpers.DistanceBetweenPoints((x, z), point_tuple)
-                        if distance < closest_point_distance:
-                            closest_point_distance = distance
-                            closest_item = item
+            points, _ = item.lane_points
+            _, distance = math_helpers.ClosestPointIndex(points, x, z)
+            if distance < closest_point_distance:
+                closest_point_distance = distance
+                closest_item = item
 
         return closest_item
 
@@ -2630,6 +3132,34 @@ class MapData:
         print(f"         > Lanes empty: {self.lanes_invalid} ({self.lanes_invalid / self.total * 100:.2f}%)")
         print(f"         > Successful: {self.total - self.not_found - self.lanes_invalid} ({(self.total - self.not_found - self.lanes_invalid) / self.total * 100:.2f}%)")
         
+    def get_memory_usage(self) -> dict[str, tuple[int, int]]:
+        """Approximate memory used by each item type. Items stored as objects
+        are estimated from a sample, references to other items are not counted.
+        
+        :return: Item type -> (item count, bytes).
+        """
+        shared = (Node, NavigationEntry, Road, Prefab, Model, RoadLook, PrefabDescription, ModelDescription, City, Country)
+        usage = {}
+        
+        views = sys.getsizeof(self.nodes) + len(self.nodes) * sys.getsizeof(self.nodes[0]) if self.nodes else 0
+        usage["nodes"] = (len(self.nodes), self.node_columns.nbytes() + views)
+        
+        entries = sys.getsizeof(self.navigation) + len(self.navigation) * sys.getsizeof(self.navigation[0]) if self.navigation else 0
+        lanes = memory_helpers.estimate_size(self.navigation_columns.lane_indices)
+        usage["navigation nodes"] = (len(self.navigation_columns), self.navigation_columns.nbytes() + entries + lanes)
+        usage["elevations"] = (len(self.elevations), self.elevations.nbytes())
+        
+        for name in ["roads", "prefabs", "models", "companies", "map_areas", "POIs", "ferries", "cities", "countries",
+                     "company_defs", "road_looks", "model_descriptions"]:
+            items = getattr(self, name)
+            usage[name.replace("_", " ")] = (len(items), memory_helpers.estimate_size(items, shared))
+        
+        descriptions = self.prefab_descriptions
+        usage["prefab descriptions"] = (len(descriptions), 
+            memory_helpers.get_deep_size(descriptions.records) + memory_helpers.get_deep_size(list(descriptions.descriptions.values())))
+            
+        return usage
+        
     def export_road_offsets(self):
         if not data.export_road_offsets:
             return
@@ -1,9 +1,9 @@
-from Plugins.Map.classes import MapData, Road, Prefab, Position, Model, City, CompanyItem, Node, Elevation
+from Plugins.Map.classes import MapData, Road, Prefab, Position, Model, City, CompanyItem, Node, Elevation, LaneIndex
 from Modules.SDKController.main import SCSController
 from Plugins.Map.route.classes import RouteSection
+from Plugins.Map.utils.map_stream import MapStream
 import ETS2LA.Utils.settings as settings
 import math
-import time
 import os
 
 # MARK: Variables
@@ -64,9 +64,11 @@ current_sector_prefabs: list[Prefab] = []
 current_sector_models: list[Model] = []
 """The models in the current sector."""
 current_sector_elevations: list[Elevation] = []
-""""The elevations in the current sector."""
+"""The elevations in the current sector."""
 current_sectors: list[tuple[int, int]] = []
 """The sectors that are currently loaded."""
+lane_index: LaneIndex = LaneIndex()
+"""Closest item and lane lookups over the roads and prefabs in the current sectors."""
 route_plan: list[RouteSection] = []
 """The current route plan."""
 route_points: list[Position] = []
@@ -131,20 +133,22 @@ use_auto_offset_data = settings.Get("Map", "UseAutoOffsetData", False)
 """Whether to use the auto offset data or not. This will use the offsets from the game instead of the ones calculated by the plugin."""
 right_hand_drive = settings.Get("Map", "RightHandDrive", False)
 """Whether the game is in right-hand drive mode or not. This will change the direction of the steering wheel."""
+precompute_lanes = settings.Get("Map", "PrecomputeLanes", True)
+"""Whether to build the road lanes and prefab routes ahead of the truck in a background thread."""
+precompute_time: float = 15
+"""How many seconds ahead of the truck (at the current speed) the lanes are precomputed."""
 
 # MARK: Return values
-external_data = {}
-"""Data that will be sent to other plugins and the frontend."""
-external_data_time = 0
-"""Time the external data was last updated."""
+map_stream: MapStream = MapStream()
+"""The current sectors serialized for the frontend, see utils/map_stream.py."""
 
 # MARK: Flags
 data_downloaded = False
 """Whether the app can continue because the data has been downloaded."""
 data_needs_update = False
-"""Does the external data need to be updated?"""
+"""Do the serialized sectors need to be rebuilt? (road data or settings changed)"""
 external_data_changed = False
-"""Flag for the main file to update the external data in the main process."""
+"""Flag for the main file to publish a new version of the map stream."""
 update_navigation_plan = False
 """Whether we should calculate a new plan to drive to the destination."""
 
@@ -154,7 +158,7 @@ def UpdateData(api_data):
     global truck_speed, truck_x, truck_y, truck_z, truck_rotation
     global current_sector_x, current_sector_y, current_sector_prefabs, current_sector_roads, last_sector, current_sector_models, current_sectors, current_sector_elevations
     global truck_indicating_left, truck_indicating_right
-    global external_data, data_needs_update, external_data_changed, external_data_time
+    global data_needs_update, external_data_changed
     global dest_city, dest_company, dest_city_token, dest_company_token
     global trailer_x, trailer_y, trailer_z, trailer_attached
     global sector_center_x, sector_center_y
@@ -175,6 +179,7 @@ def UpdateData(api_data):
     
     plugin.globals.tags.sector_center = (sector_center_x, sector_center_y)
     
+    sectors_changed = False
     if (current_sector_x, current_sector_y) != last_sector:
         last_sector = (current_sector_x, current_sector_y)
         sectors_to_load = map.get_sectors_for_coordinate_and_distance(truck_x, truck_z, load_distance)
@@ -185,24 +190,26 @@ def UpdateData(api_data):
         current_sector_models = []
         current_sector_elevations = []
         for sector in sectors_to_load:
-            current_sector_prefabs += map.get_sector_prefabs_by_sector(sector)
-            current_sector_roads += map.get_sector_roads_by_sector(sector)
-            current_sector_models += map.get_sector_models_by_sector(sector)
-            current_sector_elevations += map.get_sector_elevations_by_sector(sector)
+            current_sector_prefabs.extend(map.get_sector_prefabs_by_sector(sector))
+            current_sector_roads.extend(map.get_sector_roads_by_sector(sector))
+            current_sector_models.extend(map.get_sector_models_by_sector(sector))
+            current_sector_elevations.extend(map.get_sector_elevations_by_sector(sector))
         
-        data_needs_update = True
+        map.prefab_descriptions.pin(current_sector_prefabs)
+        sectors_changed = True
+        
+    # Only indexes the items that already have their lanes, see LaneIndex.
+    lane_index.update(map, current_sectors)
 
     if data_needs_update:
-        external_data = {
-            "prefabs": [prefab.json() for prefab in current_sector_prefabs],
-            "roads": [road.json() for road in current_sector_roads],
-            "models": [model.json() for model in current_sector_models],
-            "elevations": [elevation.json() for elevation in current_sector_elevations] if send_elevation_data else []
-        }
-        
-        external_data_changed = True
-        external_data_time = time.perf_counter()
+        map_stream.clear()
+        sectors_changed = True
         data_needs_update = False
+
+    if sectors_changed or map_stream.dirty:
+        # Only the sectors that came into range or whose lanes were built since are serialized, unless the stream was cleared.
+        map_stream.update(map, current_sectors, send_elevation_data)
+        external_data_changed = True
     
     rotationX = api_data["truckPlacement"]["rotationX"]
     angle = rotationX * 360
@@ -240,7 +247,7 @@ def UpdateSettings(settings: dict):
     global auto_accept_threshold, auto_deny_threshold, load_distance
     global drive_based_on_trailer, send_elevation_data, export_road_offsets
     global disable_fps_notices, override_lane_offsets, use_auto_offset_data
-    global right_hand_drive
+    global right_hand_drive, precompute_lanes
     internal_map = settings["InternalVisualisation"]
     calculate_steering = settings["ComputeSteeringData"]
     sector_size = settings["SectorSize"]
@@ -255,6 +262,7 @@ def UpdateSettings(settings: dict):
     override_lane_offsets = settings["Override Lane Offsets"]
     use_auto_offset_data = settings["UseAutoOffsetData"]
     right_hand_drive = settings["RightHandDrive"]
+    precompute_lanes = settings.get("PrecomputeLanes", True)
 
     global data_needs_update
     data_needs_update = True
@@ -15,6 +15,7 @@ import Plugins.Map.utils.math_helpers as mh
 # ETS2LA imports
 import Plugins.Map.utils.data_handler as data_handler
 import Plugins.Map.utils.data_reader as data_reader
+import Plugins.Map.utils.lane_precompute as lane_precompute
 from Plugins.Map.ui import SettingsMenu
 
 from Plugins.Map.utils import ui_operations as ui
@@ -235,6 +236,10 @@ class Plugin(ETS2LAPlugin):
             logging.exception(_("Error initializing Map plugin: {0}").format(e), exc_info=True)
             return False
                 
+    def shutdown(self):
+        """Stop the background threads, they would keep the old map data alive."""
+        lane_precompute.Stop()
+                
     def MapWindowInitialization(self):
         if not data.map_initialized and data.internal_map:
                 im.InitializeMapWindow()
@@ -263,11 +268,13 @@ class Plugin(ETS2LAPlugin):
             if data_handler.IsDownloaded(data.data_path) and not is_different_data:
                 self.state.text = _("Preparing to load data...")
                 data_reader.path = data.data_path
+                lane_precompute.Stop() # it would keep building the old map's lanes
                 del data.map
                 data.map = None
                 data.map = data_reader.ReadData(state=self.state)
                 data.data_downloaded = True
                 data.data_needs_update = True
+                lane_precompute.Start()
                 self.state.reset()
                 return
                 
@@ -282,18 +289,22 @@ class Plugin(ETS2LAPlugin):
         
         try:
             data_update_start_time = time.perf_counter()
-            api_data = api.run()
-            data.UpdateData(api_data)
+            with self.profile("api.run"):
+                api_data = api.run()
+            with self.profile("UpdateData"):
+                data.UpdateData(api_data)
             data_update_time = time.perf_counter() - data_update_start_time
 
             if data.calculate_steering:
                 # Update route plan and steering
                 planning_start_time = time.perf_counter()
-                planning.UpdateRoutePlan()
+                with self.profile("UpdateRoutePlan"):
+                    planning.UpdateRoutePlan()
                 planning_time = time.perf_counter() - planning_start_time
                 
                 steering_start_time = time.perf_counter()
-                steering_value = driving.GetSteering()
+                with self.profile("GetSteering"):
+                    steering_value = driving.GetSteering()
 
                 if steering_value is not None:
                     steering_value = steering_value / 180
@@ -313,7 +324,8 @@ class Plugin(ETS2LAPlugin):
             internal_map_start_time = time.perf_counter()
             if data.internal_map:
                 self.MapWindowInitialization()
-                im.DrawMap()
+                with self.profile("DrawMap"):
+                    im.DrawMap()
             internal_map_time = time.perf_counter() - internal_map_start_time
 
             navigation_start_time = time.perf_counter()
@@ -322,9 +334,12 @@ class Plugin(ETS2LAPlugin):
 
             external_map_start_time = time.perf_counter()
             if data.external_data_changed:
-                external_data = json.dumps(data.external_data)
-                self.globals.tags.map = json.loads(external_data)
-                self.globals.tags.map_update_time = data.external_data_time
+                with self.profile("map tag"):
+                    # Already serialized, the backend sends the clients what changed. (/api/map/stream)
+                    for tag, sector in data.map_stream.publish().items():
+                        self.globals.tags.set_tag(tag, sector)
+                    self.globals.tags.map_stream = data.map_stream.tag()
+                    self.globals.tags.map_update_time = data.map_stream.time
                 data.external_data_changed = False
                 
             external_map_time = time.perf_counter() - external_map_start_time
@@ -429,14 +444,19 @@ class Plugin(ETS2LAPlugin):
                         found = True
                         break
                     
-                if found:
+                # The index finds the road, the distance is still measured to its center line.
+                closest_road = None if found else data.lane_index.query(data.truck_x, data.truck_z, c.Road)[0]
+                if closest_road is None:
+                    # On a road, or none of the loaded roads have their lanes built yet.
                     self.globals.tags.closest_road_distance = 0
                     self.globals.tags.closest_road_angle = 0
                 else:
-                    # Distance
+                    # Distance, the bounding box is in xz so it's tested with xy_position.
                     truck_position = c.Position(data.truck_x, data.truck_y, data.truck_z)
-                    closest_road = min(roads, key=lambda r: r.distance_to(truck_position))
-                    self.globals.tags.closest_road_distance = closest_road.distance_to(xy_position)
+                    if closest_road.bounding_box.is_in(xy_position):
+                        self.globals.tags.closest_road_distance = 0
+                    else:
+                        self.globals.tags.closest_road_distance = min(point.distance_to(truck_position) for point in closest_road.points)
                     
                     # Angle
                     closest_point = min(closest_road.points, key=lambda p: p.distance_to(truck_position))
@@ -12,7 +12,7 @@ class RouteNode:
     RouteItem objects we get from the game.
     """
     route_item: RouteItem
-    """The RouteItem object from the game."""
+    """The route item from the game, a record from the Route module."""
     node: Node
     """Extracted from the RouteItem object."""
     item: Road | Prefab
@@ -32,7 +32,7 @@ class RouteNode:
         
         node = None
         try:
-            node = data.map.get_node_by_uid(route_item.uid)
+            node = data.map.get_node_by_uid(int(route_item.uid))
         except Exception:
             logging.exception("Failed to get node by UID")
             pass
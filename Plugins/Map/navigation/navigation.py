@@ -7,13 +7,10 @@ import Plugins.Map.data as data
 from typing import Literal
 import importlib
 import logging
-import sys
 
 nc = importlib.reload(nc)
 data.last_length = 0
 
-sys.setrecursionlimit(10**6) # Increase recursion limit
-
 def get_direction_for_route_start(route: list[nc.RouteNode]):
     last, next = nh.get_surrounding_nav_nodes(route, data.truck_x, data.truck_z, data.truck_rotation)
     if last is None or next is None:
@@ -54,31 +51,31 @@ def get_direction_for_route_start(route: list[nc.RouteNode]):
     
     return direction, index
 
-# Recursive function to traverse
 def traverse_route_for_direction(remaining: list[nc.RouteNode], direction: Literal["forward", "backward"]):
-    if len(remaining) == 2:
-        return [direction]
-    
-    current = remaining[0]
-    next = remaining[1]
-    
-    cur_entry = data.map.get_node_navigation(current.node.uid)
-    
-    if cur_entry is None:
-        logging.warning(f"Missing navigation entry for node {current.node.uid}")
-        return []
-    
-    in_direction = cur_entry.forward if direction == "forward" else cur_entry.backward
-    
-    for node in in_direction:
-        if node.node_id == next.node.uid:
-            so_far = traverse_route_for_direction(remaining[1:], node.direction)
-            if so_far == []: return []
-            return [direction] + so_far 
+    """The direction at each node of the route except the last one, [] if a node has no navigation entry."""
+    directions = []
+    for index in range(len(remaining) - 1):
+        if index == len(remaining) - 2:
+            directions.append(direction)
+            break
         
-    so_far = traverse_route_for_direction(remaining[1:], direction)
-    if so_far == []: return []
-    return [direction] + so_far
+        current = remaining[index]
+        next = remaining[index + 1]
+        
+        cur_entry = data.map.get_node_navigation(current.node.uid)
+        
+        if cur_entry is None:
+            logging.warning(f"Missing navigation entry for node {current.node.uid}")
+            return []
+        
+        directions.append(direction)
+        in_direction = cur_entry.forward if direction == "forward" else cur_entry.backward
+        for node in in_direction:
+            if node.node_id == next.node.uid:
+                direction = node.direction
+                break
+    
+    return directions
 
 def get_directions_until_route_end(route: list[nc.RouteNode], start_direction: Literal["forward", "backward", ""]):
     direction = [start_direction] + traverse_route_for_direction(route, start_direction)
@@ -88,7 +85,7 @@ def get_path_to_destination():
     """Find a path from current position to destination"""
     game_route = data.plugin.modules.Route.run()
     
-    if not game_route or len(game_route) == 0:
+    if game_route is None or len(game_route) == 0:
         return []
     
     if len(game_route) != data.last_length:
@@ -122,9 +119,13 @@ def get_path_to_destination():
 
         success = [node.is_possible for node in route]
         logging.warning(f"Successfully calculated lanes for {sum(success)} out of {len(success)} nodes ({sum(success) / len(success) * 100:.0f}%)")
-        nodes = [node.node for node in route]
+        # Plain values, the Node objects would take the whole node columns with them into the tag.
+        nodes = [(node.node.x, node.node.y, node.node.z) for node in route]
+        uids = []
         node_points = []
         for nav in route:
+            # The points are the road's, otherwise the node's position is used.
+            uids.append(nav.item.uid if type(nav.item) == c.Road else nav.node.uid)
             if type(nav.item) == c.Road:
                 new_points = []
                 points = nav.item.points
@@ -148,6 +149,7 @@ def get_path_to_destination():
                 
         data.navigation_plan = route
         data.plugin.globals.tags.navigation_plan = {
+            "uids": uids,
             "nodes": nodes,
             "points": node_points,
         }
@@ -0,0 +1,566 @@
+"""Route planning over the navigation graph, without the game.
+
+The game's route (Modules/Route) is still what the truck follows, this plans
+routes on our side: between two nodes, or from a position to a company.
+
+The graph has two states per navigation entry, arriving at the node in the
+forward or the backward direction. The forward navigation nodes of an entry are
+the edges out of its forward state, the direction of each navigation node is the
+state at the next node. Edges are stored in CSR form (offsets, targets, weights)
+in `array.array`s, indexing them is fast and the whole map fits in a few dozen MB.
+
+Queries use A* with the straight line distance to the goal as the heuristic. A
+contraction hierarchy can be built on top of the graph, queries on it only search
+a few thousand states no matter how long the route is. It's opt-in: nothing builds
+it unless Router.contract() is called. Building it for the full map (~180k states)
+took 267 s, so it's cached with the rest of the map data once it's built.
+
+tests/test_router.py checks both against a plain Dijkstra on a synthetic grid.
+"""
+from Plugins.Map.utils import data_cache
+import Plugins.Map.classes as c
+import Plugins.Map.data as data
+
+from collections import OrderedDict
+from typing import Literal
+import numpy as np
+import threading
+import logging
+import array
+import heapq
+import math
+import time
+
+CACHE_SIZE = 256
+"""How many planned routes are kept in the route cache."""
+
+WITNESS_SETTLE_LIMIT = 64
+"""How many states a witness search can settle before a shortcut is added anyway."""
+
+HIERARCHY_CACHE = "router"
+"""Name of the contraction hierarchy in the map cache."""
+
+def to_array(typecode: str, values: np.ndarray) -> array.array:
+    return c.to_array(typecode, values)
+
+def state_direction(state: int) -> Literal["forward", "backward"]:
+    return c.DIRECTIONS[state & 1]
+
+class PlannedRoute:
+    node_uids: list[int]
+    """The nodes of the route, from start to goal."""
+    directions: list[Literal["forward", "backward"]]
+    """The direction the truck arrives at each node in."""
+    distance: float
+    """Length of the route according to the navigation graph."""
+    states: list[int]
+
+    def __init__(self, graph: "NavigationGraph", states: list[int], distance: float):
+        self.states = states
+        self.distance = distance
+        self.node_uids = [graph.uids[state >> 1] for state in states]
+        self.directions = [state_direction(state) for state in states]
+
+    def __len__(self) -> int:
+        return len(self.states)
+
+    def json(self) -> dict:
+        return {
+            "nodes": self.node_uids,
+            "directions": self.directions,
+            "distance": self.distance
+        }
+
+# MARK: Graph
+class NavigationGraph:
+    """The navigation entries of the map as a directed graph of (node, direction) states."""
+    uids: array.array
+    x: array.array
+    y: array.array
+    """Position of each entry's node, NaN if the node doesn't exist."""
+    offsets: array.array
+    targets: array.array
+    weights: array.array
+
+    _sorted_uids: np.ndarray
+    _order: np.ndarray
+    _positions: np.ndarray
+
+    def __init__(self, map: c.MapData):
+        columns = map.navigation_columns
+        entries = columns.entries
+        uids = np.array([entry.uid for entry in entries], dtype=np.uint64)
+        starts = np.array([entry._start for entry in entries], dtype=np.int64)
+        middles = np.array([entry._middle for entry in entries], dtype=np.int64)
+        ends = np.array([entry._end for entry in entries], dtype=np.int64)
+
+        self._order = np.argsort(uids)
+        self._sorted_uids = uids[self._order]
+
+        # Every row belongs to the entry it's in, the forward rows come first.
+        rows = np.arange(len(columns))
+        row_entries = np.repeat(np.arange(len(entries)), ends - starts)
+        sources = row_entries * 2 + (rows >= middles[row_entries])
+
+        node_ids = columns.column("node_id")
+        target_entries, found = self.entries_of(node_ids)
+        targets = target_entries * 2 + columns.column("direction")
+        valid = found & (node_ids != uids[row_entries])
+
+        sources, targets = sources[valid], targets[valid]
+        weights = columns.column("distance")[valid]
+        order = np.argsort(sources, kind="stable")
+        offsets = np.concatenate(([0], np.cumsum(np.bincount(sources, minlength=len(entries) * 2))))
+
+        self.uids = to_array("Q", uids)
+        self.offsets = to_array("q", offsets)
+        self.targets = to_array("q", targets[order])
+        self.weights = to_array("d", weights[order])
+
+        node_uids = map.node_columns.column("uid")
+        node_order = np.argsort(node_uids)
+        index = np.clip(np.searchsorted(node_uids[node_order], uids), 0, len(node_uids) - 1)
+        node_rows = node_order[index]
+        node_found = node_uids[node_rows] == uids
+        self._positions = np.where(node_found[:, None], map.node_columns.positions("x", "y")[node_rows], np.nan)
+        self.x = to_array("d", self._positions[:, 0])
+        self.y = to_array("d", self._positions[:, 1])
+
+    @property
+    def state_count(self) -> int:
+        return len(self.offsets) - 1
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.targets)
+
+    def entries_of(self, uids: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Vectorized lookup of the entry index of each node UID.
+
+        :return: (entry indices, whether the node has an entry)
+        """
+        uids = np.asarray(uids, dtype=np.uint64)
+        if len(self._sorted_uids) == 0:
+            return np.zeros(len(uids), dtype=np.int64), np.zeros(len(uids), dtype=np.bool_)
+        index = np.clip(np.searchsorted(self._sorted_uids, uids), 0, len(self._sorted_uids) - 1)
+        return self._order[index].astype(np.int64), self._sorted_uids[index] == uids
+
+    def entry_of(self, uid: int) -> int | None:
+        entries, found = self.entries_of(np.array([uid], dtype=np.uint64))
+        return int(entries[0]) if found[0] else None
+
+    def states_of(self, uid: int, direction: Literal["forward", "backward", ""] = "") -> list[int]:
+        """The states of a node, both directions if no direction is given."""
+        entry = self.entry_of(uid)
+        if entry is None:
+            return []
+        if direction == "":
+            return [entry * 2, entry * 2 + 1]
+        return [entry * 2 + c.DIRECTIONS.index(direction)]
+
+    def closest_entry(self, x: float, z: float) -> int | None:
+        """The entry whose node is closest to the given position."""
+        if len(self._positions) == 0:
+            return None
+        distances = (self._positions[:, 0] - x) ** 2 + (self._positions[:, 1] - z) ** 2
+        entry = int(np.nanargmin(distances))
+        return entry
+
+    def heuristic(self, goals: list[int]):
+        """Straight line distance to the closest of the goal states."""
+        points = {(self.x[state >> 1], self.y[state >> 1]) for state in goals}
+        points = [point for point in points if not math.isnan(point[0])]
+        x, y, hypot = self.x, self.y, math.hypot
+
+        if len(points) == 1:
+            goal_x, goal_y = points[0]
+            def distance(state: int) -> float:
+                entry = state >> 1
+                value = hypot(x[entry] - goal_x, y[entry] - goal_y)
+                return value if value == value else 0 # NaN for nodes without a position
+            return distance
+
+        def distance(state: int) -> float:
+            entry = state >> 1
+            value = min((hypot(x[entry] - goal_x, y[entry] - goal_y) for goal_x, goal_y in points), default=0)
+            return value if value == value else 0
+        return distance
+
+    def astar(self, starts: list[int], goals: list[int]) -> tuple[float, list[int]] | None:
+        """Shortest path from any of the start states to any of the goal states.
+
+        :return: (distance, states) or None if the goals can't be reached.
+        """
+        goal_set = set(goals)
+        heuristic = self.heuristic(goals)
+        offsets, targets, weights = self.offsets, self.targets, self.weights
+
+        distances = {state: 0.0 for state in starts}
+        parents = {state: -1 for state in starts}
+        queue = [(heuristic(state), 0.0, state) for state in starts]
+        heapq.heapify(queue)
+        closed = set()
+
+        while queue:
+            _, distance, state = heapq.heappop(queue)
+            if state in closed:
+                continue
+            if state in goal_set:
+                return distance, self.backtrack(parents, state)
+            closed.add(state)
+
+            for edge in range(offsets[state], offsets[state + 1]):
+                target = targets[edge]
+                new_distance = distance + weights[edge]
+                if new_distance < distances.get(target, math.inf):
+                    distances[target] = new_distance
+                    parents[target] = state
+                    heapq.heappush(queue, (new_distance + heuristic(target), new_distance, target))
+
+        return None
+
+    def backtrack(self, parents: dict[int, int], state: int) -> list[int]:
+        states = []
+        while state != -1:
+            states.append(state)
+            state = parents[state]
+        states.reverse()
+        return states
+
+# MARK: Contraction
+class ContractionHierarchy:
+    """Shortcuts over the navigation graph that let queries skip unimportant states.
+
+    States are contracted from least to most important. Contracting a state adds
+    a shortcut between each pair of its neighbours that has no other path (a
+    witness) of the same length. Queries then only go "up" from both the start and
+    the goal and meet in the middle.
+    """
+    rank: array.array
+    up_offsets: array.array
+    up_targets: array.array
+    up_weights: array.array
+    up_middles: array.array
+    """The contracted state a shortcut goes through, -1 for edges of the original graph."""
+    down_offsets: array.array
+    down_sources: array.array
+    down_weights: array.array
+    down_middles: array.array
+    """Edges from higher to lower ranked states, stored at their target for the backward search."""
+
+    def __init__(self, columns: dict[str, np.ndarray]):
+        for name, typecode in (
+            ("rank", "q"), ("up_offsets", "q"), ("up_targets", "q"), ("up_weights", "d"), ("up_middles", "q"),
+            ("down_offsets", "q"), ("down_sources", "q"), ("down_weights", "d"), ("down_middles", "q")
+        ):
+            setattr(self, name, to_array(typecode, columns[name]))
+
+    @classmethod
+    def build(cls, graph: NavigationGraph, state = None) -> "ContractionHierarchy":
+        """Contract the whole graph, this is slow for the full map (minutes)."""
+        count = graph.state_count
+        outgoing: list[dict[int, float]] = [{} for _ in range(count)]
+        incoming: list[dict[int, float]] = [{} for _ in range(count)]
+        middles: dict[tuple[int, int], int] = {}
+
+        for source in range(count):
+            for edge in range(graph.offsets[source], graph.offsets[source + 1]):
+                target, weight = graph.targets[edge], graph.weights[edge]
+                if target == source or weight >= outgoing[source].get(target, math.inf):
+                    continue
+                outgoing[source][target] = weight
+                incoming[target][source] = weight
+
+        def shortcuts(vertex: int) -> list[tuple[int, int, float]]:
+            """The shortcuts that contracting the vertex needs."""
+            needed = []
+            out = outgoing[vertex]
+            if not out:
+                return needed
+            max_out = max(out.values())
+            for source, in_weight in incoming[vertex].items():
+                limit = in_weight + max_out
+                # Witness search from the source that doesn't go through the vertex.
+                distances = {source: 0.0}
+                queue = [(0.0, source)]
+                settled = 0
+                while queue and settled < WITNESS_SETTLE_LIMIT:
+                    distance, current = heapq.heappop(queue)
+                    if distance > limit:
+                        break
+                    if distance > distances[current]:
+                        continue
+                    settled += 1
+                    for target, weight in outgoing[current].items():
+                        if target == vertex:
+                            continue
+                        new_distance = distance + weight
+                        if new_distance < distances.get(target, math.inf):
+                            distances[target] = new_distance
+                            heapq.heappush(queue, (new_distance, target))
+
+                for target, out_weight in out.items():
+                    if target == source:
+                        continue
+                    if distances.get(target, math.inf) > in_weight + out_weight:
+                        needed.append((source, target, in_weight + out_weight))
+            return needed
+
+        contracted_neighbours = [0] * count
+        def priority(vertex: int, needed: list) -> int:
+            return len(needed) - len(incoming[vertex]) - len(outgoing[vertex]) + contracted_neighbours[vertex]
+
+        queue = [(len(incoming[v]) * len(outgoing[v]) - len(incoming[v]) - len(outgoing[v]), v) for v in range(count)]
+        heapq.heapify(queue)
+        rank = [0] * count
+        up: list[dict[int, float]] = [{} for _ in range(count)]
+        down: list[dict[int, float]] = [{} for _ in range(count)]
+
+        start_time = time.perf_counter()
+        order = 0
+        while queue:
+            _, vertex = heapq.heappop(queue)
+            needed = shortcuts(vertex)
+            current = priority(vertex, needed)
+            if queue and current > queue[0][0]:
+                heapq.heappush(queue, (current, vertex)) # lazy update, something else is cheaper now
+                continue
+
+            rank[vertex] = order
+            order += 1
+
+            # The remaining edges of the vertex all go to states that are contracted later.
+            for target, weight in outgoing[vertex].items():
+                up[vertex][target] = weight
+                del incoming[target][vertex]
+                contracted_neighbours[target] += 1
+            for source, weight in incoming[vertex].items():
+                down[vertex][source] = weight
+                del outgoing[source][vertex]
+                contracted_neighbours[source] += 1
+            outgoing[vertex] = {}
+            incoming[vertex] = {}
+
+            for source, target, weight in needed:
+                if weight < outgoing[source].get(target, math.inf):
+                    outgoing[source][target] = weight
+                    incoming[target][source] = weight
+                    middles[(source, target)] = vertex
+
+            if state is not None and order % 10000 == 0:
+                state.text = f"Building route hierarchy... ({order / count * 100:.0f}%)"
+
+        logging.info(f"Contracted {count} navigation states in {time.perf_counter() - start_time:.1f}s, {len(middles)} shortcuts")
+
+        def flatten(adjacency: list[dict[int, float]], reverse: bool) -> tuple:
+            offsets, others, weights, mids = [0], [], [], []
+            for vertex, edges in enumerate(adjacency):
+                for other, weight in edges.items():
+                    others.append(other)
+                    weights.append(weight)
+                    mids.append(middles.get((other, vertex) if reverse else (vertex, other), -1))
+                offsets.append(len(others))
+            return (np.array(offsets, dtype=np.int64), np.array(others, dtype=np.int64),
+                    np.array(weights, dtype=np.float64), np.array(mids, dtype=np.int64))
+
+        up_offsets, up_targets, up_weights, up_middles = flatten(up, reverse=False)
+        down_offsets, down_sources, down_weights, down_middles = flatten(down, reverse=True)
+        return cls({
+            "rank": np.array(rank, dtype=np.int64),
+            "up_offsets": up_offsets, "up_targets": up_targets, "up_weights": up_weights, "up_middles": up_middles,
+            "down_offsets": down_offsets, "down_sources": down_sources, "down_weights": down_weights, "down_middles": down_middles,
+        })
+
+    def columns(self) -> dict[str, np.ndarray]:
+        return {
+            name: np.frombuffer(getattr(self, name), dtype=np.float64 if name.endswith("weights") else np.int64)
+            for name in ("rank", "up_offsets", "up_targets", "up_weights", "up_middles",
+                         "down_offsets", "down_sources", "down_weights", "down_middles")
+        }
+
+    def search(self, starts: list[int], goals: list[int]) -> tuple[float, list[int]] | None:
+        """Bidirectional upward search, returns the unpacked path like NavigationGraph.astar."""
+        forward = {state: 0.0 for state in starts}
+        backward = {state: 0.0 for state in goals}
+        forward_parents = {state: -1 for state in starts}
+        backward_parents = {state: -1 for state in goals}
+        forward_queue = [(0.0, state) for state in starts]
+        backward_queue = [(0.0, state) for state in goals]
+
+        best, meeting = math.inf, -1
+        for state in starts:
+            if state in backward:
+                best, meeting = 0.0, state
+
+        searches = (
+            (forward_queue, forward, backward, forward_parents, self.up_offsets, self.up_targets, self.up_weights),
+            (backward_queue, backward, forward, backward_parents, self.down_offsets, self.down_sources, self.down_weights),
+        )
+        while forward_queue or backward_queue:
+            progressed = False
+            for queue, distances, other, parents, offsets, targets, weights in searches:
+                if not queue or queue[0][0] >= best:
+                    queue.clear() # nothing in this direction can improve the route anymore
+                    continue
+                progressed = True
+                distance, state = heapq.heappop(queue)
+                if distance > distances[state]:
+                    continue
+                if state in other and distance + other[state] < best:
+                    best, meeting = distance + other[state], state
+                for edge in range(offsets[state], offsets[state + 1]):
+                    target = targets[edge]
+                    new_distance = distance + weights[edge]
+                    if new_distance < distances.get(target, math.inf):
+                        distances[target] = new_distance
+                        parents[target] = state
+                        heapq.heappush(queue, (new_distance, target))
+            if not progressed:
+                break
+
+        if meeting == -1:
+            return None
+
+        path = []
+        state = meeting
+        while state != -1:
+            path.append(state)
+            state = forward_parents[state]
+        path.reverse()
+        state = backward_parents[meeting]
+        while state != -1:
+            path.append(state)
+            state = backward_parents[state]
+
+        return best, self.unpack(path)
+
+    def middle(self, source: int, target: int) -> int:
+        """The state a shortcut from source to target goes through, -1 if it's an original edge."""
+        if self.rank[target] > self.rank[source]:
+            for edge in range(self.up_offsets[source], self.up_offsets[source + 1]):
+                if self.up_targets[edge] == target:
+                    return self.up_middles[edge]
+        else:
+            for edge in range(self.down_offsets[target], self.down_offsets[target + 1]):
+                if self.down_sources[edge] == source:
+                    return self.down_middles[edge]
+        return -1
+
+    def unpack(self, path: list[int]) -> list[int]:
+        """Replace every shortcut in the path with the states it goes through."""
+        if len(path) < 2:
+            return path
+        unpacked = [path[0]]
+        stack = [(path[i], path[i + 1]) for i in range(len(path) - 2, -1, -1)]
+        while stack:
+            source, target = stack.pop()
+            middle = self.middle(source, target)
+            if middle == -1:
+                unpacked.append(target)
+            else:
+                stack.append((middle, target))
+                stack.append((source, middle))
+        return unpacked
+
+# MARK: Router
+class Router:
+    """Plans routes on a map and keeps the most recent ones in an LRU cache."""
+    map: c.MapData
+    graph: NavigationGraph
+    hierarchy: ContractionHierarchy | None
+    cache: OrderedDict[tuple, PlannedRoute | None]
+
+    def __init__(self, map: c.MapData):
+        self.map = map
+        start_time = time.perf_counter()
+        self.graph = NavigationGraph(map)
+        self.hierarchy = None
+        self.cache = OrderedDict()
+        self.lock = threading.Lock()
+        logging.info(f"Built the navigation graph ({self.graph.state_count} states, {self.graph.edge_count} edges) in {time.perf_counter() - start_time:.2f}s")
+
+    def contract(self, state = None) -> None:
+        """Load the contraction hierarchy from the map cache, or build and cache it.
+
+        Opt-in, the router uses A* until this is called. Building the hierarchy for
+        the full map takes minutes, call it from a background thread.
+        """
+        if data_cache.IsValid():
+            try:
+                columns = data_cache.ReadColumns(HIERARCHY_CACHE)
+                if len(columns.get("rank", ())) == self.graph.state_count:
+                    self.hierarchy = ContractionHierarchy(columns)
+                    self.cache.clear()
+                    return
+            except FileNotFoundError:
+                pass
+            except Exception:
+                logging.exception("Failed to read the cached route hierarchy, it will be rebuilt.")
+
+        hierarchy = ContractionHierarchy.build(self.graph, state)
+        if data_cache.IsValid():
+            data_cache.WriteColumns(HIERARCHY_CACHE, hierarchy.columns())
+        with self.lock:
+            self.hierarchy = hierarchy
+            self.cache.clear()
+
+    def plan(self, starts: list[int], goals: list[int]) -> PlannedRoute | None:
+        """Shortest route between any of the start and goal states, cached."""
+        if not starts or not goals:
+            return None
+
+        key = (tuple(sorted(starts)), tuple(sorted(goals)))
+        with self.lock:
+            if key in self.cache:
+                self.cache.move_to_end(key)
+                return self.cache[key]
+
+            searcher = self.hierarchy.search if self.hierarchy is not None else self.graph.astar
+            result = searcher(starts, goals)
+            route = PlannedRoute(self.graph, result[1], result[0]) if result is not None else None
+
+            self.cache[key] = route
+            if len(self.cache) > CACHE_SIZE:
+                self.cache.popitem(last=False)
+            return route
+
+    def route(self, start_uid: int, goal_uid: int,
+              start_direction: Literal["forward", "backward", ""] = "") -> PlannedRoute | None:
+        """Route from one node to another.
+
+        :param str start_direction: The direction the truck is driving in at the start node, both if empty.
+        """
+        return self.plan(self.graph.states_of(start_uid, start_direction), self.graph.states_of(goal_uid))
+
+    def company_states(self, company: c.CompanyItem) -> list[int]:
+        """The entrance of the company, or the nodes of its prefab if the entrance isn't in the graph."""
+        states = self.graph.states_of(company.node_uid)
+        if states:
+            return states
+        prefab = self.map.get_item_by_uid(company.prefab_uid, warn_errors=False)
+        if prefab is None:
+            return []
+        return [state for uid in prefab.node_uids for state in self.graph.states_of(uid)]
+
+    def route_to_company(self, x: float, z: float, token: str, city_token: str) -> PlannedRoute | None:
+        """Route from the node closest to a position to a company in a city."""
+        company = self.map.get_company_item_by_token_and_city(token, city_token)
+        if company is None:
+            logging.warning(f"Company {token} in {city_token} not found")
+            return None
+
+        entry = self.graph.closest_entry(x, z)
+        if entry is None:
+            return None
+        return self.plan([entry * 2, entry * 2 + 1], self.company_states(company))
+
+router: Router | None = None
+
+def get_router() -> Router | None:
+    """The router of the currently loaded map, built on first use. Doesn't build the contraction hierarchy, see Router.contract."""
+    global router
+    if data.map is None:
+        return None
+    if router is None or router.map is not data.map:
+        router = Router(data.map)
+    return router
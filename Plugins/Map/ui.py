@@ -55,6 +55,13 @@ class SettingsMenu(ETS2LAPage):
             value = not settings.Get("Map", "DriveBasedOnTrailer", True)
         settings.Set("Map", "DriveBasedOnTrailer", value)
         
+    def handle_precompute_lanes(self, *args):
+        if args:
+            value = args[0]
+        else:
+            value = not settings.Get("Map", "PrecomputeLanes", True)
+        settings.Set("Map", "PrecomputeLanes", value)
+        
     def handle_steering_smooth_time(self, *args):
         if args:
             value = args[0]
@@ -129,6 +136,12 @@ class SettingsMenu(ETS2LAPage):
                     default=settings.Get("Map", "DriveBasedOnTrailer", True),
                     changed=self.handle_drive_based_on_trailer,
                 )
+                CheckboxWithTitleDescription(
+                    title=_("Precompute Lanes"),
+                    description=_("When enabled map will calculate the roads ahead of the truck in the background, so that entering a new area doesn't cause a lag spike."),
+                    default=settings.Get("Map", "PrecomputeLanes", True),
+                    changed=self.handle_precompute_lanes,
+                )
                 SliderWithTitleDescription(
                     title=_("Steering Smoothness"),
                     description=_("Set the time we average the steering data over. A value of 0.5 means that the steering from the last half a second is used to calculate the current value."),
@@ -0,0 +1,277 @@
+"""Binary columnar cache for the map data.
+
+The first load parses the JSON files and computes the sectors and the
+navigation graph. The results are written here as one `.npy` file per column
+so that later startups can memory map them instead of parsing and computing
+everything again. The cache is invalidated whenever the data files change.
+"""
+from Plugins.Map.utils.data_parser import Offsets, Strings, UIDs
+from Plugins.Map import classes as c
+import itertools
+import numpy as np
+import logging
+import hashlib
+import shutil
+import json
+import os
+
+CACHE_VERSION = 3
+"""Increment this whenever the layout or meaning of the cached columns changes."""
+CACHE_FOLDER = "cache"
+"""Name of the cache folder inside the data folder."""
+
+path = "Plugins/Map/data"
+
+def GetCachePath() -> str:
+    return os.path.join(path, CACHE_FOLDER)
+
+def GetCacheKey() -> str:
+    """Hash of the config.json contents and the name, size and
+    modification time of every data file.
+    """
+    key = hashlib.sha1()
+    key.update(str(CACHE_VERSION).encode())
+    key.update(f"{c.MapData._sector_width}x{c.MapData._sector_height}".encode())
+
+    config = os.path.join(path, "config.json")
+    if os.path.exists(config):
+        with open(config, "rb") as f:
+            key.update(f.read())
+
+    for file in sorted(os.listdir(path)):
+        if file == CACHE_FOLDER:
+            continue
+        stat = os.stat(os.path.join(path, file))
+        key.update(f"{file}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+
+    return key.hexdigest()
+
+def IsValid() -> bool:
+    """Check whether the cache exists and matches the current data."""
+    meta = os.path.join(GetCachePath(), "meta.json")
+    if not os.path.exists(meta):
+        return False
+
+    try:
+        with open(meta, "r") as f:
+            meta = json.load(f)
+        return meta["version"] == CACHE_VERSION and meta["key"] == GetCacheKey()
+    except Exception:
+        logging.warning("Failed to read the map cache metadata, the cache will be rebuilt.")
+        return False
+
+def Clear() -> None:
+    cache_path = GetCachePath()
+    if os.path.exists(cache_path):
+        shutil.rmtree(cache_path)
+
+def WriteColumns(name: str, columns: dict[str, np.ndarray]) -> None:
+    folder = os.path.join(GetCachePath(), name)
+    os.makedirs(folder, exist_ok=True)
+    for column, array in columns.items():
+        np.save(os.path.join(folder, column + ".npy"), array, allow_pickle=False)
+
+def ReadColumns(name: str) -> dict[str, np.ndarray]:
+    """Memory map all the columns of a category."""
+    folder = os.path.join(GetCachePath(), name)
+    columns = {}
+    for file in os.listdir(folder):
+        if file.endswith(".npy"):
+            columns[file[:-4]] = np.load(os.path.join(folder, file), mmap_mode="r", allow_pickle=False)
+    return columns
+
+# MARK: Writing
+
+def WriteNodes(nodes: c.NodeColumns) -> None:
+    columns = {name: nodes.column(name) for name in nodes.types}
+    columns["rotation_quat"] = columns["rotation_quat"].reshape(-1, 4)
+    WriteColumns("nodes", columns)
+
+def WriteRoads(roads: list[c.Road]) -> None:
+    railings = [railing for road in roads for railing in road.railings]
+    WriteColumns("roads", {
+        "uid": UIDs([road.uid for road in roads]),
+        "x": np.array([road.x for road in roads], dtype=np.float64),
+        "y": np.array([road.y for road in roads], dtype=np.float64),
+        "sector_x": np.array([road.sector_x for road in roads], dtype=np.int32),
+        "sector_y": np.array([road.sector_y for road in roads], dtype=np.int32),
+        "dlc_guard": np.array([road.dlc_guard for road in roads], dtype=np.int32),
+        "hidden": np.array([road.hidden for road in roads], dtype=np.bool_),
+        "road_look_token": Strings([road.road_look_token for road in roads]),
+        "start_node_uid": UIDs([road.start_node_uid for road in roads]),
+        "end_node_uid": UIDs([road.end_node_uid for road in roads]),
+        "length": np.array([road.length for road in roads], dtype=np.float64),
+        "maybe_divided": np.array([bool(road.maybe_divided) for road in roads], dtype=np.bool_),
+        "railing_offsets": Offsets([len(road.railings) for road in roads]),
+        "right_railing": Strings([railing.right_railing for railing in railings]),
+        "right_railing_offset": np.array([railing.right_railing_offset for railing in railings], dtype=np.float64),
+        "left_railing": Strings([railing.left_railing for railing in railings]),
+        "left_railing_offset": np.array([railing.left_railing_offset for railing in railings], dtype=np.float64),
+    })
+
+def WritePrefabs(prefabs: list[c.Prefab]) -> None:
+    WriteColumns("prefabs", {
+        "uid": UIDs([prefab.uid for prefab in prefabs]),
+        "x": np.array([prefab.x for prefab in prefabs], dtype=np.float64),
+        "y": np.array([prefab.y for prefab in prefabs], dtype=np.float64),
+        "z": np.array([prefab.z for prefab in prefabs], dtype=np.float64),
+        "sector_x": np.array([prefab.sector_x for prefab in prefabs], dtype=np.int32),
+        "sector_y": np.array([prefab.sector_y for prefab in prefabs], dtype=np.int32),
+        "dlc_guard": np.array([prefab.dlc_guard for prefab in prefabs], dtype=np.int32),
+        "hidden": np.array([bool(prefab.hidden) for prefab in prefabs], dtype=np.bool_),
+        "token": Strings([prefab.token for prefab in prefabs]),
+        "node_offsets": Offsets([len(prefab.node_uids) for prefab in prefabs]),
+        "node_uids": UIDs([uid for prefab in prefabs for uid in prefab.node_uids]),
+        "origin_node_index": np.array([prefab.origin_node_index for prefab in prefabs], dtype=np.int32),
+    })
+
+def WriteNavigation(navigation: c.NavigationColumns) -> None:
+    starts = np.array([entry._start for entry in navigation.entries], dtype=np.int64)
+    middles = np.array([entry._middle for entry in navigation.entries], dtype=np.int64)
+    ends = np.array([entry._end for entry in navigation.entries], dtype=np.int64)
+    
+    # The rows are stored per entry with the forward ones first.
+    rows = np.arange(len(navigation))
+    entry = np.repeat(np.arange(len(starts)), ends - starts)
+    forward = rows < middles[entry] if len(rows) > 0 else np.zeros(0, dtype=np.bool_)
+    
+    lane_indices = [lanes or [] for lanes in navigation.lane_indices]
+    WriteColumns("navigation", {
+        "uid": UIDs([entry.uid for entry in navigation.entries]),
+        "entry_offsets": Offsets((ends - starts).tolist()),
+        "forward": forward,
+        "node_id": navigation.column("node_id"),
+        "distance": navigation.column("distance"),
+        "direction": np.array(c.DIRECTIONS, dtype=np.str_)[navigation.column("direction")],
+        "is_one_lane_road": navigation.column("is_one_lane_road").astype(np.bool_),
+        "dlc_guard": navigation.column("dlc_guard"),
+        "item_uid": navigation.column("item_uid"),
+        "item_type": navigation.column("item_type"),
+        "lane_offsets": Offsets([len(lanes) for lanes in lane_indices]),
+        "lane_indices": np.array([lane for lanes in lane_indices for lane in lanes], dtype=np.int32),
+    })
+
+def WriteCache(map: c.MapData) -> bool:
+    """Write the nodes, roads, prefabs and navigation graph to the cache.
+    The metadata is written last so that an interrupted write is never
+    treated as a valid cache.
+    """
+    try:
+        Clear()
+        WriteNodes(map.node_columns)
+        WriteRoads(map.roads)
+        WritePrefabs(map.prefabs)
+        WriteNavigation(map.navigation_columns)
+        with open(os.path.join(GetCachePath(), "meta.json"), "w") as f:
+            json.dump({"version": CACHE_VERSION, "key": GetCacheKey()}, f, indent=4)
+        return True
+    except Exception:
+        logging.exception("Failed to write the map cache.")
+        Clear()
+        return False
+
+# MARK: Reading
+
+def Sectors(columns: dict[str, np.ndarray]) -> tuple:
+    """The sector columns, or zeros if they haven't been calculated yet."""
+    if "sector_x" in columns:
+        return columns["sector_x"].tolist(), columns["sector_y"].tolist()
+    return itertools.repeat(0), itertools.repeat(0)
+
+def NodesFromColumns(columns: dict[str, np.ndarray]) -> c.NodeColumns:
+    return c.NodeColumns(len(columns.get("uid", ())), **columns)
+
+def RoadsFromColumns(columns: dict[str, np.ndarray]) -> list[c.Road]:
+    sectors_x, sectors_y = Sectors(columns)
+    railing_offsets = columns["railing_offsets"].tolist()
+    railings = [
+        c.Railing(right, right_offset, left, left_offset) for right, right_offset, left, left_offset in zip(
+            columns["right_railing"].tolist(), columns["right_railing_offset"].tolist(),
+            columns["left_railing"].tolist(), columns["left_railing_offset"].tolist()
+        )
+    ]
+
+    roads: list[c.Road] = []
+    for i, (uid, x, y, sector_x, sector_y, dlc_guard, hidden, token, start_node, end_node, length, maybe_divided) in enumerate(zip(
+        columns["uid"].tolist(), columns["x"].tolist(), columns["y"].tolist(),
+        sectors_x, sectors_y,
+        columns["dlc_guard"].tolist(), columns["hidden"].tolist(), columns["road_look_token"].tolist(),
+        columns["start_node_uid"].tolist(), columns["end_node_uid"].tolist(),
+        columns["length"].tolist(), columns["maybe_divided"].tolist()
+    )):
+        roads.append(c.Road(
+            uid, x, y, sector_x, sector_y, dlc_guard, hidden, token,
+            start_node, end_node, length, maybe_divided,
+            railings[railing_offsets[i]:railing_offsets[i + 1]]
+        ))
+
+    return roads
+
+def PrefabsFromColumns(columns: dict[str, np.ndarray]) -> list[c.Prefab]:
+    sectors_x, sectors_y = Sectors(columns)
+    node_offsets = columns["node_offsets"].tolist()
+    node_uids = columns["node_uids"].tolist()
+
+    prefabs: list[c.Prefab] = []
+    for i, (uid, x, y, z, sector_x, sector_y, dlc_guard, hidden, token, origin_node_index) in enumerate(zip(
+        columns["uid"].tolist(), columns["x"].tolist(), columns["y"].tolist(), columns["z"].tolist(),
+        sectors_x, sectors_y,
+        columns["dlc_guard"].tolist(), columns["hidden"].tolist(), columns["token"].tolist(),
+        columns["origin_node_index"].tolist()
+    )):
+        prefabs.append(c.Prefab(
+            uid, x, y, z, sector_x, sector_y, dlc_guard, hidden, token,
+            node_uids[node_offsets[i]:node_offsets[i + 1]],
+            origin_node_index
+        ))
+
+    return prefabs
+
+def NavigationFromColumns(columns: dict[str, np.ndarray]) -> c.NavigationColumns:
+    """Build the navigation graph. The item and lane data is only set if
+    the columns include it (ie. they come from the cache), otherwise
+    compute_navigation_data() still has to be run.
+    """
+    entry_offsets = columns.get("entry_offsets", np.zeros(1, dtype=np.int64))
+    forward = columns.get("forward", np.zeros(0, dtype=np.bool_))
+    # The forward nodes are stored first in every entry.
+    forward_counts = np.concatenate(([0], np.cumsum(forward, dtype=np.int64)))
+    starts = entry_offsets[:-1]
+    middles = starts + forward_counts[entry_offsets[1:]] - forward_counts[starts]
+
+    arrays = {name: columns[name] for name in c.NavigationColumns.types if name in columns}
+    if "direction" in columns:
+        arrays["direction"] = np.asarray(columns["direction"]) == c.DIRECTIONS[1]
+
+    if "lane_offsets" in columns:
+        lane_offsets = columns["lane_offsets"].tolist()
+        lane_indices = columns["lane_indices"].tolist()
+        arrays["lane_indices"] = [
+            lane_indices[start:end] if end > start else None 
+            for start, end in zip(lane_offsets[:-1], lane_offsets[1:])
+        ]
+
+    return c.NavigationColumns(
+        len(forward), columns.get("uid", np.zeros(0, dtype=np.uint64)).tolist(),
+        starts.tolist(), middles.tolist(), entry_offsets[1:].tolist(), **arrays
+    )
+
+def ElevationsFromColumns(columns: dict[str, np.ndarray]) -> c.ElevationColumns:
+    # The files store the points as (x, z, y).
+    points = columns.get("points", np.zeros((0, 3)))
+    return c.ElevationColumns(len(points), x=points[:, 0], y=points[:, 2], z=points[:, 1])
+
+def ReadNodes() -> c.NodeColumns:
+    return NodesFromColumns(ReadColumns("nodes"))
+
+def ReadRoads() -> list[c.Road]:
+    return RoadsFromColumns(ReadColumns("roads"))
+
+def ReadPrefabs() -> list[c.Prefab]:
+    return PrefabsFromColumns(ReadColumns("prefabs"))
+
+def ReadNavigation() -> c.NavigationColumns:
+    """Read the navigation graph including the precomputed item and
+    lane data, compute_navigation_data() doesn't need to be run after this.
+    """
+    return NavigationFromColumns(ReadColumns("navigation"))
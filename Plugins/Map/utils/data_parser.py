@@ -0,0 +1,236 @@
+"""Parallel JSON parsing for the map data.
+
+The large categories (nodes, navigation graph, elevations, roads and prefabs)
+are parsed in separate worker processes. Each worker converts one JSON file to
+numpy columns in the same layout as the map cache (see `data_cache`) and saves
+them to a temporary folder, the plugin process then only has to build the
+objects from the columns.
+
+The plugin runs inside a daemonic process which is not allowed to have child
+processes of its own, so the workers are started as separate interpreters with
+`subprocess` instead of `multiprocessing`. This module is also the worker entry
+point and only imports what is needed for parsing to keep the startup fast:
+
+    python -m Plugins.Map.utils.data_parser <category> <file> <output folder>
+"""
+import concurrent.futures
+import numpy as np
+import subprocess
+import tempfile
+import logging
+import shutil
+import orjson
+import json
+import time
+import sys
+import os
+
+# MARK: Columns
+
+def Offsets(lengths: list[int]) -> np.ndarray:
+    """CSR style offsets, the items of row i are at offsets[i]:offsets[i+1]."""
+    offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    return offsets
+
+def Strings(values: list[str]) -> np.ndarray:
+    return np.array([value if value is not None else "" for value in values], dtype=np.str_)
+
+def UIDs(values: list[int | None]) -> np.ndarray:
+    return np.array([value if value is not None else 0 for value in values], dtype=np.uint64)
+
+def ParseUID(value: int | str | None) -> int | None:
+    """Same as `classes.parse_string_to_int`, the uids in the files are hex strings."""
+    if value is None: return None
+    if type(value) == int: return value
+    return int(value, 16)
+
+def SaveColumns(folder: str, columns: dict[str, np.ndarray]) -> None:
+    os.makedirs(folder, exist_ok=True)
+    for column, array in columns.items():
+        np.save(os.path.join(folder, column + ".npy"), array, allow_pickle=False)
+
+def LoadColumns(folder: str) -> dict[str, np.ndarray]:
+    """Load the columns fully into memory, the folder can be deleted afterwards."""
+    columns = {}
+    for file in os.listdir(folder):
+        if file.endswith(".npy"):
+            columns[file[:-4]] = np.load(os.path.join(folder, file), allow_pickle=False)
+    return columns
+
+def ReadJSON(path: str) -> list:
+    with open(path, "rb") as f:
+        content = f.read()
+    try:
+        return orjson.loads(content)
+    except orjson.JSONDecodeError:
+        return json.loads(content)
+
+# MARK: Parsers
+
+def ParseNodes(file: list[dict]) -> dict[str, np.ndarray]:
+    return {
+        "uid": UIDs([ParseUID(node["uid"]) for node in file]),
+        "x": np.array([node["x"] for node in file], dtype=np.float64),
+        "y": np.array([node["y"] for node in file], dtype=np.float64),
+        "z": np.array([node["z"] for node in file], dtype=np.float64),
+        "rotation": np.array([node["rotation"] for node in file], dtype=np.float64),
+        "rotation_quat": np.array([node["rotationQuat"] for node in file], dtype=np.float64).reshape(-1, 4),
+        "forward_item_uid": UIDs([ParseUID(node["forwardItemUid"]) for node in file]),
+        "backward_item_uid": UIDs([ParseUID(node["backwardItemUid"]) for node in file]),
+        "forward_country_id": np.array([ParseUID(node["forwardCountryId"]) or 0 for node in file], dtype=np.int64),
+        "backward_country_id": np.array([ParseUID(node["backwardCountryId"]) or 0 for node in file], dtype=np.int64),
+    }
+
+def ParseNavigation(file: list) -> dict[str, np.ndarray]:
+    nodes: list[dict] = []
+    forward: list[bool] = []
+    lengths: list[int] = []
+    for entry in file:
+        nodes += entry[1]["forward"]
+        nodes += entry[1]["backward"]
+        forward += [True] * len(entry[1]["forward"]) + [False] * len(entry[1]["backward"])
+        lengths.append(len(entry[1]["forward"]) + len(entry[1]["backward"]))
+
+    return {
+        "uid": UIDs([ParseUID(entry[0]) for entry in file]),
+        "entry_offsets": Offsets(lengths),
+        "forward": np.array(forward, dtype=np.bool_),
+        "node_id": UIDs([ParseUID(node["nodeUid"] if "nodeUid" in node else node["nodeId"]) for node in nodes]),
+        "distance": np.array([node["distance"] for node in nodes], dtype=np.float64),
+        "direction": Strings([node["direction"] for node in nodes]),
+        "is_one_lane_road": np.array([bool(node.get("isOneLaneRoad", False)) for node in nodes], dtype=np.bool_),
+        "dlc_guard": np.array([node["dlcGuard"] for node in nodes], dtype=np.int32),
+    }
+
+def ParseElevations(file: list) -> dict[str, np.ndarray]:
+    return {
+        "points": np.array(file, dtype=np.float64).reshape(-1, 3),
+    }
+
+def ParseRoads(file: list[dict]) -> dict[str, np.ndarray]:
+    railings = [railing for road in file for railing in road.get("railings", [])]
+    return {
+        "uid": UIDs([ParseUID(road["uid"]) for road in file]),
+        "x": np.array([road["x"] for road in file], dtype=np.float64),
+        "y": np.array([road["y"] for road in file], dtype=np.float64),
+        "dlc_guard": np.array([int(road.get("dlcGuard", -1)) for road in file], dtype=np.int32),
+        "hidden": np.array([bool(road.get("hidden", False)) for road in file], dtype=np.bool_),
+        "road_look_token": Strings([road["roadLookToken"] for road in file]),
+        "start_node_uid": UIDs([ParseUID(road["startNodeUid"]) for road in file]),
+        "end_node_uid": UIDs([ParseUID(road["endNodeUid"]) for road in file]),
+        "length": np.array([road["length"] for road in file], dtype=np.float64),
+        "maybe_divided": np.array([bool(road.get("maybeDivided", False)) for road in file], dtype=np.bool_),
+        "railing_offsets": Offsets([len(road.get("railings", [])) for road in file]),
+        "right_railing": Strings([railing["rightRailing"] for railing in railings]),
+        "right_railing_offset": np.array([railing["rightRailingOffset"] for railing in railings], dtype=np.float64),
+        "left_railing": Strings([railing["leftRailing"] for railing in railings]),
+        "left_railing_offset": np.array([railing["leftRailingOffset"] for railing in railings], dtype=np.float64),
+    }
+
+def ParsePrefabs(file: list[dict]) -> dict[str, np.ndarray]:
+    return {
+        "uid": UIDs([ParseUID(prefab["uid"]) for prefab in file]),
+        "x": np.array([prefab["x"] for prefab in file], dtype=np.float64),
+        "y": np.array([prefab["y"] for prefab in file], dtype=np.float64),
+        "z": np.array([prefab.get("z", 0) for prefab in file], dtype=np.float64),
+        "dlc_guard": np.array([prefab["dlcGuard"] for prefab in file], dtype=np.int32),
+        "hidden": np.array([bool(prefab.get("hidden", False)) for prefab in file], dtype=np.bool_),
+        "token": Strings([prefab["token"] for prefab in file]),
+        "node_offsets": Offsets([len(prefab["nodeUids"]) for prefab in file]),
+        "node_uids": UIDs([ParseUID(uid) for prefab in file for uid in prefab["nodeUids"]]),
+        "origin_node_index": np.array([prefab["originNodeIndex"] for prefab in file], dtype=np.int32),
+    }
+
+PARSERS = {
+    "nodes": ParseNodes,
+    "graph": ParseNavigation,
+    "elevation": ParseElevations,
+    "roads": ParseRoads,
+    "prefabs": ParsePrefabs,
+}
+"""Category (as found in the file name) -> parser."""
+
+# MARK: Pool
+
+CREATION_FLAGS = subprocess.CREATE_NO_WINDOW if os.name == "nt" else 0
+"""Don't open a console window for every worker on Windows."""
+
+def GetWorkerCount() -> int:
+    """Leave one core for the plugin process, it builds the objects
+    and reads the smaller categories while the workers are running.
+    """
+    return max(1, (os.cpu_count() or 2) - 1)
+
+def UseWorkers() -> bool:
+    """With two cores or less a worker would only take time from the plugin
+    process, and starting the interpreter costs more than it saves.
+    """
+    return (os.cpu_count() or 1) > 2
+
+def ParseInProcess(category: str, path: str) -> dict[str, np.ndarray]:
+    return PARSERS[category](ReadJSON(path))
+
+def Parse(category: str, path: str) -> tuple[dict[str, np.ndarray], float]:
+    """Parse a file in a worker process and return the columns and the time it took.
+    Falls back to parsing in this process if the worker fails for any reason.
+    """
+    start_time = time.perf_counter()
+    if not UseWorkers():
+        return ParseInProcess(category, path), time.perf_counter() - start_time
+
+    folder = tempfile.mkdtemp(prefix=f"ets2la_map_{category}_")
+    try:
+        result = subprocess.run(
+            [sys.executable, "-m", "Plugins.Map.utils.data_parser", category, path, folder],
+            cwd=os.getcwd(), capture_output=True, creationflags=CREATION_FLAGS
+        )
+        if result.returncode == 0:
+            return LoadColumns(folder), time.perf_counter() - start_time
+
+        logging.warning(f"Map data worker for {category} failed, parsing in the plugin process instead.\n{result.stderr.decode(errors='ignore')}")
+    except Exception:
+        logging.exception(f"Failed to start the map data worker for {category}, parsing in the plugin process instead.")
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+    return ParseInProcess(category, path), time.perf_counter() - start_time
+
+class ParsePool:
+    """Parses the given categories in the background.
+
+    Each worker is waited on by a thread, the threads spend all their time
+    blocked on the subprocess so they don't compete with the plugin for the GIL.
+    Without workers (see `UseWorkers`) the categories are parsed one after
+    the other by a single thread.
+    """
+    executor: concurrent.futures.ThreadPoolExecutor
+    futures: dict[concurrent.futures.Future, str]
+
+    def __init__(self, files: dict[str, str]):
+        """
+        :param dict[str, str] files: Category -> path to the JSON file.
+        """
+        self.executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=min(len(files), GetWorkerCount()) or 1,
+            thread_name_prefix="Map Parser"
+        )
+        # Largest files first so that the longest job isn't started last.
+        order = sorted(files, key=lambda category: os.path.getsize(files[category]), reverse=True)
+        self.futures = {
+            self.executor.submit(Parse, category, files[category]): category
+            for category in order
+        }
+
+    def as_completed(self):
+        """Yield (category, columns, seconds) as the categories finish."""
+        try:
+            for future in concurrent.futures.as_completed(self.futures):
+                columns, seconds = future.result()
+                yield self.futures[future], columns, seconds
+        finally:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+
+if __name__ == "__main__":
+    category, path, folder = sys.argv[1:4]
+    SaveColumns(folder, ParseInProcess(category, path))
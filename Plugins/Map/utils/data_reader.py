@@ -1,8 +1,12 @@
 """Data reader utilities for map plugin."""
 from Plugins.Map.utils import data_handler
+from Plugins.Map.utils import data_parser
+from Plugins.Map.utils import data_cache
 from Plugins.Map import classes as c
 import Plugins.Map.data as data
+import ETS2LA.variables as variables
 from rich import print
+import orjson
 import psutil
 import time
 import os
@@ -21,102 +25,6 @@ def TryReadExcept(data: dict, key: str, default: any) -> any:
     except KeyError:
         return default
 
-def ReadNodes() -> list[c.Node]:
-    path = FindCategoryFilePath("nodes")
-    if path is None: return []
-    nodes: list[c.Node] = []
-    file = data_handler.ReadData(path)
-    for node in file:
-        nodes.append(c.Node(
-            node["uid"],
-            node["x"],
-            node["y"],
-            node["z"],
-            node["rotation"],
-            node["rotationQuat"],
-            node["forwardItemUid"],
-            node["backwardItemUid"],
-            0,
-            0,
-            node["forwardCountryId"],
-            node["backwardCountryId"],
-        ))
-
-    return nodes
-
-def ReadNodeGraph() -> list[c.NavigationEntry]: # None since this will just update the existing nodes
-    path = FindCategoryFilePath("graph")
-    if path is None: return []
-    graph: list[c.NavigationEntry] = []
-    file = data_handler.ReadData(path)
-    for entry in file:
-        graph.append(c.NavigationEntry(
-            entry[0],
-            [c.NavigationNode(
-                node["nodeUid"] if "nodeUid" in node else node["nodeId"],
-                node["distance"],
-                node["direction"],
-                bool(TryReadExcept(node, "isOneLaneRoad", False)),
-                node["dlcGuard"],
-            ) for node in entry[1]["forward"]],
-            [c.NavigationNode(
-                node["nodeUid"] if "nodeUid" in node else node["nodeId"],
-                node["distance"],
-                node["direction"],
-                bool(TryReadExcept(node, "isOneLaneRoad", False)),
-                node["dlcGuard"],
-            ) for node in entry[1]["backward"]],
-        ))
-    
-    return graph
-
-def ReadElevations() -> list[tuple[float, float, float]]:
-    path = FindCategoryFilePath("elevation")
-    if path is None: return []
-    elevations: list[tuple[float, float, float]] = []
-    file = data_handler.ReadData(path)
-    for elevation in file:
-        elevations.append(
-            c.Elevation(
-                elevation[0],
-                elevation[2],
-                elevation[1]
-            )
-        )
-
-    return elevations
-
-def ReadRoads() -> list[c.Road]:
-    path = FindCategoryFilePath("roads")
-    if path is None: return []
-    roads: list[c.Road] = []
-    file = data_handler.ReadData(path)
-    for road in file:
-        roads.append(c.Road(
-            road["uid"],
-            road["x"],
-            road["y"],
-            0,
-            0,
-            int(TryReadExcept(road, "dlcGuard", -1)),
-            bool(TryReadExcept(road, "hidden", False)),
-            road["roadLookToken"],
-            road["startNodeUid"],
-            road["endNodeUid"],
-            road["length"],
-            TryReadExcept(road, "maybeDivided", False),
-            [
-                c.Railing(
-                    railing["rightRailing"],
-                    railing["rightRailingOffset"],
-                    railing["leftRailing"],
-                    railing["leftRailingOffset"]
-                ) for railing in TryReadExcept(road, "railings", [])
-            ]
-        ))
-
-    return roads
-
 def ReadRoadLooks() -> list[c.RoadLook]:
     path = FindCategoryFilePath("roadLooks")
     if path is None: return []
@@ -136,168 +44,143 @@ def ReadRoadLooks() -> list[c.RoadLook]:
 
     return road_looks
 
-def ReadPrefabs() -> list[c.Prefab]:
-    path = FindCategoryFilePath("prefabs")
-    if path is None: return []
-    prefabs: list[c.Prefab] = []
-    file = data_handler.ReadData(path)
-    for prefab in file:
-        prefabs.append(c.Prefab(
-            prefab["uid"],
-            prefab["x"],
-            prefab["y"],
-            TryReadExcept(prefab, "z", 0),
-            0,
-            0,
-            prefab["dlcGuard"],
-            TryReadExcept(prefab, "hidden", False),
-            prefab["token"],
-            [uid for uid in prefab["nodeUids"]],
-            prefab["originNodeIndex"],
-        ))
-
-    return prefabs
-
-import concurrent.futures
+def BuildPrefabDescription(record: bytes) -> c.PrefabDescription:
+    prefab_description = orjson.loads(record)
+    # TODO: Read signs!
+    return c.PrefabDescription(
+        prefab_description["token"],
+        # nodes
+        [
+            c.PrefabNode(
+                node["x"],
+                node["y"],
+                node["z"],
+                node["rotation"],
+                TryReadExcept(node, "inputLanes", []),
+                TryReadExcept(node, "outputLanes", []),
+            )
+            for node in prefab_description["nodes"]
+        ],
+        # map points
+        [
+            c.RoadMapPoint(
+                point["x"],
+                point["y"],
+                point["z"],
+                point["neighbors"],
+                point["lanesLeft"],
+                point["lanesRight"],
+                point["offset"],
+                c.NavNode(
+                    point["navNode"]["node0"],
+                    point["navNode"]["node1"],
+                    point["navNode"]["node2"],
+                    point["navNode"]["node3"],
+                    point["navNode"]["node4"],
+                    point["navNode"]["node5"],
+                    point["navNode"]["node6"],
+                    point["navNode"]["nodeCustom"],
+                ),
+                c.NavFlags(
+                    point["navFlags"]["isStart"],
+                    point["navFlags"]["isExit"],
+                    point["navFlags"]["isBase"],
+                ),
+            )
+            if point["type"] == "road"
+            else c.PolygonMapPoint(
+                point["x"],
+                point["y"],
+                point["z"],
+                point["neighbors"],
+                point["color"],
+                point["roadOver"],
+            )
+            if point["type"] == "polygon"
+            else None
+            for point in prefab_description["mapPoints"]
+        ],
+        # spawn points
+        [
+            c.PrefabSpawnPoints(
+                spawn_point["x"],
+                spawn_point["y"],
+                TryReadExcept(spawn_point, "z", 0),
+                spawn_point["type"],
+            )
+            for spawn_point in prefab_description["spawnPoints"]
+        ],
+        # trigger points
+        [
+            c.PrefabTriggerPoint(
+                trigger_point["x"],
+                trigger_point["y"],
+                TryReadExcept(trigger_point, "z", 0),
+                trigger_point["action"],
+            )
+            for trigger_point in prefab_description["triggerPoints"]
+        ],
+        # nav curves
+        [
+            c.PrefabNavCurve(
+                curve["navNodeIndex"],
+                c.Transform(
+                    curve["start"]["x"],
+                    curve["start"]["y"],
+                    curve["start"]["z"],
+                    curve["start"]["rotation"],
+                ),
+                c.Transform(
+                    curve["end"]["x"],
+                    curve["end"]["y"],
+                    curve["end"]["z"],
+                    curve["end"]["rotation"],
+                ),
+                curve["nextLines"],
+                curve["prevLines"],
+                TryReadExcept(curve, "semaphoreId", -1)
+            )
+            for curve in prefab_description["navCurves"]
+        ],
+        # nav nodes
+        [
+            c.PrefabNavNode(
+                node["type"],
+                node["endIndex"],
+                [
+                    c.NavNodeConnection(
+                        connection["targetNavNodeIndex"],
+                        connection["curveIndices"],
+                    )
+                    for connection in node["connections"]
+                ],
+            )
+            for node in prefab_description["navNodes"]
+        ],
+        [
+            c.Semaphore(
+                semaphore["x"],
+                semaphore["y"],
+                semaphore["z"],
+                semaphore["rotation"],
+                semaphore["type"],
+                semaphore["id"],
+            )
+            for semaphore in TryReadExcept(prefab_description, "semaphores", [])
+        ]
+    )
 
-def ReadPrefabDescriptions() -> list[c.PrefabDescription]:
+def ReadPrefabDescriptions() -> c.PrefabDescriptionStore:
+    """The descriptions are kept as raw records, PrefabDescriptionStore builds them when they are needed."""
     path = FindCategoryFilePath("prefabDescriptions")
     if path is None:
-        return []
+        return c.PrefabDescriptionStore({}, BuildPrefabDescription)
 
-    prefab_data_list = data_handler.ReadData(path)
-
-    def process_prefab_description(prefab_description):
-        # TODO: Read signs!
-        return c.PrefabDescription(
-            prefab_description["token"],
-            # nodes
-            [
-                c.PrefabNode(
-                    node["x"],
-                    node["y"],
-                    node["z"],
-                    node["rotation"],
-                    TryReadExcept(node, "inputLanes", []),
-                    TryReadExcept(node, "outputLanes", []),
-                )
-                for node in prefab_description["nodes"]
-            ],
-            # map points
-            [
-                c.RoadMapPoint(
-                    point["x"],
-                    point["y"],
-                    point["z"],
-                    point["neighbors"],
-                    point["lanesLeft"],
-                    point["lanesRight"],
-                    point["offset"],
-                    c.NavNode(
-                        point["navNode"]["node0"],
-                        point["navNode"]["node1"],
-                        point["navNode"]["node2"],
-                        point["navNode"]["node3"],
-                        point["navNode"]["node4"],
-                        point["navNode"]["node5"],
-                        point["navNode"]["node6"],
-                        point["navNode"]["nodeCustom"],
-                    ),
-                    c.NavFlags(
-                        point["navFlags"]["isStart"],
-                        point["navFlags"]["isExit"],
-                        point["navFlags"]["isBase"],
-                    ),
-                )
-                if point["type"] == "road"
-                else c.PolygonMapPoint(
-                    point["x"],
-                    point["y"],
-                    point["z"],
-                    point["neighbors"],
-                    point["color"],
-                    point["roadOver"],
-                )
-                if point["type"] == "polygon"
-                else None
-                for point in prefab_description["mapPoints"]
-            ],
-            # spawn points
-            [
-                c.PrefabSpawnPoints(
-                    spawn_point["x"],
-                    spawn_point["y"],
-                    TryReadExcept(spawn_point, "z", 0),
-                    spawn_point["type"],
-                )
-                for spawn_point in prefab_description["spawnPoints"]
-            ],
-            # trigger points
-            [
-                c.PrefabTriggerPoint(
-                    trigger_point["x"],
-                    trigger_point["y"],
-                    TryReadExcept(trigger_point, "z", 0),
-                    trigger_point["action"],
-                )
-                for trigger_point in prefab_description["triggerPoints"]
-            ],
-            # nav curves
-            [
-                c.PrefabNavCurve(
-                    curve["navNodeIndex"],
-                    c.Transform(
-                        curve["start"]["x"],
-                        curve["start"]["y"],
-                        curve["start"]["z"],
-                        curve["start"]["rotation"],
-                    ),
-                    c.Transform(
-                        curve["end"]["x"],
-                        curve["end"]["y"],
-                        curve["end"]["z"],
-                        curve["end"]["rotation"],
-                    ),
-                    curve["nextLines"],
-                    curve["prevLines"],
-                    TryReadExcept(curve, "semaphoreId", -1)
-                )
-                for curve in prefab_description["navCurves"]
-            ],
-            # nav nodes
-            [
-                c.PrefabNavNode(
-                    node["type"],
-                    node["endIndex"],
-                    [
-                        c.NavNodeConnection(
-                            connection["targetNavNodeIndex"],
-                            connection["curveIndices"],
-                        )
-                        for connection in node["connections"]
-                    ],
-                )
-                for node in prefab_description["navNodes"]
-            ],
-            [
-                c.Semaphore(
-                    semaphore["x"],
-                    semaphore["y"],
-                    semaphore["z"],
-                    semaphore["rotation"],
-                    semaphore["type"],
-                    semaphore["id"],
-                )
-                for semaphore in TryReadExcept(prefab_description, "semaphores", [])
-            ]
-        )
-
-    with concurrent.futures.ThreadPoolExecutor() as executor:
-        prefab_descriptions = list(
-            executor.map(process_prefab_description, prefab_data_list)
-        )
-
-    return prefab_descriptions
+    records = {
+        prefab_description["token"]: orjson.dumps(prefab_description)
+        for prefab_description in data_handler.ReadData(path)
+    }
+    return c.PrefabDescriptionStore(records, BuildPrefabDescription)
 
 def ReadFerries() -> list[c.Ferry]:
     path = FindCategoryFilePath("ferries")
@@ -558,13 +441,33 @@ def ReadCities() -> list[c.City]:
         
     return cities
 
+BUILDERS = {
+    "nodes": ("node_columns", "Nodes", data_cache.NodesFromColumns),
+    "graph": ("navigation_columns", "Navigation nodes", data_cache.NavigationFromColumns),
+    "elevation": ("elevations", "Elevations", data_cache.ElevationsFromColumns),
+    "roads": ("roads", "Roads", data_cache.RoadsFromColumns),
+    "prefabs": ("prefabs", "Prefabs", data_cache.PrefabsFromColumns),
+}
+"""Category -> (MapData attribute, display name, builder) for the categories parsed by `data_parser`."""
+
+CACHED_CATEGORIES = {
+    "nodes": data_cache.ReadNodes,
+    "graph": data_cache.ReadNavigation,
+    "roads": data_cache.ReadRoads,
+    "prefabs": data_cache.ReadPrefabs,
+}
+"""Categories that are read from the map cache when it's valid."""
+
 progress = 0
-total_steps = 21
+total_steps = 22
+"""How many times PrintState is called, set by ReadData."""
 start_ram_usage = 0
+step_start_time = 0
 state_object = None
 def PrintState(start_time: float, message: str):
-    global progress, start_ram_usage
+    global progress, start_ram_usage, step_start_time
     start_ram_usage = psutil.Process(os.getpid()).memory_info().rss
+    step_start_time = time.perf_counter()
     print(f" → {message}", end="\r")
     if state_object != None:
         progress += 1
@@ -573,43 +476,47 @@ def PrintState(start_time: float, message: str):
     
 def UpdateState(start_time: float, message: str):
     centiseconds = (time.perf_counter() - start_time) * 100
+    step_centiseconds = (time.perf_counter() - step_start_time) * 100
     total_ram_usage = (psutil.Process(os.getpid()).memory_info().rss - start_ram_usage) / 1024 / 1024
-    if centiseconds < 1000:
-        time_string = f"{centiseconds:.0f}cs  |"
-    else:
-        time_string = f"{centiseconds:.0f}cs |"
+    time_string = f"{centiseconds:>5.0f}cs | {step_centiseconds:>5.0f}cs |"
         
     print(f"[dim]{time_string}[/dim] {message} [dim] used {total_ram_usage:.0f}mb of RAM [/dim]", end="\n")
 
+def PrintMemoryUsage(map: c.MapData):
+    usage = map.get_memory_usage()
+    print("[dim]Memory usage by item type:[/dim]")
+    for name, (count, size) in sorted(usage.items(), key=lambda item: item[1][1], reverse=True):
+        per_item = size / count if count > 0 else 0
+        print(f"[dim]{name:>20} | {count:>9} items | {per_item:>6.0f} B/item | {size / 1024 / 1024:>7.1f} MB[/dim]")
+    print(f"[dim]{'total':>20} | {sum(size for _, size in usage.values()) / 1024 / 1024:>7.1f} MB[/dim]")
+
 # MARK : ReadData()
 def ReadData(state = None) -> c.MapData:
-    global progress, state_object
+    global progress, total_steps, state_object
     progress = 0
     state_object = state
     start_time = time.perf_counter()
     print("[yellow]Please wait for map to load the necessary data.[/yellow]")
+    print("[dim]  total |    step |[/dim]")
     
     map = c.MapData()
     
+    data_cache.path = path
+    cached = data_cache.IsValid()
+    if cached:
+        print("[dim]Using cached nodes, roads, prefabs and navigation graph.[/dim]")
     
-    PrintState(start_time, "Nodes")
-    map.nodes = ReadNodes()
-    UpdateState(start_time, f"Loaded {len(map.nodes)} nodes")
+    # 11 small categories, one per BUILDERS category, 5 steps after loading
+    # and writing the map cache, which isn't done when it's already valid.
+    total_steps = 11 + len(BUILDERS) + 5 + (0 if cached else 1)
     
-    PrintState(start_time, "Navigation")
-    map.navigation = ReadNodeGraph()
-    if map.navigation == []:
-        print("[red]No navigation map found (graph.json). Map cannot proceed.[/red]")
-        return
-    UpdateState(start_time, f"Loaded {len(map.navigation)} navigation entries")
-    
-    PrintState(start_time, "Elevations")
-    map.elevations = ReadElevations()
-    UpdateState(start_time, f"Loaded {len(map.elevations)} elevations")
-    
-    PrintState(start_time, "Roads")
-    map.roads = ReadRoads()
-    UpdateState(start_time, f"Loaded {len(map.roads)} roads")
+    # The large categories are parsed by worker processes while
+    # the smaller ones are read below.
+    files = {
+        category: FindCategoryFilePath(category) for category in data_parser.PARSERS
+        if not (cached and category in CACHED_CATEGORIES)
+    }
+    pool = data_parser.ParsePool({category: file for category, file in files.items() if file is not None})
     
     PrintState(start_time, "RoadLooks")
     map.road_looks = ReadRoadLooks()
@@ -619,10 +526,6 @@ def ReadData(state = None) -> c.MapData:
     map.ferries = ReadFerries()
     UpdateState(start_time, f"Loaded {len(map.ferries)} ferries")
     
-    PrintState(start_time, "Prefabs")
-    map.prefabs = ReadPrefabs()
-    UpdateState(start_time, f"Loaded {len(map.prefabs)} prefabs")
-    
     PrintState(start_time, "Prefab Descriptions")
     map.prefab_descriptions = ReadPrefabDescriptions()
     UpdateState(start_time, f"Loaded {len(map.prefab_descriptions)} prefab descriptions")
@@ -659,28 +562,66 @@ def ReadData(state = None) -> c.MapData:
     map.cities = ReadCities()
     UpdateState(start_time, f"Loaded {len(map.cities)} cities")
     
+    if cached:
+        for category in CACHED_CATEGORIES:
+            attribute, name, _ = BUILDERS[category]
+            PrintState(start_time, name)
+            setattr(map, attribute, CACHED_CATEGORIES[category]())
+            UpdateState(start_time, f"Loaded {len(getattr(map, attribute))} {name.lower()} from cache")
+    
+    # Build the objects in the order the workers finish.
+    for category in [category for category, file in files.items() if file is None]:
+        attribute, name, builder = BUILDERS[category]
+        PrintState(start_time, name)
+        setattr(map, attribute, builder({}))
+        UpdateState(start_time, f"No {name.lower()} file found")
+    for category, columns, seconds in pool.as_completed():
+        attribute, name, builder = BUILDERS[category]
+        PrintState(start_time, name)
+        setattr(map, attribute, builder(columns))
+        del columns
+        UpdateState(start_time, f"Loaded {len(getattr(map, attribute))} {name.lower()} [dim](parsed in {seconds * 100:.0f}cs)[/dim]")
+    
+    map.nodes = map.node_columns.nodes
+    map.navigation = map.navigation_columns.entries
+    if map.navigation == []:
+        print("[red]No navigation map found (graph.json). Map cannot proceed.[/red]")
+        return
+    
     PrintState(start_time, "Calculating sectors")
-    map.calculate_sectors()
-    UpdateState(start_time, f"Calculated sectors")
+    map.build_dictionary()
+    map.calculate_sectors(precomputed=cached)
+    UpdateState(start_time, "Calculated sectors")
     
     PrintState(start_time, "Optimizing map")
     map.sort_to_sectors()
-    map.build_dictionary()
     UpdateState(start_time, f"Sorted data to {map._max_sector_x - map._min_sector_x} x {map._max_sector_y - map._min_sector_y} ({map._sector_width}m x {map._sector_height}m) sectors")
     
     PrintState(start_time, "Linking objects (prefabs)")
     map.match_prefabs_to_descriptions()
-    UpdateState(start_time, f"Linked prefabs to descriptions")
+    UpdateState(start_time, "Linked prefabs to descriptions")
     
     PrintState(start_time, "Linking objects (roads)")
     map.match_roads_to_looks()
-    UpdateState(start_time, f"Linked roads to looks")
+    UpdateState(start_time, f"Linked {len(map.roads)} roads to {len(map.road_looks)} looks")
     
     PrintState(start_time, "Computing Navigation Graph")
-    map.compute_navigation_data()
-    UpdateState(start_time, f"Computed navigation graph")
+    if cached:
+        UpdateState(start_time, "Loaded navigation graph from cache")
+    else:
+        map.compute_navigation_data()
+        UpdateState(start_time, "Computed navigation graph")
+        
+        PrintState(start_time, "Writing map cache")
+        if data_cache.WriteCache(map):
+            UpdateState(start_time, "Wrote map cache")
+    
+    # Everything was built while computing the navigation graph, only keep what's used from now on.
+    map.prefab_descriptions.limit()
     
     print(f"[green]Data read in {time.perf_counter() - start_time:.2f} seconds.[/green]")
+    if variables.DEVELOPMENT_MODE:
+        PrintMemoryUsage(map)
     data.map = map
     
     map.export_road_offsets()
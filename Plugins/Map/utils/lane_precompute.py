@@ -0,0 +1,128 @@
+"""Background precomputation of road lanes and prefab routes.
+
+Road and prefab geometry is built lazily the first time it's accessed. On the
+steering thread that happens right after a sector change, which is both the
+most expensive frame and the one where `allowed_heavy_calculations` makes
+`get_closest_item` and the internal map see empty bounding boxes.
+
+This worker predicts where the truck will be from its heading and speed and
+builds the geometry of the roads and prefabs in those sectors ahead of time,
+so by the time the truck crosses into them `data.UpdateData` only has to
+collect the already built items.
+"""
+from Plugins.Map.utils import road_helpers
+import Plugins.Map.classes as c
+import Plugins.Map.data as data
+import threading
+import logging
+import math
+import time
+
+UPDATE_INTERVAL = 0.5
+"""How often the worker checks the truck's predicted path. (s)"""
+
+thread: threading.Thread | None = None
+stop_event = threading.Event()
+
+def PredictSectors() -> list[tuple[int, int]]:
+    """The sectors that will be loaded along the truck's predicted path, closest first.
+
+    The truck's heading is extrapolated `data.precompute_time` seconds ahead (at least one
+    sector). Each point along that line gets the same sectors `data.UpdateData` would load
+    if the truck was standing there.
+    """
+    map = data.map
+    sector_size = max(map._sector_width, map._sector_height)
+
+    forward_x = -math.sin(data.truck_rotation)
+    forward_z = -math.cos(data.truck_rotation)
+    distance = max(abs(data.truck_speed) * data.precompute_time, sector_size)
+    steps = math.ceil(distance / sector_size)
+
+    sectors = []
+    seen = set()
+    for step in range(steps + 1):
+        x = data.truck_x + forward_x * sector_size * step
+        z = data.truck_z + forward_z * sector_size * step
+        for sector in map.get_sectors_for_coordinate_and_distance(x, z, data.load_distance):
+            if sector not in seen:
+                seen.add(sector)
+                sectors.append(sector)
+
+    return sectors
+
+def PrecomputeRoad(road: c.Road) -> None:
+    # The private attributes are set directly, the properties would count
+    # towards the heavy calculations of the current frame.
+    if road._points is None:
+        road._points = road.generate_points()
+    if road._bounding_box is None or road._lanes == []:
+        road._lanes, road._bounding_box = road_helpers.GetRoadLanes(road, data)
+    if road._lanes != []:
+        road.lane_points # for the lane index, so the steering thread only has to concatenate them
+
+def PrecomputePrefab(prefab: c.Prefab) -> None:
+    # The bounding box is kept when the nav routes are evicted, so it can't be used to rebuild them.
+    if prefab._nav_routes == []:
+        prefab.build_nav_routes()
+        if prefab._descriptions is not None:
+            prefab._descriptions.touch(prefab)
+    if prefab._bounding_box is None:
+        prefab.bounding_box
+    if prefab._nav_routes != []:
+        prefab.lane_points
+
+def PrecomputeSector(sector: tuple[int, int]) -> int:
+    """Build the geometry of every road and prefab in the sector.
+
+    :return: How many items were checked.
+    """
+    roads = data.map.get_sector_roads_by_sector(sector)
+    prefabs = data.map.get_sector_prefabs_by_sector(sector)
+
+    count = 0
+    for road in roads if roads is not None else []:
+        if stop_event.is_set(): break
+        PrecomputeRoad(road)
+        count += 1
+        time.sleep(0) # let the steering thread have the GIL between items
+
+    for prefab in prefabs if prefabs is not None else []:
+        if stop_event.is_set(): break
+        PrecomputePrefab(prefab)
+        count += 1
+        time.sleep(0)
+
+    return count
+
+def Worker() -> None:
+    while not stop_event.wait(UPDATE_INTERVAL):
+        try:
+            if not data.data_downloaded or not data.precompute_lanes or data.map is None:
+                continue
+
+            last_sector = data.last_sector
+            for sector in PredictSectors():
+                if stop_event.is_set() or data.last_sector != last_sector:
+                    break # the truck moved on, start again from the new position
+                PrecomputeSector(sector)
+        except Exception:
+            logging.exception("Error while precomputing lanes")
+
+def Start() -> None:
+    """Start the worker if it isn't running already."""
+    global thread
+    if thread is not None and thread.is_alive():
+        return
+
+    stop_event.clear()
+    thread = threading.Thread(target=Worker, daemon=True, name="Map Lane Precompute")
+    thread.start()
+
+def Stop() -> None:
+    """Stop the worker, called when the plugin stops or before the map data is reloaded."""
+    global thread
+    stop_event.set()
+    if thread is not None:
+        thread.join(timeout=1)
+    thread = None
@@ -0,0 +1,161 @@
+"""
+The map data that is sent to the frontend, split into sectors.
+
+Every sector is serialized once with orjson when it comes into range and kept in
+a cache, so crossing into a new sector only serializes the sectors that were
+added instead of everything around the truck. Each change of the loaded sectors
+gets a new version, the last versions are kept in the history so that the backend
+can send a client only the sectors that were added or removed since the version
+it acknowledged.
+
+Every loaded sector is published in its own slot tag, "map_sector_<slot>". A slot
+is only written when a sector is assigned to it or the sector is serialized again,
+so a sector crossing only writes the sectors that came into range. The slots of the
+sectors that left are reused. The "map_stream" tag holds the rest:
+    version:  the current version
+    time:     perf_counter() when the version was made
+    sectors:  {"x,y": (slot, revision)} of every loaded sector
+    history:  {version: {"x,y": revision}} the loaded sectors of the last versions
+
+A slot holds {"sector": "x,y", "revision": revision, category: comma separated
+JSON objects}. Readers check the sector and revision against the stream, the slot
+might already be reused for a newer version.
+
+A sector is marked dirty when the lanes of one of its roads are built after it was
+serialized, it's then serialized again with a new revision. Clearing the stream (when
+the road data or settings change) also clears the history, so every client gets a
+full sync on its next request.
+"""
+
+from collections import OrderedDict, deque
+import orjson
+import time
+
+CATEGORIES = ("prefabs", "roads", "models", "elevations")
+
+HISTORY_LENGTH = 32
+"""How many versions a client can be behind and still get a delta."""
+
+CACHE_SIZE = 128
+"""How many serialized sectors are kept, so driving back to a sector doesn't serialize it again."""
+
+OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+def sector_key(sector: tuple[int, int]) -> str:
+    return f"{sector[0]},{sector[1]}"
+
+def slot_tag(slot: int) -> str:
+    return f"map_sector_{slot}"
+
+class MapStream:
+    version: int
+    """Never goes back to 0, even when the stream is cleared, so old versions from clients never match."""
+
+    time: float
+    """perf_counter() when the current version was made."""
+
+    revision: int
+    """Incremented every time a sector is serialized."""
+
+    cache: OrderedDict[tuple[int, int], tuple[int, dict[str, bytes]]]
+    """The revision and serialized categories of each sector, the least recently loaded first."""
+
+    loaded: list[tuple[int, int]]
+    """The sectors in the current version."""
+
+    slots: dict[tuple[int, int], int]
+    """The slot of each loaded sector."""
+
+    free: list[int]
+    """Slots that are no longer used by a loaded sector."""
+
+    changed: dict[int, dict]
+    """The slots that have to be published with the next version."""
+
+    dirty: set[tuple[int, int]]
+    """Sectors that changed since they were serialized, see `invalidate`."""
+
+    history: deque[tuple[int, dict[str, int]]]
+    """The loaded sector keys and their revisions of the last versions."""
+
+    def __init__(self):
+        self.version = 0
+        self.time = 0
+        self.revision = 0
+        self.cache = OrderedDict()
+        self.loaded = []
+        self.slots = {}
+        self.free = []
+        self.changed = {}
+        self.dirty = set()
+        self.history = deque(maxlen=HISTORY_LENGTH)
+
+    def serialize(self, map, sector: tuple[int, int], elevations: bool) -> dict[str, bytes]:
+        items = {
+            "prefabs": map.get_sector_prefabs_by_sector(sector),
+            "roads": map.get_sector_roads_by_sector(sector),
+            "models": map.get_sector_models_by_sector(sector),
+            "elevations": map.get_sector_elevations_by_sector(sector) if elevations else [],
+        }
+        # Strip the brackets so that the backend can join sectors without parsing them.
+        serialized = {category: orjson.dumps([item.json() for item in items[category]], option=OPTIONS)[1:-1]
+                      for category in CATEGORIES}
+        # json() builds the missing lanes, they are already in this serialization.
+        self.dirty.discard(sector)
+        return serialized
+
+    def invalidate(self, sector: tuple[int, int]) -> None:
+        """Serialize the sector again with the next update. Called when the lanes of one of its roads are built."""
+        if sector in self.cache:
+            self.dirty.add(sector)
+
+    def update(self, map, sectors: list[tuple[int, int]], elevations: bool) -> None:
+        """Make a new version with the given sectors, only the ones that aren't cached or are dirty are serialized."""
+        dirty, self.dirty = self.dirty, set()
+        for sector in dirty:
+            self.cache.pop(sector, None)
+
+        for sector in set(self.loaded) - set(sectors):
+            self.free.append(self.slots.pop(sector))
+
+        for sector in sectors:
+            serialized = sector not in self.cache
+            if serialized:
+                self.revision += 1
+                self.cache[sector] = (self.revision, self.serialize(map, sector, elevations))
+            else:
+                self.cache.move_to_end(sector)
+
+            if serialized or sector not in self.slots:
+                if sector not in self.slots:
+                    self.slots[sector] = self.free.pop() if self.free else len(self.slots) + len(self.free)
+                revision, categories = self.cache[sector]
+                self.changed[self.slots[sector]] = {"sector": sector_key(sector), "revision": revision, **categories}
+
+        while len(self.cache) > max(CACHE_SIZE, len(sectors)):
+            self.cache.popitem(last=False)
+
+        self.loaded = list(sectors)
+        self.version += 1
+        self.time = time.perf_counter()
+        self.history.append((self.version, {sector_key(sector): self.cache[sector][0] for sector in self.loaded}))
+
+    def clear(self) -> None:
+        """Forget all serialized sectors, the next update serializes everything again."""
+        self.cache.clear()
+        self.dirty.clear()
+        self.history.clear()
+
+    def publish(self) -> dict[str, dict]:
+        """The slot tags that changed since the last call, they have to be set before the stream tag."""
+        changed = {slot_tag(slot): value for slot, value in self.changed.items()}
+        self.changed.clear()
+        return changed
+
+    def tag(self) -> dict:
+        return {
+            "version": self.version,
+            "time": self.time,
+            "sectors": {sector_key(sector): (self.slots[sector], self.cache[sector][0]) for sector in self.loaded},
+            "history": dict(self.history),
+        }
@@ -90,6 +90,20 @@ def GetMostInDirection(points: list[tuple[float, float]] | list[tuple[float, flo
     
     return best_index
 
+def ClosestPointIndex(points: np.ndarray, x: float, z: float) -> tuple[int, float]:
+    """Find the point closest to (x, z).
+
+    :param np.ndarray points: (N, 2) array of [x, z] points.
+    :param float x: X coordinate.
+    :param float z: Z coordinate.
+    :return tuple[int, float]: Index of the closest point (the first one on ties) and the distance to it. (-1, inf) if there are no points.
+    """
+    if len(points) == 0:
+        return -1, math.inf
+    distances = np.hypot(points[:, 0] - x, points[:, 1] - z)
+    index = int(np.argmin(distances))
+    return index, float(distances[index])
+
 def InOut(s: float) -> float:
     """InOut interpolation function.
 
@@ -240,3 +254,57 @@ def Hermite3D(s, start_pos, end_pos, start_quaternion, end_quaternion, length):
     tan_end = quaternion_rotate(end_quaternion, initial_vector)
 
     return hermite_curve(np.array(start_pos), np.array(end_pos), tan_start, tan_end, s)
+
+
+def quaternion_rotate_batch(q, v):
+    """Rotate vectors by quaternions, same as quaternion_rotate but for many at once.
+
+    :param (np.array) q: quaternions in (w,x,y,z) format, shape (..., 4).
+    :param (np.array) v: vectors (x,y,z) to be rotated, shape (..., 3).
+    :return (np.array) v_rotated: rotated vectors (x,y,z), shape (..., 3).
+    """
+    q = np.asarray(q, dtype=np.float64)
+    v = np.asarray(v, dtype=np.float64)
+
+    norm = np.linalg.norm(q, axis=-1, keepdims=True)
+    if np.any(norm == 0):
+        raise ValueError("Found zero norm quaternions in `quat`.") # same as scipy
+    q = q / norm
+
+    w = q[..., :1]
+    xyz = q[..., 1:]
+    # v' = v + 2w(q x v) + 2q x (q x v)
+    cross = np.cross(xyz, v)
+    return v + 2 * w * cross + 2 * np.cross(xyz, cross)
+
+
+def Hermite3DBatch(s, start_pos, end_pos, start_quaternion, end_quaternion, length):
+    """Hermite3D evaluated for many interpolation values at once.
+
+    All the arguments broadcast against each other, so this can be used to sample a single
+    road (s has shape (N,), the rest are per road) or a batch of roads (each argument has
+    one row per sample, for example with np.repeat).
+
+    :param np.array s: The interpolation values between 0 and 1, shape (N,).
+    :param np.array start_pos: The starting positions (x,y,z), shape (3,) or (N, 3).
+    :param np.array end_pos: The ending positions (x,y,z), shape (3,) or (N, 3).
+    :param np.array start_quaternion: The starting quaternions (w,x,y,z), shape (4,) or (N, 4).
+    :param np.array end_quaternion: The ending quaternions (w,x,y,z), shape (4,) or (N, 4).
+    :param float | np.array length: The length of the roads, shape () or (N,). 0 or None will use the distance between the positions.
+    :return np.array: The hermite interpolated positions (x,y,z), shape (N, 3).
+    """
+    s = np.asarray(s, dtype=np.float64)[..., None]
+    start_pos = np.asarray(start_pos, dtype=np.float64)
+    end_pos = np.asarray(end_pos, dtype=np.float64)
+
+    distance = np.linalg.norm(end_pos - start_pos, axis=-1)
+    length = np.asarray(length if length is not None else 0, dtype=np.float64)
+    length = np.where(length == 0, distance, length)[..., None]
+
+    # Initial vector defined by [0, 0, -1] * road length
+    initial_vector = np.array([0, 0, -1]) * length
+
+    tan_start = quaternion_rotate_batch(start_quaternion, initial_vector)
+    tan_end = quaternion_rotate_batch(end_quaternion, initial_vector)
+
+    return hermite_curve(start_pos, end_pos, tan_start, tan_end, s)
@@ -0,0 +1,51 @@
+import random
+import sys
+
+def get_deep_size(value, shared: tuple[type, ...] = (), seen: set[int] | None = None) -> int:
+    """Size of the value and everything it owns in bytes.
+
+    :param value: The object to measure.
+    :param tuple[type] shared: Types that are owned by something else (ie. a road's road look), these are
+        skipped unless they are the value itself.
+    :param set[int] seen: IDs of objects that have already been counted.
+
+    :return: The size in bytes.
+    """
+    if seen is None:
+        seen = set()
+    if value is None or isinstance(value, type) or id(value) in seen:
+        return 0
+    seen.add(id(value))
+
+    size = sys.getsizeof(value)
+    if isinstance(value, (str, bytes, int, float, bool)):
+        return size
+
+    if isinstance(value, dict):
+        children = [*value.keys(), *value.values()]
+    elif isinstance(value, (list, tuple, set)):
+        children = value
+    else:
+        children = [getattr(value, slot, None) for cls in type(value).__mro__ for slot in getattr(cls, "__slots__", ())]
+        if hasattr(value, "__dict__"):
+            children.append(value.__dict__)
+
+    return size + sum(get_deep_size(child, shared, seen) for child in children if not isinstance(child, shared))
+
+def estimate_size(items: list, shared: tuple[type, ...] = (), samples: int = 1000) -> int:
+    """Estimate the deep size of a list of items from a random sample.
+
+    :param list items: The items to measure.
+    :param tuple[type] shared: Types that are owned by something else, these are skipped.
+    :param int samples: How many items to measure.
+
+    :return: The estimated size in bytes including the list itself.
+    """
+    if len(items) == 0:
+        return sys.getsizeof(items)
+
+    # Objects the items share (like small ints) are only counted once.
+    seen = set()
+    sample = random.sample(range(len(items)), min(samples, len(items)))
+    measured = sum(get_deep_size(items[index], shared, seen) for index in sample)
+    return sys.getsizeof(items) + int(measured / len(sample) * len(items))
@@ -113,16 +113,9 @@ def display_prefab_routes(prefab_description) -> None:
     cv2.waitKey(0)
     
 def get_closest_lane(item, x: float, z: float, return_distance=False) -> int:
-    closest_point_distance = math.inf
-    closest_lane_id = -1
-    for lane_id, lane in enumerate(item.nav_routes):
-        for point in lane.points:
-            point_tuple = point.tuple()
-            point_tuple = (point_tuple[0], point_tuple[2])
-            distance = math_helpers.DistanceBetweenPoints((x, z), point_tuple)
-            if distance < closest_point_distance:
-                closest_point_distance = distance
-                closest_lane_id = lane_id
+    points, lane_ids = item.lane_points
+    index, closest_point_distance = math_helpers.ClosestPointIndex(points, x, z)
+    closest_lane_id = int(lane_ids[index]) if index != -1 else -1
         
     if return_distance:
         return closest_lane_id, closest_point_distance
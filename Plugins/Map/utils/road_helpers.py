@@ -11,7 +11,6 @@ import ETS2LA.variables as variables
 from Plugins.Map import classes as c
 import numpy as np
 import logging
-import math
 import cv2
 import json
 
@@ -48,82 +47,62 @@ def lerp(a, b, t):
     return a + t * (b - a)
 
 def calculate_lanes(points, lane_width, num_left_lanes, num_right_lanes, road, custom_offset=999, prev_offset=999):
+    """Offset the road points to the lane center lines.
+    
+    Every segment (points[i] -> points[i + 1]) is offset along its own perpendicular, the
+    last point uses the perpendicular of the last segment. All segments and lanes are
+    computed at once with numpy broadcasting.
+    
+    :return dict: {'left': [[[x, z, y], ...], ...], 'right': [...]}
+    """
     try:
         # Validate input points
         if not points or len(points) < 2:
             logging.error(f"Road {road.uid if hasattr(road, 'uid') else 'unknown'} failed to generate points: insufficient points")
             return {'left': [], 'right': []}
 
-        lanes = {'left': [[] for _ in range(num_left_lanes)],
-                'right': [[] for _ in range(num_right_lanes)]}
-
-        base_custom_offset = custom_offset
-
+        positions = np.array([point.list() for point in points], dtype=np.float64)
+        xz = positions[:, [0, 2]]
+        height = positions[:, 1:2]
         pointCount = len(points)
-        for i in range(pointCount - 1):
-            point1 = points[i].list()
-            point1 = np.array([point1[0], point1[2]])
-            point2 = points[i + 1].list()
-            point2 = np.array([point2[0], point2[2]])
-
-            if base_custom_offset != 999 and prev_offset != 999 and prev_offset != base_custom_offset:
-                custom_offset = lerp(prev_offset, base_custom_offset, i / (pointCount - 2))
-
-            direction_vector = point2 - point1
-            direction_vector = normalize(direction_vector)
-            perp_vector = perpendicular_vector(direction_vector)
-
-            if num_left_lanes == 0: # lanes on only right side
-                middle_offset = perp_vector * lane_width * (num_right_lanes + 1) / 2
-                if num_right_lanes % 2 == 0:
-                    middle_offset -= perp_vector * lane_width / 2
-                point1 -= middle_offset
-                point2 -= middle_offset
-                
-            elif num_right_lanes == 0: # lanes on only left side
-                middle_offset = -perp_vector * lane_width * (num_left_lanes + 1) / 2
-                if num_left_lanes % 2 == 0:
-                    middle_offset += perp_vector * lane_width / 2
-                point1 -= middle_offset
-                point2 -= middle_offset
-                
-            # elif num_left_lanes > num_right_lanes: # more lanes on left side
-            #     #               sideways    * 4.5        * (2              + 1 - 1              ) / 2 
-            #     middle_offset = perp_vector * lane_width * (num_left_lanes + 1 - num_right_lanes) / 2
-            #     point1 -= middle_offset
-            #     point2 -= middle_offset
-            #     
-            # elif num_right_lanes > num_left_lanes: # more lanes on right side
-            #     middle_offset = -perp_vector * lane_width * (num_right_lanes + 1 - num_left_lanes) / 2
-            #     point1 -= middle_offset
-            #     point2 -= middle_offset
-
-            for lane in range(num_left_lanes): # left lanes
-                offset = perp_vector * (lane_width * (lane) + custom_offset / 2)
-
-                left_point1 = point1 - offset
-                left_point2 = point2 - offset
-                lanes['left'][lane].append(left_point1.tolist())
-                if i == len(points) - 2:
-                    lanes['left'][lane].append(left_point2.tolist())
-
-            for lane in range(num_right_lanes): # right lanes
-                offset = perp_vector * (lane_width * (lane) + custom_offset / 2)
-
-                right_point1 = point1 + offset
-                right_point2 = point2 + offset
-                lanes['right'][lane].append(right_point1.tolist())
-                if i == len(points) - 2:
-                    lanes['right'][lane].append(right_point2.tolist())
-
-        for lane in range(num_left_lanes):
-            for i in range(len(lanes['left'][lane])):
-                lanes['left'][lane][i].append(road.points[i].list()[1])
-        for lane in range(num_right_lanes):
-            for i in range(len(lanes['right'][lane])):
-                lanes['right'][lane][i].append(road.points[i].list()[1])
-
-        return lanes
+
+        direction_vectors = xz[1:] - xz[:-1]
+        norms = np.linalg.norm(direction_vectors, axis=1, keepdims=True)
+        direction_vectors = np.divide(direction_vectors, norms, out=direction_vectors, where=norms != 0)
+        perp_vectors = np.stack([-direction_vectors[:, 1], direction_vectors[:, 0]], axis=1)
+
+        # Offset per segment, interpolated from the previous road's offset if they differ.
+        offsets = np.full((pointCount - 1, 1), float(custom_offset))
+        if custom_offset != 999 and prev_offset != 999 and prev_offset != custom_offset:
+            offsets[:, 0] = lerp(prev_offset, custom_offset, np.arange(pointCount - 1) * (1 / (pointCount - 2)))
+
+        if num_left_lanes == 0: # lanes on only right side
+            middle_offset = perp_vectors * lane_width * (num_right_lanes + 1) / 2
+            if num_right_lanes % 2 == 0:
+                middle_offset -= perp_vectors * lane_width / 2
+        elif num_right_lanes == 0: # lanes on only left side
+            middle_offset = -perp_vectors * lane_width * (num_left_lanes + 1) / 2
+            if num_left_lanes % 2 == 0:
+                middle_offset += perp_vectors * lane_width / 2
+        else:
+            middle_offset = np.zeros_like(perp_vectors)
+
+        # The last point is offset with the values of the last segment.
+        perp_vectors = np.concatenate([perp_vectors, perp_vectors[-1:]])
+        middle_offset = np.concatenate([middle_offset, middle_offset[-1:]])
+        offsets = np.concatenate([offsets, offsets[-1:]])
+        center = xz - middle_offset
+
+        def offset_lanes(count, side):
+            if count == 0:
+                return []
+            # (lanes, points, 1) * (points, 2) -> (lanes, points, 2)
+            distances = lane_width * np.arange(count)[:, None, None] + offsets[None] / 2
+            lane_points = center[None] + side * perp_vectors[None] * distances
+            lane_points = np.concatenate([lane_points, np.broadcast_to(height, (count, pointCount, 1))], axis=2)
+            return lane_points.tolist()
+
+        return {'left': offset_lanes(num_left_lanes, -1), 'right': offset_lanes(num_right_lanes, 1)}
     except Exception as e:
         logging.error(f"Error calculating lanes for road {getattr(road, 'uid', 'unknown')}: {e}")
         return {'left': [], 'right': []}
@@ -214,16 +193,10 @@ def GetRoadLanes(road, data):
         points = lanes['left'] + lanes['right']
 
         bounding_box = [[999999, 999999], [-999999, -999999]]
-        for lane in points:
-            for point in lane:
-                if point[0] < bounding_box[0][0]:
-                    bounding_box[0][0] = point[0]
-                if point[0] > bounding_box[1][0]:
-                    bounding_box[1][0] = point[0]
-                if point[1] < bounding_box[0][1]:
-                    bounding_box[0][1] = point[1]
-                if point[1] > bounding_box[1][1]:
-                    bounding_box[1][1] = point[1]
+        if points:
+            lane_points = np.array(points, dtype=np.float64).reshape(-1, 3)
+            bounding_box[0] = np.minimum(bounding_box[0], lane_points[:, :2].min(axis=0)).tolist()
+            bounding_box[1] = np.maximum(bounding_box[1], lane_points[:, :2].max(axis=0)).tolist()
 
         bounding_box[0][0] -= 5
         bounding_box[0][1] -= 5
@@ -311,16 +284,9 @@ def get_error_for_road(road, map):
     return offsets
 
 def get_closest_lane(item, x: float, z: float, return_distance:bool = False) -> int:
-    closest_point_distance = math.inf
-    closest_lane_id = -1
-    for lane_id, lane in enumerate(item.lanes):
-        for point in lane.points:
-            point_tuple = point.tuple()
-            point_tuple = (point_tuple[0], point_tuple[2])
-            distance = math_helpers.DistanceBetweenPoints((x, z), point_tuple)
-            if distance < closest_point_distance:
-                closest_point_distance = distance
-                closest_lane_id = lane_id
+    points, lane_ids = item.lane_points
+    index, closest_point_distance = math_helpers.ClosestPointIndex(points, x, z)
+    closest_lane_id = int(lane_ids[index]) if index != -1 else -1
 
     if return_distance:
         return closest_lane_id, closest_point_distance
@@ -2,15 +2,18 @@ from ETS2LA.Utils.translator import _
 from ETS2LA.Plugin import *
 from ETS2LA.UI import *
 
-from Plugins.NavigationSockets.projections import get_ets2_coordinates, get_ats_coordinates
-from Plugins.NavigationSockets.socket import WebSocketConnection
-from Plugins.Map.utils.math_helpers import DistanceBetweenPoints
+from Plugins.NavigationSockets.projections import get_ets2_coordinates, get_ats_coordinates, get_coordinates_batch
+from ETS2LA.Networking.broadcast import Broadcaster
+import numpy as np
 import json
 import math
 
 last_angle = 0
 last_position = (0, 0)
 
+CHANNELS = ["1", 2, 4, 5]
+"""The ids of the packets, every client gets all of them."""
+
 def degrees_to_radians(degrees):
     return degrees * math.pi / 180
 
@@ -57,6 +60,73 @@ def convert_angle_to_wgs84_heading(position, speed, game="ETS2"):
 
     return geographic_heading
 
+class RouteProjection:
+    """
+    The lon/lat points of the navigation route. Every road (or node for the other
+    items) is projected the first time it's on the route and then cached by its UID,
+    so when the route changes only the new items are projected, all in one call.
+    """
+    game: str
+    uids: tuple | None
+    """The UIDs of the route the current lon/lats are for."""
+    cache: dict[int, np.ndarray]
+    """The projected (N, 2) points of each item on the route, in the order of the item's points."""
+    lon_lats: np.ndarray
+    """(N, 2), the broadcaster encodes numpy arrays directly."""
+    
+    def __init__(self):
+        self.game = ""
+        self.uids = None
+        self.cache = {}
+        self.lon_lats = np.empty((0, 2))
+    
+    def update(self, navigation: dict, game: str) -> bool:
+        """Project the route if it changed.
+        
+        :return: Whether the lon/lats changed.
+        """
+        uids = tuple(navigation["uids"])
+        if game != self.game:
+            self.game = game
+            self.cache = {}
+        elif uids == self.uids:
+            return False
+        
+        nodes = navigation["nodes"]
+        node_points = navigation["points"]
+        
+        # Which points each item has and whether they're driven in reverse, this
+        # depends on the item before it so it's done for the whole route.
+        items = []
+        last = None
+        for i in range(len(nodes) - 1):
+            points = node_points[i]
+            if not points or len(points) < 5:
+                points = [nodes[i]]
+                reverse = False
+            else:
+                # Reverse the points if the end point is closer to the last point
+                reverse = last is not None and math.dist(points[-1], last) < math.dist(points[0], last)
+                
+            items.append((uids[i], points, reverse))
+            last = points[0] if reverse else points[-1]
+        
+        missing = {uid: points for uid, points, _ in items if uid not in self.cache}
+        if missing:
+            coordinates = [point[:2] for points in missing.values() for point in points]
+            projected = get_coordinates_batch(np.array(coordinates, dtype=np.float64), game)
+            start = 0
+            for uid, points in missing.items():
+                self.cache[uid] = projected[start:start + len(points)]
+                start += len(points)
+        
+        # Only keep what's on the route, it's only getting shorter while driving.
+        self.cache = {uid: self.cache[uid] for uid, _, _ in items}
+        parts = [self.cache[uid][::-1] if reverse else self.cache[uid] for uid, _, reverse in items]
+        self.lon_lats = np.concatenate(parts) if parts else np.empty((0, 2))
+        self.uids = uids
+        return True
+
 class Plugin(ETS2LAPlugin):
     description = PluginDescription(
         name=_("Navigation Sockets"),
@@ -74,11 +144,11 @@ class Plugin(ETS2LAPlugin):
         icon="https://avatars.githubusercontent.com/u/83072683?v=4"
     )
     
-    last_navigation_time = 0
-    
     def init(self):
-        self.connected_clients = {}
-        self.loop = None
+        self.route = RouteProjection()
+        self.route_packet = None
+        self.broadcaster = Broadcaster()
+        self.connected_clients = self.broadcaster.subscribers
 
     def imports(self):
         global multiprocessing, websockets, threading, logging, asyncio, json, os, time
@@ -92,8 +162,9 @@ class Plugin(ETS2LAPlugin):
         import os
 
     async def server(self, websocket):
-        connection = WebSocketConnection(websocket)
-        self.connected_clients[websocket] = connection
+        self.broadcaster.connect(websocket)
+        for channel in CHANNELS:
+            self.broadcaster.subscribe(websocket, channel)
         response = [
             #{"id": 1,"result": {"type": "started"}},
             {"id": 2,"result": {"type": "started"}},
@@ -110,12 +181,10 @@ class Plugin(ETS2LAPlugin):
         except Exception as e:
             print("Client disconnected due to exception.", str(e))
         finally:
-            connection.sender_task.cancel()
-            del self.connected_clients[websocket]
+            self.broadcaster.disconnect(websocket)
             print("Client disconnected. Number of connected clients: ", len(self.connected_clients))
 
     async def start(self):
-        self.loop = asyncio.get_running_loop()
         async with websockets.serve(self.server, "localhost", 62840):
             await asyncio.Future()  # run forever
 
@@ -181,35 +250,11 @@ class Plugin(ETS2LAPlugin):
         
         navigation = self.globals.tags.navigation_plan
         navigation = self.globals.tags.merge(navigation)
-        if time.time() - self.last_navigation_time > 10 and navigation is not None and len(navigation) > 0: # Send the navigation plan every 10 seconds
-            self.last_navigation_time = time.time()
-            
+        # Only projected when the route changes. The packet is published every frame so
+        # that clients that connect later get it, the broadcaster doesn't resend it unchanged.
+        if navigation is not None and len(navigation) > 0 and self.route.update(navigation, game):
             nodes = navigation["nodes"]
-            node_points = navigation["points"]
-            
-            total_points = []
-            for i in range(len(nodes) - 1):
-                node = nodes[i]
-                points = node_points[i]
-                
-                if not points or len(points) < 5:
-                    total_points.append([node.x, node.y, node.z])
-                    continue
-                
-                start = points[0]
-                end = points[-1]
-                last = total_points[-1]
-                
-                distance_start = DistanceBetweenPoints(start, last)
-                distance_end = DistanceBetweenPoints(end, last)
-                
-                if distance_end < distance_start:
-                    # Reverse the points if the end point is closer to the last point
-                    points = points[::-1]
-                
-                total_points.extend(points)
-                
-            packets.append({
+            self.route_packet = {
                 "id": "1",
                 "result": {
                     "type": "data",
@@ -218,17 +263,17 @@ class Plugin(ETS2LAPlugin):
                             "segments": [
                                 {
                                     "key": "route",
-                                    "lonLats": [coords_to_wgs84(point[0], point[1], game=game) for point in total_points],
-                                    "distance": math.sqrt((nodes[-1].x - nodes[0].x) ** 2 + (nodes[-1].y - nodes[0].y) ** 2),
+                                    "lonLats": self.route.lon_lats,
+                                    "distance": math.sqrt((nodes[-1][0] - nodes[0][0]) ** 2 + (nodes[-1][1] - nodes[0][1]) ** 2),
                                     "time": 0,
                                     "strategy": "shortest",
                                 }
                             ]
                     }
                 }       
-            })
+            }
+        if self.route_packet is not None:
+            packets.append(self.route_packet)
         
-        # Enqueue the message to all connected clients
-        for connection in list(self.connected_clients.values()):
-            for packet in packets:
-                asyncio.run_coroutine_threadsafe(connection.queue.put(json.dumps(packet)), self.loop)
+        # Encoded once for all clients, packets that didn't change since the last frame aren't sent again.
+        self.broadcaster.publish_all({packet["id"]: packet for packet in packets})
@@ -2,6 +2,7 @@
 # later forked to ETS2LA/maps
 
 from pyproj import CRS, Transformer
+import numpy as np
 import math
 
 earth_radius = 6_370_997 # meters
@@ -62,4 +63,41 @@ def get_ets2_coordinates(x, y):
     proj_x = x * ets2_map_factor[1] * length_of_degree
     proj_y = y * ets2_map_factor[0] * length_of_degree
     lon, lat = ets2_transformer.transform(proj_x, proj_y)
-    return (lat, lon)
\ No newline at end of file
+    return (lat, lon)
+
+def get_ats_coordinates_batch(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """get_ats_coordinates for whole arrays in one transform call, returns (N, 2)."""
+    offset_x = np.round(36 * (1 / (1 + np.exp(0.0001 * (x + 60000)))))
+    pos_y_factor = 1 / (1 + np.exp(-0.00015 * (y - 20000)))
+    neg_y_factor = 1 / (1 + np.exp(0.00015 * (y + 40000)))
+    offset_y = np.round(45 * pos_y_factor - 108 * neg_y_factor)
+    
+    x = x - offset_x
+    y = y - offset_y
+    proj_x = x * ats_map_factor[1] * length_of_degree
+    proj_y = y * ats_map_factor[0] * length_of_degree
+    lon, lat = ats_transformer.transform(proj_x, proj_y)
+    return np.column_stack((lat, lon))
+
+def get_ets2_coordinates_batch(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """get_ets2_coordinates for whole arrays in one transform call, returns (N, 2)."""
+    x = x - ets2_map_offset[0]
+    y = y - ets2_map_offset[1]
+    
+    uk_factor = 0.75
+    calais = [-31100, -5500]
+    is_uk = ((x * uk_factor) < calais[0]) & ((y * uk_factor) < calais[1])
+    x = np.where(is_uk, (x + calais[0] / 2) * uk_factor, x)
+    y = np.where(is_uk, (y + calais[1] / 2) * uk_factor, y)
+        
+    proj_x = x * ets2_map_factor[1] * length_of_degree
+    proj_y = y * ets2_map_factor[0] * length_of_degree
+    lon, lat = ets2_transformer.transform(proj_x, proj_y)
+    return np.column_stack((lat, lon))
+
+def get_coordinates_batch(points: np.ndarray, game: str = "ETS2") -> np.ndarray:
+    """Project an (N, 2) array of game x, z coordinates, the same as calling coords_to_wgs84 for each point."""
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    if game == "ATS":
+        return get_ats_coordinates_batch(points[:, 0], points[:, 1])
+    return get_ets2_coordinates_batch(points[:, 0], points[:, 1])
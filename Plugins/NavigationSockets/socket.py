@@ -1,15 +0,0 @@
-import asyncio
-
-class WebSocketConnection:
-    def __init__(self, websocket):
-        self.websocket = websocket
-        self.queue = asyncio.Queue()
-        self.sender_task = asyncio.create_task(self.send_messages())
-
-    async def send_messages(self):
-        try:
-            while True:
-                message = await self.queue.get()
-                await self.websocket.send(message)
-        except Exception as e:
-            print("Client disconnected due to exception in send_messages.", str(e))
\ No newline at end of file
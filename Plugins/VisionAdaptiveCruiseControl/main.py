@@ -14,47 +14,6 @@ EnableDisable = ControlEvent(
 )
 
 
-def ConvertToScreenCoordinate(X: float, Y: float, Z: float):
-    HeadYaw = HeadRotationDegreesX
-    HeadPitch = HeadRotationDegreesY
-    HeadRoll = HeadRotationDegreesZ
-
-    RelativeX = X - HeadX
-    RelativeY = Y - HeadY
-    RelativeZ = Z - HeadZ
-
-    CosYaw = math.cos(math.radians(-HeadYaw))
-    SinYaw = math.sin(math.radians(-HeadYaw))
-    NewX = RelativeX * CosYaw + RelativeZ * SinYaw
-    NewZ = RelativeZ * CosYaw - RelativeX * SinYaw
-
-    CosPitch = math.cos(math.radians(-HeadPitch))
-    SinPitch = math.sin(math.radians(-HeadPitch))
-    NewY = RelativeY * CosPitch - NewZ * SinPitch
-    FinalZ = NewZ * CosPitch + RelativeY * SinPitch
-
-    CosRoll = math.cos(math.radians(HeadRoll))
-    SinRoll = math.sin(math.radians(HeadRoll))
-    FinalX = NewX * CosRoll - NewY * SinRoll
-    FinalY = NewY * CosRoll + NewX * SinRoll
-
-    if FinalZ >= 0:
-        return None, None, None
-
-    FovRad = math.radians(FOV)
-
-    WindowDistance = ((ScreenCapture.MonitorY2 - ScreenCapture.MonitorY1) * (4 / 3) / 2) / math.tan(FovRad / 2)
-
-    ScreenX = (FinalX / FinalZ) * WindowDistance + (ScreenCapture.MonitorX2 - ScreenCapture.MonitorX1) / 2
-    ScreenY = (FinalY / FinalZ) * WindowDistance + (ScreenCapture.MonitorY2 - ScreenCapture.MonitorY1) / 2
-
-    ScreenX = (ScreenCapture.MonitorX2 - ScreenCapture.MonitorX1) - ScreenX
-
-    Distance = math.sqrt((RelativeX ** 2) + (RelativeY ** 2) + (RelativeZ ** 2))
-
-    return ScreenX, ScreenY, Distance
-
-
 def CalculateRadiusFrontWheel(SteeringAngle, Distance):
     SteeringAngle = math.radians(SteeringAngle)
     if SteeringAngle != 0:
@@ -98,11 +57,12 @@ class Plugin(ETS2LAPlugin):
         global Enabled; Enabled = not Enabled
 
     def imports(self):
-        global SCSTelemetry, SCSController, ScreenCapture, ShowImage, pytorch, variables, settings, np, math, time, cv2
+        global SCSTelemetry, SCSController, ScreenCapture, ShowImage, Projection, pytorch, variables, settings, np, math, time, cv2
         from Modules.TruckSimAPI.main import scsTelemetry as SCSTelemetry
         import Modules.BetterScreenCapture.main as ScreenCapture
         from Modules.SDKController.main import SCSController
         import Modules.BetterShowImage.main as ShowImage
+        from ETS2LA.Utils.projection import Projection
         import ETS2LA.Handlers.pytorch as pytorch
         import ETS2LA.Utils.settings as settings
         import ETS2LA.variables as variables
@@ -209,6 +169,9 @@ class Plugin(ETS2LAPlugin):
             HeadRotationDegreesY = Angles[0]
             HeadRotationDegreesZ = Angles[2]
 
+        # This plugin has always rolled the points the other way than AR does.
+        CameraProjection = Projection(HeadX, HeadY, HeadZ, HeadRotationDegreesX, HeadRotationDegreesY, -HeadRotationDegreesZ, FOV,
+                                      ScreenCapture.MonitorX2 - ScreenCapture.MonitorX1, ScreenCapture.MonitorY2 - ScreenCapture.MonitorY1)
 
         TruckWheelPointsX = [Point for Point in APIDATA["configVector"]["truckWheelPositionX"] if Point != 0]
         TruckWheelPointsY = [Point for Point in APIDATA["configVector"]["truckWheelPositionY"] if Point != 0]
@@ -271,8 +234,7 @@ class Plugin(ETS2LAPlugin):
             RightCenterX = BackRightWheel[0] - RightBackWheelRadius * math.cos(TruckRotationRadiansX)
             RightCenterZ = BackRightWheel[2] - RightBackWheelRadius * math.sin(TruckRotationRadiansX)
 
-            LeftPoints = []
-            RightPoints = []
+            Sides = []
             for i in range(2):
                 if i == 0:
                     R = LeftFrontWheelRadius - 1
@@ -284,19 +246,17 @@ class Plugin(ETS2LAPlugin):
                     CenterX = RightCenterX
                     CenterZ = RightCenterZ
                     Offset = math.degrees(math.atan((DistanceRight + 5) / R))
-                for j in range(15):
-                    Angle = j * (1 / -R) * 120 - TruckRotationDegreesX - Offset
-                    Angle = math.radians(Angle)
-                    X = CenterX + R * math.cos(Angle)
-                    Z = CenterZ + R * math.sin(Angle)
-                    Distance = math.sqrt((X - TruckX) ** 2 + (Z - TruckZ) ** 2)
-                    Y = TruckY + math.tan(math.radians(TruckRotationY * 360)) * Distance
-                    X, Y, D = ConvertToScreenCoordinate(X=X, Y=Y, Z=Z)
-                    if X != None and Y != None:
-                        if i == 0:
-                            LeftPoints.append([X, Y])
-                        else:
-                            RightPoints.append([X, Y])
+                ArcAngles = np.radians(np.arange(15) * (1 / -R) * 120 - TruckRotationDegreesX - Offset)
+                X = CenterX + R * np.cos(ArcAngles)
+                Z = CenterZ + R * np.sin(ArcAngles)
+                Distance = np.sqrt((X - TruckX) ** 2 + (Z - TruckZ) ** 2)
+                Y = TruckY + math.tan(math.radians(TruckRotationY * 360)) * Distance
+                Sides.append(np.stack([X, Y, Z], axis=1))
+
+            # Both sides in one batch, the points behind the camera are left out.
+            Screen, _, Visible = CameraProjection.project(np.concatenate(Sides))
+            LeftPoints = Screen[:15][Visible[:15]].tolist()
+            RightPoints = Screen[15:][Visible[15:]].tolist()
 
             TotalImage = np.zeros((100 * min(len(LeftPoints) - 1, len(RightPoints) - 1), 500, 3), np.uint8)
             for i in range(min(len(LeftPoints) - 1, len(RightPoints) - 1)):
@@ -10,6 +10,7 @@ import math
 import os
         
 from ETS2LA.Utils.Values.numbers import SmoothedValue
+from ETS2LA.Networking.broadcast import Broadcaster
 from ETS2LA.Utils.translator import _
 from ETS2LA.Plugin import *
 from ETS2LA.UI import *
@@ -45,6 +46,11 @@ To start off call the server with the following after connecting:
         "name": "available_channels"
     }
 }
+
+Subscribe with "params": {"encoding": "msgpack"} to get binary msgpack frames
+on that channel instead of JSON, the response's "encoding" is the one that will
+be used. Send {"method": "acknowledge", "channel": 0} after handling each batch
+of frames, the next batch is only sent after that.
 """
 
 available_channels = [
@@ -269,29 +275,14 @@ class SettingsMenu(ETS2LAPage):
                         connection = clients[client]
                         with Container(styles.FlexVertical() + styles.Gap("4px")):
                             Text("- " + _("Latency: {latency:.2f}ms").format(latency=client.latency * 1000), styles.Classname("text-sm"))
-                            if connection.subscribed_channels:
-                                Text("- " + _("Channels: {channels}").format(channels=", ".join(str(channel) for channel in connection.subscribed_channels)), styles.Classname("text-sm"))
+                            if connection.channels:
+                                Text("- " + _("Channels: {channels}").format(channels=", ".join(str(channel) for channel in connection.channels)), styles.Classname("text-sm"))
+                                Text("- " + _("Dropped frames: {dropped}").format(dropped=connection.dropped), styles.Classname("text-sm"))
                             else:
                                 Text(_("Not acknowledged yet."), styles.Classname("font-semibold text-sm"))
         else:
             Text(_("There are no currently connected clients."), styles.Classname("font-bold"))
 
-class WebSocketConnection:
-    def __init__(self, websocket):
-        self.websocket = websocket
-        self.queue = asyncio.Queue()
-        self.sender_task = asyncio.create_task(self.send_messages())
-        self.subscribed_channels = set()
-        self.acknowledged = False
-
-    async def send_messages(self):
-        try:
-            while True:
-                message = await self.queue.get()
-                await self.websocket.send(message)
-        except Exception as e:
-            print("Client disconnected due to exception in send_messages.", str(e))
-
 class Plugin(ETS2LAPlugin):
     description = PluginDescription(
         name=_("Visualization Sockets"),
@@ -325,8 +316,9 @@ class Plugin(ETS2LAPlugin):
         global TruckSimAPI
         global socket
 
-        self.connected_clients = {}
-        self.loop = None
+        # Clients have to acknowledge each batch, the frames in between are dropped for slow clients.
+        self.broadcaster = Broadcaster(needs_acknowledge=True)
+        self.connected_clients = self.broadcaster.subscribers
         
         TruckSimAPI = self.modules.TruckSimAPI
         TruckSimAPI.TRAILER = True
@@ -342,7 +334,7 @@ class Plugin(ETS2LAPlugin):
             params = message.get("params", {})
             
             if method == "acknowledge" and channel == 0:
-                self.connected_clients[websocket].acknowledged = True
+                self.connected_clients[websocket].acknowledge()
 
             elif method == "query" and channel == 0:
                 if params.get("name") == "available_channels":
@@ -356,13 +348,14 @@ class Plugin(ETS2LAPlugin):
                     await websocket.send(json.dumps(response))
 
             elif method == "subscribe":
-                self.connected_clients[websocket].subscribed_channels.add(channel)
+                encoding = self.broadcaster.subscribe(websocket, channel, params.get("encoding", "json"))
                 response = {
                     "channel": channel,
                     "result": {
                         "type": "data",
                         "data": {
-                            "message": f"Subscribed to channel {channel}."
+                            "message": f"Subscribed to channel {channel}.",
+                            "encoding": encoding
                         }
                     }
                 }
@@ -370,7 +363,7 @@ class Plugin(ETS2LAPlugin):
                 await websocket.send(json.dumps(response))
 
             elif method == "unsubscribe":
-                self.connected_clients[websocket].subscribed_channels.discard(channel)
+                self.broadcaster.unsubscribe(websocket, channel)
                 response = {
                     "channel": channel,
                     "result": {
@@ -389,8 +382,7 @@ class Plugin(ETS2LAPlugin):
     async def server(self, websocket):
         print("Client connected")
 
-        connection = WebSocketConnection(websocket)
-        self.connected_clients[websocket] = connection
+        self.broadcaster.connect(websocket)
         print("Number of connected clients: ", len(self.connected_clients))
         try:
             async for message in websocket:
@@ -398,8 +390,7 @@ class Plugin(ETS2LAPlugin):
         except Exception as e:
             print("Client disconnected due to exception.", str(e))
         finally:
-            connection.sender_task.cancel()
-            del self.connected_clients[websocket]
+            self.broadcaster.disconnect(websocket)
             print("Client disconnected. Number of connected clients: ", len(self.connected_clients))
         
         
@@ -621,7 +612,6 @@ class Plugin(ETS2LAPlugin):
         return send
 
     async def start(self):
-        self.loop = asyncio.get_running_loop()
         async with websockets.serve(self.server, "0.0.0.0", 37522):
             await asyncio.Future()  # run forever
 
@@ -652,30 +642,23 @@ class Plugin(ETS2LAPlugin):
 
     def run(self):
         api_data = TruckSimAPI.run()
-        channel_data = {} # Cache data for each channel for a frame.
         
         self.description.fps_cap = 20
         self.last_timestamp = api_data["time"]
 
+        # Each channel is built and encoded once, no matter how many clients are subscribed.
+        messages = {}
+        for channel in self.broadcaster.channels():
+            if channel not in self.channel_data_calls:
+                logging.warning(f"Channel {channel} not implemented.")
+                continue
+            
+            try:
+                messages[channel] = self.create_socket_message(channel, self.channel_data_calls[channel](self, api_data))
+            except Exception as e:
+                logging.warning(f"Error getting data for channel {channel}: {str(e)}")
+        
         try:
-            for websocket, connection in list(self.connected_clients.items()):
-                if not connection.acknowledged:
-                    continue
-                
-                for channel in connection.subscribed_channels:
-                    try:
-                        if channel not in channel_data:
-                            if channel not in self.channel_data_calls:
-                                logging.warning(f"Channel {channel} not implemented.")
-                                continue    
-                            channel_data[channel] = self.channel_data_calls[channel](self, api_data)
-                            
-                        message = self.create_socket_message(channel, channel_data[channel])
-                        asyncio.run_coroutine_threadsafe(connection.queue.put(json.dumps(message)), self.loop)
-                        
-                    except Exception as e:
-                        logging.warning(f"Error sending data to client: {str(e)} on channel {channel}.")
-                
-                connection.acknowledged = False
-        except:
-            pass # Got disconnected while iterating over the clients.
+            self.broadcaster.publish_all(messages)
+        except Exception as e:
+            logging.warning(f"Error sending data to clients: {str(e)}")
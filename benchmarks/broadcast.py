@@ -0,0 +1,146 @@
+"""
+Publish 3 channels at 20 fps to 20 local websocket clients through a Broadcaster
+that needs acknowledgements, like VisualizationSockets does. One of the clients
+takes 250 ms to handle each batch.
+
+Also times what the plugin used to do, json.dumps of the traffic channel once per client.
+
+Run from the repository root: python -m benchmarks.broadcast
+"""
+from ETS2LA.Networking.broadcast import Broadcaster
+
+import statistics
+import websockets
+import threading
+import asyncio
+import random
+import json
+import time
+
+CLIENTS = 20
+SECONDS = 5
+FPS = 20
+SLOW_DELAY = 0.25
+"""How long the slow client takes to handle a batch. (s)"""
+PORT = 37599
+
+def vehicles() -> list[dict]:
+    return [{
+        "position": {"x": random.random() * 1e4, "y": 1.0, "z": random.random() * 1e4},
+        "rotation": {"w": 1, "x": 0, "y": 0, "z": 0, "pitch": 0, "yaw": random.random(), "roll": 0},
+        "size": {"width": 2.5, "height": 3.5, "length": 16},
+        "speed": random.random() * 30, "acceleration": 0, "trailer_count": 1, "id": i,
+        "trailers": [], "is_tmp": False, "is_trailer": False
+    } for i in range(40)]
+
+class Server:
+    def __init__(self, broadcaster: Broadcaster):
+        self.broadcaster = broadcaster
+        self.ready = threading.Event()
+        self.dropped = {}
+        """Dropped frames by client id, filled in when the client disconnects."""
+
+    async def handler(self, websocket):
+        subscriber = self.broadcaster.connect(websocket)
+        client = None
+        try:
+            async for message in websocket:
+                message = json.loads(message)
+                if message["method"] == "acknowledge":
+                    subscriber.acknowledge()
+                elif message["method"] == "subscribe":
+                    encoding = self.broadcaster.subscribe(websocket, message["channel"])
+                    await websocket.send(json.dumps({"channel": message["channel"], "result": {"type": "data", "data": {"encoding": encoding}}}))
+                elif message["method"] == "identify":
+                    client = message["id"]
+        finally:
+            self.dropped[client] = subscriber.dropped
+            self.broadcaster.disconnect(websocket)
+
+    async def serve(self):
+        async with websockets.serve(self.handler, "127.0.0.1", PORT):
+            self.ready.set()
+            await asyncio.Future()
+
+async def client(id: int, slow: bool, results: dict):
+    latencies, received = [], 0
+    async with websockets.connect(f"ws://127.0.0.1:{PORT}", max_size=None) as websocket:
+        await websocket.send(json.dumps({"method": "identify", "id": id}))
+        for channel in (1, 3, 4):
+            await websocket.send(json.dumps({"method": "subscribe", "channel": channel}))
+            await websocket.recv()
+        await websocket.send(json.dumps({"method": "acknowledge", "channel": 0}))
+
+        end = time.time() + SECONDS
+        while time.time() < end:
+            try:
+                batch = [await asyncio.wait_for(websocket.recv(), 1)]
+            except asyncio.TimeoutError:
+                continue
+            if slow:
+                await asyncio.sleep(SLOW_DELAY)
+            # The rest of the batch that arrived in the meantime, then acknowledge once.
+            while True:
+                try:
+                    batch.append(await asyncio.wait_for(websocket.recv(), 0.002))
+                except asyncio.TimeoutError:
+                    break
+            for message in batch:
+                data = json.loads(message)["result"]["data"]
+                received += 1
+                if "time" in data:
+                    latencies.append(time.perf_counter() - data["time"])
+            await websocket.send(json.dumps({"method": "acknowledge", "channel": 0}))
+    results[id] = (received, latencies)
+
+async def clients(results: dict):
+    await asyncio.gather(*(client(id, id == 0, results) for id in range(CLIENTS)))
+
+def main():
+    broadcaster = Broadcaster(needs_acknowledge=True)
+    server = Server(broadcaster)
+    threading.Thread(target=lambda: asyncio.run(server.serve()), daemon=True).start()
+    server.ready.wait()
+
+    results = {}
+    client_thread = threading.Thread(target=lambda: asyncio.run(clients(results)))
+    client_thread.start()
+    time.sleep(0.5)
+
+    publish, old = [], []
+    status = {"enabled": ["ACC"], "disabled": []}
+    end = time.time() + SECONDS - 1
+    while time.time() < end:
+        start = time.perf_counter()
+        traffic = {"channel": 4, "result": {"type": "data", "data": {"vehicles": vehicles(), "time": time.perf_counter()}}}
+        broadcaster.publish_all({
+            1: {"channel": 1, "result": {"type": "data", "data": {"x": random.random(), "time": time.perf_counter()}}},
+            3: {"channel": 3, "result": {"type": "data", "data": status}}, # doesn't change, only sent once
+            4: traffic,
+        })
+        publish.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        for i in range(CLIENTS):
+            json.dumps(traffic)
+        old.append(time.perf_counter() - start)
+        time.sleep(1 / FPS)
+
+    client_thread.join()
+    time.sleep(0.2)
+
+    latencies = [latency for id, (received, client_latencies) in results.items() if id != 0 for latency in client_latencies]
+    fast_received = statistics.mean(received for id, (received, client_latencies) in results.items() if id != 0)
+    fast_dropped = max(dropped for id, dropped in server.dropped.items() if id != 0)
+    slow_received, slow_latencies = results[0]
+
+    print(f"{CLIENTS} clients, {len(publish)} ticks, median:")
+    print(f"  publish_all, 3 channels:              {statistics.median(publish) * 1000:8.2f} ms")
+    print(f"  json.dumps of traffic for each client: {statistics.median(old) * 1000:7.2f} ms")
+    print(f"  fast clients: {fast_received:.0f} frames each, latency {statistics.median(latencies) * 1000:.2f} ms, "
+          f"p99 {sorted(latencies)[int(len(latencies) * 0.99)] * 1000:.2f} ms, at most {fast_dropped} dropped")
+    print(f"  slow client:  {slow_received} frames, latency {statistics.median(slow_latencies) * 1000:.1f} ms, "
+          f"{server.dropped[0]} dropped")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Run a small convolutional net (3x144x256 input, like the vision plugins' models)
+through torch and every installed CPU backend of ETS2LA/Handlers/backends.py,
+with and without int8 quantization, and compare the outputs to torch.
+
+The backends use all cores by default, run it with `taskset -c 0` on Linux to
+compare them on one core.
+
+Run from the repository root: python -m benchmarks.inference_backends
+"""
+import ETS2LA.Handlers.backends as backends
+
+import numpy as np
+import tempfile
+import logging
+import torch
+import time
+import os
+
+CHANNELS, HEIGHT, WIDTH = 3, 144, 256
+CALLS = 300
+
+class Net(torch.nn.Module):
+    def __init__(self):
+        super().__init__()
+        self.features = torch.nn.Sequential(
+            torch.nn.Conv2d(CHANNELS, 16, 3, stride=2, padding=1), torch.nn.ReLU(),
+            torch.nn.Conv2d(16, 32, 3, stride=2, padding=1), torch.nn.ReLU(),
+            torch.nn.Conv2d(32, 64, 3, stride=2, padding=1), torch.nn.ReLU(),
+            torch.nn.AdaptiveAvgPool2d(1),
+        )
+        self.head = torch.nn.Linear(64, 8)
+
+    def forward(self, x):
+        return self.head(torch.flatten(self.features(x), 1))
+
+def latencies_ms(function, frames: np.ndarray) -> np.ndarray:
+    times = []
+    for i in range(CALLS):
+        frame = frames[i % len(frames)][None]
+        start = time.perf_counter()
+        function(frame)
+        times.append(time.perf_counter() - start)
+    return np.array(times) * 1000
+
+def main():
+    logging.basicConfig(level=logging.WARNING)
+    torch.manual_seed(0)
+    frames = backends.test_frames(CHANNELS, HEIGHT, WIDTH)
+
+    with tempfile.TemporaryDirectory() as folder:
+        model_path = os.path.join(folder, "model.pt")
+        torch.jit.script(Net().eval()).save(model_path)
+        model = torch.jit.load(model_path, map_location="cpu").float().eval()
+
+        def run_torch(frame):
+            with torch.no_grad():
+                return model(torch.from_numpy(frame)).numpy()
+
+        reference = np.concatenate([run_torch(frame[None]) for frame in frames])
+        results = [("Torch", latencies_ms(run_torch, frames), None, 0)]
+
+        for backend in backends.available_backends():
+            if backend == "Torch":
+                continue
+            for quantization in (False, True):
+                start = time.perf_counter()
+                loaded = backends.load(model_path, CHANNELS, HEIGHT, WIDTH, backend, quantization, "benchmark")
+                load_ms = (time.perf_counter() - start) * 1000
+                if loaded is None:
+                    print(f"  {backend}{' int8' if quantization else ''} didn't load, see the warning above.")
+                    continue
+                outputs = np.concatenate([loaded.run(frame[None]) for frame in frames])
+                difference = float(np.abs(outputs - reference).max())
+                # With quantization on, load() picks int8 only if it's accurate enough and faster.
+                name = f"{loaded.name} (int8 on)" if quantization else loaded.name
+                results.append((name, latencies_ms(loaded.run, frames), difference, load_ms))
+
+    print(f"{CALLS} calls, {CHANNELS}x{HEIGHT}x{WIDTH}:")
+    print(f"  {'backend':<26} {'p50':>8} {'p99':>8} {'max diff':>10} {'load':>9}")
+    for name, times, difference, load_ms in results:
+        difference = f"{difference:.1e}" if difference is not None else ""
+        print(f"  {name:<26} {np.percentile(times, 50):6.2f}ms {np.percentile(times, 99):6.2f}ms {difference:>10} {load_ms:7.0f}ms")
+
+if __name__ == "__main__":
+    main()
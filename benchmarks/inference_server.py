@@ -0,0 +1,109 @@
+"""
+Run a small convolutional net (the one from benchmarks/inference_backends.py)
+on the CPU through the inference server of ETS2LA/Handlers/inference.py, with
+1 to 4 clients sending requests at the same time, and in the benchmark's own
+process like a plugin does when the server isn't running.
+
+Each client has its own connection, like one plugin process. Prints the
+latency of a request and the requests per second of all clients together.
+The "Failed to preprocess" error it logs first is expected, it checks that
+a malformed image is answered without an output.
+
+Run from the repository root: python -m benchmarks.inference_server
+"""
+from benchmarks.inference_backends import Net, CHANNELS, HEIGHT, WIDTH
+from multiprocessing.connection import Client
+import ETS2LA.Handlers.inference as inference
+
+import numpy as np
+import threading
+import tempfile
+import torch
+import time
+import os
+
+CALLS = 200
+"""Requests per client."""
+
+CLIENTS = (1, 2, 4)
+
+def wait_for_server(timeout: float = 30) -> None:
+    start = time.time()
+    while time.time() - start < timeout:
+        try:
+            Client(inference.ADDRESS, authkey=inference.AUTHKEY).close()
+            return
+        except Exception:
+            time.sleep(0.1)
+    raise TimeoutError("The inference server didn't start")
+
+def run_clients(count: int, config: tuple, image: np.ndarray) -> tuple[np.ndarray, float]:
+    """Latencies of every request (ms) and the requests per second of all clients."""
+    latencies = [[] for _ in range(count)]
+    def client(index: int):
+        connection = inference.InferenceClient()
+        for i in range(CALLS):
+            start = time.perf_counter()
+            connection.detect("benchmark", config, image)
+            latencies[index].append(time.perf_counter() - start)
+        connection.close()
+
+    threads = [threading.Thread(target=client, args=(index,)) for index in range(count)]
+    start = time.perf_counter()
+    for thread in threads: thread.start()
+    for thread in threads: thread.join()
+    elapsed = time.perf_counter() - start
+    return np.concatenate(latencies) * 1000, count * CALLS / elapsed
+
+def run_local(model, image: np.ndarray) -> tuple[np.ndarray, float]:
+    """Like Model.detect without the server, uint8 to float and then the model."""
+    latencies = []
+    start = time.perf_counter()
+    for i in range(CALLS):
+        call = time.perf_counter()
+        tensor = torch.from_numpy(image).permute(2, 0, 1)[None].float() / 255
+        with torch.no_grad():
+            model(tensor).numpy()
+        latencies.append(time.perf_counter() - call)
+    return np.array(latencies) * 1000, CALLS / (time.perf_counter() - start)
+
+def main():
+    torch.manual_seed(0)
+    image = np.random.default_rng(0).integers(0, 256, (HEIGHT, WIDTH, CHANNELS), dtype=np.uint8)
+
+    with tempfile.TemporaryDirectory() as folder:
+        model_path = os.path.join(folder, "model.pt")
+        torch.jit.script(Net().eval()).save(model_path)
+        config = (model_path, "float32", WIDTH, HEIGHT, CHANNELS)
+        model = torch.jit.load(model_path, map_location="cpu").float().eval()
+
+        inference.run(cpu=True)
+        try:
+            wait_for_server()
+            # Warm up, and check that an image that can't be preprocessed isn't answered with an output.
+            connection = inference.InferenceClient()
+            reference = connection.detect("benchmark", config, image)
+            try:
+                connection.detect("benchmark", config, image[:HEIGHT // 2])
+                raise AssertionError("A malformed image got an output")
+            except ConnectionError:
+                pass
+            connection.close()
+            with torch.no_grad():
+                local = model(torch.from_numpy(image).permute(2, 0, 1)[None].float() / 255).numpy()
+            assert np.allclose(reference, local, atol=1e-5)
+
+            results = [("local (no server)", *run_local(model, image))]
+            for count in CLIENTS:
+                results.append((f"server, {count} client{'s' if count > 1 else ''}", *run_clients(count, config, image)))
+        finally:
+            inference.process.terminate()
+            inference.process.join()
+
+    print(f"{CALLS} requests per client, {CHANNELS}x{HEIGHT}x{WIDTH}, CPU only:")
+    print(f"  {'':<20} {'p50':>8} {'p99':>8} {'requests/s':>11}")
+    for name, latencies, throughput in results:
+        print(f"  {name:<20} {np.percentile(latencies, 50):6.2f}ms {np.percentile(latencies, 99):6.2f}ms {throughput:11.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+Build the UID index of a map with 3M nodes (about the size of the full Europe map)
+and look up 200k random nodes by their integer and their hex string UID.
+
+Run from the repository root: python -m benchmarks.map_index [nodes]
+"""
+import Plugins.Map.classes as c
+
+import numpy as np
+import random
+import time
+import sys
+
+NODES = 3_000_000
+LOOKUPS = 200_000
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else NODES
+    rng = np.random.default_rng(1)
+    uids = np.unique(rng.integers(1, 2**63, count, dtype=np.uint64))
+    columns = c.NodeColumns(len(uids), uid=uids, x=rng.uniform(-1e5, 1e5, len(uids)), y=rng.uniform(-1e5, 1e5, len(uids)))
+
+    map = c.MapData()
+    map.nodes = columns.nodes
+    map.roads, map.prefabs, map.models, map.navigation = [], [], [], []
+    map.model_descriptions, map.companies, map.cities, map.road_looks = [], [], [], []
+
+    start = time.perf_counter()
+    map.build_dictionary()
+    build = time.perf_counter() - start
+
+    keys = [int(uid) for uid in random.Random(2).sample(list(uids), min(LOOKUPS, len(uids)))]
+    hex_keys = [hex(key)[2:] for key in keys]
+    assert all(map.get_node_by_uid(key).uid == key for key in keys[:1000])
+    assert all(map.get_node_by_uid(key).uid == int(key, 16) for key in hex_keys[:1000])
+
+    def per_lookup(lookups: list) -> float:
+        start = time.perf_counter()
+        for key in lookups:
+            map.get_node_by_uid(key)
+        return (time.perf_counter() - start) / len(lookups) * 1e6
+
+    print(f"{len(uids)} nodes, {len(keys)} lookups:")
+    print(f"  build_dictionary:           {build:8.2f} s")
+    print(f"  get_node_by_uid, int:       {per_lookup(keys):8.2f} us")
+    print(f"  get_node_by_uid, hex str:   {per_lookup(hex_keys):8.2f} us")
+
+if __name__ == "__main__":
+    main()
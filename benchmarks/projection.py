@@ -0,0 +1,45 @@
+"""
+Project 10k points with the scalar ConvertCoordinateToScreen, Projection.project
+and the AR plugin's ProjectCoordinates.
+
+Run from the repository root: python -m benchmarks.projection
+"""
+from ETS2LA.Utils.projection import Projection
+import Plugins.AR.classes as ar
+
+from types import SimpleNamespace
+import numpy as np
+import time
+
+POINTS = 10000
+
+def median_ms(function, repeats: int) -> float:
+    times = []
+    for i in range(repeats):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return float(np.median(times)) * 1000
+
+def main():
+    ar.ets2la_AR_imported = False # the Python version, the C++ one is only built for Windows
+    rng = np.random.default_rng(1)
+    plugin = SimpleNamespace(
+        HeadX=1200.0, HeadY=40.0, HeadZ=-3400.0, InsideHeadX=1200.0, InsideHeadY=40.0, InsideHeadZ=-3400.0,
+        HeadRotationDegreesX=35.0, HeadRotationDegreesY=-5.0, HeadRotationDegreesZ=1.0,
+        CabinOffsetRotationDegreesX=0.0, CabinOffsetRotationDegreesY=0.0, CabinOffsetRotationDegreesZ=0.0,
+        FOV=75.0, WindowPosition=(0, 0, 1920, 1080),
+    )
+    points = np.array([plugin.HeadX, plugin.HeadY, plugin.HeadZ]) + rng.uniform(-300, 300, (POINTS, 3))
+    coordinates = [ar.Coordinate(*point) for point in points]
+    projection = Projection(plugin.HeadX, plugin.HeadY, plugin.HeadZ, plugin.HeadRotationDegreesX, plugin.HeadRotationDegreesY,
+                            plugin.HeadRotationDegreesZ, plugin.FOV, 1920, 1080)
+
+    print(f"{POINTS} points, median:")
+    print(f"  ConvertCoordinateToScreen loop:       {median_ms(lambda: [ar.ConvertCoordinateToScreen(c, plugin) for c in coordinates], 10):8.2f} ms")
+    print(f"  Projection.project:                   {median_ms(lambda: projection.project(points), 200):8.2f} ms")
+    print(f"  Projection.project (frustum):         {median_ms(lambda: projection.project(points, frustum=True), 200):8.2f} ms")
+    print(f"  ProjectCoordinates (from Coordinate): {median_ms(lambda: ar.ProjectCoordinates(coordinates, plugin), 20):8.2f} ms")
+
+if __name__ == "__main__":
+    main()
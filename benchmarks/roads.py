@@ -0,0 +1,107 @@
+"""
+Generate the points and lanes of a synthetic 400 road sector (10-200 m long,
+0-3 lanes on each side), and compare the points against the scalar Hermite3D.
+
+Run from the repository root: python -m benchmarks.roads
+"""
+from Plugins.Map.utils import road_helpers, math_helpers
+import Plugins.Map.classes as c
+import Plugins.Map.data as data
+
+from types import SimpleNamespace
+import numpy as np
+import logging
+import random
+import time
+import math
+
+ROADS = 400
+
+def node(rng: random.Random, x: float, y: float, z: float, angle: float) -> SimpleNamespace:
+    pitch = rng.uniform(-0.05, 0.05)
+    quaternion = np.array([math.cos(angle / 2), math.sin(pitch / 2), math.sin(angle / 2), 0.01])
+    return SimpleNamespace(x=x, y=y, z=z, rotationQuat=list(quaternion / np.linalg.norm(quaternion)))
+
+def sector(seed: int = 3) -> list[c.Road]:
+    """Roads that already have their nodes, so generating them doesn't need the map."""
+    rng = random.Random(seed)
+    roads = []
+    for i in range(ROADS):
+        x, z = rng.uniform(0, 300), rng.uniform(0, 300)
+        angle = rng.uniform(0, 2 * math.pi)
+        length = rng.uniform(10, 200)
+        end_angle = angle + rng.uniform(-0.5, 0.5)
+
+        road = object.__new__(c.Road)
+        road.uid = i
+        road.start_node_uid, road.end_node_uid = 1, 2
+        road.start_node = node(rng, x, rng.uniform(0, 50), z, angle)
+        road.end_node = node(rng, x - math.sin(angle) * length, rng.uniform(0, 50), z - math.cos(angle) * length, end_angle)
+        road.length = length * 1.02 if i % 10 else 0 # some roads without a length, like in the data
+        road.road_look = c.RoadLook("token", "name", ["lane"] * (i % 4), ["lane"] * ((i // 4) % 4), 0, 0, 0, 0)
+        road._points = None
+        roads.append(road)
+    return roads
+
+def scalar_points(road: c.Road) -> list[tuple[float, float, float]]:
+    """Road.generate_points with one Hermite3D call per point."""
+    start = (road.start_node.x, road.start_node.z, road.start_node.y)
+    end = (road.end_node.x, road.end_node.z, road.end_node.y)
+    count = max(int(math.dist(start, end) * 0.5), 4)
+    return [math_helpers.Hermite3D(i / (count - 1), start, end, road.start_node.rotationQuat, road.end_node.rotationQuat, road.length)
+            for i in range(count)]
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return result, (time.perf_counter() - start) * 1000
+
+def main():
+    logging.disable(logging.ERROR)
+    c.data = data
+    roads = sector()
+
+    reference, scalar_ms = timed(lambda: [scalar_points(road) for road in roads])
+    points, points_ms = timed(lambda: [road.generate_points() for road in roads])
+    error = max(np.abs(np.array(a) - np.array([p.tuple() for p in b])).max() for a, b in zip(reference, points))
+
+    widths = [(4.5 + i % 3, 4.5 + (i % 2) * 2) for i in range(ROADS)]
+    lanes, lanes_ms = timed(lambda: [
+        road_helpers.calculate_lanes(road_points, 4.5, len(road.road_look.lanes_left), len(road.road_look.lanes_right), road, custom, previous)
+        for road, road_points, (custom, previous) in zip(roads, points, widths)
+    ])
+    lane_count = sum(len(road_lanes["left"]) + len(road_lanes["right"]) for road_lanes in lanes)
+
+    for road, road_points in zip(roads, points):
+        road._points = road_points
+    results, get_lanes_ms = timed(lambda: [road_helpers.GetRoadLanes(road, data) for road in roads])
+    assert all(bounding_box is not None for lanes, bounding_box in results if lanes)
+
+    # The whole sector as one batch, the samples of every road repeated into rows.
+    def batch():
+        counts, starts, ends, start_rotations, end_rotations, lengths = [], [], [], [], [], []
+        for road in roads:
+            start = (road.start_node.x, road.start_node.z, road.start_node.y)
+            end = (road.end_node.x, road.end_node.z, road.end_node.y)
+            counts.append(max(int(math.dist(start, end) * 0.5), 4))
+            starts.append(start)
+            ends.append(end)
+            start_rotations.append(road.start_node.rotationQuat)
+            end_rotations.append(road.end_node.rotationQuat)
+            lengths.append(road.length)
+        counts = np.array(counts)
+        s = np.concatenate([np.arange(count) / (count - 1) for count in counts])
+        repeat = lambda values: np.repeat(np.array(values, dtype=np.float64), counts, axis=0)
+        return math_helpers.Hermite3DBatch(s, repeat(starts), repeat(ends), repeat(start_rotations), repeat(end_rotations), repeat(lengths))
+    batched, batch_ms = timed(batch)
+    batch_error = np.abs(batched - np.array([point for road_points in reference for point in road_points])).max()
+
+    print(f"{ROADS} roads, {sum(len(road_points) for road_points in points)} points, {lane_count} lanes:")
+    print(f"  points, scalar Hermite3D:   {scalar_ms:8.1f} ms")
+    print(f"  points, generate_points:    {points_ms:8.1f} ms (max difference {error:.1e})")
+    print(f"  calculate_lanes:            {lanes_ms:8.1f} ms")
+    print(f"  GetRoadLanes:               {get_lanes_ms:8.1f} ms")
+    print(f"  points, one sector batch:   {batch_ms:8.1f} ms (max difference {batch_error:.1e})")
+
+if __name__ == "__main__":
+    main()
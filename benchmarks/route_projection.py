@@ -0,0 +1,85 @@
+"""
+Project a synthetic 6000 item navigation route to lon/lat with RouteProjection,
+and with one get_ets2_coordinates call per point like NavigationSockets used to.
+
+Run from the repository root: python -m benchmarks.route_projection
+"""
+from Plugins.NavigationSockets.main import RouteProjection, coords_to_wgs84
+from ETS2LA.Networking.broadcast import encode
+
+import numpy as np
+import random
+import json
+import math
+import time
+
+ITEMS = 6000
+
+def synthetic_route(seed: int = 1) -> dict:
+    """Every third item is a prefab (only the node), the roads have 5 points and some are driven in reverse."""
+    rng = random.Random(seed)
+    uids, nodes, points = [], [], []
+    x, z = 0.0, 0.0
+    for i in range(ITEMS):
+        nodes.append((x, z, 10.0))
+        if i % 3:
+            road = [(x + j * 20, z + j * 5, 10.0) for j in range(5)]
+            if rng.random() < 0.3:
+                road = road[::-1]
+            points.append(road)
+            uids.append(10_000 + i)
+            x += 80
+            z += 20
+        else:
+            points.append(None)
+            uids.append(90_000 + i)
+    return {"uids": uids, "nodes": nodes, "points": points}
+
+def per_point(navigation: dict) -> list[tuple[float, float]]:
+    nodes, node_points = navigation["nodes"], navigation["points"]
+    route = []
+    for i in range(len(nodes) - 1):
+        points = node_points[i]
+        if not points or len(points) < 5:
+            route.append(nodes[i])
+            continue
+        if route and math.dist(points[-1], route[-1]) < math.dist(points[0], route[-1]):
+            points = points[::-1]
+        route.extend(points)
+    return [coords_to_wgs84(point[0], point[1], "ETS2") for point in route]
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return result, (time.perf_counter() - start) * 1000
+
+def main():
+    navigation = synthetic_route()
+    # The route gets shorter from the start while driving.
+    shrunk = {key: values[6:] for key, values in navigation.items()}
+
+    reference, per_point_ms = timed(lambda: per_point(navigation))
+    projection = RouteProjection()
+    changed, first_ms = timed(lambda: projection.update(navigation, "ETS2"))
+    assert changed and np.allclose(projection.lon_lats, np.array(reference))
+
+    changed, shrunk_ms = timed(lambda: projection.update(shrunk, "ETS2"))
+    assert changed and np.allclose(projection.lon_lats, np.array(per_point(shrunk)))
+    changed, unchanged_ms = timed(lambda: projection.update(shrunk, "ETS2"))
+    assert not changed
+
+    projection.update(navigation, "ETS2")
+    _, dumps_ms = timed(lambda: json.dumps({"lonLats": reference}))
+    encoded, encode_ms = timed(lambda: encode({"lonLats": projection.lon_lats}, "json"))
+    assert np.allclose(np.array(json.loads(encoded)["lonLats"]), np.array(reference))
+
+    print(f"{ITEMS} items, {len(reference)} points:")
+    print(f"  per point projection:           {per_point_ms:8.1f} ms")
+    print(f"  RouteProjection, first update:  {first_ms:8.1f} ms")
+    print(f"  route shorter by 6 items:       {shrunk_ms:8.1f} ms")
+    print(f"  unchanged route:                {unchanged_ms:8.3f} ms")
+    print(f"  json.dumps of the list:         {dumps_ms:8.1f} ms")
+    print(f"  broadcast encode of the array:  {encode_ms:8.1f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Decode a synthetic 32 KB telemetry buffer with scsTelemetry.update(), all of it
+and only the entries a plugin typically reads, with and without the trailers.
+
+Every field of the layout is filled with a random value of its type, strings
+are NUL padded and bools are 0 or 1, like the game writes them.
+
+Run from the repository root: python -m benchmarks.telemetry
+"""
+import Modules.TruckSimAPI.api as api
+
+import tempfile
+import random
+import pickle
+import struct
+import json
+import time
+import os
+
+UPDATES = 300
+
+def fill(buffer: bytearray, layout: list, offset: int, rng: random.Random) -> int:
+    for key, format in layout:
+        if isinstance(format, list):
+            offset = fill(buffer, format, offset, rng)
+            continue
+
+        compiled, _, _ = api.compileFormat(format)
+        size = struct.calcsize("=" + compiled)
+        if format == "game":
+            buffer[offset:offset + size] = struct.pack("=i", 1)
+        elif format.endswith("s"):
+            length = int(format.split("*")[-1][:-1])
+            for start in range(offset, offset + size, length):
+                text = bytes(rng.choice(b"abcdef ") for i in range(rng.randint(0, length - 1)))
+                buffer[start:start + length] = text.ljust(length, b"\0")
+        elif format.endswith("?"):
+            for index in range(offset, offset + size):
+                buffer[index] = rng.randint(0, 1)
+        elif format[-1] in "fd":
+            count = size // struct.calcsize(format[-1])
+            buffer[offset:offset + size] = struct.pack(f"={count}{format[-1]}", *[rng.uniform(-1000, 1000) for i in range(count)])
+        elif not format.endswith("x"):
+            buffer[offset:offset + size] = bytes(rng.getrandbits(8) for i in range(size))
+        offset += size
+    return offset
+
+def synthetic_buffer(seed: int = 1) -> bytearray:
+    rng = random.Random(seed)
+    buffer = bytearray(rng.getrandbits(8) for i in range(api.mmapSize))
+    fill(buffer, api.LAYOUT, 0, rng)
+    trailer_size = api.TRAILER_ENTRIES["trailers"][1].size // api.trailerCount
+    for trailer in range(api.trailerCount):
+        fill(buffer, api.TRAILER_LAYOUT, api.trailerOffset + trailer * trailer_size, rng)
+    buffer[0] = 1 # sdkActive
+    return buffer
+
+def per_update_ms(function) -> float:
+    start = time.perf_counter()
+    for i in range(UPDATES):
+        function()
+    return (time.perf_counter() - start) / UPDATES * 1000
+
+def main():
+    if os.name == "nt":
+        print("The benchmark maps a file instead of the game's shared memory, which only works on Linux.")
+        return
+
+    path = os.path.join(tempfile.gettempdir(), "ETS2LA_benchmark_telemetry")
+    with open(path, "wb") as file:
+        file.write(synthetic_buffer())
+    api.mmapName = path
+
+    telemetry = api.scsTelemetry()
+    try:
+        for trailers in (False, True):
+            data = telemetry.update(trailers)
+            decoded = dict(data.items())
+            assert pickle.loads(pickle.dumps(data)) == decoded
+            assert json.loads(json.dumps(data)) == json.loads(json.dumps(decoded))
+
+        plugin_entries = lambda data: (data["truckPlacement"], data["truckFloat"], data["truckVector"], data["commonFloat"], data["specialBool"])
+        print(f"{UPDATES} updates, per update:")
+        print(f"  full decode:                   {per_update_ms(lambda: telemetry.update().items()):8.3f} ms")
+        print(f"  only truckPlacement:           {per_update_ms(lambda: telemetry.update()['truckPlacement']):8.3f} ms")
+        print(f"  5 entries:                     {per_update_ms(lambda: plugin_entries(telemetry.update())):8.3f} ms")
+        print(f"  with trailers, full decode:    {per_update_ms(lambda: telemetry.update(True).items()):8.3f} ms")
+        print(f"  with trailers, 5 entries:      {per_update_ms(lambda: plugin_entries(telemetry.update(True))):8.3f} ms")
+    finally:
+        telemetry.close()
+        os.remove(path)
+
+if __name__ == "__main__":
+    main()
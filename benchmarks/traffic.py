@@ -0,0 +1,95 @@
+"""
+Decode a synthetic traffic buffer of 40 vehicles with 0-2 trailers each, and
+compute their corners in one batch and one vehicle at a time.
+
+Run from the repository root: python -m benchmarks.traffic
+"""
+import Modules.Traffic.main as traffic
+
+import numpy as np
+import struct
+import time
+
+VEHICLES = 40
+REPEATS = 300
+
+VEHICLE_FORMAT = "ffffffffffffhh" + "ffffffffff" * 2
+"""Position, rotation, size, speed, acceleration, trailer count and ID, then the 2 trailers."""
+
+def synthetic_buffer(seed: int = 2) -> bytes:
+    rng = np.random.default_rng(seed)
+    def quaternion() -> list[float]:
+        values = rng.standard_normal(4)
+        return list(values / np.linalg.norm(values))
+
+    values = []
+    for i in range(VEHICLES):
+        position = [1000 + i * 10, 5.0, -2000 + i * 7]
+        trailer_count = i % 3
+        values += position + quaternion() + [2.5, 3.5, 8 + i % 5] + [20.0, 0.5, trailer_count, i + 1]
+        for trailer in range(2):
+            if trailer < trailer_count:
+                values += [position[0] + trailer, 5, position[2] - 10 * (trailer + 1)] + quaternion() + [2.5, 4, 12]
+            else:
+                values += [0.0] * 10
+    return struct.pack("=" + VEHICLE_FORMAT * VEHICLES, *values)
+
+def module(buffer: bytes) -> traffic.Module:
+    """The module without waiting for the game's buffer, see Module.imports()."""
+    module = traffic.Module.__new__(traffic.Module)
+    module.buf = buffer
+    module.seen = np.zeros(65536, dtype=bool)
+    module.last_ids = np.zeros(0, dtype=np.int64)
+    module.speeds = np.zeros(65536)
+    module.speed_times = np.zeros(65536)
+    module.speed_positions = np.zeros((65536, 3))
+    return module
+
+def scalar_corners(vehicles: list) -> list:
+    """Each vehicle's and trailer's corners on their own, without the frame's batch."""
+    corners = []
+    for vehicle in vehicles:
+        vehicle.frame = None
+        corners.append(vehicle.get_corners())
+        for trailer in vehicle.trailers:
+            trailer.frame = None
+            corners.append(trailer.get_corners())
+    return corners
+
+def batch_corners(vehicles: list) -> list:
+    corners = []
+    for vehicle in vehicles:
+        corners.append(vehicle.get_corners())
+        for trailer in vehicle.trailers:
+            corners.append(trailer.get_corners())
+    return corners
+
+def per_call_us(function) -> float:
+    times = []
+    for i in range(5):
+        start = time.perf_counter()
+        for j in range(REPEATS):
+            function()
+        times.append((time.perf_counter() - start) / REPEATS)
+    return min(times) * 1e6
+
+def main():
+    traffic_module = module(synthetic_buffer())
+
+    vehicles = traffic_module.get_traffic()
+    assert len(vehicles) == VEHICLES
+    batch = batch_corners(vehicles)
+    scalar = scalar_corners(traffic_module.get_traffic())
+    error = np.abs(np.array(batch) - np.array(scalar)).max()
+
+    highlighted = [VEHICLES // 2]
+    print(f"{VEHICLES} vehicles, best of 5:")
+    print(f"  get_traffic_arrays:                 {per_call_us(traffic_module.get_traffic_arrays):8.1f} us")
+    print(f"  get_traffic (Vehicles):             {per_call_us(traffic_module.get_traffic):8.1f} us")
+    print(f"  Vehicles + corners, batch:          {per_call_us(lambda: batch_corners(traffic_module.get_traffic())):8.1f} us")
+    print(f"  Vehicles + corners, one at a time:  {per_call_us(lambda: scalar_corners(traffic_module.get_traffic())):8.1f} us")
+    print(f"  find highlighted + corners:         {per_call_us(lambda: traffic_module.get_traffic_arrays().find(highlighted).get_corners()):8.1f} us")
+    print(f"  largest corner difference: {error:.1e} m")
+
+if __name__ == "__main__":
+    main()
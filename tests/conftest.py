@@ -0,0 +1,27 @@
+"""
+Shared setup for the tests. Run them from the repository root with `python -m pytest tests`.
+
+Importing Plugins.Map.data reads the plugin settings, which creates the settings
+files if they don't exist yet. Those are removed again after the tests.
+"""
+import pytest
+import sys
+import os
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+SETTINGS_FILES = [
+    os.path.join(ROOT, "ETS2LA", "global.json"),
+    os.path.join(ROOT, "Plugins", "Map", "settings.json"),
+]
+EXISTING = [path for path in SETTINGS_FILES if os.path.exists(path)]
+"""Checked before the test modules are imported."""
+
+@pytest.fixture(scope="session", autouse=True)
+def remove_created_settings():
+    yield
+    for path in SETTINGS_FILES:
+        if path not in EXISTING and os.path.exists(path):
+            os.remove(path)
@@ -0,0 +1,60 @@
+"""The broadcaster with stand-in websockets, new subscribers get the last message of each channel."""
+from ETS2LA.Networking.broadcast import Broadcaster
+
+import asyncio
+import orjson
+
+class Socket:
+    remote_address = ("127.0.0.1", 0)
+
+    def __init__(self):
+        self.sent = []
+
+    async def send(self, frame):
+        self.sent.append(orjson.loads(frame))
+
+async def settle():
+    """Let the broadcaster deliver and the sender tasks send."""
+    for attempt in range(5):
+        await asyncio.sleep(0)
+
+def test_subscribe_after_publish_before_any_client():
+    async def run():
+        broadcaster = Broadcaster()
+        broadcaster.publish_all({"route": {"points": [1, 2, 3]}, "theme": "dark"})
+
+        socket = Socket()
+        broadcaster.connect(socket)
+        broadcaster.subscribe(socket, "route")
+        await settle()
+        assert socket.sent == [{"points": [1, 2, 3]}]
+        broadcaster.disconnect(socket)
+    asyncio.run(run())
+
+def test_subscribe_after_publish_with_other_clients():
+    async def run():
+        broadcaster = Broadcaster()
+        first = Socket()
+        broadcaster.connect(first)
+        broadcaster.subscribe(first, "theme")
+        broadcaster.publish_all({"route": {"points": [1]}, "theme": "dark"})
+        broadcaster.publish_all({"route": {"points": [1, 2]}, "theme": "dark"})
+        await settle()
+        assert first.sent == ["dark"]
+
+        # Nobody was subscribed to the route, the newest one is sent.
+        second = Socket()
+        broadcaster.connect(second)
+        broadcaster.subscribe(second, "route")
+        broadcaster.subscribe(second, "theme")
+        await settle()
+        assert sorted(second.sent, key=str) == sorted([{"points": [1, 2]}, "dark"], key=str)
+
+        # Unchanged messages aren't sent again, changed ones go to the subscribers.
+        broadcaster.publish_all({"route": {"points": [1, 2]}, "theme": "light"})
+        await settle()
+        assert first.sent == ["dark", "light"]
+        assert second.sent[2:] == ["light"]
+        for socket in (first, second):
+            broadcaster.disconnect(socket)
+    asyncio.run(run())
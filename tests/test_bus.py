@@ -0,0 +1,76 @@
+"""The tag bus with a plugin process writing and the test process reading, like the backend."""
+from ETS2LA.Plugin.bus import TagBus, MISSING, MIN_CAPACITY
+
+import multiprocessing
+import pytest
+import time
+
+WRITES = 400
+
+def value(index: int) -> tuple[int, bytes]:
+    """Grows past MIN_CAPACITY a few times, a torn read mixes two of these."""
+    size = 100 + index * MIN_CAPACITY * 4 // WRITES
+    return index, bytes([index % 256]) * size
+
+def write_growing(handle: tuple) -> None:
+    bus = TagBus(*handle)
+    for index in range(WRITES):
+        bus.write("growing", "writer", value(index))
+    bus.close()
+
+def write_later(handle: tuple, delay: float) -> None:
+    bus = TagBus(*handle)
+    time.sleep(delay)
+    bus.write("later", "writer", True)
+    bus.close()
+
+@pytest.fixture
+def bus():
+    bus = TagBus()
+    yield bus
+    bus.close()
+
+def test_reads_while_a_process_grows_the_segment(bus):
+    writer = multiprocessing.Process(target=write_growing, args=(bus.handle,))
+    writer.start()
+    last = -1
+    reads = 0
+    while writer.is_alive() or last < WRITES - 1:
+        data = bus.read("growing")
+        if data is None:
+            continue
+        index, payload = data["writer"]
+        assert (index, payload) == value(index)
+        assert index >= last
+        last = index
+        reads += 1
+    writer.join()
+    assert writer.exitcode == 0
+    assert last == WRITES - 1
+    assert reads > 1
+
+def test_wait_wakes_up_on_a_write(bus):
+    writer = multiprocessing.Process(target=write_later, args=(bus.handle, 0.2))
+    writer.start()
+    start = time.perf_counter()
+    assert bus.wait("later", timeout=5)
+    assert time.perf_counter() - start < 5
+    assert bus.read("later") == {"writer": True}
+    writer.join()
+    assert bus.waiters() == 0
+
+def test_wait_times_out_without_a_write(bus):
+    bus.write("other", "writer", 1)
+    start = time.perf_counter()
+    assert not bus.wait("quiet", timeout=0.2)
+    assert time.perf_counter() - start >= 0.2
+    assert bus.waiters() == 0
+
+def test_registered_but_unwritten_entries_are_missing(bus):
+    entry = bus.register("tag", "first")
+    assert bus.read_entry(entry) is MISSING
+    assert bus.read("tag") is None
+
+    bus.write("tag", "second", 2)
+    assert bus.read("tag") == {"second": 2}
+    assert bus.read_entry(entry) is MISSING
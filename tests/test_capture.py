@@ -0,0 +1,79 @@
+"""The capture service with the synthetic source, readers get the (x, y, frame) pattern back."""
+from Modules.BetterScreenCapture.shared import SharedCapture, sharedName
+import ETS2LA.Handlers.capture as capture
+
+from multiprocessing import shared_memory
+import numpy as np
+import subprocess
+import pytest
+import time
+import sys
+
+X1, Y1, X2, Y2 = 300, 500, 340, 520
+
+READER = f"""
+from Modules.BetterScreenCapture.shared import SharedCapture
+import time
+reader = SharedCapture()
+for attempt in range(100):
+    if reader.read() is not None:
+        break
+    time.sleep(0.05)
+else:
+    raise SystemExit("No frame")
+reader.close()
+"""
+
+def pattern(frame: int) -> np.ndarray:
+    """The BGRA pixels SyntheticSource generates for the area."""
+    y, x = np.mgrid[Y1:Y2, X1:X2]
+    return np.stack([x % 256, y % 256, np.full_like(x, frame % 256), np.full_like(x, 255)], axis=2).astype(np.uint8)
+
+def newest(function, timeout: float = 5):
+    """The first result that isn't None, the service is idle until a reader asks for a frame."""
+    end = time.time() + timeout
+    while time.time() < end:
+        result = function()
+        if result is not None:
+            return result
+        time.sleep(0.01)
+    raise TimeoutError("No frame from the capture service")
+
+@pytest.fixture(scope="module")
+def reader():
+    capture.run("synthetic")
+    reader = SharedCapture()
+    assert reader.start()
+    yield reader
+    reader.close()
+    capture.stop()
+
+def test_view_is_the_area_of_the_frame(reader):
+    frame, view = newest(lambda: reader.view(X1, Y1, X2, Y2))
+    matches = np.array_equal(view, pattern(frame))
+    assert reader.valid(frame) # the slot wasn't overwritten while comparing
+    assert matches
+
+def test_read_is_a_bgr_copy(reader):
+    image = newest(lambda: reader.read(X1, Y1, X2, Y2))
+    assert image.shape == (Y2 - Y1, X2 - X1, 3)
+    frame = int(image[0, 0, 2])
+    assert np.array_equal(image, pattern(frame)[:, :, :3])
+
+def test_region_follows_the_frames(reader):
+    region = reader.register(X1, Y1, X2, Y2)
+    first, _ = newest(region.view)
+    time.sleep(0.1)
+    second, view = newest(region.view)
+    assert second > first
+    matches = np.array_equal(view, pattern(second))
+    assert reader.valid(second)
+    assert matches
+
+def test_ring_outlives_a_reader_process(reader):
+    result = subprocess.run([sys.executable, "-c", READER], capture_output=True, text=True, timeout=30)
+    assert result.returncode == 0, result.stderr
+    assert "leaked" not in result.stderr
+    ring = shared_memory.SharedMemory(name=sharedName)
+    ring.close()
+    assert newest(lambda: reader.read(X1, Y1, X2, Y2)) is not None
@@ -0,0 +1,90 @@
+"""The batched projection against the scalar ConvertCoordinateToScreen it replaces."""
+from ETS2LA.Utils.projection import Projection
+import Plugins.AR.classes as ar
+
+from types import SimpleNamespace
+import numpy as np
+import functools
+import pytest
+
+def camera(rng: np.random.Generator, inside: bool) -> SimpleNamespace:
+    """A random camera with the attributes the AR plugin reads from the telemetry."""
+    head = rng.uniform(-5000, 5000, 3)
+    offset = rng.uniform(-1, 1, 3) * (2, 0.5, 2) if inside else rng.uniform(5, 20, 3)
+    return SimpleNamespace(
+        HeadX=head[0], HeadY=head[1], HeadZ=head[2],
+        InsideHeadX=head[0] + offset[0], InsideHeadY=head[1] + offset[1], InsideHeadZ=head[2] + offset[2],
+        HeadRotationDegreesX=rng.uniform(-180, 180), HeadRotationDegreesY=rng.uniform(-60, 60), HeadRotationDegreesZ=rng.uniform(-20, 20),
+        CabinOffsetRotationDegreesX=rng.uniform(-10, 10), CabinOffsetRotationDegreesY=rng.uniform(-10, 10), CabinOffsetRotationDegreesZ=rng.uniform(-10, 10),
+        FOV=rng.uniform(50, 100), WindowPosition=(0, 0, 2560, 1440),
+    )
+
+def coordinates(rng: np.random.Generator, plugin: SimpleNamespace, count: int) -> list[ar.Coordinate]:
+    """Absolute, relative and rotation relative coordinates around the camera."""
+    result = []
+    for i in range(count):
+        if i % 3 == 0:
+            position = np.array([plugin.HeadX, plugin.HeadY, plugin.HeadZ]) + rng.uniform(-300, 300, 3)
+            result.append(ar.Coordinate(*position))
+        else:
+            result.append(ar.Coordinate(*rng.uniform(-30, 30, 3), relative=True, rotation_relative=i % 3 == 2))
+    return result
+
+@pytest.fixture(autouse=True)
+def python_only(monkeypatch):
+    monkeypatch.setattr(ar, "ets2la_AR_imported", False)
+
+@pytest.mark.parametrize("inside", [True, False])
+def test_matches_scalar(inside, monkeypatch):
+    # The scalar version only clips points behind the camera, not the ones closer than NEAR.
+    monkeypatch.setattr(ar, "Projection", functools.partial(Projection, near=0))
+    rng = np.random.default_rng(1 if inside else 2)
+    for trial in range(50):
+        plugin = camera(rng, inside)
+        batch = coordinates(rng, plugin, 60)
+        projected = ar.ProjectCoordinates(batch, plugin)
+        for coordinate in batch:
+            expected = ar.ConvertCoordinateToScreen(coordinate, plugin)
+            result = projected[id(coordinate)]
+            if expected is None:
+                assert result is None
+                continue
+            assert result == pytest.approx(expected, rel=1e-9, abs=1e-6)
+
+def test_relative_from_other_camera():
+    """From another camera a relative coordinate is where it would be relative to the driver's head."""
+    rng = np.random.default_rng(3)
+    plugin = camera(rng, inside=False)
+    assert not ar.IsInsideCab(plugin)
+    offset = ar.Coordinate(*rng.uniform(-10, 10, 3), relative=True)
+    absolute = ar.Coordinate(plugin.InsideHeadX + offset.x, plugin.InsideHeadY + offset.y, plugin.InsideHeadZ + offset.z)
+    assert ar.ConvertCoordinateToScreen(offset, plugin) == pytest.approx(ar.ConvertCoordinateToScreen(absolute, plugin))
+    projected = ar.ProjectCoordinates([offset, absolute], plugin)
+    assert projected[id(offset)] == pytest.approx(projected[id(absolute)])
+
+def test_uses_cpp_when_imported(monkeypatch):
+    """The C++ version projects everything it supports, the relative coordinates of other cameras are batched."""
+    rng = np.random.default_rng(4)
+    plugin = camera(rng, inside=False)
+    batch = coordinates(rng, plugin, 30)
+    python = ar.ProjectCoordinates(batch, plugin)
+
+    calls = []
+    def game_to_screen_coordinate(x, y, z, *args):
+        calls.append((x, y, z))
+        return 1.0, 2.0, 3.0
+    monkeypatch.setattr(ar, "ets2la_AR", SimpleNamespace(game_to_screen_coordinate=game_to_screen_coordinate), raising=False)
+    monkeypatch.setattr(ar, "ets2la_AR_imported", True)
+
+    projected = ar.ProjectCoordinates(batch, plugin)
+    absolute = [coordinate for coordinate in batch if not coordinate.relative]
+    assert calls == [coordinate.tuple() for coordinate in absolute]
+    for coordinate in batch:
+        expected = (1.0, 2.0, 3.0) if not coordinate.relative else python[id(coordinate)]
+        assert projected[id(coordinate)] == expected
+
+def test_projection_point():
+    projection = Projection(0, 0, 0, 0, 0, 0, 90, 1920, 1080)
+    # The camera looks down -Z, a point straight ahead is in the middle of the window.
+    assert projection.project_point(0, 0, -10) == pytest.approx((960, 540, 10))
+    assert projection.project_point(0, 0, 10) is None
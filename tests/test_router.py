@@ -0,0 +1,119 @@
+"""The router's A* and contraction hierarchy against a plain Dijkstra on a synthetic road grid."""
+from Plugins.Map.navigation.router import NavigationGraph, ContractionHierarchy, Router
+import Plugins.Map.classes as c
+
+from types import SimpleNamespace
+import numpy as np
+import random
+import pytest
+import heapq
+import math
+
+SIZE = 12
+"""The grid is SIZE x SIZE nodes, 100 m apart."""
+
+def grid_map(seed: int = 1) -> SimpleNamespace:
+    """A grid of nodes with random one way and missing connections, the columns a MapData would have."""
+    rng = random.Random(seed)
+    count = SIZE * SIZE
+    uids = [1000 + i for i in range(count)]
+    xs = np.array([(i % SIZE) * 100 + rng.uniform(-20, 20) for i in range(count)])
+    ys = np.array([(i // SIZE) * 100 + rng.uniform(-20, 20) for i in range(count)])
+
+    node_id, distance, direction = [], [], []
+    starts, middles, ends = [], [], []
+    for i in range(count):
+        x, y = i % SIZE, i // SIZE
+        neighbours = [(x + dx, y + dy) for dx, dy in ((1, 0), (-1, 0), (0, 1), (0, -1))
+                      if 0 <= x + dx < SIZE and 0 <= y + dy < SIZE and rng.random() > 0.15]
+        starts.append(len(node_id))
+        for half in (0, 1):
+            if half == 1:
+                middles.append(len(node_id))
+            for nx, ny in neighbours:
+                if rng.random() < 0.3:
+                    continue
+                j = ny * SIZE + nx
+                node_id.append(uids[j])
+                distance.append(math.hypot(xs[i] - xs[j], ys[i] - ys[j]) * rng.uniform(1.0, 1.3))
+                direction.append(rng.randint(0, 1))
+        ends.append(len(node_id))
+
+    navigation = c.NavigationColumns(len(node_id), uids, starts, middles, ends,
+                                     node_id=np.array(node_id, dtype=np.uint64),
+                                     distance=np.array(distance),
+                                     direction=np.array(direction, dtype=np.int8))
+    nodes = c.NodeColumns(count, uid=np.array(uids, dtype=np.uint64), x=xs, y=ys)
+    return SimpleNamespace(navigation_columns=navigation, node_columns=nodes)
+
+def dijkstra(graph: NavigationGraph, starts: list[int], goals: list[int]) -> float | None:
+    goals = set(goals)
+    distances = {start: 0.0 for start in starts}
+    queue = [(0.0, start) for start in starts]
+    settled = set()
+    while queue:
+        distance, state = heapq.heappop(queue)
+        if state in settled:
+            continue
+        if state in goals:
+            return distance
+        settled.add(state)
+        for edge in range(graph.offsets[state], graph.offsets[state + 1]):
+            target = graph.targets[edge]
+            new_distance = distance + graph.weights[edge]
+            if new_distance < distances.get(target, math.inf):
+                distances[target] = new_distance
+                heapq.heappush(queue, (new_distance, target))
+    return None
+
+def path_length(graph: NavigationGraph, states: list[int]) -> float:
+    """The length of the path over the graph's edges, fails if two states aren't connected."""
+    length = 0
+    for source, target in zip(states, states[1:]):
+        weights = [graph.weights[edge] for edge in range(graph.offsets[source], graph.offsets[source + 1])
+                   if graph.targets[edge] == target]
+        assert weights, f"{source} -> {target} isn't an edge"
+        length += min(weights)
+    return length
+
+@pytest.fixture(scope="module")
+def router() -> Router:
+    return Router(grid_map())
+
+@pytest.fixture(scope="module")
+def pairs() -> list[tuple[int, int]]:
+    rng = random.Random(2)
+    uids = [1000 + i for i in range(SIZE * SIZE)]
+    return [(rng.choice(uids), rng.choice(uids)) for _ in range(40)]
+
+def check_routes(router: Router, pairs: list[tuple[int, int]]) -> None:
+    graph = router.graph
+    for start, goal in pairs:
+        router.cache.clear()
+        route = router.route(start, goal)
+        expected = dijkstra(graph, graph.states_of(start), graph.states_of(goal))
+        if expected is None:
+            assert route is None
+            continue
+        assert route is not None
+        assert route.distance == pytest.approx(expected, abs=1e-6)
+        assert path_length(graph, route.states) == pytest.approx(expected, abs=1e-6)
+        assert route.node_uids[0] == start and route.node_uids[-1] == goal
+
+def test_astar_matches_dijkstra(router, pairs):
+    router.hierarchy = None
+    check_routes(router, pairs)
+
+def test_hierarchy_matches_dijkstra(router, pairs):
+    hierarchy = ContractionHierarchy.build(router.graph)
+    # Through the columns, the way it's loaded from the map cache.
+    router.hierarchy = ContractionHierarchy(hierarchy.columns())
+    try:
+        check_routes(router, pairs)
+    finally:
+        router.hierarchy = None
+
+def test_routes_are_cached(router, pairs):
+    start, goal = pairs[0]
+    router.cache.clear()
+    assert router.route(start, goal) is router.route(start, goal)